@@ -0,0 +1,41 @@
+"""Add covering indexes for reports aggregates
+
+Revision ID: h7i8j9k0l1m2
+Revises: g6h7i8j9k0l1
+Create Date: 2026-10-18
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'h7i8j9k0l1m2'
+down_revision: Union[str, None] = 'g6h7i8j9k0l1'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Create indexes used by the reports conditional-aggregation queries."""
+    op.create_index(
+        'ix_conversation_sessions_company_created',
+        'conversation_sessions',
+        ['company_id', 'created_at'],
+        unique=False,
+        postgresql_include=['status', 'channel', 'assignee_id', 'waiting_for_agent'],
+    )
+    op.create_index(
+        'ix_chat_messages_company_timestamp',
+        'chat_messages',
+        ['company_id', 'timestamp'],
+        unique=False,
+        postgresql_include=['feedback_rating', 'issue'],
+    )
+
+
+def downgrade() -> None:
+    """Drop reports indexes."""
+    op.drop_index('ix_chat_messages_company_timestamp', table_name='chat_messages')
+    op.drop_index('ix_conversation_sessions_company_created', table_name='conversation_sessions')
@@ -0,0 +1,64 @@
+"""Add conversation_stats counters table
+
+Revision ID: i8j9k0l1m2n3
+Revises: h7i8j9k0l1m2
+Create Date: 2026-10-18
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'i8j9k0l1m2n3'
+down_revision: Union[str, None] = 'h7i8j9k0l1m2'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Create conversation_stats and backfill it from conversation_sessions."""
+    op.create_table(
+        'conversation_stats',
+        sa.Column('company_id', sa.Integer(), nullable=False),
+        sa.Column('total_count', sa.BigInteger(), nullable=False, server_default='0'),
+        sa.Column('closed_count', sa.BigInteger(), nullable=False, server_default='0'),
+        sa.Column('unattended_count', sa.BigInteger(), nullable=False, server_default='0'),
+        sa.Column('waiting_for_agent_count', sa.BigInteger(), nullable=False, server_default='0'),
+        sa.Column('reopened_count', sa.BigInteger(), nullable=False, server_default='0'),
+        sa.Column('reopen_events', sa.BigInteger(), nullable=False, server_default='0'),
+        sa.Column('reopen_delay_seconds', sa.Float(), nullable=False, server_default='0'),
+        sa.Column('reopen_delay_samples', sa.BigInteger(), nullable=False, server_default='0'),
+        sa.Column('updated_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=True),
+        sa.ForeignKeyConstraint(['company_id'], ['companies.id'], ondelete='CASCADE'),
+        sa.PrimaryKeyConstraint('company_id')
+    )
+
+    op.execute("""
+        INSERT INTO conversation_stats (
+            company_id, total_count, closed_count, unattended_count, waiting_for_agent_count,
+            reopened_count, reopen_events, reopen_delay_seconds, reopen_delay_samples
+        )
+        SELECT
+            company_id,
+            COUNT(*),
+            SUM(CASE WHEN status IN ('resolved', 'archived') THEN 1 ELSE 0 END),
+            SUM(CASE WHEN status NOT IN ('resolved', 'archived')
+                      AND (assignee_id IS NULL OR waiting_for_agent) THEN 1 ELSE 0 END),
+            SUM(CASE WHEN status NOT IN ('resolved', 'archived') AND waiting_for_agent THEN 1 ELSE 0 END),
+            SUM(CASE WHEN reopen_count > 0 THEN 1 ELSE 0 END),
+            COALESCE(SUM(reopen_count), 0),
+            COALESCE(SUM(CASE WHEN resolved_at IS NOT NULL AND last_reopened_at IS NOT NULL
+                         THEN EXTRACT(EPOCH FROM last_reopened_at - resolved_at) ELSE 0 END), 0),
+            SUM(CASE WHEN resolved_at IS NOT NULL AND last_reopened_at IS NOT NULL THEN 1 ELSE 0 END)
+        FROM conversation_sessions
+        WHERE company_id IS NOT NULL
+        GROUP BY company_id
+    """)
+
+
+def downgrade() -> None:
+    """Drop conversation_stats."""
+    op.drop_table('conversation_stats')
@@ -0,0 +1,40 @@
+"""Add composite indexes for keyset-paginated inbox listing
+
+Revision ID: j9k0l1m2n3o4
+Revises: i8j9k0l1m2n3
+Create Date: 2026-10-18
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'j9k0l1m2n3o4'
+down_revision: Union[str, None] = 'i8j9k0l1m2n3'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+INBOX_INDEXES = {
+    'ix_conversation_sessions_inbox': ['company_id', 'updated_at', 'id'],
+    'ix_conversation_sessions_inbox_status': ['company_id', 'status', 'updated_at', 'id'],
+    'ix_conversation_sessions_inbox_assignee': ['company_id', 'assignee_id', 'updated_at', 'id'],
+    'ix_conversation_sessions_inbox_channel': ['company_id', 'channel', 'updated_at', 'id'],
+    'ix_conversation_sessions_inbox_priority': ['company_id', 'priority', 'updated_at', 'id'],
+}
+
+
+def upgrade() -> None:
+    """Create inbox listing indexes."""
+    for name, columns in INBOX_INDEXES.items():
+        op.create_index(name, 'conversation_sessions', columns, unique=False)
+    op.create_index('ix_chat_messages_session_timestamp', 'chat_messages', ['session_id', 'timestamp'], unique=False)
+
+
+def downgrade() -> None:
+    """Drop inbox listing indexes."""
+    op.drop_index('ix_chat_messages_session_timestamp', table_name='chat_messages')
+    for name in reversed(list(INBOX_INDEXES)):
+        op.drop_index(name, table_name='conversation_sessions')
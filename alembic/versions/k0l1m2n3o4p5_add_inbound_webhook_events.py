@@ -0,0 +1,49 @@
+"""Add inbound_webhook_events table
+
+Revision ID: k0l1m2n3o4p5
+Revises: j9k0l1m2n3o4
+Create Date: 2026-10-18
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'k0l1m2n3o4p5'
+down_revision: Union[str, None] = 'j9k0l1m2n3o4'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Create inbound_webhook_events table."""
+    op.create_table(
+        'inbound_webhook_events',
+        sa.Column('id', sa.BigInteger(), nullable=False),
+        sa.Column('channel', sa.String(20), nullable=False),
+        sa.Column('provider_message_id', sa.String(255), nullable=False),
+        sa.Column('conversation_key', sa.String(255), nullable=False),
+        sa.Column('integration_id', sa.Integer(), nullable=True),
+        sa.Column('payload', sa.JSON(), nullable=False),
+        sa.Column('status', sa.String(20), nullable=False, server_default='pending'),
+        sa.Column('attempts', sa.Integer(), nullable=False, server_default='0'),
+        sa.Column('error', sa.Text(), nullable=True),
+        sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=True),
+        sa.Column('processed_at', sa.DateTime(timezone=True), nullable=True),
+        sa.PrimaryKeyConstraint('id'),
+        sa.UniqueConstraint('channel', 'provider_message_id', name='uq_inbound_webhook_event_provider_id')
+    )
+    op.create_index(op.f('ix_inbound_webhook_events_id'), 'inbound_webhook_events', ['id'], unique=False)
+    op.create_index('ix_inbound_webhook_events_status_created', 'inbound_webhook_events', ['status', 'created_at'], unique=False)
+    op.create_index('ix_inbound_webhook_events_conversation', 'inbound_webhook_events', ['channel', 'conversation_key', 'status', 'id'], unique=False)
+
+
+def downgrade() -> None:
+    """Drop inbound_webhook_events table."""
+    op.drop_index('ix_inbound_webhook_events_conversation', table_name='inbound_webhook_events')
+    op.drop_index('ix_inbound_webhook_events_status_created', table_name='inbound_webhook_events')
+    op.drop_index(op.f('ix_inbound_webhook_events_id'), table_name='inbound_webhook_events')
+    op.drop_table('inbound_webhook_events')
@@ -0,0 +1,34 @@
+"""Add progress columns to content_exports
+
+Revision ID: l1m2n3o4p5q6
+Revises: k0l1m2n3o4p5
+Create Date: 2026-10-18
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'l1m2n3o4p5q6'
+down_revision: Union[str, None] = 'k0l1m2n3o4p5'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Track export progress and allow export files over 2 GB."""
+    op.add_column('content_exports', sa.Column('total_count', sa.Integer(), nullable=True))
+    op.add_column('content_exports', sa.Column('processed_count', sa.Integer(), nullable=False, server_default='0'))
+    op.add_column('content_exports', sa.Column('error_message', sa.Text(), nullable=True))
+    op.alter_column('content_exports', 'file_size', type_=sa.BigInteger(), existing_type=sa.Integer(), existing_nullable=True)
+
+
+def downgrade() -> None:
+    """Drop export progress columns."""
+    op.alter_column('content_exports', 'file_size', type_=sa.Integer(), existing_type=sa.BigInteger(), existing_nullable=True)
+    op.drop_column('content_exports', 'error_message')
+    op.drop_column('content_exports', 'processed_count')
+    op.drop_column('content_exports', 'total_count')
@@ -0,0 +1,32 @@
+"""Add background processing columns to content_media
+
+Revision ID: m2n3o4p5q6r7
+Revises: l1m2n3o4p5q6
+Create Date: 2026-10-18
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'm2n3o4p5q6r7'
+down_revision: Union[str, None] = 'l1m2n3o4p5q6'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Track media processing state and rendered thumbnail sizes."""
+    # Existing media was processed synchronously at upload time
+    op.add_column('content_media', sa.Column('processing_status', sa.String(length=20), nullable=False, server_default='completed'))
+    op.add_column('content_media', sa.Column('thumbnails', postgresql.JSONB(astext_type=sa.Text()), nullable=True))
+
+
+def downgrade() -> None:
+    """Drop media processing columns."""
+    op.drop_column('content_media', 'thumbnails')
+    op.drop_column('content_media', 'processing_status')
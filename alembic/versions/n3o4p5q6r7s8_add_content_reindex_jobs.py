@@ -0,0 +1,50 @@
+"""Add content_reindex_jobs and content_items.search_index_hash
+
+Revision ID: n3o4p5q6r7s8
+Revises: m2n3o4p5q6r7
+Create Date: 2026-10-18
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'n3o4p5q6r7s8'
+down_revision: Union[str, None] = 'm2n3o4p5q6r7'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Track indexed document hashes and bulk reindex checkpoints."""
+    op.add_column('content_items', sa.Column('search_index_hash', sa.String(length=64), nullable=True))
+
+    op.create_table(
+        'content_reindex_jobs',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('company_id', sa.Integer(), nullable=False),
+        sa.Column('scope', sa.String(length=100), nullable=False),
+        sa.Column('status', sa.String(length=20), nullable=False),
+        sa.Column('last_item_id', sa.Integer(), nullable=False),
+        sa.Column('indexed_count', sa.Integer(), nullable=False),
+        sa.Column('skipped_count', sa.Integer(), nullable=False),
+        sa.Column('error_count', sa.Integer(), nullable=False),
+        sa.Column('started_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=True),
+        sa.Column('updated_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=True),
+        sa.Column('completed_at', sa.DateTime(timezone=True), nullable=True),
+        sa.ForeignKeyConstraint(['company_id'], ['companies.id']),
+        sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index(op.f('ix_content_reindex_jobs_id'), 'content_reindex_jobs', ['id'], unique=False)
+    op.create_index(op.f('ix_content_reindex_jobs_company_id'), 'content_reindex_jobs', ['company_id'], unique=False)
+
+
+def downgrade() -> None:
+    """Drop reindex checkpoints and document hashes."""
+    op.drop_index(op.f('ix_content_reindex_jobs_company_id'), table_name='content_reindex_jobs')
+    op.drop_index(op.f('ix_content_reindex_jobs_id'), table_name='content_reindex_jobs')
+    op.drop_table('content_reindex_jobs')
+    op.drop_column('content_items', 'search_index_hash')
@@ -0,0 +1,54 @@
+"""Add knowledge_base_ingestion_jobs
+
+Revision ID: o4p5q6r7s8t9
+Revises: n3o4p5q6r7s8
+Create Date: 2026-10-18
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'o4p5q6r7s8t9'
+down_revision: Union[str, None] = 'n3o4p5q6r7s8'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Track background document ingestion into knowledge bases."""
+    op.create_table(
+        'knowledge_base_ingestion_jobs',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('company_id', sa.Integer(), nullable=False),
+        sa.Column('knowledge_base_id', sa.Integer(), nullable=True),
+        sa.Column('name', sa.String(), nullable=False),
+        sa.Column('description', sa.String(), nullable=True),
+        sa.Column('file_name', sa.String(), nullable=False),
+        sa.Column('storage_key', sa.String(), nullable=False),
+        sa.Column('embedding_model', sa.String(length=50), nullable=False),
+        sa.Column('vector_store_type', sa.String(length=20), nullable=False),
+        sa.Column('status', sa.String(length=20), nullable=False),
+        sa.Column('total_pages', sa.Integer(), nullable=True),
+        sa.Column('processed_pages', sa.Integer(), nullable=False),
+        sa.Column('chunk_count', sa.Integer(), nullable=False),
+        sa.Column('error_message', sa.Text(), nullable=True),
+        sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=True),
+        sa.Column('started_at', sa.DateTime(timezone=True), nullable=True),
+        sa.Column('completed_at', sa.DateTime(timezone=True), nullable=True),
+        sa.ForeignKeyConstraint(['company_id'], ['companies.id']),
+        sa.ForeignKeyConstraint(['knowledge_base_id'], ['knowledge_bases.id'], ondelete='SET NULL'),
+        sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index(op.f('ix_knowledge_base_ingestion_jobs_id'), 'knowledge_base_ingestion_jobs', ['id'], unique=False)
+    op.create_index(op.f('ix_knowledge_base_ingestion_jobs_company_id'), 'knowledge_base_ingestion_jobs', ['company_id'], unique=False)
+
+
+def downgrade() -> None:
+    """Drop knowledge base ingestion jobs."""
+    op.drop_index(op.f('ix_knowledge_base_ingestion_jobs_company_id'), table_name='knowledge_base_ingestion_jobs')
+    op.drop_index(op.f('ix_knowledge_base_ingestion_jobs_id'), table_name='knowledge_base_ingestion_jobs')
+    op.drop_table('knowledge_base_ingestion_jobs')
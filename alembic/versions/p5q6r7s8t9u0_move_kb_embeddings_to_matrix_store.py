@@ -0,0 +1,29 @@
+"""Keep legacy knowledge_bases.embeddings for the embedding matrix store
+
+Revision ID: p5q6r7s8t9u0
+Revises: o4p5q6r7s8t9
+Create Date: 2026-10-18
+
+Legacy knowledge bases are searched through per-node embedding matrices.
+Databases that still have the JSON ``knowledge_bases.embeddings`` column keep
+it: each app node builds a knowledge base's matrix from the column the first
+time it searches it (knowledge_base_service._backfill_legacy_embeddings), so
+nothing depends on the host alembic runs on. Drop the column in a later
+revision once every node has its matrices.
+"""
+from typing import Sequence, Union
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'p5q6r7s8t9u0'
+down_revision: Union[str, None] = 'o4p5q6r7s8t9'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    pass
+
+
+def downgrade() -> None:
+    pass
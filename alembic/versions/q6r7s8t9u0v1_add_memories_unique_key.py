@@ -0,0 +1,37 @@
+"""Make memories unique per agent, session and key
+
+Revision ID: q6r7s8t9u0v1
+Revises: p5q6r7s8t9u0
+Create Date: 2026-10-18
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'q6r7s8t9u0v1'
+down_revision: Union[str, None] = 'p5q6r7s8t9u0'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Keep the newest row of duplicated keys, then index (agent_id, session_id, key) for upserts."""
+    op.execute(
+        """
+        DELETE FROM memories AS older
+        USING memories AS newer
+        WHERE older.agent_id = newer.agent_id
+          AND older.session_id = newer.session_id
+          AND older.key = newer.key
+          AND older.id < newer.id
+        """
+    )
+    op.create_index('uq_memories_agent_session_key', 'memories', ['agent_id', 'session_id', 'key'], unique=True)
+
+
+def downgrade() -> None:
+    """Drop the unique memory key index."""
+    op.drop_index('uq_memories_agent_session_key', table_name='memories')
@@ -0,0 +1,51 @@
+"""Add webhook_deliveries
+
+Revision ID: r7s8t9u0v1w2
+Revises: q6r7s8t9u0v1
+Create Date: 2026-10-18
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'r7s8t9u0v1w2'
+down_revision: Union[str, None] = 'q6r7s8t9u0v1'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Outbox for API channel webhook callbacks."""
+    op.create_table(
+        'webhook_deliveries',
+        sa.Column('id', sa.BigInteger(), nullable=False),
+        sa.Column('company_id', sa.Integer(), nullable=False),
+        sa.Column('api_integration_id', sa.Integer(), nullable=True),
+        sa.Column('event_type', sa.String(length=50), nullable=False),
+        sa.Column('url', sa.String(), nullable=False),
+        sa.Column('body', sa.Text(), nullable=False),
+        sa.Column('signature', sa.String(length=64), nullable=False),
+        sa.Column('status', sa.String(length=20), server_default='pending', nullable=False),
+        sa.Column('attempts', sa.Integer(), server_default='0', nullable=False),
+        sa.Column('next_attempt_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=False),
+        sa.Column('last_status_code', sa.Integer(), nullable=True),
+        sa.Column('last_error', sa.Text(), nullable=True),
+        sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=True),
+        sa.Column('delivered_at', sa.DateTime(timezone=True), nullable=True),
+        sa.ForeignKeyConstraint(['company_id'], ['companies.id']),
+        sa.ForeignKeyConstraint(['api_integration_id'], ['api_integrations.id'], ondelete='CASCADE'),
+        sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index(op.f('ix_webhook_deliveries_id'), 'webhook_deliveries', ['id'], unique=False)
+    op.create_index('ix_webhook_deliveries_status_next_attempt', 'webhook_deliveries', ['status', 'next_attempt_at'], unique=False)
+
+
+def downgrade() -> None:
+    """Drop the webhook delivery outbox."""
+    op.drop_index('ix_webhook_deliveries_status_next_attempt', table_name='webhook_deliveries')
+    op.drop_index(op.f('ix_webhook_deliveries_id'), table_name='webhook_deliveries')
+    op.drop_table('webhook_deliveries')
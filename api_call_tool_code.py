@@ -11,7 +11,8 @@ def run(params: dict, config: dict) -> dict:
             - method (str): The HTTP method (GET, POST, PUT, DELETE, PATCH).
             - headers (str, optional): A JSON string representing the request headers.
             - body (str, optional): A JSON string representing the request body.
-        config (dict): A dictionary for configuration (e.g., db session), not used here.
+        config (dict): A dictionary for configuration (e.g., db session). Its optional
+            'http_session' is a shared requests.Session that keeps connections alive.
 
     Returns:
         A dictionary containing the status code and response data or an error message.
@@ -32,7 +33,8 @@ def run(params: dict, config: dict) -> dict:
         if method.upper() in ["POST", "PUT", "PATCH"] and body_str:
             parsed_body = json.loads(body_str)
 
-        response = requests.request(
+        http = config.get("http_session") or requests
+        response = http.request(
             method=method.upper(),
             url=url,
             headers=parsed_headers,
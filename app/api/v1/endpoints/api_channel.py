@@ -5,17 +5,18 @@ External-facing API for third-party integrations.
 Authenticated via X-API-Key header.
 """
 from datetime import datetime, timezone
-from fastapi import APIRouter, Depends, HTTPException, status, Header, Query, Body
+from fastapi import APIRouter, Depends, HTTPException, status, Header, Query, Body, Response
 from sqlalchemy.orm import Session
 from typing import Optional, Tuple
 
 from app.core.dependencies import get_db
 from app.models.api_key import ApiKey
 from app.models.api_integration import ApiIntegration
-from app.services import api_key_service, conversation_session_service, chat_service
+from app.services import api_key_service, conversation_session_service, chat_service, inbound_webhook_service
 from app.services.api_channel_service import (
     ApiChannelService,
-    get_api_integration_by_api_key
+    get_api_integration_by_api_key,
+    process_queued_message
 )
 from app.schemas.api_channel import (
     ApiMessageSend, ApiMessageResponse, ResponseMode,
@@ -80,16 +81,20 @@ async def get_api_key_and_integration(
 
 # ============ MESSAGE ENDPOINTS ============
 
-@router.post("/message", response_model=ApiMessageResponse)
+@router.post("/message", response_model=ApiMessageResponse, responses={202: {"model": ApiMessageResponse}})
 async def send_message(
     message: ApiMessageSend,
+    http_response: Response,
     db: Session = Depends(get_db),
     auth_data: Tuple[ApiKey, ApiIntegration, int] = Depends(get_api_key_and_integration)
 ):
     """
     Send a message to the AI agent and receive a response.
 
-    - Supports sync (wait for response) or async (webhook callback) modes
+    - Supports sync (wait for response) or async (webhook callback) modes.
+      Async requests return 202 with status "accepted" once the message is
+      stored; the reply is POSTed to the integration's webhook URL, signed
+      with HMAC-SHA256 of the raw body in `X-Webhook-Signature`
     - Automatically creates or continues conversation sessions
     - Executes configured workflows or falls back to agent
 
@@ -112,6 +117,8 @@ async def send_message(
         company_id=company_id
     )
 
+    if response.status == "accepted":
+        http_response.status_code = status.HTTP_202_ACCEPTED
     return response
 
 
@@ -353,3 +360,6 @@ async def update_session_context(
         status="success",
         message="Session context updated"
     )
+
+
+inbound_webhook_service.inbound_webhook_worker.register_handler("api", process_queued_message)
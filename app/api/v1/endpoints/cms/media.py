@@ -39,8 +39,11 @@ async def upload_media(
     - **Video**: mp4, webm, ogg, mov (max 200 MB)
     - **Files**: pdf, doc, docx, xls, xlsx, txt, csv (max 25 MB)
 
-    For images, a thumbnail is automatically generated.
-    For audio/video, duration is automatically extracted.
+    The file is streamed to storage and the response returns immediately.
+    Image dimensions and the default thumbnail, and audio/video duration, are
+    filled in by a background worker; poll GET /{media_id} until
+    `processing_status` is `completed`. Other thumbnail sizes are available
+    from GET /{media_id}/thumbnail.
     """
     try:
         db_media = await media_service.upload_media(
@@ -71,6 +74,8 @@ async def upload_media(
             width=db_media.width,
             height=db_media.height,
             duration=db_media.duration,
+            processing_status=db_media.processing_status,
+            thumbnails=db_media.thumbnails,
             alt_text=db_media.alt_text,
             caption=db_media.caption,
             usage_count=db_media.usage_count,
@@ -130,6 +135,8 @@ def list_media(
             "width": item.width,
             "height": item.height,
             "duration": item.duration,
+            "processing_status": item.processing_status,
+            "thumbnails": item.thumbnails,
             "alt_text": item.alt_text,
             "caption": item.caption,
             "usage_count": item.usage_count,
@@ -160,6 +167,10 @@ def get_media(
     if not media:
         raise HTTPException(status_code=404, detail="Media not found")
 
+    # Re-queue processing that never ran (e.g. the worker restarted mid-queue)
+    if media.processing_status == 'pending':
+        media_service.schedule_processing(media)
+
     # Add URL
     response = ContentMediaResponse(
         id=media.id,
@@ -175,6 +186,8 @@ def get_media(
         width=media.width,
         height=media.height,
         duration=media.duration,
+        processing_status=media.processing_status,
+        thumbnails=media.thumbnails,
         alt_text=media.alt_text,
         caption=media.caption,
         usage_count=media.usage_count,
@@ -222,6 +235,8 @@ def update_media(
         width=media.width,
         height=media.height,
         duration=media.duration,
+        processing_status=media.processing_status,
+        thumbnails=media.thumbnails,
         alt_text=media.alt_text,
         caption=media.caption,
         usage_count=media.usage_count,
@@ -281,3 +296,39 @@ def get_media_download_url(
         "thumbnail_url": thumbnail_url,
         "expires_in": expires_in
     }
+
+
+@router.get("/{media_id}/thumbnail")
+def get_media_thumbnail(
+    *,
+    db: Session = Depends(get_db),
+    current_user: models_user.User = Depends(get_current_active_user),
+    media_id: int,
+    size: int = Query(300, description="Thumbnail bounding box in px (one of MEDIA_THUMBNAIL_SIZES)"),
+    expires_in: int = Query(3600, ge=60, le=86400, description="URL expiration time in seconds")
+):
+    """
+    Get a pre-signed URL for an image thumbnail at the given size.
+
+    Sizes that haven't been requested before are rendered on first request.
+    """
+    media = media_service.get_content_media(
+        db=db,
+        media_id=media_id,
+        company_id=current_user.company_id
+    )
+    if not media:
+        raise HTTPException(status_code=404, detail="Media not found")
+
+    try:
+        thumbnail_key = media_service.ensure_thumbnail(db, media, size)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    if not thumbnail_key:
+        raise HTTPException(status_code=404, detail="Thumbnail not available")
+
+    return {
+        "url": media_service.get_thumbnail_url(media, expires_in=expires_in, s3_key=thumbnail_key),
+        "size": size,
+        "expires_in": expires_in
+    }
@@ -354,7 +354,7 @@ def regenerate_api_token(
 # ==================== Exports ====================
 
 class ExportRequest(BaseModel):
-    format: str  # json or csv
+    format: str  # json, csv or ndjson
     knowledge_base_id: Optional[int] = None
     content_type_id: Optional[int] = None
     status: Optional[str] = None
@@ -369,6 +369,9 @@ class ExportResponse(BaseModel):
     status: str
     file_size: Optional[int]
     item_count: Optional[int]
+    total_count: Optional[int] = None
+    processed_count: Optional[int] = None
+    error_message: Optional[str] = None
     completed_at: Optional[datetime]
     expires_at: Optional[datetime]
     created_at: datetime
@@ -408,10 +411,10 @@ def create_export(
             visibility_filter=export_request.visibility
         )
 
-        # Process in background
+        # Process in background (with its own session; the request's is closed by then)
         background_tasks.add_task(
-            export_service.process_export,
-            db, export_record.id, current_user.company_id
+            export_service.run_export,
+            export_record.id, current_user.company_id
         )
 
         return export_record
@@ -35,9 +35,24 @@ class SemanticSearchRequest(BaseModel):
 
 
 class ReindexResponse(BaseModel):
-    success_count: int
+    success_count: int  # indexed + skipped
     error_count: int
     message: str
+    job_id: Optional[int] = None
+    indexed_count: int = 0
+    skipped_count: int = 0  # unchanged since last indexed
+
+
+def _reindex_response(job) -> ReindexResponse:
+    success_count = job.indexed_count + job.skipped_count
+    return ReindexResponse(
+        success_count=success_count,
+        error_count=job.error_count,
+        message=f"Reindexed {success_count} items ({job.skipped_count} unchanged) with {job.error_count} errors",
+        job_id=job.id,
+        indexed_count=job.indexed_count,
+        skipped_count=job.skipped_count
+    )
 
 
 @router.get("/", response_model=SearchResponse)
@@ -141,25 +156,25 @@ def reindex_content_type(
     *,
     db: Session = Depends(get_db),
     current_user: models_user.User = Depends(get_current_active_user),
-    content_type_id: int
+    content_type_id: int,
+    restart: bool = Query(False, description="Start over instead of resuming an interrupted reindex")
 ):
     """
     Reindex all content items of a specific content type.
 
-    Use this after modifying which fields are searchable.
+    Use this after modifying which fields are searchable. Items that haven't
+    changed since they were last indexed are skipped, and an interrupted
+    reindex resumes where it stopped.
     """
     try:
-        success_count, error_count = search_service.reindex_content_type(
+        job = search_service.reindex_content_type(
             db=db,
             content_type_id=content_type_id,
-            company_id=current_user.company_id
+            company_id=current_user.company_id,
+            restart=restart
         )
 
-        return ReindexResponse(
-            success_count=success_count,
-            error_count=error_count,
-            message=f"Reindexed {success_count} items with {error_count} errors"
-        )
+        return _reindex_response(job)
     except ValueError as e:
         raise HTTPException(status_code=404, detail=str(e))
 
@@ -169,24 +184,24 @@ def reindex_all_content(
     *,
     db: Session = Depends(get_db),
     current_user: models_user.User = Depends(get_current_active_user),
-    knowledge_base_id: Optional[int] = Query(None, description="Only reindex specific knowledge base")
+    knowledge_base_id: Optional[int] = Query(None, description="Only reindex specific knowledge base"),
+    restart: bool = Query(False, description="Start over instead of resuming an interrupted reindex")
 ):
     """
     Reindex all published content for the company.
 
-    This can be a long-running operation for large datasets.
+    This can be a long-running operation for large datasets. Items that
+    haven't changed since they were last indexed are skipped, and an
+    interrupted reindex resumes where it stopped.
     """
     try:
-        success_count, error_count = search_service.reindex_all_content(
+        job = search_service.reindex_all_content(
             db=db,
             company_id=current_user.company_id,
-            knowledge_base_id=knowledge_base_id
+            knowledge_base_id=knowledge_base_id,
+            restart=restart
         )
 
-        return ReindexResponse(
-            success_count=success_count,
-            error_count=error_count,
-            message=f"Reindexed {success_count} items with {error_count} errors"
-        )
+        return _reindex_response(job)
     except ValueError as e:
         raise HTTPException(status_code=400, detail=str(e))
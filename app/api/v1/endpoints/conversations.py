@@ -5,7 +5,7 @@ from pydantic import BaseModel
 import datetime
 
 from app.core.dependencies import get_db, get_current_active_user, get_current_company, require_permission
-from app.services import chat_service, agent_service, conversation_session_service, summary_service
+from app.services import chat_service, agent_service, conversation_session_service, conversation_stats_service, summary_service
 from app.schemas import chat_message as schemas_chat_message, session as schemas_session, conversation_session as schemas_conversation_session
 from app.models import user as models_user, conversation_session as models_conversation_session, chat_message as models_chat_message
 
@@ -31,18 +31,9 @@ class PriorityUpdate(BaseModel):
 def get_session_counts(db: Session = Depends(get_db), current_user: models_user.User = Depends(get_current_active_user)):
     """
     Get counts of sessions by status for the company.
-    Returns: { "open": count, "resolved": count, "all": count }
+    Returns: { "open": count, "resolved": count, "all": count, "unattended": count, "waiting_for_agent": count }
     """
-    all_sessions = chat_service.get_sessions_with_details(db, company_id=current_user.company_id)
-
-    open_count = sum(1 for s in all_sessions if s.status not in ['resolved', 'archived'])
-    resolved_count = sum(1 for s in all_sessions if s.status in ['resolved', 'archived'])
-
-    return {
-        "open": open_count,
-        "resolved": resolved_count,
-        "all": len(all_sessions)
-    }
+    return conversation_stats_service.get_session_counts(db, current_user.company_id)
 
 @router.get("/analytics/reopens", dependencies=[Depends(require_permission("conversation:read"))])
 async def get_reopen_analytics(
@@ -57,51 +48,10 @@ async def get_reopen_analytics(
     - start_date: Optional date filter in YYYY-MM-DD format
     - end_date: Optional date filter in YYYY-MM-DD format
     """
-    query = db.query(models_conversation_session.ConversationSession).filter(
-        models_conversation_session.ConversationSession.company_id == current_user.company_id,
-        models_conversation_session.ConversationSession.reopen_count > 0
-    )
-
-    if start_date:
-        start_datetime = datetime.datetime.strptime(start_date, '%Y-%m-%d')
-        query = query.filter(models_conversation_session.ConversationSession.last_reopened_at >= start_datetime)
-    if end_date:
-        end_datetime = datetime.datetime.strptime(end_date, '%Y-%m-%d').replace(hour=23, minute=59, second=59)
-        query = query.filter(models_conversation_session.ConversationSession.last_reopened_at <= end_datetime)
-
-    sessions = query.all()
+    start_datetime = datetime.datetime.strptime(start_date, '%Y-%m-%d') if start_date else None
+    end_datetime = datetime.datetime.strptime(end_date, '%Y-%m-%d').replace(hour=23, minute=59, second=59) if end_date else None
 
-    total_reopens = sum(s.reopen_count for s in sessions)
-    avg_reopen_count = total_reopens / len(sessions) if sessions else 0
-
-    # Calculate average time to reopen
-    times_to_reopen = []
-    for s in sessions:
-        if s.resolved_at and s.last_reopened_at:
-            delta = (s.last_reopened_at - s.resolved_at).total_seconds()
-            times_to_reopen.append(delta)
-
-    avg_time_to_reopen = sum(times_to_reopen) / len(times_to_reopen) if times_to_reopen else 0
-
-    # Get total conversations for reopen rate
-    total_query = db.query(models_conversation_session.ConversationSession).filter(
-        models_conversation_session.ConversationSession.company_id == current_user.company_id
-    )
-    if start_date:
-        total_query = total_query.filter(models_conversation_session.ConversationSession.created_at >= start_datetime)
-    if end_date:
-        total_query = total_query.filter(models_conversation_session.ConversationSession.created_at <= end_datetime)
-
-    total_conversations = total_query.count()
-    reopen_rate = (len(sessions) / total_conversations * 100) if total_conversations > 0 else 0
-
-    return {
-        "total_conversations_reopened": len(sessions),
-        "total_reopen_events": total_reopens,
-        "average_reopens_per_conversation": round(avg_reopen_count, 2),
-        "average_time_to_reopen_hours": round(avg_time_to_reopen / 3600, 2) if avg_time_to_reopen > 0 else 0,
-        "reopen_rate_percentage": round(reopen_rate, 2),
-    }
+    return conversation_stats_service.get_reopen_analytics(db, current_user.company_id, start_datetime, end_datetime)
 
 
 @router.get("/sessions", response_model=List[schemas_session.Session], dependencies=[Depends(require_permission("conversation:read"))])
@@ -119,43 +69,77 @@ def get_all_sessions(
       - 'resolved' returns: resolved, archived
       - None returns: all sessions
     """
-    from app.services.connection_manager import manager
-
-    sessions_from_db = chat_service.get_sessions_with_details(db, company_id=current_user.company_id)
+    rows, _ = chat_service.list_inbox_sessions(
+        db, current_user.company_id, status_filter=status_filter if status_filter in ('open', 'resolved') else None
+    )
+    return _inbox_rows_to_sessions(db, rows)
+
+
+@router.get("/sessions/page", response_model=schemas_session.SessionPage, dependencies=[Depends(require_permission("conversation:read"))])
+def get_sessions_page(
+    limit: int = Query(default=50, ge=1, le=200, description="Max sessions to return"),
+    cursor: Optional[str] = Query(default=None, description="next_cursor from the previous page"),
+    status_filter: Optional[str] = Query(default=None, description="'open', 'resolved' or an exact status"),
+    assignee_id: Optional[int] = None,
+    unassigned: bool = False,
+    channel: Optional[str] = None,
+    priority: Optional[int] = None,
+    db: Session = Depends(get_db),
+    current_user: models_user.User = Depends(get_current_active_user)
+):
+    """
+    Keyset-paginated inbox listing, newest activity first.
 
-    # Apply status filter
-    if status_filter == 'open':
-        sessions_from_db = [s for s in sessions_from_db if s.status not in ['resolved', 'archived']]
-    elif status_filter == 'resolved':
-        sessions_from_db = [s for s in sessions_from_db if s.status in ['resolved', 'archived']]
+    Pass the returned `next_cursor` as `cursor` to fetch the next page.
+    """
+    try:
+        rows, next_cursor = chat_service.list_inbox_sessions(
+            db,
+            current_user.company_id,
+            limit=limit,
+            cursor=cursor,
+            status_filter=status_filter,
+            assignee_id=assignee_id,
+            unassigned=unassigned,
+            channel=channel,
+            priority=priority,
+        )
+    except ValueError:
+        raise HTTPException(status_code=400, detail="Invalid cursor")
 
-    sessions = []
-    for s in sessions_from_db:
-        first_message = chat_service.get_first_message_for_session(db, s.conversation_id, current_user.company_id)
-        contact_info = chat_service.get_contact_for_session(db, s.conversation_id, current_user.company_id)
+    return schemas_session.SessionPage(
+        sessions=_inbox_rows_to_sessions(db, rows),
+        has_more=next_cursor is not None,
+        next_cursor=next_cursor,
+    )
 
-        # Get real-time connection status from ConnectionManager
-        real_time_connected = manager.get_connection_status(s.conversation_id)
 
-        # If real-time status differs from DB, update DB
-        if real_time_connected != s.is_client_connected:
-            print(f"[get_all_sessions] Syncing connection status for {s.conversation_id}: DB={s.is_client_connected} -> Real-time={real_time_connected}")
-            s.is_client_connected = real_time_connected
-            db.commit()
+def _inbox_rows_to_sessions(db: Session, rows) -> List[schemas_session.Session]:
+    from app.services.connection_manager import manager
 
-        sessions.append(schemas_session.Session(
-            session_id=s.conversation_id,
-            status=s.status,
-            assignee_id=s.assignee_id,  # Use assignee_id instead of agent_id
-            last_message_timestamp=s.updated_at.isoformat(),
-            first_message_content=first_message.message if first_message else "",
-            channel=s.channel,
-            contact_name=contact_info.name if contact_info else "Unknown",
-            contact_phone=contact_info.phone_number if contact_info else None,
-            is_client_connected=real_time_connected,  # Use real-time status
-            priority=s.priority
-        ))
-    return sessions
+    # Use real-time connection status from ConnectionManager and sync stale DB flags
+    realtime = chat_service.sync_client_connection_flags(db, rows, manager.get_connection_status)
+
+    return [
+        schemas_session.Session(
+            session_id=row.conversation_id,
+            status=row.status,
+            assignee_id=row.assignee_id,
+            last_message_timestamp=row.updated_at.isoformat(),
+            first_message_content=row.first_message or "",
+            last_message_content=row.last_message,
+            channel=row.channel,
+            contact_name=row.contact_name if row.contact_id else "Unknown",
+            contact_phone=row.contact_phone,
+            contact=schemas_session.ContactInfo(
+                id=row.contact_id, name=row.contact_name, email=row.contact_email, phone_number=row.contact_phone
+            ) if row.contact_id else None,
+            is_client_connected=realtime[row.conversation_id],
+            is_ai_enabled=row.is_ai_enabled,
+            priority=row.priority
+        )
+        for row in rows
+    ]
 
 
 # Summary endpoints - must be defined BEFORE /{agent_id}/{session_id} routes to avoid route conflicts
@@ -19,9 +19,9 @@ from app.models.user import User
 from app.models.freeswitch_phone_number import FreeSwitchPhoneNumber
 from app.models.voice_call import VoiceCall
 from app.services.freeswitch_voice_service import FreeSwitchVoiceService, get_freeswitch_phone_numbers_by_company
-from app.services.audio_conversion_service import AudioConversionService
+from app.services.audio_conversion_service import audio_transcoder
 from app.services.stt_service import OpenAISTTService
-from app.services.tts_service import OpenAITTSService
+from app.services.tts_cache_service import get_telephony_audio, l16_format, tts_audio_cache
 from app.services.vad_service import SileroVADService, VADEvent, VADResult
 from app.services.openai_realtime_service import (
     OpenAIRealtimeService,
@@ -112,17 +112,11 @@ async def handle_freeswitch_realtime_mode(
         # the next user speech cycle begins (on speech_started event).
         # This ensures any lingering OpenAI responses are discarded.
         try:
-            tts_service = OpenAITTSService(api_key=openai_api_key)
-            pcm_audio = await tts_service.text_to_speech_pcm(text)
-
-            # Convert PCM 24kHz to L16 8kHz for FreeSWITCH
-            l16_bytes = convert_pcm_24k_to_l16_8k(pcm_audio)
+            # Workflow messages are mostly static node prompts - serve them from the TTS cache
+            l16_bytes = await get_telephony_audio(text, openai_api_key, l16_format(8000))
 
             # Send in chunks (640 bytes = 40ms at 8kHz L16)
-            chunk_size = 640
-            for i in range(0, len(l16_bytes), chunk_size):
-                chunk = l16_bytes[i:i+chunk_size]
-                l16_b64 = base64.b64encode(chunk).decode("utf-8")
+            for l16_b64 in await audio_transcoder.encode_b64_chunks(l16_bytes, 640):
                 await websocket.send_json({"event": "audio", "audio": l16_b64})
                 await asyncio.sleep(0.04)  # 40ms between chunks
 
@@ -142,7 +136,7 @@ async def handle_freeswitch_realtime_mode(
                     audio_data = data.get("audio", "")
                     if audio_data:
                         l16_bytes = base64.b64decode(audio_data)
-                        pcm_24k = convert_l16_8k_to_pcm_24k(l16_bytes)
+                        pcm_24k = await audio_transcoder.run(convert_l16_8k_to_pcm_24k, l16_bytes)
                         await realtime.send_audio(pcm_24k)
 
                 elif event_type == "disconnect":
@@ -168,11 +162,13 @@ async def handle_freeswitch_realtime_mode(
         async def flush_audio_buffer():
             """Forward all buffered audio to FreeSWITCH."""
             nonlocal audio_buffer
-            for chunk in audio_buffer:
-                l16_bytes = convert_pcm_24k_to_l16_8k(chunk)
-                l16_b64 = base64.b64encode(l16_bytes).decode("utf-8")
-                await websocket.send_json({"event": "audio", "audio": l16_b64})
-            audio_buffer = []
+            # Convert buffered audio in off-loop batches; chunks that arrive
+            # while a batch is converting are picked up by the next pass
+            while audio_buffer:
+                pending, audio_buffer = audio_buffer, []
+                payloads = await audio_transcoder.pcm_batch_to_l16_b64(pending, from_rate=24000, to_rate=8000)
+                for l16_b64 in payloads:
+                    await websocket.send_json({"event": "audio", "audio": l16_b64})
 
         try:
             async for event in realtime.receive_events():
@@ -202,7 +198,7 @@ async def handle_freeswitch_realtime_mode(
                         audio_buffer.append(audio_bytes)
                     else:
                         # No pending workflow check, forward immediately
-                        l16_bytes = convert_pcm_24k_to_l16_8k(audio_bytes)
+                        l16_bytes = await audio_transcoder.run(convert_pcm_24k_to_l16_8k, audio_bytes)
                         l16_b64 = base64.b64encode(l16_bytes).decode("utf-8")
                         await websocket.send_json({"event": "audio", "audio": l16_b64})
 
@@ -427,7 +423,6 @@ async def freeswitch_audio_stream(
     await websocket.send_json({"event": "connected", "protocol": "audio_stream", "version": "1.0"})
 
     voice_service = FreeSwitchVoiceService(db)
-    audio_converter = AudioConversionService()
 
     # State variables
     openai_api_key = None
@@ -461,7 +456,7 @@ async def freeswitch_audio_stream(
         is_processing = True
         try:
             # Convert accumulated L16 PCM to format for Whisper
-            pcm_16k = audio_converter.freeswitch_buffer_to_whisper_format(audio_buffer, sample_rate)
+            pcm_16k = await audio_transcoder.freeswitch_buffer_to_whisper(audio_buffer, sample_rate)
 
             # Transcribe with Whisper
             stt_service = OpenAISTTService(api_key=openai_api_key)
@@ -490,23 +485,19 @@ async def freeswitch_audio_stream(
         finally:
             is_processing = False
 
-    async def stream_tts_response(text: str):
+    async def stream_tts_response(text: str, static: bool = False):
         """Generate TTS and stream back to FreeSWITCH."""
         try:
-            tts_service = OpenAITTSService(api_key=openai_api_key)
-
-            # Get PCM audio from TTS
-            pcm_audio = await tts_service.text_to_speech_pcm(text)
-
-            # Convert to FreeSWITCH format (L16 at configured sample rate)
-            l16_b64 = audio_converter.tts_to_freeswitch(
-                pcm_audio,
-                tts_sample_rate=24000,
-                target_sample_rate=sample_rate
+            # Get FreeSWITCH format (L16 at configured sample rate); the
+            # greeting and prompts registered by a workflow warmup go
+            # through the TTS cache, free-form answers don't
+            cacheable = static or await tts_audio_cache.is_static_prompt(text)
+            l16_bytes = await get_telephony_audio(
+                text, openai_api_key, l16_format(sample_rate), static=static, cacheable=cacheable
             )
 
             # Send to FreeSWITCH in chunks
-            chunks = audio_converter.chunk_audio_for_freeswitch(l16_b64, chunk_size=640)
+            chunks = await audio_transcoder.encode_b64_chunks(l16_bytes, 640)
 
             for chunk in chunks:
                 audio_message = {
@@ -636,7 +627,7 @@ async def freeswitch_audio_stream(
                 # Send welcome message if configured (only in standard mode)
                 welcome_message = call_config.get("welcome_message")
                 if welcome_message and openai_api_key and not use_realtime:
-                    await stream_tts_response(welcome_message)
+                    await stream_tts_response(welcome_message, static=True)
 
                 logger.info(f"Call setup complete: {call_uuid}, company: {company_id}, agent: {agent_id}")
 
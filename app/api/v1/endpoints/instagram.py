@@ -1,11 +1,11 @@
 from fastapi import APIRouter, Request, Depends, HTTPException, Response
 from sqlalchemy.orm import Session
+from sqlalchemy.ext.asyncio import AsyncSession
 import logging
 import traceback
 import httpx
-import base64
 
-from app.core.dependencies import get_db
+from app.core.dependencies import get_async_db
 from app.core.config import settings
 from app.services import (
     contact_service,
@@ -16,13 +16,15 @@ from app.services import (
     integration_service,
     messaging_service,
     agent_service,
-    agent_execution_service
+    agent_execution_service,
+    inbound_webhook_service
 )
 from app.services.workflow_execution_service import WorkflowExecutionService
 from app.models.workflow_trigger import TriggerChannel
 from app.schemas.chat_message import ChatMessageCreate
 from app.schemas import chat_message as schemas_chat_message
-from app.api.v1.endpoints.websocket_conversations import manager as session_ws_manager, process_attachments_for_storage
+from app.api.v1.endpoints.websocket_conversations import manager as session_ws_manager
+from app.services import attachment_service
 
 router = APIRouter()
 
@@ -84,10 +86,19 @@ async def verify_webhook(request: Request):
         raise HTTPException(status_code=403, detail="Invalid verification token")
 
 @router.post("")
-async def receive_message(request: Request, db: Session = Depends(get_db)):
+async def receive_message(request: Request, db: AsyncSession = Depends(get_async_db)):
+    """
+    Acknowledges Instagram webhooks immediately. Every messaging event is
+    stored as its own event and processed by the inbound webhook worker.
+    """
     data = await request.json()
     logging.info(f"Received Instagram webhook data: {data}")
 
+    await inbound_webhook_service.accept_webhook(db, "instagram", inbound_webhook_service.split_meta_messaging_payload(data, "instagram"))
+    return Response(status_code=200)
+
+
+async def process_webhook_payload(data: dict, db: Session, integration_id: int = None):
     try:
         if data.get("object") == "instagram" and "entry" in data:
             for entry in data["entry"]:
@@ -106,13 +117,11 @@ async def receive_message(request: Request, db: Session = Depends(get_db)):
                                 att_url = att.get("payload", {}).get("url", "")
                                 if att_url:
                                     try:
-                                        # Download media from Instagram URL and convert to base64
+                                        # Download media from Instagram URL
                                         logging.info(f"[Instagram] Downloading {att_type} media from URL")
                                         media_result = await download_instagram_media(att_url)
-                                        file_data_base64 = base64.b64encode(media_result["data"]).decode('utf-8')
-
                                         attachment = {
-                                            "file_data": file_data_base64,
+                                            "data": media_result["data"],
                                             "file_name": f"instagram_{att_type}{media_result['extension']}",
                                             "file_type": media_result["mime_type"],
                                             "file_size": len(media_result["data"])
@@ -130,6 +139,10 @@ async def receive_message(request: Request, db: Session = Depends(get_db)):
 
                             logging.info(f"[Instagram] Processed {len(attachments)} attachment(s)")
 
+                            # Upload downloaded media to S3 (drops the raw bytes once stored)
+                            if attachments:
+                                await attachment_service.ingest_attachments(attachments)
+
                             # If no text but has attachments, use attachment info as message
                             if not message_text and attachments:
                                 att_name = attachments[0].get('file_name', attachments[0].get('name', 'attachment'))
@@ -458,4 +471,7 @@ async def receive_message(request: Request, db: Session = Depends(get_db)):
     except Exception as e:
         logging.error(f"An unexpected error occurred: {e}\n{traceback.format_exc()}")
     
-    return Response(status_code=200)
\ No newline at end of file
+    return Response(status_code=200)
+
+
+inbound_webhook_service.inbound_webhook_worker.register_handler("instagram", process_webhook_payload)
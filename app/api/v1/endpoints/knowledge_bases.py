@@ -1,4 +1,4 @@
-from fastapi import APIRouter, Depends, HTTPException, UploadFile, File, Form
+from fastapi import APIRouter, Depends, HTTPException, UploadFile, File, Form, BackgroundTasks
 from sqlalchemy.orm import Session
 from typing import List, Optional
 from pydantic import BaseModel, HttpUrl
@@ -12,7 +12,7 @@ from RestrictedPython import compile_restricted, safe_builtins
 
 from app.schemas import knowledge_base as schemas_knowledge_base
 from app.schemas.temporary_document import TemporaryDocument
-from app.services import knowledge_base_service, knowledge_base_processing_service
+from app.services import knowledge_base_service, knowledge_base_processing_service, knowledge_base_ingestion_service
 from app.core.dependencies import get_db, get_current_active_user, require_permission
 from app.models import user as models_user
 from app.crud import crud_temporary_document
@@ -98,6 +98,13 @@ class KnowledgeBaseCreateFromURL(BaseModel):
     description: str | None = None
     knowledge_base_id: Optional[int] = None # New field for appending
 
+# Allowed MIME types for knowledge base uploads
+ALLOWED_UPLOAD_MIME_TYPES = {
+    "application/pdf": ".pdf",
+    "text/plain": ".txt",
+    "application/vnd.openxmlformats-officedocument.wordprocessingml.document": ".docx"
+}
+
 @router.post("/upload", response_model=schemas_knowledge_base.KnowledgeBase, dependencies=[Depends(require_permission("knowledgebase:create"))])
 def upload_knowledge_base_file(
     *,
@@ -114,18 +121,10 @@ def upload_knowledge_base_file(
     Supported formats: PDF (.pdf), Text (.txt), Word (.docx)
     """
     # Validate file type using MIME type detection
-    file_content = file.file.read()
-    mime_type = magic.from_buffer(file_content[:2048], mime=True)
+    mime_type = magic.from_buffer(file.file.read(2048), mime=True)
     file.file.seek(0)  # Reset file pointer
 
-    # Allowed MIME types
-    allowed_mime_types = {
-        "application/pdf": ".pdf",
-        "text/plain": ".txt",
-        "application/vnd.openxmlformats-officedocument.wordprocessingml.document": ".docx"
-    }
-
-    if mime_type not in allowed_mime_types:
+    if mime_type not in ALLOWED_UPLOAD_MIME_TYPES:
         raise HTTPException(
             status_code=400,
             detail=f"Unsupported file type: {mime_type}. Supported formats: PDF, TXT, DOCX. "
@@ -135,11 +134,65 @@ def upload_knowledge_base_file(
     # Create a simple object that mimics the Agent model for the purpose of passing the embedding model
     agent = SimpleNamespace(embedding_model=embedding_model)
 
-    knowledge_base = knowledge_base_processing_service.process_and_store_document(
-        db=db, file=file, agent=agent, company_id=current_user.company_id, name=name, description=description, vector_store_type=vector_store_type
-    )
+    try:
+        knowledge_base = knowledge_base_processing_service.process_and_store_document(
+            db=db, file=file, agent=agent, company_id=current_user.company_id, name=name, description=description, vector_store_type=vector_store_type
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
     return knowledge_base
 
+@router.post("/ingest", response_model=schemas_knowledge_base.KnowledgeBaseIngestionJob, status_code=202, dependencies=[Depends(require_permission("knowledgebase:create"))])
+def ingest_knowledge_base_file(
+    *,
+    db: Session = Depends(get_db),
+    current_user: models_user.User = Depends(get_current_active_user),
+    background_tasks: BackgroundTasks,
+    file: UploadFile = File(...),
+    name: str = Form(...),
+    description: str = Form(None),
+    embedding_model: str = Form("nvidia"),
+    vector_store_type: str = Form("chroma")
+):
+    """
+    Upload a file to create a new knowledge base in the background.
+    Supported formats: PDF (.pdf), Text (.txt), Word (.docx)
+
+    Returns the ingestion job; poll GET /ingestion-jobs/{job_id} until it is
+    completed (knowledge_base_id is then set) or failed.
+    """
+    mime_type = magic.from_buffer(file.file.read(2048), mime=True)
+    file.file.seek(0)
+    if mime_type not in ALLOWED_UPLOAD_MIME_TYPES:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Unsupported file type: {mime_type}. Supported formats: PDF, TXT, DOCX. "
+                   f"Note: Legacy .doc files must be converted to .docx or .pdf first."
+        )
+
+    try:
+        job = knowledge_base_ingestion_service.start_document_ingestion(
+            db, file, current_user.company_id, name, description,
+            embedding_model=embedding_model, vector_store_type=vector_store_type
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+    # Process in background (with its own session; the request's is closed by then)
+    background_tasks.add_task(knowledge_base_ingestion_service.run_ingestion_job, job.id)
+    return job
+
+@router.get("/ingestion-jobs/{job_id}", response_model=schemas_knowledge_base.KnowledgeBaseIngestionJob, dependencies=[Depends(require_permission("knowledgebase:read"))])
+def get_ingestion_job(
+    job_id: int,
+    db: Session = Depends(get_db),
+    current_user: models_user.User = Depends(get_current_active_user)
+):
+    job = knowledge_base_ingestion_service.get_ingestion_job(db, job_id, current_user.company_id)
+    if not job:
+        raise HTTPException(status_code=404, detail="Ingestion job not found")
+    return job
+
 @router.post("/from-url", response_model=schemas_knowledge_base.KnowledgeBase, dependencies=[Depends(require_permission("knowledgebase:create"))])
 def create_knowledge_base_from_url(
     kb_from_url: KnowledgeBaseCreateFromURL,
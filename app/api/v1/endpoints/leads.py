@@ -454,6 +454,26 @@ def get_unassigned_leads(
     return leads
 
 
+@router.post("/rescore", dependencies=[Depends(require_permission("lead:update"))])
+def rescore_leads(
+    full: bool = Query(False, description="Re-score every lead with recent enrollments, not only those with new activity"),
+    lookback_days: int = Query(30, ge=1, le=365),
+    db: Session = Depends(get_db),
+    current_user: models_user.User = Depends(get_current_active_user)
+):
+    """
+    Re-score engagement and combined scores for the company's leads in bulk
+    """
+    summary = lead_qualification_service.rescore_leads(
+        db=db,
+        company_id=current_user.company_id,
+        lookback_days=lookback_days,
+        full=full
+    )
+
+    return {"success": True, **summary}
+
+
 @router.post("/bulk-assign", dependencies=[Depends(require_permission("lead:update"))])
 def bulk_assign_leads(
     lead_ids: List[int],
@@ -12,6 +12,7 @@ from app.models import user as models_user, conversation_session as models_conve
 from app.services.connection_manager import manager
 from app.services.stt_service import STTService, GroqSTTService, OpenAISTTService
 from app.services.tts_service import TTSService
+from app.services.tts_cache_service import stream_browser_tts
 from fastapi import UploadFile
 import io
 import logging
@@ -318,7 +319,8 @@ async def public_voice_websocket_endpoint(
             # Optionally convert to speech
             if tts_provider:
                 try:
-                    audio_stream = tts_service.text_to_speech_stream(message_text, final_voice_id, tts_provider)
+                    # Hold messages are fixed, so they are served from the TTS cache
+                    audio_stream = stream_browser_tts(tts_service, message_text, final_voice_id, tts_provider, static=True)
                     async for audio_chunk in audio_stream:
                         await websocket.send_bytes(audio_chunk)
                 except Exception as e:
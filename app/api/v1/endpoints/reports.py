@@ -1,6 +1,6 @@
 from fastapi import APIRouter, Depends, Query
 from sqlalchemy.orm import Session
-from sqlalchemy import desc, func, or_
+from sqlalchemy import func
 from app.core.dependencies import get_db
 from app.models import conversation_session as models_conversation_session
 from app.models import agent as models_agent
@@ -8,6 +8,7 @@ from app.models import chat_message as models_chat_message
 from typing import Dict, Any, List
 from app.models.user import User
 from app.core.auth import get_current_user
+from app.services import report_service
 import datetime
 
 router = APIRouter()
@@ -19,94 +20,7 @@ def get_overall_metrics(
     end_date: datetime.date = Query(None),
     current_user: User = Depends(get_current_user),
 ) -> Dict[str, Any]:
-
-    # Convert end_date to include the entire day (23:59:59)
-    end_datetime = datetime.datetime.combine(end_date, datetime.time.max) if end_date else None
-
-    query = db.query(models_conversation_session.ConversationSession)
-    query = query.filter(models_conversation_session.ConversationSession.company_id == current_user.company_id)
-    if start_date:
-        query = query.filter(models_conversation_session.ConversationSession.created_at >= start_date)
-    if end_datetime:
-        query = query.filter(models_conversation_session.ConversationSession.created_at <= end_datetime)
-
-    total_conversations = query.count()
-
-    # Active conversations (not resolved or archived)
-    active_conversations = db.query(models_conversation_session.ConversationSession).filter(
-        models_conversation_session.ConversationSession.company_id == current_user.company_id,
-        ~models_conversation_session.ConversationSession.status.in_(['resolved', 'archived'])
-    )
-    if start_date:
-        active_conversations = active_conversations.filter(models_conversation_session.ConversationSession.created_at >= start_date)
-    if end_datetime:
-        active_conversations = active_conversations.filter(models_conversation_session.ConversationSession.created_at <= end_datetime)
-    active_conversations_count = active_conversations.count()
-
-    # Resolved conversations count
-    resolved_conversations = db.query(models_conversation_session.ConversationSession).filter(
-        models_conversation_session.ConversationSession.company_id == current_user.company_id,
-        models_conversation_session.ConversationSession.status == 'resolved'
-    )
-    if start_date:
-        resolved_conversations = resolved_conversations.filter(models_conversation_session.ConversationSession.created_at >= start_date)
-    if end_datetime:
-        resolved_conversations = resolved_conversations.filter(models_conversation_session.ConversationSession.created_at <= end_datetime)
-    resolved_conversations_count = resolved_conversations.count()
-
-    # Resolution rate
-    resolution_rate = round((resolved_conversations_count / total_conversations) * 100, 2) if total_conversations > 0 else 0
-
-    # Unattended conversations (no assignee or waiting for agent)
-    unattended_conversations = db.query(models_conversation_session.ConversationSession).filter(
-        models_conversation_session.ConversationSession.company_id == current_user.company_id,
-        or_(
-            models_conversation_session.ConversationSession.assignee_id.is_(None),
-            models_conversation_session.ConversationSession.waiting_for_agent == True
-        ),
-        ~models_conversation_session.ConversationSession.status.in_(['resolved', 'archived'])
-    )
-    if start_date:
-        unattended_conversations = unattended_conversations.filter(models_conversation_session.ConversationSession.created_at >= start_date)
-    if end_datetime:
-        unattended_conversations = unattended_conversations.filter(models_conversation_session.ConversationSession.created_at <= end_datetime)
-    unattended_conversations_count = unattended_conversations.count()
-
-    avg_satisfaction_query = db.query(func.avg(models_chat_message.ChatMessage.feedback_rating))
-    avg_satisfaction_query = avg_satisfaction_query.filter(models_chat_message.ChatMessage.company_id == current_user.company_id)
-    if start_date:
-        avg_satisfaction_query = avg_satisfaction_query.filter(models_chat_message.ChatMessage.timestamp >= start_date)
-    if end_datetime:
-        avg_satisfaction_query = avg_satisfaction_query.filter(models_chat_message.ChatMessage.timestamp <= end_datetime)
-    avg_satisfaction = avg_satisfaction_query.scalar() or 0
-
-    active_agents = db.query(models_agent.Agent).filter(models_agent.Agent.is_active == True).count()
-
-    # Agent availability (users who are online)
-    available_users = db.query(User).filter(
-        User.company_id == current_user.company_id,
-        User.is_active == True,
-        User.presence_status == 'online'
-    ).count()
-
-    total_users = db.query(User).filter(
-        User.company_id == current_user.company_id,
-        User.is_active == True
-    ).count()
-
-    agent_availability_rate = round((available_users / total_users) * 100, 2) if total_users > 0 else 0
-
-    return {
-        "total_sessions": total_conversations,
-        "customer_satisfaction": round(avg_satisfaction, 2),
-        "active_agents": active_agents,
-        "active_conversations": active_conversations_count,
-        "resolution_rate": f"{resolution_rate}%",
-        "available_users": available_users,
-        "total_users": total_users,
-        "agent_availability_rate": f"{agent_availability_rate}%",
-        "unattended_conversations": unattended_conversations_count,
-    }
+    return report_service.get_overall_metrics(db, current_user.company_id, start_date, end_date)
 
 @router.get("/agent-performance")
 def get_agent_performance(
@@ -129,6 +43,7 @@ def get_agent_performance(
         models_chat_message.ChatMessage,
         models_conversation_session.ConversationSession.id == models_chat_message.ChatMessage.session_id
     )
+    query = query.filter(models_conversation_session.ConversationSession.company_id == current_user.company_id)
 
     if start_date:
         query = query.filter(models_conversation_session.ConversationSession.created_at >= start_date)
@@ -154,29 +69,16 @@ def get_customer_satisfaction(
     end_date: datetime.date = Query(None),
     current_user: User = Depends(get_current_user),
 ) -> List[Dict[str, Any]]:
-    # Convert end_date to include the entire day (23:59:59)
-    end_datetime = datetime.datetime.combine(end_date, datetime.time.max) if end_date else None
+    satisfaction_data = report_service.get_satisfaction_distribution(db, current_user.company_id, start_date, end_date)
 
-    query = db.query(
-        models_chat_message.ChatMessage.feedback_rating,
-        func.count(models_chat_message.ChatMessage.id).label('count')
-    ).filter(models_chat_message.ChatMessage.feedback_rating != None)
+    total_ratings = sum(satisfaction_data.values())
 
-    if start_date:
-        query = query.filter(models_chat_message.ChatMessage.timestamp >= start_date)
-    if end_datetime:
-        query = query.filter(models_chat_message.ChatMessage.timestamp <= end_datetime)
-
-    satisfaction_data = query.group_by(models_chat_message.ChatMessage.feedback_rating).all()
-    
-    total_ratings = sum([item.count for item in satisfaction_data])
-    
     return [
         {
             "rating": rating,
             "percentage": round((count / total_ratings) * 100, 2) if total_ratings > 0 else 0
         }
-        for rating, count in satisfaction_data
+        for rating, count in satisfaction_data.items()
     ]
 
 @router.get("/top-issues")
@@ -186,28 +88,7 @@ def get_top_issues(
     end_date: datetime.date = Query(None),
     current_user: User = Depends(get_current_user),
 ) -> List[Dict[str, Any]]:
-    # Convert end_date to include the entire day (23:59:59)
-    end_datetime = datetime.datetime.combine(end_date, datetime.time.max) if end_date else None
-
-    query = db.query(
-        models_chat_message.ChatMessage.issue,
-        func.count(models_chat_message.ChatMessage.id).label('count')
-    ).filter(models_chat_message.ChatMessage.issue != None)
-
-    if start_date:
-        query = query.filter(models_chat_message.ChatMessage.timestamp >= start_date)
-    if end_datetime:
-        query = query.filter(models_chat_message.ChatMessage.timestamp <= end_datetime)
-
-    top_issues_data = query.group_by(models_chat_message.ChatMessage.issue).order_by(desc('count')).limit(10).all()
-    
-    return [
-        {
-            "issue": issue,
-            "count": count
-        }
-        for issue, count in top_issues_data
-    ]
+    return report_service.get_top_issues(db, current_user.company_id, start_date, end_date)
 
 @router.get("/error-rates")
 def get_error_rates(
@@ -229,7 +110,9 @@ def get_latency(
     # Convert end_date to include the entire day (23:59:59)
     end_datetime = datetime.datetime.combine(end_date, datetime.time.max) if end_date else None
 
-    query = db.query(models_chat_message.ChatMessage).order_by(models_chat_message.ChatMessage.timestamp)
+    query = db.query(models_chat_message.ChatMessage).filter(
+        models_chat_message.ChatMessage.company_id == current_user.company_id
+    ).order_by(models_chat_message.ChatMessage.timestamp)
     if start_date:
         query = query.filter(models_chat_message.ChatMessage.timestamp >= start_date)
     if end_datetime:
@@ -271,22 +154,8 @@ def get_conversation_status(
     """
     Get conversation counts grouped by status (active, inactive, assigned, pending, resolved, archived)
     """
-    # Convert end_date to include the entire day (23:59:59)
-    end_datetime = datetime.datetime.combine(end_date, datetime.time.max) if end_date else None
-
-    query = db.query(
-        models_conversation_session.ConversationSession.status,
-        func.count(models_conversation_session.ConversationSession.id).label('count')
-    ).filter(models_conversation_session.ConversationSession.company_id == current_user.company_id)
-
-    if start_date:
-        query = query.filter(models_conversation_session.ConversationSession.created_at >= start_date)
-    if end_datetime:
-        query = query.filter(models_conversation_session.ConversationSession.created_at <= end_datetime)
-
-    status_data = query.group_by(models_conversation_session.ConversationSession.status).all()
-
-    total_conversations = sum([item.count for item in status_data])
+    metrics = report_service.get_conversation_metrics(db, current_user.company_id, start_date, end_date)
+    total_conversations = metrics["total"]
 
     return [
         {
@@ -294,7 +163,7 @@ def get_conversation_status(
             "count": count,
             "percentage": round((count / total_conversations) * 100, 2) if total_conversations > 0 else 0
         }
-        for status, count in status_data
+        for status, count in metrics["by_status"].items()
     ]
 
 @router.get("/conversation-trends")
@@ -307,28 +176,7 @@ def get_conversation_trends(
     """
     Get daily conversation counts for trend analysis
     """
-    # Convert end_date to include the entire day (23:59:59)
-    end_datetime = datetime.datetime.combine(end_date, datetime.time.max) if end_date else None
-
-    query = db.query(
-        func.date(models_conversation_session.ConversationSession.created_at).label('date'),
-        func.count(models_conversation_session.ConversationSession.id).label('count')
-    ).filter(models_conversation_session.ConversationSession.company_id == current_user.company_id)
-
-    if start_date:
-        query = query.filter(models_conversation_session.ConversationSession.created_at >= start_date)
-    if end_datetime:
-        query = query.filter(models_conversation_session.ConversationSession.created_at <= end_datetime)
-
-    trends_data = query.group_by(func.date(models_conversation_session.ConversationSession.created_at)).order_by('date').all()
-
-    return [
-        {
-            "date": str(date),
-            "count": count
-        }
-        for date, count in trends_data
-    ]
+    return report_service.get_conversation_trends(db, current_user.company_id, start_date, end_date)
 
 @router.get("/channel-distribution")
 def get_channel_distribution(
@@ -340,22 +188,8 @@ def get_channel_distribution(
     """
     Get conversation counts grouped by channel (web, whatsapp, messenger, instagram, telegram, gmail)
     """
-    # Convert end_date to include the entire day (23:59:59)
-    end_datetime = datetime.datetime.combine(end_date, datetime.time.max) if end_date else None
-
-    query = db.query(
-        models_conversation_session.ConversationSession.channel,
-        func.count(models_conversation_session.ConversationSession.id).label('count')
-    ).filter(models_conversation_session.ConversationSession.company_id == current_user.company_id)
-
-    if start_date:
-        query = query.filter(models_conversation_session.ConversationSession.created_at >= start_date)
-    if end_datetime:
-        query = query.filter(models_conversation_session.ConversationSession.created_at <= end_datetime)
-
-    channel_data = query.group_by(models_conversation_session.ConversationSession.channel).all()
-
-    total_conversations = sum([item.count for item in channel_data])
+    metrics = report_service.get_conversation_metrics(db, current_user.company_id, start_date, end_date)
+    total_conversations = metrics["total"]
 
     return [
         {
@@ -363,7 +197,7 @@ def get_channel_distribution(
             "count": count,
             "percentage": round((count / total_conversations) * 100, 2) if total_conversations > 0 else 0
         }
-        for channel, count in channel_data
+        for channel, count in metrics["by_channel"].items()
     ]
 
 @router.get("/alerts")
@@ -1,10 +1,11 @@
 from fastapi import APIRouter, Request, Depends, HTTPException, Response
 from sqlalchemy.orm import Session
+from sqlalchemy.ext.asyncio import AsyncSession
 import logging
 import traceback
 import httpx
 
-from app.core.dependencies import get_db
+from app.core.dependencies import get_async_db
 from app.core.config import settings
 from app.services import (
     contact_service,
@@ -15,8 +16,10 @@ from app.services import (
     integration_service,
     messaging_service,
     agent_service,
-    agent_execution_service
+    agent_execution_service,
+    inbound_webhook_service
 )
+from app.models.integration import Integration
 from app.services.workflow_execution_service import WorkflowExecutionService
 from app.models.workflow_trigger import TriggerChannel
 from app.schemas.chat_message import ChatMessageCreate
@@ -26,9 +29,12 @@ from app.api.v1.endpoints.websocket_conversations import manager as session_ws_m
 router = APIRouter()
 
 @router.post("/webhook/{token}")
-async def receive_message(token: str, request: Request, db: Session = Depends(get_db)):
-    
-    integration = integration_service.get_integration_by_telegram_bot_token(db, bot_token=token)
+async def receive_message(token: str, request: Request, db: AsyncSession = Depends(get_async_db)):
+    """
+    Acknowledges Telegram updates immediately; the update is stored and
+    processed by the inbound webhook worker.
+    """
+    integration = await integration_service.get_integration_by_telegram_bot_token_async(db, bot_token=token)
     if not integration:
         logging.error(f"Error: No active integration found for Telegram bot token: {token}")
         raise HTTPException(status_code=404, detail="Integration not found")
@@ -36,6 +42,18 @@ async def receive_message(token: str, request: Request, db: Session = Depends(ge
     data = await request.json()
     logging.info(f"Received Telegram webhook data: {data}")
 
+    await inbound_webhook_service.accept_webhook(
+        db, "telegram", inbound_webhook_service.split_telegram_update(data, integration.id), integration_id=integration.id
+    )
+    return Response(status_code=200)
+
+
+async def process_webhook_payload(data: dict, db: Session, integration_id: int = None):
+    integration = db.query(Integration).filter(Integration.id == integration_id).first()
+    if not integration:
+        logging.error(f"Error: Telegram integration {integration_id} no longer exists")
+        return
+
     try:
         if "message" in data:
             message = data["message"]
@@ -279,3 +297,6 @@ async def receive_message(token: str, request: Request, db: Session = Depends(ge
         logging.error(f"An unexpected error occurred: {e}\n{traceback.format_exc()}")
     
     return Response(status_code=200)
+
+
+inbound_webhook_service.inbound_webhook_worker.register_handler("telegram", process_webhook_payload)
@@ -16,9 +16,9 @@ from app.models.user import User
 from app.models.twilio_phone_number import TwilioPhoneNumber
 from app.models.voice_call import VoiceCall
 from app.services.twilio_voice_service import TwilioVoiceService, get_voice_calls_by_company
-from app.services.audio_conversion_service import AudioConversionService
+from app.services.audio_conversion_service import audio_transcoder
 from app.services.stt_service import OpenAISTTService
-from app.services.tts_service import OpenAITTSService
+from app.services.tts_cache_service import get_telephony_audio, tts_audio_cache, FORMAT_TWILIO_MULAW_8K
 from app.services.vad_service import SileroVADService, VADEvent, VADResult
 from app.services.openai_realtime_service import (
     OpenAIRealtimeService,
@@ -246,17 +246,11 @@ async def handle_realtime_mode(
         # the next user speech cycle begins (on speech_started event).
         # This ensures any lingering OpenAI responses are discarded.
         try:
-            tts_service = OpenAITTSService(api_key=openai_api_key)
-            pcm_audio = await tts_service.text_to_speech_pcm(text)
-
-            # Convert PCM 24kHz to mulaw 8kHz for Twilio
-            mulaw_bytes = convert_pcm_24k_to_mulaw_8k(pcm_audio)
+            # Workflow messages are mostly static node prompts - serve them from the TTS cache
+            mulaw_bytes = await get_telephony_audio(text, openai_api_key, FORMAT_TWILIO_MULAW_8K)
 
             # Send in chunks (640 bytes = 40ms at 8kHz mulaw)
-            chunk_size = 640
-            for i in range(0, len(mulaw_bytes), chunk_size):
-                chunk = mulaw_bytes[i:i+chunk_size]
-                mulaw_b64 = base64.b64encode(chunk).decode("utf-8")
+            for mulaw_b64 in await audio_transcoder.encode_b64_chunks(mulaw_bytes, 640):
                 media_message = {
                     "event": "media",
                     "streamSid": stream_sid,
@@ -283,7 +277,7 @@ async def handle_realtime_mode(
                     if payload:
                         # Decode mulaw and convert to PCM 24kHz
                         mulaw_bytes = base64.b64decode(payload)
-                        pcm_24k = convert_mulaw_8k_to_pcm_24k(mulaw_bytes)
+                        pcm_24k = await audio_transcoder.run(convert_mulaw_8k_to_pcm_24k, mulaw_bytes)
                         await realtime.send_audio(pcm_24k)
 
                 elif event_type == "stop":
@@ -309,15 +303,17 @@ async def handle_realtime_mode(
         async def flush_audio_buffer():
             """Forward all buffered audio to Twilio."""
             nonlocal audio_buffer
-            for chunk in audio_buffer:
-                mulaw_bytes = convert_pcm_24k_to_mulaw_8k(chunk)
-                mulaw_b64 = base64.b64encode(mulaw_bytes).decode("utf-8")
-                await websocket.send_json({
-                    "event": "media",
-                    "streamSid": stream_sid,
-                    "media": {"payload": mulaw_b64}
-                })
-            audio_buffer = []
+            # Convert buffered audio in off-loop batches; chunks that arrive
+            # while a batch is converting are picked up by the next pass
+            while audio_buffer:
+                pending, audio_buffer = audio_buffer, []
+                payloads = await audio_transcoder.pcm_batch_to_mulaw_b64(pending, from_rate=24000)
+                for mulaw_b64 in payloads:
+                    await websocket.send_json({
+                        "event": "media",
+                        "streamSid": stream_sid,
+                        "media": {"payload": mulaw_b64}
+                    })
 
         try:
             async for event in realtime.receive_events():
@@ -347,7 +343,7 @@ async def handle_realtime_mode(
                         audio_buffer.append(audio_bytes)
                     else:
                         # No pending workflow check, forward immediately
-                        mulaw_bytes = convert_pcm_24k_to_mulaw_8k(audio_bytes)
+                        mulaw_bytes = await audio_transcoder.run(convert_pcm_24k_to_mulaw_8k, audio_bytes)
                         mulaw_b64 = base64.b64encode(mulaw_bytes).decode("utf-8")
 
                         media_message = {
@@ -571,7 +567,6 @@ async def twilio_media_stream(
     logger.info(f"Media stream WebSocket connected for call: {call_sid}")
 
     voice_service = TwilioVoiceService(db)
-    audio_converter = AudioConversionService()
 
     # State variables
     openai_api_key = None
@@ -607,7 +602,7 @@ async def twilio_media_stream(
         buffer_start_time = None  # Reset buffer timer
         try:
             # Convert accumulated mulaw to PCM for Whisper
-            pcm_16k = audio_converter.buffer_to_whisper_format(audio_buffer)
+            pcm_16k = await audio_transcoder.twilio_buffer_to_whisper(audio_buffer)
             logger.info(f"Converted to PCM: {len(pcm_16k)} bytes")
 
             # Transcribe with Whisper
@@ -643,7 +638,7 @@ async def twilio_media_stream(
         finally:
             is_processing = False
 
-    async def stream_tts_response(text: str):
+    async def stream_tts_response(text: str, static: bool = False):
         """Generate TTS and stream back to Twilio."""
         try:
             # Check if WebSocket is still connected
@@ -656,17 +651,17 @@ async def twilio_media_stream(
                 return
 
             logger.info(f"Starting TTS for: {text[:50]}...")
-            tts_service = OpenAITTSService(api_key=openai_api_key)
-
-            # Get PCM audio from TTS
-            pcm_audio = await tts_service.text_to_speech_pcm(text)
-            logger.info(f"TTS generated {len(pcm_audio)} bytes of PCM audio")
 
-            # Convert to Twilio format (mulaw 8kHz)
-            mulaw_b64 = audio_converter.tts_to_twilio(pcm_audio, tts_sample_rate=24000)
+            # Get mulaw 8kHz audio; greetings and prompts registered by a
+            # workflow warmup go through the TTS cache, free-form answers don't
+            cacheable = static or await tts_audio_cache.is_static_prompt(text)
+            mulaw_bytes = await get_telephony_audio(
+                text, openai_api_key, FORMAT_TWILIO_MULAW_8K, static=static, cacheable=cacheable
+            )
+            logger.info(f"TTS generated {len(mulaw_bytes)} bytes of mulaw audio")
 
-            # Send to Twilio in chunks
-            chunks = audio_converter.chunk_audio_for_streaming(mulaw_b64, chunk_size=8000)
+            # Send to Twilio in chunks (6000 bytes = 8000 base64 characters)
+            chunks = await audio_transcoder.encode_b64_chunks(mulaw_bytes, 6000)
             logger.info(f"Sending {len(chunks)} audio chunks to Twilio")
 
             for chunk in chunks:
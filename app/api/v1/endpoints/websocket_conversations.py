@@ -5,16 +5,15 @@ from app.services.workflow_execution_service import WorkflowExecutionService
 from app.schemas import chat_message as schemas_chat_message, websocket as schemas_websocket
 from app.schemas.websockets import WebSocketMessage
 import json
-import base64
-import uuid
 from typing import List, Dict, Any, Optional
 from app.core.dependencies import get_current_user_from_ws, get_db
-from app.core.database import SessionLocal
+from app.core.database import SessionLocal, AsyncSessionLocal
 from app.models import user as models_user, conversation_session as models_conversation_session
 from app.models.workflow_trigger import TriggerChannel
 from app.services.connection_manager import manager
 from app.services.stt_service import STTService, GroqSTTService
 from app.services.tts_service import TTSService
+from app.services.tts_cache_service import stream_browser_tts
 from fastapi import UploadFile
 import io
 import asyncio
@@ -22,60 +21,100 @@ import datetime
 from contextlib import contextmanager
 from jose import JWTError, jwt
 from app.core.config import settings
-from app.core.object_storage import s3_client, BUCKET_NAME
+from app.services import attachment_service
 
 router = APIRouter()
 
-def upload_attachment_to_s3(file_data_base64: str, file_name: str, file_type: str) -> Optional[str]:
-    """Upload base64-encoded file to S3, return URL or None if failed."""
-    try:
-        file_bytes = base64.b64decode(file_data_base64)
-        # Generate unique key with UUID prefix
-        safe_filename = file_name.replace(' ', '_')
-        key = f"attachments/{uuid.uuid4()}_{safe_filename}"
-
-        s3_client.put_object(
-            Bucket=BUCKET_NAME,
-            Key=key,
-            Body=file_bytes,
-            ContentType=file_type
-        )
-
-        # Build URL based on MinIO endpoint
-        scheme = 'https' if settings.minio_secure else 'http'
-        file_url = f"{scheme}://{settings.minio_endpoint}/{BUCKET_NAME}/{key}"
-        print(f"[S3 Upload] Successfully uploaded {file_name} to {file_url}")
-        return file_url
-    except Exception as e:
-        print(f"[S3 Upload] Failed to upload {file_name}: {e}")
-        return None
-
-def process_attachments_for_storage(attachments: List[Dict[str, Any]]) -> str:
+class AttachmentUploadChannel:
     """
-    Process attachments: upload to S3 if available, build message text.
-    Returns message text like "📎 filename.jpg" or "📍 Location (lat, lng)"
+    Attachment uploads over a chat WebSocket, so files never travel as base64.
+
+    Control messages (JSON text frames):
+    - {"type": "attachment_presign", "file_name", "file_type"}
+      -> {"type": "attachment_presigned", "upload_url", "storage_key", "file_url", "expires_in"}
+      The client PUTs the file to upload_url itself.
+    - {"type": "attachment_upload_start", "upload_id", "file_name", "file_type"},
+      then the file as binary frames, then {"type": "attachment_upload_end", "upload_id"}
+      -> {"type": "attachment_uploaded", "upload_id", "attachment": {...}}
+      Frames are streamed to object storage as a multipart upload.
+
+    Either way the chat message then lists the attachment by ``storage_key``.
     """
-    parts = []
-
-    for att in attachments:
-        if att.get('file_data'):
-            # Try to upload to S3
-            file_url = upload_attachment_to_s3(
-                att['file_data'],
-                att.get('file_name', 'file'),
-                att.get('file_type', 'application/octet-stream')
-            )
-            if file_url:
-                att['file_url'] = file_url
-            # Build display text
-            parts.append(f"📎 {att.get('file_name', 'file')}")
-        elif att.get('location'):
-            loc = att['location']
-            lat = loc.get('latitude', 0)
-            lng = loc.get('longitude', 0)
-            parts.append(f"📍 Location ({lat:.4f}, {lng:.4f})")
-
-    return '\n'.join(parts) if parts else ""
+
+    def __init__(self, websocket: WebSocket):
+        self.websocket = websocket
+        self.issued_keys = set()  # Storage keys this connection may reference
+        self._upload: Optional[attachment_service.StreamingAttachmentUpload] = None
+        self._upload_id = None
+
+    async def receive_text(self) -> str:
+        """Next chat text frame; upload frames are consumed along the way."""
+        while True:
+            message = await self.websocket.receive()
+            if message["type"] == "websocket.disconnect":
+                raise WebSocketDisconnect(message.get("code", 1000))
+            if message.get("bytes") is not None:
+                await self._write(message["bytes"])
+                continue
+            text = message.get("text") or ""
+            if not await self._handle_control(text):
+                return text
+
+    async def _send(self, payload: dict):
+        await self.websocket.send_text(json.dumps(payload))
+
+    async def _write(self, chunk: bytes):
+        if self._upload is None:
+            print(f"[websocket_conversations] Dropping binary frame without an active upload")
+            return
+        try:
+            await self._upload.write(chunk)
+        except Exception as e:
+            upload_id, self._upload, self._upload_id = self._upload_id, None, None
+            await self._send({"type": "attachment_error", "upload_id": upload_id, "detail": str(e)})
+
+    async def _handle_control(self, text: str) -> bool:
+        if '"attachment_' not in text:
+            return False
+        try:
+            data = json.loads(text)
+        except json.JSONDecodeError:
+            return False
+        if not isinstance(data, dict):
+            return False
+
+        msg_type = data.get('type')
+        if msg_type == 'attachment_presign':
+            presigned = attachment_service.create_presigned_upload(data.get('file_name'), data.get('file_type'))
+            self.issued_keys.add(presigned['storage_key'])
+            await self._send({"type": "attachment_presigned", **presigned})
+        elif msg_type == 'attachment_upload_start':
+            await self.close()
+            self._upload = attachment_service.StreamingAttachmentUpload(data.get('file_name'), data.get('file_type'))
+            self._upload_id = data.get('upload_id')
+        elif msg_type == 'attachment_upload_end':
+            if self._upload is None or data.get('upload_id') != self._upload_id:
+                await self._send({"type": "attachment_error", "upload_id": data.get('upload_id'), "detail": "No active upload"})
+                return True
+            upload, upload_id = self._upload, self._upload_id
+            self._upload, self._upload_id = None, None
+            try:
+                attachment = await upload.complete()
+            except Exception as e:
+                await upload.abort()
+                await self._send({"type": "attachment_error", "upload_id": upload_id, "detail": str(e)})
+                return True
+            self.issued_keys.add(attachment['storage_key'])
+            await self._send({"type": "attachment_uploaded", "upload_id": upload_id, "attachment": attachment})
+        else:
+            return False
+        return True
+
+    async def close(self):
+        """Abort an unfinished upload."""
+        if self._upload is not None:
+            await self._upload.abort()
+            self._upload, self._upload_id = None, None
 
 @contextmanager
 def get_db_session():
@@ -533,17 +572,19 @@ async def websocket_endpoint(
 
     # Update session status to active when user connects (use temporary DB session)
     if user_type == "user":
-        with get_db_session() as db:
-            await conversation_session_service.update_session_connection_status(db, session_id, is_connected=True)
+        async with AsyncSessionLocal() as adb:
+            await conversation_session_service.update_session_connection_status_async(adb, session_id, is_connected=True)
 
     # Start heartbeat task if enabled
     heartbeat_task = None
     if settings.WS_ENABLE_HEARTBEAT:
         heartbeat_task = asyncio.create_task(heartbeat_handler(websocket, session_id))
 
+    uploads = AttachmentUploadChannel(websocket)
+
     try:
         while True:
-            data = await websocket.receive_text()
+            data = await uploads.receive_text()
 
             # Update activity timestamp
             manager.update_activity(session_id, websocket)
@@ -618,11 +659,11 @@ async def websocket_endpoint(
                 print(f"[websocket_conversations] Missing user_message/attachments or sender: user_message={user_message}, attachments={len(attachments)}, sender={sender}")
                 continue
 
-            # Process attachments: upload to S3 and build display text
+            # Process attachments: store new uploads and build display text
             attachment_text = ""
             if attachments:
                 print(f"[websocket_conversations] 📎 Processing {len(attachments)} attachment(s)")
-                attachment_text = process_attachments_for_storage(attachments)
+                attachment_text = await attachment_service.ingest_attachments(attachments, uploads.issued_keys)
 
             # Build message for storage
             message_to_store = user_message
@@ -630,11 +671,12 @@ async def websocket_endpoint(
                 # If no text but attachments, use attachment description
                 message_to_store = attachment_text
 
-            # Create a temporary DB session for this message handling
-            with get_db_session() as db:
-                # Instantiate the execution service with this DB session
-                workflow_exec_service = WorkflowExecutionService(db)
-
+            # Per-message bookkeeping runs on the async session so a slow query
+            # doesn't stall every other connection on this worker
+            widget_settings = None
+            typing_indicator_sent = False
+            session_ai_enabled = True
+            async with AsyncSessionLocal() as adb:
                 # 1. Log user message
                 chat_message = schemas_chat_message.ChatMessageCreate(
                     message=message_to_store,
@@ -644,21 +686,15 @@ async def websocket_endpoint(
 
                 # Determine assignee_id: if agent is sending, use current_user.id
                 assignee_id = current_user.id if sender == 'agent' else None
-                db_message = chat_service.create_chat_message(db, chat_message, agent_id, session_id, company_id, sender, assignee_id, attachments=attachments if attachments else None)
+                db_message = await chat_service.create_chat_message_async(adb, chat_message, agent_id, session_id, company_id, sender, assignee_id, attachments=attachments if attachments else None)
                 print(f"[websocket_conversations] Created chat message: {db_message.id}")
 
                 # Enrich message with assignee name for broadcast
                 message_dict = schemas_chat_message.ChatMessage.model_validate(db_message).model_dump(mode='json')
                 if sender == 'agent' and db_message.assignee_id:
-                    assignee_user = db.query(models_user.User).filter(models_user.User.id == db_message.assignee_id).first()
-                    if assignee_user:
-                        # Build full name from first_name and last_name
-                        name_parts = []
-                        if assignee_user.first_name:
-                            name_parts.append(assignee_user.first_name)
-                        if assignee_user.last_name:
-                            name_parts.append(assignee_user.last_name)
-                        message_dict['assignee_name'] = ' '.join(name_parts) if name_parts else assignee_user.email
+                    assignee_name = await chat_service.get_user_display_name_async(adb, db_message.assignee_id)
+                    if assignee_name:
+                        message_dict['assignee_name'] = assignee_name
 
                 # Include attachments in broadcast for preview display
                 if attachments:
@@ -669,15 +705,18 @@ async def websocket_endpoint(
 
                 # OPTIMIZATION: Check and send typing indicator IMMEDIATELY for user messages
                 # This happens before workflow/AI processing to show immediate feedback
-                typing_indicator_sent = False
                 if sender == 'user':
-                    # Quick check for AI enabled (single DB query, cached by SQLAlchemy)
-                    agent = agent_service.get_agent(db, agent_id, company_id)
+                    # Check if AI is enabled for this session
+                    session_obj = await conversation_session_service.get_session_by_conversation_id_async(adb, session_id, company_id)
+                    session_ai_enabled = not session_obj or session_obj.is_ai_enabled
+
+                    # Quick check for AI enabled
+                    agent = await agent_service.get_agent_async(adb, agent_id, company_id)
                     ai_enabled = agent and agent.credential is not None
 
-                    if ai_enabled:
-                        # Quick check for typing indicator setting (single DB query, cached)
-                        widget_settings = widget_settings_service.get_widget_settings(db, agent_id)
+                    if ai_enabled and session_ai_enabled:
+                        # Quick check for typing indicator setting
+                        widget_settings = await widget_settings_service.get_widget_settings_async(adb, agent_id)
                         if widget_settings and widget_settings.typing_indicator_enabled:
                             # Send typing indicator IMMEDIATELY before any workflow/AI processing
                             await manager.broadcast_to_session(
@@ -688,6 +727,15 @@ async def websocket_endpoint(
                             typing_indicator_sent = True
                             print(f"[websocket_conversations] ⚡ Typing indicator ON (immediate) for session: {session_id}")
 
+            if sender == 'user' and not session_ai_enabled:
+                print(f"AI is disabled for session {session_id}. No response will be generated.")
+                continue
+
+            # Create a temporary DB session for channel forwarding and workflow/AI processing
+            with get_db_session() as db:
+                # Instantiate the execution service with this DB session
+                workflow_exec_service = WorkflowExecutionService(db)
+
                 # If agent sends message, check session channel and send to external platform
                 if sender == 'agent':
                     session_obj = db.query(models_conversation_session.ConversationSession).filter(
@@ -726,16 +774,6 @@ async def websocket_endpoint(
 
                 # 2. If the message is from the user, execute the workflow
                 if sender == 'user':
-                    # Check if AI is enabled for this session
-                    session_obj = db.query(models_conversation_session.ConversationSession).filter(
-                        models_conversation_session.ConversationSession.conversation_id == session_id,
-                        models_conversation_session.ConversationSession.company_id == company_id
-                    ).first()
-
-                    if session_obj and not session_obj.is_ai_enabled:
-                        print(f"AI is disabled for session {session_id}. No response will be generated.")
-                        continue
-
                     execution_result = None
                     try:
                         # Priority: 1) Triggers, 2) LLM decision, 3) Similarity search
@@ -942,10 +980,12 @@ async def websocket_endpoint(
         # Update session status to inactive when user disconnects
         # Only if there are no more user connections
         if user_type == "user" and not manager.has_user_connection(session_id):
-            with get_db_session() as db:
-                await conversation_session_service.update_session_connection_status(db, session_id, is_connected=False)
+            async with AsyncSessionLocal() as adb:
+                await conversation_session_service.update_session_connection_status_async(adb, session_id, is_connected=False)
 
     finally:
+        await uploads.close()
+
         # Cancel heartbeat task
         if heartbeat_task:
             heartbeat_task.cancel()
@@ -964,8 +1004,8 @@ async def public_websocket_endpoint(
     user_type: str = Query(...)  # 'user' or 'agent'
 ):
     # Verify agent exists with temporary DB session
-    with get_db_session() as db:
-        agent = agent_service.get_agent(db, agent_id, company_id)
+    async with AsyncSessionLocal() as adb:
+        agent = await agent_service.get_agent_async(adb, agent_id, company_id)
         if not agent:
             await websocket.close(code=1008)
             return
@@ -974,42 +1014,37 @@ async def public_websocket_endpoint(
 
     # Send message history for existing sessions (user reconnection)
     if user_type == "user":
-        with get_db_session() as db:
-            # Check if session exists
-            existing_session = db.query(models_conversation_session.ConversationSession).filter(
-                models_conversation_session.ConversationSession.conversation_id == session_id,
-                models_conversation_session.ConversationSession.company_id == company_id
-            ).first()
-
-            if existing_session:
-                # Fetch last 20 messages for this session
-                history_messages = chat_service.get_chat_messages(
-                    db, agent_id, session_id, company_id, limit=20
-                )
-                if history_messages:
-                    history_payload = {
-                        "type": "history",
-                        "messages": [
-                            schemas_chat_message.ChatMessage.model_validate(msg).model_dump(mode='json')
-                            for msg in history_messages
-                        ]
-                    }
-                    await websocket.send_text(json.dumps(history_payload))
-                    print(f"[websocket] Sent {len(history_messages)} history messages to session {session_id}")
+        async with AsyncSessionLocal() as adb:
+            # Fetch last 20 messages for this session (empty for new sessions)
+            history_messages = await chat_service.get_chat_messages_async(
+                adb, session_id, company_id, limit=20
+            )
+            if history_messages:
+                history_payload = {
+                    "type": "history",
+                    "messages": [
+                        schemas_chat_message.ChatMessage.model_validate(msg).model_dump(mode='json')
+                        for msg in history_messages
+                    ]
+                }
+                await websocket.send_text(json.dumps(history_payload))
+                print(f"[websocket] Sent {len(history_messages)} history messages to session {session_id}")
 
     # Update session status to active when user connects
     if user_type == "user":
-        with get_db_session() as db:
-            await conversation_session_service.update_session_connection_status(db, session_id, is_connected=True)
+        async with AsyncSessionLocal() as adb:
+            await conversation_session_service.update_session_connection_status_async(adb, session_id, is_connected=True)
 
     # Start heartbeat task if enabled
     heartbeat_task = None
     if settings.WS_ENABLE_HEARTBEAT:
         heartbeat_task = asyncio.create_task(heartbeat_handler(websocket, session_id))
 
+    uploads = AttachmentUploadChannel(websocket)
+
     try:
         while True:
-            data = await websocket.receive_text()
+            data = await uploads.receive_text()
 
             # Update activity timestamp
             manager.update_activity(session_id, websocket)
@@ -1040,11 +1075,11 @@ async def public_websocket_endpoint(
                 print(f"[websocket_conversations] PUBLIC: Missing user_message/attachments or sender")
                 continue
 
-            # Process attachments: upload to S3 and build display text
+            # Process attachments: store new uploads and build display text
             attachment_text = ""
             if attachments:
                 print(f"[websocket_conversations] 📎 PUBLIC: Processing {len(attachments)} attachment(s)")
-                attachment_text = process_attachments_for_storage(attachments)
+                attachment_text = await attachment_service.ingest_attachments(attachments, uploads.issued_keys)
 
             # Use temporary DB session for each message
             with get_db_session() as db:
@@ -1155,8 +1190,9 @@ async def public_websocket_endpoint(
                 typing_indicator_sent = False
                 print(f"[DEBUG] Checking typing indicator - sender: {sender}")
                 if sender == 'user':
-                    # Quick check for typing indicator setting (single DB query, cached)
-                    widget_settings = widget_settings_service.get_widget_settings(db, agent_id)
+                    # Quick check for typing indicator setting
+                    async with AsyncSessionLocal() as adb:
+                        widget_settings = await widget_settings_service.get_widget_settings_async(adb, agent_id)
                     print(f"[DEBUG] Widget settings: {widget_settings}")
                     if widget_settings:
                         print(f"[DEBUG] Widget settings exists, typing_indicator_enabled: {widget_settings.typing_indicator_enabled}")
@@ -1174,20 +1210,15 @@ async def public_websocket_endpoint(
 
                 # Now, create and broadcast the chat message
                 chat_message = schemas_chat_message.ChatMessageCreate(message=message_for_storage, message_type=message_data.get('message_type', 'message'))
-                db_message = chat_service.create_chat_message(db, chat_message, agent_id, session_id, company_id, sender, assignee_id=None, attachments=attachments if attachments else None)
+                async with AsyncSessionLocal() as adb:
+                    db_message = await chat_service.create_chat_message_async(adb, chat_message, agent_id, session_id, company_id, sender, assignee_id=None, attachments=attachments if attachments else None)
 
-                # Enrich message with assignee name for broadcast (if message has assignee from database)
-                message_dict = schemas_chat_message.ChatMessage.model_validate(db_message).model_dump(mode='json')
-                if db_message.assignee_id:
-                    assignee_user = db.query(models_user.User).filter(models_user.User.id == db_message.assignee_id).first()
-                    if assignee_user:
-                        # Build full name from first_name and last_name
-                        name_parts = []
-                        if assignee_user.first_name:
-                            name_parts.append(assignee_user.first_name)
-                        if assignee_user.last_name:
-                            name_parts.append(assignee_user.last_name)
-                        message_dict['assignee_name'] = ' '.join(name_parts) if name_parts else assignee_user.email
+                    # Enrich message with assignee name for broadcast (if message has assignee from database)
+                    message_dict = schemas_chat_message.ChatMessage.model_validate(db_message).model_dump(mode='json')
+                    if db_message.assignee_id:
+                        assignee_name = await chat_service.get_user_display_name_async(adb, db_message.assignee_id)
+                        if assignee_name:
+                            message_dict['assignee_name'] = assignee_name
 
                 # Include attachments in broadcast for preview display
                 if attachments:
@@ -1368,7 +1399,7 @@ async def public_websocket_endpoint(
                                     except Exception:
                                         pass
                                 tts_service = TTSService(openai_api_key=openai_api_key)
-                                audio_stream = tts_service.text_to_speech_stream(agent_response_text, voice_id, tts_provider)
+                                audio_stream = stream_browser_tts(tts_service, agent_response_text, voice_id, tts_provider)
                                 async for audio_chunk in audio_stream:
                                     await manager.broadcast_bytes_to_session(str(session_id), audio_chunk)
                                 await tts_service.close()
@@ -1428,7 +1459,7 @@ async def public_websocket_endpoint(
                                     except Exception:
                                         pass
                                 tts_service = TTSService(openai_api_key=openai_api_key)
-                                audio_stream = tts_service.text_to_speech_stream(tts_text, voice_id, tts_provider)
+                                audio_stream = stream_browser_tts(tts_service, tts_text, voice_id, tts_provider)
                                 async for audio_chunk in audio_stream:
                                     await manager.broadcast_bytes_to_session(str(session_id), audio_chunk)
                                 await tts_service.close()
@@ -1469,7 +1500,7 @@ async def public_websocket_endpoint(
                                     except Exception:
                                         pass
                                 tts_service = TTSService(openai_api_key=openai_api_key)
-                                audio_stream = tts_service.text_to_speech_stream(tts_text, voice_id, tts_provider)
+                                audio_stream = stream_browser_tts(tts_service, tts_text, voice_id, tts_provider)
                                 async for audio_chunk in audio_stream:
                                     await manager.broadcast_bytes_to_session(str(session_id), audio_chunk)
                                 await tts_service.close()
@@ -1497,10 +1528,12 @@ async def public_websocket_endpoint(
         # Update session status to inactive when user disconnects
         # Only if there are no more user connections
         if user_type == "user" and not manager.has_user_connection(session_id):
-            with get_db_session() as db:
-                await conversation_session_service.update_session_connection_status(db, session_id, is_connected=False)
+            async with AsyncSessionLocal() as adb:
+                await conversation_session_service.update_session_connection_status_async(adb, session_id, is_connected=False)
 
     finally:
+        await uploads.close()
+
         # Cancel heartbeat task
         if heartbeat_task:
             heartbeat_task.cancel()
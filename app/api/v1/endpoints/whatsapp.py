@@ -1,13 +1,13 @@
 from fastapi import APIRouter, Request, Depends, HTTPException, Response
 from sqlalchemy.orm import Session
+from sqlalchemy.ext.asyncio import AsyncSession
 import os
 import logging
 import traceback
 import json
-import base64
 
-from app.core.dependencies import get_db
-from app.api.v1.endpoints.websocket_conversations import process_attachments_for_storage
+from app.core.dependencies import get_async_db
+from app.services import attachment_service
 from app.core.config import settings
 from app.services import (
     contact_service,
@@ -18,7 +18,8 @@ from app.services import (
     integration_service,
     messaging_service,
     agent_service,
-    agent_execution_service
+    agent_execution_service,
+    inbound_webhook_service
 )
 from app.services.workflow_execution_service import WorkflowExecutionService
 from app.models.workflow_trigger import TriggerChannel
@@ -45,10 +46,23 @@ async def verify_webhook(request: Request):
         raise HTTPException(status_code=403, detail="Invalid verification token")
 
 @router.post("")
-async def receive_message(request: Request, db: Session = Depends(get_db)):
+async def receive_message(request: Request, db: AsyncSession = Depends(get_async_db)):
+    """
+    Acknowledges WhatsApp webhooks immediately. Every message of every entry is
+    stored as its own event and processed by the inbound webhook worker.
+    """
     data = await request.json()
     print(f"Received webhook data: {data}")
 
+    await inbound_webhook_service.accept_webhook(db, "whatsapp", inbound_webhook_service.split_whatsapp_payload(data))
+    return {"status": "ok"}
+
+
+async def process_webhook_payload(data: dict, db: Session, integration_id: int = None):
+    """
+    Processes a single-message WhatsApp webhook payload: media download,
+    contact/session creation, workflow or LLM execution and the reply.
+    """
     try:
         if "entry" in data and data["entry"]:
             change = data["entry"][0]["changes"][0]
@@ -143,18 +157,17 @@ async def receive_message(request: Request, db: Session = Depends(get_db)):
                             db=db
                         )
 
-                        # Create attachment dict in the format expected by process_attachments_for_storage
-                        file_data_base64 = base64.b64encode(media_result["data"]).decode('utf-8')
+                        # Hand the downloaded bytes straight to storage (no base64 round-trip)
                         attachment = {
-                            "file_data": file_data_base64,
+                            "data": media_result["data"],
                             "file_name": pending_media.get("filename") or media_result["file_name"],
                             "file_type": media_result["mime_type"],
                             "file_size": len(media_result["data"])
                         }
                         attachments.append(attachment)
 
-                        # Process attachments to upload to S3
-                        attachment_text = process_attachments_for_storage(attachments)
+                        # Upload to S3
+                        attachment_text = await attachment_service.ingest_attachments(attachments)
                         print(f"[WhatsApp] Processed attachment: {attachment_text}")
 
                         # If no caption was provided, use attachment text as message
@@ -427,3 +440,6 @@ async def receive_message(request: Request, db: Session = Depends(get_db)):
         return Response(status_code=200)
 
     return {"status": "ok"}
+
+
+inbound_webhook_service.inbound_webhook_worker.register_handler("whatsapp", process_webhook_payload)
@@ -1,13 +1,13 @@
 from typing import List, Dict, Any, Optional
 from datetime import datetime
 import json
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, BackgroundTasks
 from fastapi.responses import Response
 from sqlalchemy.orm import Session
 from pydantic import BaseModel
 from app.core.dependencies import get_db, get_current_active_user, require_permission
 from app.schemas import workflow as schemas_workflow
-from app.services import workflow_service, tool_service
+from app.services import workflow_service, tool_service, tts_cache_service
 from app.services.workflow_intent_service import WorkflowIntentService
 from app.models import user as models_user
 
@@ -33,8 +33,11 @@ class WorkflowImportRequest(BaseModel):
     workflow_data: Dict[str, Any]
 
 @router.post("/", response_model=schemas_workflow.Workflow, dependencies=[Depends(require_permission("workflow:create"))])
-def create_workflow(workflow: schemas_workflow.WorkflowCreate, db: Session = Depends(get_db), current_user: models_user.User = Depends(get_current_active_user)):
-    return workflow_service.create_workflow(db=db, workflow=workflow, company_id=current_user.company_id)
+def create_workflow(workflow: schemas_workflow.WorkflowCreate, background_tasks: BackgroundTasks, db: Session = Depends(get_db), current_user: models_user.User = Depends(get_current_active_user)):
+    db_workflow = workflow_service.create_workflow(db=db, workflow=workflow, company_id=current_user.company_id)
+    # Pre-synthesize static prompts so voice channels play them instantly
+    background_tasks.add_task(tts_cache_service.warm_workflow_prompts, db_workflow.id, current_user.company_id)
+    return db_workflow
 
 @router.get("/", response_model=List[schemas_workflow.Workflow], dependencies=[Depends(require_permission("workflow:read"))])
 def read_workflows(skip: int = 0, limit: int = 100, db: Session = Depends(get_db), current_user: models_user.User = Depends(get_current_active_user)):
@@ -198,10 +201,12 @@ def get_workflows_using_as_subworkflow(
     return using_workflows
 
 @router.put("/{workflow_id}", response_model=schemas_workflow.Workflow, dependencies=[Depends(require_permission("workflow:update"))])
-def update_workflow(workflow_id: int, workflow: schemas_workflow.WorkflowUpdate, db: Session = Depends(get_db), current_user: models_user.User = Depends(get_current_active_user)):
+def update_workflow(workflow_id: int, workflow: schemas_workflow.WorkflowUpdate, background_tasks: BackgroundTasks, db: Session = Depends(get_db), current_user: models_user.User = Depends(get_current_active_user)):
     db_workflow = workflow_service.update_workflow(db=db, workflow_id=workflow_id, workflow=workflow, company_id=current_user.company_id)
     if db_workflow is None:
         raise HTTPException(status_code=404, detail="Workflow not found")
+    if workflow.visual_steps is not None:
+        background_tasks.add_task(tts_cache_service.warm_workflow_prompts, workflow_id, current_user.company_id)
     return db_workflow
 
 @router.post("/{workflow_id}/regenerate-description", dependencies=[Depends(require_permission("workflow:update"))])
@@ -282,6 +287,7 @@ def export_workflow(workflow_id: int, db: Session = Depends(get_db), current_use
 @router.post("/import", response_model=schemas_workflow.Workflow, dependencies=[Depends(require_permission("workflow:create"))])
 def import_workflow(
     request: WorkflowImportRequest,
+    background_tasks: BackgroundTasks,
     db: Session = Depends(get_db),
     current_user: models_user.User = Depends(get_current_active_user)
 ):
@@ -305,6 +311,7 @@ def import_workflow(
         else:
             raise HTTPException(status_code=400, detail=result["error"])
 
+    background_tasks.add_task(tts_cache_service.warm_workflow_prompts, result["workflow"].id, current_user.company_id)
     return result["workflow"]
 
 # --- Versioning Endpoints ---
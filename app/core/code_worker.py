@@ -0,0 +1,205 @@
+"""
+Code Worker
+Entry point and job runner of the code-node worker processes.
+
+Workers are started with ``spawn``, so this module is what a new worker
+imports: it stays free of app services, settings and the database so
+workers start quickly and hold nothing of the API process.
+"""
+import json
+import re
+import signal
+import traceback
+from collections import OrderedDict
+from types import SimpleNamespace
+from typing import Any, List, Tuple
+
+ERROR_PREFIXES = {
+    "code": "Error executing code",
+    "expression": "Error manipulating data",
+}
+
+
+class CodeNodeTimeout(BaseException):
+    """Raised inside a worker when a run uses up its CPU or wall-clock budget."""
+
+
+def _jsonable(value):
+    if isinstance(value, SimpleNamespace):
+        return vars(value)
+    if isinstance(value, (set, frozenset, tuple)):
+        return list(value)
+    return str(value)
+
+
+def dumps(value) -> str:
+    return json.dumps(value, default=_jsonable)
+
+
+_compiled: "OrderedDict[Tuple[str, str], Any]" = OrderedDict()
+_compiled_limit = 256
+
+
+def _on_limit(signum, frame):
+    if signum == signal.SIGPROF:
+        raise CodeNodeTimeout("CPU time limit exceeded")
+    raise CodeNodeTimeout("Time limit exceeded")
+
+
+def _init_worker(cache_size: int, memory_mb: int):
+    global _compiled_limit
+    _compiled_limit = cache_size
+    signal.signal(signal.SIGALRM, _on_limit)
+    signal.signal(signal.SIGPROF, _on_limit)
+    if memory_mb:
+        import resource
+        _, hard = resource.getrlimit(resource.RLIMIT_AS)
+        resource.setrlimit(resource.RLIMIT_AS, (memory_mb * 1024 * 1024, hard))
+
+
+def _compile(source: str, digest: str, mode: str):
+    key = (digest, mode)
+    code = _compiled.get(key)
+    if code is not None:
+        _compiled.move_to_end(key)
+        return code
+    code = compile(source, "<workflow-node>", mode)
+    _compiled[key] = code
+    while len(_compiled) > _compiled_limit:
+        _compiled.popitem(last=False)
+    return code
+
+
+def _to_namespace(value):
+    """Nested dicts as SimpleNamespace, for dot notation access in expressions."""
+    if isinstance(value, dict):
+        return SimpleNamespace(**{k: _to_namespace(v) for k, v in value.items()})
+    if isinstance(value, list):
+        return [_to_namespace(item) for item in value]
+    return value
+
+
+def _evaluate(source: str, digest: str, context: dict, results: dict) -> dict:
+    # Allow both dict access (context['key']) and dot notation (context.key)
+    safe_globals = {"__builtins__": None}
+    safe_locals = {
+        "context": _to_namespace(context),
+        "ctx": context,
+        "results": _to_namespace(results),
+        "res": results,
+    }
+    return {"output": eval(_compile(source, digest, "eval"), safe_globals, safe_locals)}
+
+
+def _run_code(source: str, digest: str, context: dict, results: dict, args: dict, arg_names: List[str], return_variables: List[str]) -> dict:
+    # Arguments are directly available in the scope; 'output' is the legacy way to set the result
+    execution_scope = {"context": context, "results": results, "output": None, **args}
+    exec(_compile(source, digest, "exec"), execution_scope)
+
+    # Auto-call a defined function unless the code already called it or set the return variables
+    func_match = re.search(r'def\s+(\w+)\s*\(', source)
+    if func_match:
+        func_name = func_match.group(1)
+        func_call_pattern = rf'{func_name}\s*\('
+        func_def_end = source.find('def ' + func_name)
+        code_after_def = source[func_def_end:] if func_def_end >= 0 else ""
+        lines_after_def = code_after_def.split('\n')[1:]  # Skip the def line
+        manual_call_exists = any(re.search(func_call_pattern, line) and not line.strip().startswith('def ') for line in lines_after_def)
+
+        return_vars_already_set = return_variables and all(
+            var_name.strip() in execution_scope and execution_scope[var_name.strip()] is not None
+            for var_name in return_variables if var_name.strip()
+        )
+
+        if not manual_call_exists and not return_vars_already_set:
+            func = execution_scope.get(func_name)
+            if callable(func):
+                arg_values = [args[name] for name in arg_names if name in args]
+                print(f"[CODE NODE] Auto-calling function '{func_name}' with args: {arg_values}")
+                func_result = func(*arg_values)
+
+                if return_variables and len(return_variables) == 1:
+                    var_name = return_variables[0].strip()
+                    context[var_name] = func_result
+                    return {"output": {var_name: func_result}}
+                if return_variables and len(return_variables) > 1 and isinstance(func_result, (tuple, list)):
+                    output = {}
+                    for i, var_name in enumerate(return_variables):
+                        var_name = var_name.strip()
+                        if i < len(func_result):
+                            output[var_name] = func_result[i]
+                            context[var_name] = func_result[i]
+                    return {"output": output if output else func_result}
+                return {"output": func_result}
+
+    # Collect return variables into output (for non-function code or manually called functions)
+    if return_variables:
+        output = {}
+        for var_name in return_variables:
+            var_name = var_name.strip()
+            if var_name and var_name in execution_scope:
+                output[var_name] = execution_scope[var_name]
+                context[var_name] = execution_scope[var_name]
+        return {"output": output if output else "Code executed successfully."}
+    return {"output": execution_scope.get("output", "Code executed successfully.")}
+
+
+def run_node_job(kind: str, source: str, digest: str, payload: str, cpu_seconds: float, wall_seconds: float) -> str:
+    """
+    Run one node in a worker process.
+
+    Args:
+        kind: "code" (exec, with function auto-call) or "expression" (eval)
+        source: Code or expression text
+        digest: SHA-256 of ``source``, the compile cache key
+        payload: JSON inputs (context, results and, for code, the arguments)
+        cpu_seconds: CPU time budget
+        wall_seconds: Wall-clock budget
+
+    Returns:
+        JSON result: the node result plus, for code, context changes
+    """
+    inputs = json.loads(payload)
+    context = inputs["context"]
+    try:
+        signal.setitimer(signal.ITIMER_PROF, cpu_seconds)
+        signal.setitimer(signal.ITIMER_REAL, wall_seconds)
+        try:
+            if kind == "expression":
+                result = _evaluate(source, digest, context, inputs["results"])
+            else:
+                result = _run_code(source, digest, context, inputs["results"], inputs["args"],
+                                   inputs["arg_names"], inputs["return_variables"])
+        finally:
+            signal.setitimer(signal.ITIMER_REAL, 0)
+            signal.setitimer(signal.ITIMER_PROF, 0)
+    except CodeNodeTimeout as e:
+        return dumps({"error": f"{ERROR_PREFIXES[kind]}: {e}", "timeout": True})
+    except Exception as e:
+        result = {"error": f"{ERROR_PREFIXES[kind]}: {e}"}
+        if kind == "code":
+            print(f"[CODE NODE] Error: {e}")
+            result["traceback"] = traceback.format_exc()
+        return dumps(result)
+
+    if kind == "code":
+        # Round-trip the context so values compare as the caller's serialized copy
+        context = json.loads(dumps(context))
+        original = json.loads(payload)["context"]
+        result["context_updates"] = {k: v for k, v in context.items() if k not in original or original[k] != v}
+        result["context_removed"] = [k for k in original if k not in context]
+    return dumps(result)
+
+
+def worker_main(conn, cache_size: int, memory_mb: int) -> None:
+    """Worker process loop: run jobs received on ``conn`` until it closes or sends None."""
+    _init_worker(cache_size, memory_mb)
+    conn.send("ready")
+    while True:
+        try:
+            job = conn.recv()
+        except EOFError:
+            return
+        if job is None:
+            return
+        conn.send(run_node_job(*job))
@@ -1,5 +1,5 @@
 import os
-from typing import Optional
+from typing import List, Optional
 
 from pydantic_settings import BaseSettings
 
@@ -45,6 +45,24 @@ class Settings(BaseSettings):
 
     FAISS_INDEX_DIR: str = "./faiss_indexes"
 
+    # Knowledge base hybrid retrieval (BM25 + vector, fused with reciprocal rank fusion)
+    KB_HYBRID_SEARCH_ENABLED: bool = True
+    KB_HYBRID_CANDIDATES: int = 20  # Hits taken from each ranking before fusion
+    KB_RRF_K: int = 60
+    LEXICAL_INDEX_DIR: str = "./lexical_indexes"  # BM25 indexes of Chroma-backed KBs (FAISS KBs keep theirs in the index dir)
+    LEXICAL_INDEX_CACHE_SIZE: int = 32  # Indexes kept in memory per worker
+
+    # Legacy knowledge base embeddings (float32 matrices, one .npy per KB)
+    KB_EMBEDDING_DIR: str = "./kb_embeddings"
+    KB_EMBEDDING_MMAP: bool = True  # Memory-map matrices instead of reading them into each worker
+    KB_EMBEDDING_CACHE_SIZE: int = 64  # Matrices kept open per worker
+
+    # Knowledge base document ingestion (background jobs)
+    KB_INGEST_PARSE_WORKERS: int = 2  # Processes extracting document text
+    KB_INGEST_PAGES_PER_TASK: int = 16  # PDF pages per parse task
+    KB_INGEST_EMBED_BATCH_SIZE: int = 64  # Chunks per embedding request and vector store write
+    KB_INGEST_EMBED_CONCURRENCY: int = 4  # Embedding requests in flight at once
+
     CHROMA_DB_HOST: Optional[str] = None
     CHROMA_DB_PORT: Optional[int] = None
 
@@ -57,6 +75,15 @@ class Settings(BaseSettings):
     CORS_ORIGINS: str = "http://localhost:8080,http://localhost:5173,*"
     PUBLIC_HOST: Optional[str] = None  # Public hostname for WebSocket URLs (e.g., api.example.com)
 
+    # Startup (models and heavy SDKs load on first use unless preloaded)
+    PRELOAD_MODELS: List[str] = []  # Registry names, e.g. ["sentence_transformer", "chromadb"]; listed under /metrics/runtime
+    STARTUP_IMPORT_PROFILE: bool = False  # Time module imports and log the slowest at startup
+    STARTUP_IMPORT_PROFILE_TOP: int = 25
+
+    # Async database pool (websocket and webhook hot paths)
+    DB_ASYNC_POOL_SIZE: int = 15
+    DB_ASYNC_MAX_OVERFLOW: int = 5
+
     # WebSocket session cleanup settings
     WS_PING_INTERVAL: int = 30  # Send ping every 30 seconds
     WS_CLEANUP_INTERVAL: int = 60  # Run cleanup every 60 seconds
@@ -66,6 +93,17 @@ class Settings(BaseSettings):
 
     # Workflow Configuration
     MAX_SUBWORKFLOW_DEPTH: int = 5  # Maximum depth for nested subworkflows
+    WORKFLOW_PLAN_CACHE_MAX_ENTRIES: int = 500  # Compiled workflow graphs kept per worker
+    WORKFLOW_MAX_PARALLEL_BRANCHES: int = 4  # Fan-out branches of one workflow run at once
+    WORKFLOW_EMBEDDING_MAX_COMPANIES: int = 256  # Companies whose workflow embedding matrices are kept per worker
+
+    # Workflow code and data-manipulation nodes (run in a sandboxed process pool)
+    CODE_NODE_WORKERS: int = 2
+    CODE_NODE_TIMEOUT: float = 10.0  # Wall-clock seconds per node run
+    CODE_NODE_CPU_SECONDS: float = 5.0  # CPU seconds per node run
+    CODE_NODE_MEMORY_MB: int = 0  # Address-space cap per worker process; 0 leaves it unlimited
+    CODE_NODE_CACHE_SIZE: int = 256  # Compiled snippets kept per worker process
+    CODE_NODE_PREWARM: bool = False  # Start the worker processes at startup instead of on first use
 
     # LLM Streaming Configuration
     LLM_STREAMING_ENABLED: bool = False  # Disabled streaming responses by default
@@ -73,11 +111,89 @@ class Settings(BaseSettings):
     LLM_REQUEST_TIMEOUT: int = 120  # Timeout for LLM API calls in seconds
     HTTP_REQUEST_TIMEOUT: int = 30  # Timeout for workflow HTTP requests in seconds
 
+    # Workflow HTTP requests (shared keep-alive pool; nodes can override timeout, retries and caching)
+    WORKFLOW_HTTP_MAX_CONNECTIONS: int = 100
+    WORKFLOW_HTTP_MAX_KEEPALIVE: int = 20  # Idle keep-alive connections kept open
+    WORKFLOW_HTTP_KEEPALIVE_EXPIRY: float = 30.0  # Seconds an idle connection is kept
+    WORKFLOW_HTTP_RETRIES: int = 0  # Default extra attempts after a retryable failure
+    WORKFLOW_HTTP_RETRY_BACKOFF: float = 0.5  # Seconds before the first retry, doubling after each
+    WORKFLOW_HTTP_CACHE_MAX_ENTRIES: int = 500  # Cached GET responses (nodes opt in)
+    WORKFLOW_HTTP_CACHE_MAX_BYTES: int = 1024 * 1024  # Larger response bodies aren't cached
+
     # OpenAI Realtime API Configuration
     OPENAI_REALTIME_ENABLED: bool = True  # Use OpenAI Realtime API for voice calls
     OPENAI_REALTIME_MODEL: str = "gpt-4o-realtime-preview-2024-12-17"
     OPENAI_REALTIME_VOICE: str = "alloy"  # alloy, echo, shimmer, ash, ballad, coral, sage, verse
 
+    # Inbound messaging webhooks (WhatsApp, Messenger, Instagram, Telegram)
+    WEBHOOK_QUEUE_ENABLED: bool = True  # Store-and-ack; False processes events inline in the request
+    WEBHOOK_QUEUE_WORKERS: int = 8  # Conversations processed concurrently
+    WEBHOOK_QUEUE_SWEEP_INTERVAL: int = 30  # Seconds between sweeps for orphaned events
+    WEBHOOK_QUEUE_STALE_SECONDS: int = 600  # Claimed events older than this are retried
+    WEBHOOK_EVENT_RETENTION_DAYS: int = 7  # Processed events are pruned after this
+
+    # Outbound webhook callbacks (API channel async responses, delivered from an outbox)
+    WEBHOOK_DELIVERY_CONCURRENCY: int = 16  # Deliveries in flight per worker
+    WEBHOOK_DELIVERY_PER_ENDPOINT: int = 4  # Deliveries in flight per receiving host
+    WEBHOOK_DELIVERY_TIMEOUT: float = 15.0  # Seconds per attempt
+    WEBHOOK_DELIVERY_MAX_ATTEMPTS: int = 8
+    WEBHOOK_DELIVERY_BACKOFF: float = 5.0  # Seconds before the first retry; doubles per attempt
+    WEBHOOK_DELIVERY_BACKOFF_MAX: float = 3600.0
+    WEBHOOK_DELIVERY_POLL_INTERVAL: float = 5.0  # Seconds between checks for due retries
+    WEBHOOK_DELIVERY_RETENTION_DAYS: int = 7  # Delivered/failed rows are pruned after this
+
+    # Batch lead rescoring (leads with campaign activity since they were last scored)
+    LEAD_RESCORE_INTERVAL_MINUTES: int = 15  # 0 disables the scheduled job
+    LEAD_RESCORE_LOOKBACK_DAYS: int = 30
+    LEAD_RESCORE_BATCH_SIZE: int = 1000  # Leads written per transaction
+
+    # Chat attachments (stored in minio_bucket under attachments/)
+    ATTACHMENT_MAX_BYTES: int = 50 * 1024 * 1024
+    ATTACHMENT_UPLOAD_PART_BYTES: int = 8 * 1024 * 1024  # Multipart part size; S3 requires at least 5 MiB
+    ATTACHMENT_PRESIGN_EXPIRY: int = 900  # Seconds a pre-signed upload URL stays valid
+
+    # CMS content exports (streamed to minio_bucket under exports/)
+    EXPORT_FETCH_SIZE: int = 1000  # Rows per server-side cursor fetch
+    EXPORT_UPLOAD_PART_BYTES: int = 8 * 1024 * 1024  # Multipart part size; S3 requires at least 5 MiB
+    EXPORT_PROGRESS_EVERY: int = 5000  # Items between progress updates on the export record
+
+    # CMS media (probing and thumbnails run in a worker pool after upload)
+    MEDIA_PROCESSING_WORKERS: int = 2
+    MEDIA_THUMBNAIL_SIZES: str = "150,300,600"  # Comma-separated bounding boxes in px
+    MEDIA_THUMBNAIL_DEFAULT_SIZE: int = 300  # Rendered right after upload; other sizes on first request
+    MEDIA_UPLOAD_PART_BYTES: int = 8 * 1024 * 1024  # Multipart part size; S3 requires at least 5 MiB
+    MEDIA_PROCESSING_STALE_MINUTES: int = 15  # Unfinished media older than this is resubmitted by the sweep
+    MEDIA_PROCESSING_SWEEP_INTERVAL_MINUTES: int = 10  # 0 disables the sweep
+
+    # CMS search reindexing
+    CMS_REINDEX_BATCH_SIZE: int = 256  # Items per Chroma upsert (and per checkpoint)
+    CMS_EMBED_BATCH_SIZE: int = 10  # Texts per embedding request (provider limit)
+    CMS_EMBED_CONCURRENCY: int = 4  # Embedding requests in flight at once
+    CMS_SEARCH_CACHE_TTL: int = 300  # Seconds; results are also dropped when the company's content changes
+    CMS_SEARCH_CACHE_MAX_ENTRIES: int = 1000
+    CMS_SEARCH_EMBEDDING_CACHE_SIZE: int = 2000  # Query embeddings kept (shared by all companies)
+
+    # Reports
+    REPORTS_CACHE_TTL: int = 30  # Seconds; conversation metrics are also invalidated on status changes
+    REPORTS_CACHE_SLOW_TTL: int = 300  # Seconds; satisfaction and issue breakdowns
+    REPORTS_CACHE_MAX_ENTRIES: int = 1000
+
+    # Audio transcoding (voice endpoints convert audio off the event loop)
+    AUDIO_TRANSCODE_WORKERS: int = 4
+    AUDIO_TRANSCODE_USE_PROCESSES: bool = False  # Process pool instead of threads (true multi-core)
+    AUDIO_TRANSCODE_INLINE_BYTES: int = 2048  # Smaller payloads are converted inline
+    EVENT_LOOP_LAG_INTERVAL: float = 0.5  # Seconds between event-loop lag samples
+
+    # TTS Audio Cache (static prompts, greetings, workflow messages)
+    TTS_CACHE_ENABLED: bool = True
+    TTS_CACHE_BACKEND: str = "local"  # local or s3 (uses minio_bucket)
+    TTS_CACHE_DIR: str = "./tts_cache"
+    TTS_CACHE_DIR_MAX_BYTES: int = 1024 * 1024 * 1024  # Local cache cap; least recently used files are evicted
+    TTS_CACHE_S3_PREFIX: str = "tts-cache"
+    TTS_CACHE_MEMORY_MAX_BYTES: int = 64 * 1024 * 1024  # In-process LRU size
+    TTS_CACHE_MAX_TEXT_LENGTH: int = 500  # Longer texts are never cached
+    TTS_CACHE_WARMUP_ON_SAVE: bool = True  # Pre-synthesize workflow prompts when a workflow is saved
+
     # LiveKit AI Agents Configuration
     OPENAI_API_KEY: str = ""
     DEEPGRAM_API_KEY: str = ""
@@ -1,20 +1,78 @@
+from typing import Any, Callable, Hashable
 
-from sqlalchemy import create_engine
+from sqlalchemy import create_engine, event
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
 from sqlalchemy.ext.declarative import declarative_base
-from sqlalchemy.orm import sessionmaker
+from sqlalchemy.orm import Session, sessionmaker
 from app.core.config import settings
 
 
 engine = create_engine(
     settings.DATABASE_URL,
     # connect_args={"check_same_thread": False}, # only for SQLite
-    pool_size=50,  # 50 persistent connections in the pool
-    max_overflow=30,  # 30 additional temporary connections (total: 80)
+    pool_size=40,  # 40 persistent connections in the pool
+    max_overflow=20,  # 20 additional temporary connections (total: 60)
     pool_pre_ping=True,  # Test connections before using them to detect stale connections
     pool_recycle=3600,  # Recycle connections after 1 hour to prevent stale connections
     pool_timeout=60  # Wait up to 60 seconds for an available connection
-    # Total max connections: 80 (leaves 20 of 100 for admin/monitoring/other apps)
 )
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
+
+def _async_database_url(url: str) -> str:
+    """Same database through the asyncpg driver (postgresql://... -> postgresql+asyncpg://...)."""
+    scheme, separator, rest = url.partition("://")
+    if scheme.split("+")[0] in ("postgresql", "postgres"):
+        return f"postgresql+asyncpg{separator}{rest}"
+    return url
+
+
+# Async engine for the per-message hot paths (websockets, webhooks) so a slow
+# query no longer blocks the event loop for every connected client.
+async_engine = create_async_engine(
+    _async_database_url(settings.DATABASE_URL),
+    pool_size=settings.DB_ASYNC_POOL_SIZE,
+    max_overflow=settings.DB_ASYNC_MAX_OVERFLOW,
+    pool_pre_ping=True,
+    pool_recycle=3600,
+    pool_timeout=60
+)
+# Total max connections: 60 sync + 20 async = 80 (leaves 20 of 100 for admin/monitoring/other apps)
+AsyncSessionLocal = async_sessionmaker(
+    bind=async_engine,
+    class_=AsyncSession,
+    autoflush=False,
+    expire_on_commit=False  # Attribute access after commit would need an implicit (sync) refresh
+)
+
 Base = declarative_base()
+
+
+def invalidate_on_commit(info_key: str, invalidate: Callable[[Hashable], Any]) -> Callable[[Session, Hashable], None]:
+    """
+    Defer cache invalidations until the session's transaction commits.
+
+    Keys marked on a session are collected in ``session.info[info_key]``;
+    ``invalidate(key)`` runs for each of them after the commit, and a
+    rollback discards them.
+
+    Args:
+        info_key: Session.info key holding the marked keys (unique per cache)
+        invalidate: Called with each marked key after commit
+
+    Returns:
+        mark(session, key)
+    """
+    def after_commit(session: Session):
+        for key in session.info.pop(info_key, ()):
+            invalidate(key)
+
+    def after_soft_rollback(session: Session, previous_transaction):
+        session.info.pop(info_key, None)
+
+    def mark(session: Session, key: Hashable) -> None:
+        session.info.setdefault(info_key, set()).add(key)
+
+    event.listen(Session, "after_commit", after_commit)
+    event.listen(Session, "after_soft_rollback", after_soft_rollback)
+    return mark
@@ -1,5 +1,5 @@
 from typing import Optional
-from app.core.database import SessionLocal
+from app.core.database import SessionLocal, AsyncSessionLocal
 from fastapi import Header, HTTPException, Depends, Query, WebSocketDisconnect, status, WebSocket, WebSocketException
 from fastapi.security import OAuth2PasswordBearer
 from jose import JWTError, jwt
@@ -20,6 +20,10 @@ def get_db():
     finally:
         db.close()
 
+async def get_async_db():
+    async with AsyncSessionLocal() as db:
+        yield db
+
 async def get_current_company_from_api_key(
     x_api_key: str = Header(...), db: Session = Depends(get_db)
 ) -> models_company.Company:
@@ -0,0 +1,100 @@
+"""
+Import Profiler
+Startup import-time report, like ``python -X importtime`` but readable from the app.
+
+While running, it wraps ``builtins.__import__`` and times the first import of
+each module. Cumulative time includes the modules it imported in turn; self
+time excludes them. The slowest entries show which dependencies make worker
+restarts slow and are candidates for the model registry.
+"""
+import builtins
+import sys
+import threading
+import time
+from typing import Dict, List, Tuple
+
+
+class ImportProfiler:
+    """Times first-time module imports between start() and stop()."""
+
+    def __init__(self):
+        self.timings: Dict[str, Tuple[float, float]] = {}  # module -> (self ms, cumulative ms)
+        self.total_ms = 0.0
+        self._original_import = None
+        self._started = 0.0
+        self._local = threading.local()
+
+    @property
+    def running(self) -> bool:
+        return self._original_import is not None
+
+    def start(self) -> None:
+        if self.running:
+            return
+        self._original_import = builtins.__import__
+        self._started = time.perf_counter()
+        builtins.__import__ = self._import
+
+    def stop(self) -> None:
+        if not self.running:
+            return
+        builtins.__import__ = self._original_import
+        self._original_import = None
+        self.total_ms = (time.perf_counter() - self._started) * 1000
+
+    def _import(self, name, globals=None, locals=None, fromlist=(), level=0):
+        original = self._original_import or builtins.__import__
+        # Relative imports run inside a package import that is already being timed
+        if level or original is self._import:
+            return original(name, globals, locals, fromlist, level)
+
+        if name not in sys.modules:
+            self._timed(original, name)
+        # ``from package import submodule`` loads submodules without going through
+        # __import__ again, so time each one here first
+        package = sys.modules.get(name)
+        for item in (fromlist or ()) if hasattr(package, "__path__") else ():
+            submodule = f"{name}.{item}"
+            if item != "*" and submodule not in sys.modules and not hasattr(package, item):
+                try:
+                    self._timed(original, submodule)
+                except ModuleNotFoundError as e:
+                    if e.name != submodule:
+                        raise
+        return original(name, globals, locals, fromlist, level)
+
+    def _timed(self, original, name: str) -> None:
+        stack = getattr(self._local, "stack", None)
+        if stack is None:
+            stack = self._local.stack = []
+        stack.append(0.0)
+        started = time.perf_counter()
+        loaded = False
+        try:
+            original(name)
+            loaded = True
+        finally:
+            elapsed_ms = (time.perf_counter() - started) * 1000
+            children_ms = stack.pop()
+            if stack:
+                stack[-1] += elapsed_ms
+            if loaded:
+                self.timings.setdefault(name, (elapsed_ms - children_ms, elapsed_ms))
+
+    def slowest(self, top: int = 25) -> List[dict]:
+        """Modules with the highest cumulative import time, slowest first."""
+        ranked = sorted(self.timings.items(), key=lambda item: item[1][1], reverse=True)[:top]
+        return [
+            {"module": name, "self_ms": round(self_ms, 1), "cumulative_ms": round(cumulative_ms, 1)}
+            for name, (self_ms, cumulative_ms) in ranked
+        ]
+
+    def report(self, top: int = 25) -> str:
+        lines = [f"[Startup] Imported {len(self.timings)} modules in {self.total_ms:.0f} ms; slowest:"]
+        for entry in self.slowest(top):
+            lines.append(f"  {entry['cumulative_ms']:>9.1f} ms  (self {entry['self_ms']:>8.1f} ms)  {entry['module']}")
+        return "\n".join(lines)
+
+
+# Global profiler used by app.main
+import_profiler = ImportProfiler()
@@ -0,0 +1,125 @@
+"""
+Model Registry
+Lazily loaded models and heavy SDKs.
+
+Modules register a loader under a name instead of building models at import
+time; the first ``get`` runs it (once per worker, even under concurrent
+callers) and later calls return the same object. Deployments list the names
+they actually use in ``settings.PRELOAD_MODELS`` to load them at startup
+instead of on the first request.
+"""
+import importlib
+import threading
+import time
+from typing import Any, Callable, Dict, Iterable
+
+
+class ModelRegistry:
+    """Named loaders whose results are built on first use and then shared."""
+
+    def __init__(self):
+        self._loaders: Dict[str, Callable[[], Any]] = {}
+        self._descriptions: Dict[str, str] = {}
+        self._locks: Dict[str, threading.Lock] = {}
+        self._values: Dict[str, Any] = {}
+        self._load_ms: Dict[str, float] = {}
+        self._errors: Dict[str, str] = {}
+        self._lock = threading.Lock()
+
+    def register(self, name: str, loader: Callable[[], Any], description: str = "") -> None:
+        """
+        Register (or replace) a loader. A replaced entry is loaded again on next use.
+
+        Args:
+            name: Key used with get() and in PRELOAD_MODELS
+            loader: Zero-argument callable that builds the model or imports the SDK
+            description: Shown in stats()
+        """
+        with self._lock:
+            self._loaders[name] = loader
+            self._descriptions[name] = description
+            self._locks.setdefault(name, threading.Lock())
+            self._values.pop(name, None)
+            self._load_ms.pop(name, None)
+
+    def register_module(self, name: str, module_name: str, description: str = "") -> None:
+        """Register a heavy SDK whose import is deferred until it is first needed."""
+        self.register(name, lambda: importlib.import_module(module_name), description)
+
+    def get(self, name: str) -> Any:
+        """
+        The loaded object, loading it first if needed.
+
+        Raises:
+            KeyError: If nothing is registered under ``name``
+        """
+        if name in self._values:
+            return self._values[name]
+        with self._lock:
+            if name not in self._loaders:
+                raise KeyError(f"No model registered as '{name}'")
+            loader, load_lock = self._loaders[name], self._locks[name]
+
+        # One lock per entry: loading a slow model doesn't hold up the others
+        with load_lock:
+            if name in self._values:
+                return self._values[name]
+            started = time.perf_counter()
+            try:
+                value = loader()
+            except Exception as e:
+                self._errors[name] = str(e)
+                raise
+            elapsed_ms = (time.perf_counter() - started) * 1000
+            self._values[name] = value
+            self._load_ms[name] = elapsed_ms
+            self._errors.pop(name, None)
+        print(f"[Models] Loaded {name} in {elapsed_ms:.0f} ms")
+        return value
+
+    def is_registered(self, name: str) -> bool:
+        return name in self._loaders
+
+    def is_loaded(self, name: str) -> bool:
+        return name in self._values
+
+    def prewarm(self, names: Iterable[str]) -> Dict[str, str]:
+        """
+        Load the given entries now. Failures are logged, not raised.
+
+        Returns:
+            "loaded", "unknown" or the error message, by name
+        """
+        results = {}
+        for name in names:
+            try:
+                self.get(name)
+                results[name] = "loaded"
+            except KeyError:
+                print(f"[Models] Cannot preload '{name}': not registered (known: {', '.join(sorted(self._loaders))})")
+                results[name] = "unknown"
+            except Exception as e:
+                print(f"[Models] Preloading {name} failed: {e}")
+                results[name] = str(e)
+        return results
+
+    def stats(self) -> dict:
+        with self._lock:
+            names = sorted(self._loaders)
+        return {
+            name: {
+                "description": self._descriptions.get(name, ""),
+                "loaded": name in self._values,
+                "load_ms": round(self._load_ms[name], 1) if name in self._load_ms else None,
+                "error": self._errors.get(name),
+            }
+            for name in names
+        }
+
+
+# Global registry shared by every module in this worker
+model_registry = ModelRegistry()
+
+# SDKs that are imported inside the functions using them; registered here so they can be preloaded
+model_registry.register_module("chromadb", "chromadb", "ChromaDB client SDK")
+model_registry.register_module("faiss", "app.services.faiss_vector_database", "FAISS + LangChain vector store")
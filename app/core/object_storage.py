@@ -1,8 +1,7 @@
 import boto3
 from botocore.client import Config
-import chromadb
-from chromadb.api.client import Client as ChromaClient
 from app.core.config import settings
+from app.core.model_registry import model_registry
 
 scheme = 'https' if settings.minio_secure else 'http'
 endpoint_url = f'{scheme}://{settings.minio_endpoint}'
@@ -19,11 +18,22 @@ s3_client = boto3.client(
 BUCKET_NAME = settings.minio_bucket
 
 # Default ChromaDB client (for backwards compatibility during migration)
-if settings.CHROMA_DB_HOST:
-    print(f"Connecting to ChromaDB at {settings.CHROMA_DB_HOST}:{settings.CHROMA_DB_PORT}")
-    chroma_client = chromadb.HttpClient(host=settings.CHROMA_DB_HOST, port=settings.CHROMA_DB_PORT)
-else:
-    chroma_client = ChromaClient()
+def _create_default_chroma_client():
+    import chromadb
+    if settings.CHROMA_DB_HOST:
+        print(f"Connecting to ChromaDB at {settings.CHROMA_DB_HOST}:{settings.CHROMA_DB_PORT}")
+        return chromadb.HttpClient(host=settings.CHROMA_DB_HOST, port=settings.CHROMA_DB_PORT)
+    from chromadb.api.client import Client as ChromaClient
+    return ChromaClient()
+
+model_registry.register("chroma_client", _create_default_chroma_client, "Default ChromaDB client")
+
+
+def __getattr__(name):
+    # ``chroma_client`` is created on first access rather than at import
+    if name == "chroma_client":
+        return model_registry.get("chroma_client")
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
 
 
 # =============================================================================
@@ -50,6 +60,8 @@ def get_company_chroma_client(company_id: int):
     if company_id in _company_chroma_clients:
         return _company_chroma_clients[company_id]
 
+    import chromadb
+
     tenant_name = f"company_{company_id}"
     database_name = "knowledge_base"
 
@@ -1,12 +1,29 @@
-from transformers import AutoTokenizer, AutoModel
-import torch
+from app.core.model_registry import model_registry
 
-def get_embeddings(texts: list[str], model_name: str = "nvidia/llama-3.2-nemoretriever-1b-vlm-embed-v1"):
+DEFAULT_EMBEDDING_MODEL = "nvidia/llama-3.2-nemoretriever-1b-vlm-embed-v1"
+
+def _model_loader(model_name: str):
+    def load():
+        from transformers import AutoTokenizer, AutoModel
+        return AutoTokenizer.from_pretrained(model_name), AutoModel.from_pretrained(model_name)
+    return load
+
+def _registry_name(model_name: str) -> str:
+    return "nvidia_embeddings" if model_name == DEFAULT_EMBEDDING_MODEL else f"nvidia_embeddings:{model_name}"
+
+model_registry.register(_registry_name(DEFAULT_EMBEDDING_MODEL), _model_loader(DEFAULT_EMBEDDING_MODEL), DEFAULT_EMBEDDING_MODEL)
+
+def get_embeddings(texts: list[str], model_name: str = DEFAULT_EMBEDDING_MODEL):
     """
     Generates embeddings for a list of texts using the specified NVIDIA model.
+    The tokenizer and model are loaded once per worker, on first use.
     """
-    tokenizer = AutoTokenizer.from_pretrained(model_name)
-    model = AutoModel.from_pretrained(model_name)
+    import torch
+
+    name = _registry_name(model_name)
+    if not model_registry.is_registered(name):
+        model_registry.register(name, _model_loader(model_name), model_name)
+    tokenizer, model = model_registry.get(name)
 
     inputs = tokenizer(texts, padding=True, truncation=True, return_tensors="pt")
     
@@ -1,3 +1,8 @@
+from app.core.config import settings
+from app.core.import_profiler import import_profiler
+if settings.STARTUP_IMPORT_PROFILE:
+    import_profiler.start()
+
 from fastapi import FastAPI, Depends
 from sqlalchemy.orm import Session
 from fastapi.middleware.cors import CORSMiddleware
@@ -6,19 +11,29 @@ import uvicorn
 import os
 from apscheduler.schedulers.asyncio import AsyncIOScheduler
 
-from app.core.database import Base, engine, SessionLocal
+from app.core.database import Base, engine, SessionLocal, async_engine
 from app.models import role, permission, contact, comment # Import new models
-from app.core.config import settings
+from app.core.model_registry import model_registry
 from app.api.v1.main import api_router, websocket_router
 from app.api.v1.endpoints import ws_updates, comments, gmail, google, published, ai_images, ai_chat, object_detection, public_pages
-from app.core.dependencies import get_db
+from app.core.dependencies import get_db, require_super_admin
 from app.services.connection_manager import manager
 from app.services.websocket_cleanup_service import cleanup_inactive_sessions
 from app.services.call_timeout_service import call_timeout_service
+from app.services.event_loop_monitor import event_loop_monitor
+from app.services.inbound_webhook_service import inbound_webhook_worker
+from app.services.webhook_delivery_service import webhook_delivery_worker
+from app.services.audio_conversion_service import audio_transcoder
+from app.services.cms.media_processing_service import media_processor
+from app.services.knowledge_base_ingestion_service import document_parser
+from app.services.code_execution_service import code_executor
+from app.services.workflow_http_service import workflow_http
+from app.services.workflow_embedding_service import workflow_embeddings
 from app.services import tool_service, widget_settings_service
 from app.schemas import widget_settings as schemas_widget_settings
 from create_tool import create_api_call_tool
 import asyncio
+from datetime import datetime
 
 # Create all database tables
 Base.metadata.create_all(bind=engine)
@@ -61,6 +76,23 @@ async def read_root():
     return {"message": "AgentConnect backend is running"}
 
 
+@app.get("/metrics/runtime", dependencies=[Depends(require_super_admin)])
+async def read_runtime_metrics():
+    """Runtime statistics for this worker: event-loop lag, off-loop processing pools, workflow HTTP and embeddings, webhook delivery, model loading and startup imports."""
+    return {
+        "event_loop_lag": event_loop_monitor.stats(),
+        "audio_transcoding": audio_transcoder.stats(),
+        "media_processing": media_processor.stats(),
+        "document_parsing": document_parser.stats(),
+        "code_nodes": code_executor.stats(),
+        "workflow_http": workflow_http.stats(),
+        "webhook_delivery": webhook_delivery_worker.stats(),
+        "workflow_embeddings": workflow_embeddings.stats(),
+        "models": model_registry.stats(),
+        "startup_imports": import_profiler.slowest(settings.STARTUP_IMPORT_PROFILE_TOP),
+    }
+
+
 from app.initial_data import create_initial_data
 from app.services.builtin_tools_service import seed_builtin_tools
 
@@ -83,8 +115,48 @@ async def run_whatsapp_token_refresh():
     await run_whatsapp_token_refresh_scheduler()
 
 
+def rescore_active_leads():
+    """Re-score leads of every company with campaign activity since their last scoring"""
+    from app.services.lead_qualification_service import rescore_leads
+    db = SessionLocal()
+    try:
+        summary = rescore_leads(
+            db,
+            lookback_days=settings.LEAD_RESCORE_LOOKBACK_DAYS,
+            batch_size=settings.LEAD_RESCORE_BATCH_SIZE
+        )
+        if summary["leads"]:
+            print(f"[LeadRescore] Re-scored {summary['leads']} leads")
+    finally:
+        db.close()
+
+
+async def run_lead_rescore():
+    await asyncio.to_thread(rescore_active_leads)
+
+
+def resubmit_stale_media():
+    """Re-queue media processing lost when a worker stopped mid-job"""
+    from app.services.cms.media_service import resubmit_stale_media as resubmit
+    db = SessionLocal()
+    try:
+        count = resubmit(db)
+        if count:
+            print(f"[MediaSweep] Resubmitted {count} unfinished media items")
+    finally:
+        db.close()
+
+
+async def run_media_sweep():
+    await asyncio.to_thread(resubmit_stale_media)
+
+
 @app.on_event("startup")
 async def on_startup():
+    if import_profiler.running:
+        import_profiler.stop()
+        print(import_profiler.report(settings.STARTUP_IMPORT_PROFILE_TOP))
+
     create_initial_data()
 
     # Seed built-in tools (idempotent)
@@ -130,6 +202,29 @@ async def on_startup():
     )
     print("[Startup] WhatsApp token refresh scheduler started (interval: 1 hour)")
 
+    if settings.LEAD_RESCORE_INTERVAL_MINUTES > 0:
+        scheduler.add_job(
+            run_lead_rescore,
+            'interval',
+            minutes=settings.LEAD_RESCORE_INTERVAL_MINUTES,
+            id='lead_rescore',
+            replace_existing=True,
+            max_instances=1
+        )
+        print(f"[Startup] Lead rescoring scheduler started (interval: {settings.LEAD_RESCORE_INTERVAL_MINUTES} min)")
+
+    if settings.MEDIA_PROCESSING_SWEEP_INTERVAL_MINUTES > 0:
+        scheduler.add_job(
+            run_media_sweep,
+            'interval',
+            minutes=settings.MEDIA_PROCESSING_SWEEP_INTERVAL_MINUTES,
+            next_run_time=datetime.now(),  # also sweep once at startup
+            id='media_processing_sweep',
+            replace_existing=True,
+            max_instances=1
+        )
+        print(f"[Startup] Media processing sweep started (interval: {settings.MEDIA_PROCESSING_SWEEP_INTERVAL_MINUTES} min)")
+
     # Start the scheduler if not already started
     if not scheduler.running:
         scheduler.start()
@@ -138,6 +233,29 @@ async def on_startup():
     asyncio.create_task(call_timeout_service.start())
     print("[Startup] Call timeout service started (timeout: 30s, check interval: 10s)")
 
+    # Start inbound messaging webhook worker
+    if settings.WEBHOOK_QUEUE_ENABLED:
+        asyncio.create_task(inbound_webhook_worker.start())
+        print(f"[Startup] Inbound webhook worker started ({settings.WEBHOOK_QUEUE_WORKERS} workers)")
+
+    # Start outbound webhook delivery worker (API channel callbacks)
+    asyncio.create_task(webhook_delivery_worker.start())
+    print(f"[Startup] Webhook delivery worker started (concurrency: {settings.WEBHOOK_DELIVERY_CONCURRENCY})")
+
+    # Start event loop lag monitor
+    event_loop_monitor.interval = settings.EVENT_LOOP_LAG_INTERVAL
+    asyncio.create_task(event_loop_monitor.start())
+    print(f"[Startup] Event loop lag monitor started (interval: {settings.EVENT_LOOP_LAG_INTERVAL}s)")
+
+    if settings.CODE_NODE_PREWARM:
+        code_executor.prewarm()
+        print(f"[Startup] Code node workers started ({settings.CODE_NODE_WORKERS} processes)")
+
+    if settings.PRELOAD_MODELS:
+        # Off the event loop: model loading is CPU- and disk-bound
+        await asyncio.to_thread(model_registry.prewarm, settings.PRELOAD_MODELS)
+        print(f"[Startup] Preloaded models: {', '.join(settings.PRELOAD_MODELS)}")
+
 @app.on_event("shutdown")
 async def on_shutdown():
     print("Server is shutting down...")
@@ -146,6 +264,18 @@ async def on_shutdown():
     call_timeout_service.stop()
     print("[Shutdown] Call timeout service stopped")
 
+    # Stop inbound webhook worker and outbound webhook delivery
+    inbound_webhook_worker.stop()
+    await webhook_delivery_worker.stop()
+
+    # Stop event loop lag monitor and audio/media/document/code node processing pools
+    event_loop_monitor.stop()
+    audio_transcoder.shutdown()
+    media_processor.shutdown()
+    document_parser.shutdown()
+    code_executor.shutdown()
+    await workflow_http.aclose()
+
     # Shutdown scheduler
     if scheduler.running:
         scheduler.shutdown(wait=False)
@@ -155,5 +285,8 @@ async def on_shutdown():
     await manager.disconnect_all()
     print("[Shutdown] All WebSocket clients disconnected")
 
+    # Close pooled async database connections
+    await async_engine.dispose()
+
 if __name__ == "__main__":
     uvicorn.run(app, host=settings.HOST, port=settings.PORT, ws="websockets")
\ No newline at end of file
@@ -7,9 +7,11 @@ from app.models.company import Company
 from app.models.company_settings import CompanySettings
 from app.models.contact import Contact
 from app.models.conversation_session import ConversationSession
+from app.models.conversation_stats import ConversationStats
 from app.models.credential import Credential
 from app.models.integration import Integration
 from app.models.knowledge_base import KnowledgeBase
+from app.models.knowledge_base_ingestion_job import KnowledgeBaseIngestionJob
 from app.models.memory import Memory
 from app.models.notification_settings import NotificationSettings
 from app.models.optimization_suggestion import OptimizationSuggestion
@@ -70,11 +72,15 @@ from app.models.security_log import SecurityLog
 from app.models.token_usage import TokenUsage
 from app.models.usage_alert import UsageAlert
 
+# Messaging Channel Models
+from app.models.inbound_webhook_event import InboundWebhookEvent
+from app.models.webhook_delivery import WebhookDelivery
+
 # CMS Models
 from app.models.content_type import ContentType
 from app.models.content_item import ContentItem, content_item_categories
 from app.models.content_media import ContentMedia
 from app.models.content_category import ContentCategory
 from app.models.content_tag import ContentTag
-from app.models.content_publishing import ContentCopy, ContentApiToken, ContentExport
+from app.models.content_publishing import ContentCopy, ContentApiToken, ContentExport, ContentReindexJob
 
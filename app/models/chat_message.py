@@ -1,4 +1,4 @@
-from sqlalchemy import BigInteger, Column, Integer, String, DateTime, ForeignKey, func, JSON
+from sqlalchemy import BigInteger, Column, Integer, String, DateTime, ForeignKey, func, JSON, Index
 from sqlalchemy.orm import relationship
 from app.core.database import Base
 
@@ -30,3 +30,13 @@ class ChatMessage(Base):
     assignee = relationship("User")
     contact = relationship("Contact", back_populates="chat_messages")
     session = relationship("ConversationSession", back_populates="messages")
+
+    __table_args__ = (
+        # Covering index for the reports aggregates (company + date range)
+        Index(
+            'ix_chat_messages_company_timestamp', 'company_id', 'timestamp',
+            postgresql_include=['feedback_rating', 'issue'],
+        ),
+        # First/last message lookups per session
+        Index('ix_chat_messages_session_timestamp', 'session_id', 'timestamp'),
+    )
@@ -42,6 +42,7 @@ class ContentItem(Base):
 
     # ChromaDB reference for semantic search
     chroma_doc_id = Column(String(100), nullable=True)
+    search_index_hash = Column(String(64), nullable=True)  # sha256 of the indexed document; unchanged items are skipped on reindex
 
     # Metadata
     created_by = Column(Integer, ForeignKey("users.id"), nullable=True)
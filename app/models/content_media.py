@@ -1,4 +1,5 @@
 from sqlalchemy import Column, Integer, String, Text, ForeignKey, DateTime, func
+from sqlalchemy.dialects.postgresql import JSONB
 from sqlalchemy.orm import relationship
 from app.core.database import Base
 
@@ -24,6 +25,10 @@ class ContentMedia(Base):
     s3_bucket = Column(String(100), nullable=True)
     s3_key = Column(String(500), nullable=False)
     thumbnail_s3_key = Column(String(500), nullable=True)  # for images/videos
+    thumbnails = Column(JSONB, nullable=True)  # {"<size>": s3_key} of rendered thumbnail sizes
+
+    # Background probing/thumbnailing: pending, processing, completed, failed
+    processing_status = Column(String(20), nullable=False, default='pending', server_default='completed')
 
     # Image/Video dimensions
     width = Column(Integer, nullable=True)
@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, Boolean, ForeignKey, DateTime, func
+from sqlalchemy import Column, Integer, BigInteger, String, Text, Boolean, ForeignKey, DateTime, func
 from sqlalchemy.orm import relationship
 from app.core.database import Base
 import secrets
@@ -80,13 +80,18 @@ class ContentExport(Base):
     company_id = Column(Integer, ForeignKey("companies.id"), nullable=False)
     knowledge_base_id = Column(Integer, ForeignKey("knowledge_bases.id"), nullable=True)
 
-    format = Column(String(20), nullable=False)  # json, csv, pdf
+    format = Column(String(20), nullable=False)  # json, csv, ndjson
     status = Column(String(20), default='pending')  # pending, processing, completed, failed
 
     s3_key = Column(String(500), nullable=True)  # export file location
-    file_size = Column(Integer, nullable=True)
+    file_size = Column(BigInteger, nullable=True)
     item_count = Column(Integer, nullable=True)
 
+    # Progress while processing (processed_count of total_count items written)
+    total_count = Column(Integer, nullable=True)
+    processed_count = Column(Integer, nullable=False, default=0, server_default='0')
+    error_message = Column(Text, nullable=True)
+
     # Filter criteria used for export
     filter_criteria = Column(String(500), nullable=True)
 
@@ -99,3 +104,27 @@ class ContentExport(Base):
     company = relationship("Company", back_populates="content_exports")
     knowledge_base = relationship("KnowledgeBase", back_populates="content_exports")
     requester = relationship("User", backref="content_exports")
+
+
+class ContentReindexJob(Base):
+    """
+    Checkpoint of a bulk search reindex.
+
+    Items are indexed in id order; ``last_item_id`` is committed after each
+    batch, so an interrupted reindex of the same scope resumes where it stopped.
+    """
+    __tablename__ = "content_reindex_jobs"
+
+    id = Column(Integer, primary_key=True, index=True)
+    company_id = Column(Integer, ForeignKey("companies.id"), nullable=False, index=True)
+    scope = Column(String(100), nullable=False)  # all, kb:<id>, type:<id>
+    status = Column(String(20), nullable=False, default='running')  # running, completed, failed
+
+    last_item_id = Column(Integer, nullable=False, default=0)
+    indexed_count = Column(Integer, nullable=False, default=0)
+    skipped_count = Column(Integer, nullable=False, default=0)  # unchanged since last indexed
+    error_count = Column(Integer, nullable=False, default=0)
+
+    started_at = Column(DateTime(timezone=True), server_default=func.now())
+    updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now())
+    completed_at = Column(DateTime(timezone=True), nullable=True)
@@ -1,4 +1,4 @@
-from sqlalchemy import Boolean, Column, Integer, String, JSON, ForeignKey, DateTime, Text
+from sqlalchemy import Boolean, Column, Integer, String, JSON, ForeignKey, DateTime, Text, Index
 from sqlalchemy.orm import relationship
 from app.core.database import Base
 import datetime
@@ -56,3 +56,17 @@ class ConversationSession(Base):
     workflow = relationship("Workflow")
     contact = relationship("Contact", back_populates="sessions")
     messages = relationship("ChatMessage", back_populates="session")
+
+    __table_args__ = (
+        # Covering index for the reports aggregates (company + date range)
+        Index(
+            'ix_conversation_sessions_company_created', 'company_id', 'created_at',
+            postgresql_include=['status', 'channel', 'assignee_id', 'waiting_for_agent'],
+        ),
+        # Keyset pagination of the inbox (ORDER BY updated_at DESC, id DESC) per filter
+        Index('ix_conversation_sessions_inbox', 'company_id', 'updated_at', 'id'),
+        Index('ix_conversation_sessions_inbox_status', 'company_id', 'status', 'updated_at', 'id'),
+        Index('ix_conversation_sessions_inbox_assignee', 'company_id', 'assignee_id', 'updated_at', 'id'),
+        Index('ix_conversation_sessions_inbox_channel', 'company_id', 'channel', 'updated_at', 'id'),
+        Index('ix_conversation_sessions_inbox_priority', 'company_id', 'priority', 'updated_at', 'id'),
+    )
@@ -0,0 +1,132 @@
+"""
+Conversation Stats Model
+
+Per-company conversation counters kept up to date on every flush that
+inserts, updates or deletes a ConversationSession, so the inbox badge and
+reopen analytics read one row instead of scanning sessions.
+"""
+from sqlalchemy import Column, Integer, BigInteger, Float, DateTime, ForeignKey, event, inspect
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.sql import func
+from app.core.database import Base
+from app.models.conversation_session import ConversationSession
+
+CLOSED_STATUSES = ('resolved', 'archived')
+
+COUNTER_COLUMNS = (
+    'total_count',
+    'closed_count',
+    'unattended_count',
+    'waiting_for_agent_count',
+    'reopened_count',
+    'reopen_events',
+    'reopen_delay_seconds',
+    'reopen_delay_samples',
+)
+
+# Session attributes the counters depend on
+TRACKED_FIELDS = (
+    'company_id', 'status', 'assignee_id', 'waiting_for_agent',
+    'reopen_count', 'resolved_at', 'last_reopened_at',
+)
+
+
+class ConversationStats(Base):
+    __tablename__ = "conversation_stats"
+
+    company_id = Column(Integer, ForeignKey("companies.id", ondelete="CASCADE"), primary_key=True)
+
+    total_count = Column(BigInteger, nullable=False, default=0, server_default='0')
+    closed_count = Column(BigInteger, nullable=False, default=0, server_default='0')  # resolved or archived
+    unattended_count = Column(BigInteger, nullable=False, default=0, server_default='0')  # open, no assignee or waiting for agent
+    waiting_for_agent_count = Column(BigInteger, nullable=False, default=0, server_default='0')  # open and waiting for agent
+    reopened_count = Column(BigInteger, nullable=False, default=0, server_default='0')  # sessions reopened at least once
+    reopen_events = Column(BigInteger, nullable=False, default=0, server_default='0')  # sum of reopen_count
+    reopen_delay_seconds = Column(Float, nullable=False, default=0, server_default='0')  # sum of last_reopened_at - resolved_at
+    reopen_delay_samples = Column(BigInteger, nullable=False, default=0, server_default='0')
+
+    updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now())
+
+    @property
+    def open_count(self) -> int:
+        return self.total_count - self.closed_count
+
+
+def session_contribution(values: dict) -> dict:
+    """Counter contribution of one session given its tracked attribute values."""
+    closed = (values.get('status') or 'active') in CLOSED_STATUSES
+    waiting = bool(values.get('waiting_for_agent'))
+    reopen_count = values.get('reopen_count') or 0
+    resolved_at = values.get('resolved_at')
+    last_reopened_at = values.get('last_reopened_at')
+    has_delay = bool(resolved_at and last_reopened_at)
+
+    return {
+        'total_count': 1,
+        'closed_count': int(closed),
+        'unattended_count': int(not closed and (values.get('assignee_id') is None or waiting)),
+        'waiting_for_agent_count': int(not closed and waiting),
+        'reopened_count': int(reopen_count > 0),
+        'reopen_events': reopen_count,
+        'reopen_delay_seconds': (last_reopened_at - resolved_at).total_seconds() if has_delay else 0.0,
+        'reopen_delay_samples': int(has_delay),
+    }
+
+
+def _apply_delta(connection, company_id, delta: dict) -> None:
+    if company_id is None or not any(delta.values()):
+        return
+    table = ConversationStats.__table__
+    stmt = pg_insert(table).values(company_id=company_id, **delta)
+    stmt = stmt.on_conflict_do_update(
+        index_elements=[table.c.company_id],
+        set_={
+            **{column: table.c[column] + stmt.excluded[column] for column in delta},
+            'updated_at': func.now(),
+        },
+    )
+    connection.execute(stmt)
+
+
+def _current_values(target) -> dict:
+    return {field: getattr(target, field) for field in TRACKED_FIELDS}
+
+
+def _previous_values(target) -> dict:
+    state = inspect(target)
+    values = {}
+    for field in TRACKED_FIELDS:
+        history = state.attrs[field].history
+        values[field] = history.deleted[0] if history.deleted else getattr(target, field)
+    return values
+
+
+def _after_insert(mapper, connection, target):
+    _apply_delta(connection, target.company_id, session_contribution(_current_values(target)))
+
+
+def _after_delete(mapper, connection, target):
+    removed = session_contribution(_previous_values(target))
+    _apply_delta(connection, target.company_id, {k: -v for k, v in removed.items()})
+
+
+def _after_update(mapper, connection, target):
+    state = inspect(target)
+    if not any(state.attrs[field].history.has_changes() for field in TRACKED_FIELDS):
+        return
+
+    previous = _previous_values(target)
+    current = _current_values(target)
+    old = session_contribution(previous)
+    new = session_contribution(current)
+
+    if previous['company_id'] == current['company_id']:
+        _apply_delta(connection, current['company_id'], {k: new[k] - old[k] for k in new})
+    else:
+        _apply_delta(connection, previous['company_id'], {k: -v for k, v in old.items()})
+        _apply_delta(connection, current['company_id'], new)
+
+
+event.listen(ConversationSession, "after_insert", _after_insert)
+event.listen(ConversationSession, "after_update", _after_update)
+event.listen(ConversationSession, "after_delete", _after_delete)
@@ -0,0 +1,42 @@
+"""
+Inbound Webhook Event Model
+
+Raw messaging-channel webhook events (one row per provider message) persisted
+by the webhook endpoints before acknowledging, and drained by the
+InboundWebhookWorker.
+"""
+from sqlalchemy import Column, Integer, BigInteger, String, DateTime, Text, JSON, Index, UniqueConstraint
+from sqlalchemy.sql import func
+from app.core.database import Base
+
+
+class InboundWebhookEvent(Base):
+    """
+    Statuses:
+    - pending: stored, waiting for a worker
+    - processing: claimed by a worker
+    - done: processed (including events the handler chose to ignore)
+    - failed: the handler raised; see ``error``
+    """
+    __tablename__ = "inbound_webhook_events"
+
+    id = Column(BigInteger, primary_key=True, index=True)
+
+    channel = Column(String(20), nullable=False)  # whatsapp, messenger, instagram, telegram, api
+    provider_message_id = Column(String(255), nullable=False)  # Dedup key (wamid, mid, bot:update_id)
+    conversation_key = Column(String(255), nullable=False)  # Events with the same key are processed in order
+    integration_id = Column(Integer, nullable=True)  # Pre-resolved integration (Telegram bot)
+    payload = Column(JSON, nullable=False)  # Single-message webhook payload in the provider's format
+
+    status = Column(String(20), nullable=False, default="pending", server_default="pending")
+    attempts = Column(Integer, nullable=False, default=0, server_default="0")
+    error = Column(Text, nullable=True)
+
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
+    processed_at = Column(DateTime(timezone=True), nullable=True)  # Claim time while processing, then completion time
+
+    __table_args__ = (
+        UniqueConstraint('channel', 'provider_message_id', name='uq_inbound_webhook_event_provider_id'),
+        Index('ix_inbound_webhook_events_status_created', 'status', 'created_at'),
+        Index('ix_inbound_webhook_events_conversation', 'channel', 'conversation_key', 'status', 'id'),
+    )
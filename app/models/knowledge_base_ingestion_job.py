@@ -0,0 +1,38 @@
+from sqlalchemy import Column, Integer, String, Text, DateTime, ForeignKey
+from sqlalchemy.orm import relationship
+from sqlalchemy.sql import func
+from app.core.database import Base
+
+
+class KnowledgeBaseIngestionJob(Base):
+    """
+    Background ingestion of an uploaded document into a new knowledge base.
+
+    The upload is stored first; pages are then parsed, chunked, embedded and
+    written to the vector store incrementally, with progress committed as it
+    goes so clients can poll the job.
+    """
+    __tablename__ = "knowledge_base_ingestion_jobs"
+
+    id = Column(Integer, primary_key=True, index=True)
+    company_id = Column(Integer, ForeignKey("companies.id"), nullable=False, index=True)
+    knowledge_base_id = Column(Integer, ForeignKey("knowledge_bases.id", ondelete="SET NULL"), nullable=True)  # Set on completion
+
+    name = Column(String, nullable=False)
+    description = Column(String, nullable=True)
+    file_name = Column(String, nullable=False)
+    storage_key = Column(String, nullable=False)  # Uploaded source document in minio_bucket
+    embedding_model = Column(String(50), nullable=False, default='nvidia')
+    vector_store_type = Column(String(20), nullable=False, default='chroma')
+
+    status = Column(String(20), nullable=False, default='pending')  # pending, running, completed, failed
+    total_pages = Column(Integer, nullable=True)
+    processed_pages = Column(Integer, nullable=False, default=0)
+    chunk_count = Column(Integer, nullable=False, default=0)  # Chunks written to the vector store
+    error_message = Column(Text, nullable=True)
+
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
+    started_at = Column(DateTime(timezone=True), nullable=True)
+    completed_at = Column(DateTime(timezone=True), nullable=True)
+
+    knowledge_base = relationship("KnowledgeBase")
@@ -1,9 +1,13 @@
-from sqlalchemy import Column, Integer, String, ForeignKey, JSON
+from sqlalchemy import Column, Integer, String, ForeignKey, JSON, Index
 from sqlalchemy.orm import relationship
 from app.core.database import Base
 
 class Memory(Base):
     __tablename__ = "memories"
+    __table_args__ = (
+        # One row per key; memory_service.upsert_memories conflicts on it
+        Index("uq_memories_agent_session_key", "agent_id", "session_id", "key", unique=True),
+    )
 
     id = Column(Integer, primary_key=True, index=True)
     agent_id = Column(Integer, ForeignKey("agents.id"))
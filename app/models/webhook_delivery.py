@@ -0,0 +1,43 @@
+"""
+Webhook Delivery Model
+
+Outbox of outbound webhook callbacks (API channel async responses). Rows are
+written in the same transaction as the work that produced them and delivered
+by the WebhookDeliveryWorker with retries.
+"""
+from sqlalchemy import Column, Integer, BigInteger, String, DateTime, Text, ForeignKey, Index
+from sqlalchemy.sql import func
+from app.core.database import Base
+
+
+class WebhookDelivery(Base):
+    """
+    Statuses:
+    - pending: waiting for ``next_attempt_at``
+    - delivering: claimed by a worker
+    - delivered: the endpoint answered 2xx
+    - failed: permanent error or out of attempts; see ``last_error``
+    """
+    __tablename__ = "webhook_deliveries"
+
+    id = Column(BigInteger, primary_key=True, index=True)
+
+    company_id = Column(Integer, ForeignKey("companies.id"), nullable=False)
+    api_integration_id = Column(Integer, ForeignKey("api_integrations.id", ondelete="CASCADE"), nullable=True)
+    event_type = Column(String(50), nullable=False)
+    url = Column(String, nullable=False)
+    body = Column(Text, nullable=False)  # Serialized JSON exactly as signed and sent
+    signature = Column(String(64), nullable=False)  # HMAC-SHA256 of body, hex
+
+    status = Column(String(20), nullable=False, default="pending", server_default="pending")
+    attempts = Column(Integer, nullable=False, default=0, server_default="0")
+    next_attempt_at = Column(DateTime(timezone=True), nullable=False, server_default=func.now())
+    last_status_code = Column(Integer, nullable=True)
+    last_error = Column(Text, nullable=True)
+
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
+    delivered_at = Column(DateTime(timezone=True), nullable=True)
+
+    __table_args__ = (
+        Index('ix_webhook_deliveries_status_next_attempt', 'status', 'next_attempt_at'),
+    )
@@ -83,7 +83,7 @@ class ApiMessageResponse(BaseModel):
     )
     status: str = Field(
         ...,
-        description="Status: completed, pending, paused_for_input, paused_for_prompt, error"
+        description="Status: accepted (async mode), completed, pending, paused_for_input, paused_for_prompt, error"
     )
     workflow_status: Optional[str] = Field(
         default=None,
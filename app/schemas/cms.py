@@ -44,6 +44,7 @@ class ContentVisibility(str, Enum):
 class ExportFormat(str, Enum):
     JSON = "json"
     CSV = "csv"
+    NDJSON = "ndjson"
     PDF = "pdf"
 
 
@@ -214,6 +215,8 @@ class ContentMediaResponse(ContentMediaBase):
     width: Optional[int] = None
     height: Optional[int] = None
     duration: Optional[int] = None
+    processing_status: Optional[str] = None  # pending, processing, completed, failed
+    thumbnails: Optional[Dict[str, str]] = None  # rendered thumbnail sizes -> S3 key
     usage_count: int = 0
     uploaded_by: Optional[int] = None
     created_at: datetime
@@ -376,6 +379,9 @@ class ContentExportResponse(BaseModel):
     s3_key: Optional[str] = None
     file_size: Optional[int] = None
     item_count: Optional[int] = None
+    total_count: Optional[int] = None
+    processed_count: Optional[int] = None
+    error_message: Optional[str] = None
     requested_by: Optional[int] = None
     completed_at: Optional[datetime] = None
     expires_at: Optional[datetime] = None
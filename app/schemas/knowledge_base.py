@@ -1,4 +1,5 @@
 from pydantic import BaseModel
+from datetime import datetime
 from typing import Optional, Dict, Any
 
 class KnowledgeBaseBase(BaseModel):
@@ -39,6 +40,24 @@ class KnowledgeBase(KnowledgeBaseBase):
     class Config:
         orm_mode = True
 
+class KnowledgeBaseIngestionJob(BaseModel):
+    id: int
+    knowledge_base_id: Optional[int] = None
+    name: str
+    file_name: str
+    vector_store_type: str
+    status: str  # pending, running, completed, failed
+    total_pages: Optional[int] = None
+    processed_pages: int = 0
+    chunk_count: int = 0
+    error_message: Optional[str] = None
+    created_at: Optional[datetime] = None
+    started_at: Optional[datetime] = None
+    completed_at: Optional[datetime] = None
+
+    class Config:
+        orm_mode = True
+
 class KnowledgeBaseQnAGenerate(BaseModel):
     knowledge_base_id: int
     prompt: Optional[str] = "Generate a list of 10 questions and answers based on the following content. Format as Q: ...\nA: ..."
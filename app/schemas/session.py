@@ -1,4 +1,4 @@
-from typing import Optional
+from typing import List, Optional
 from pydantic import BaseModel, Field
 
 class ContactInfo(BaseModel):
@@ -17,6 +17,7 @@ class Session(BaseModel):
     assignee_id: Optional[int] = None
     last_message_timestamp: str
     first_message_content: str
+    last_message_content: Optional[str] = None
     channel: Optional[str] = None
     contact_name: Optional[str] = None
     contact_phone: Optional[str] = None
@@ -28,3 +29,12 @@ class Session(BaseModel):
     class Config:
         populate_by_name = True
         from_attributes = True
+
+class SessionPage(BaseModel):
+    """Keyset-paginated inbox listing"""
+    sessions: List[Session]
+    has_more: bool
+    next_cursor: Optional[str] = Field(
+        default=None,
+        description="Cursor to pass to fetch the next page"
+    )
@@ -10,14 +10,12 @@ from app.services.vault_service import vault_service
 from app.models.agent import Agent
 
 import numpy as np
-import chromadb
 from app.llm_providers import gemini_provider, nvidia_provider, nvidia_api_provider, groq_provider, openai_provider
-from app.services.faiss_vector_database import VectorDatabase
-from app.llm_providers.nvidia_api_provider import NVIDIAEmbeddings
 from app.core.object_storage import s3_client, get_company_chroma_client
 from app.services.prompt_guard_service import scan_user_message, get_safe_system_prompt, prompt_guard
 from app.services import security_log_service
 from app.services import token_usage_service
+from app.services import lexical_index_service
 
 
 def _get_embeddings(agent: Agent, texts: list[str]):
@@ -86,24 +84,31 @@ def _get_rag_context(agent: Agent, user_query: str, knowledge_bases: list, k: in
                 collection = company_chroma_client.get_collection(name=kb.chroma_collection_name)
                 results = collection.query(
                     query_embeddings=[query_embedding.tolist()],
-                    n_results=k
+                    n_results=lexical_index_service.candidate_count(k)
+                )
+                all_retrieved_chunks.extend(
+                    lexical_index_service.fuse_with_lexical(kb, user_query, results['documents'][0], k)
                 )
-                all_retrieved_chunks.extend(results['documents'][0])
 
             elif kb.type == "local" and kb.faiss_index_id:
                 # Query the local FAISS index
+                from app.services.faiss_vector_database import VectorDatabase
+                from app.llm_providers.nvidia_api_provider import NVIDIAEmbeddings
                 embeddings_instance = NVIDIAEmbeddings() # Assuming NVIDIAEmbeddings is the chosen embedding model
                 faiss_db_path = os.path.join(settings.FAISS_INDEX_DIR, str(agent.company_id), kb.faiss_index_id)
                 faiss_db = VectorDatabase(embeddings=embeddings_instance, db_path=faiss_db_path, index_name=kb.faiss_index_id)
                 if faiss_db.load_index():
                     # FAISS similarity search expects a string query, not an embedding
-                    results = faiss_db.similarity_search(user_query, k=k)
-                    all_retrieved_chunks.extend([doc.page_content for doc in results])
+                    results = faiss_db.similarity_search(user_query, k=lexical_index_service.candidate_count(k))
+                    all_retrieved_chunks.extend(
+                        lexical_index_service.fuse_with_lexical(kb, user_query, [doc.page_content for doc in results], k)
+                    )
                 else:
                     print(f"Error loading FAISS index from {faiss_db_path}")
 
             elif kb.type == "remote" and kb.provider == "chroma" and kb.connection_details:
                 # Query a user-provided, remote ChromaDB instance
+                import chromadb
                 client = chromadb.HttpClient(host=kb.connection_details.get("host"), port=kb.connection_details.get("port"))
                 collection = client.get_collection(name=kb.connection_details.get("collection_name"))
                 results = collection.query(
@@ -1,5 +1,7 @@
 
-from sqlalchemy.orm import Session, joinedload
+from sqlalchemy.orm import Session, joinedload, selectinload
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy import select
 from sqlalchemy import or_
 from app.models import agent as models_agent, tool as models_tool, credential as models_credential, knowledge_base as models_knowledge_base
 from app.schemas import agent as schemas_agent
@@ -13,6 +15,18 @@ def get_agent(db: Session, agent_id: int, company_id: int):
         joinedload(models_agent.Agent.credential)  # Eagerly load the credential
     ).filter(models_agent.Agent.id == agent_id, models_agent.Agent.company_id == company_id).first()
 
+async def get_agent_async(db: AsyncSession, agent_id: int, company_id: int):
+    """Async variant of get_agent (relationships loaded eagerly; lazy loads aren't possible on AsyncSession)."""
+    result = await db.execute(
+        select(models_agent.Agent).options(
+            selectinload(models_agent.Agent.tools),
+            selectinload(models_agent.Agent.workflows),
+            selectinload(models_agent.Agent.knowledge_bases),
+            joinedload(models_agent.Agent.credential)
+        ).where(models_agent.Agent.id == agent_id, models_agent.Agent.company_id == company_id)
+    )
+    return result.scalars().first()
+
 def get_agents(db: Session, company_id: int, skip: int = 0, limit: int = 100):
     return db.query(models_agent.Agent).filter(models_agent.Agent.company_id == company_id).offset(skip).limit(limit).all()
 
@@ -4,12 +4,10 @@ API Channel Service
 Handles message processing for the API channel, following the same patterns
 as WhatsApp, Telegram, and other channel handlers.
 """
-import hashlib
-import hmac
-import httpx
+import asyncio
 import logging
 from datetime import datetime, timezone
-from typing import Optional, Dict, Any, List
+from typing import Optional, Dict, Any, List, Set
 
 from sqlalchemy.orm import Session
 
@@ -22,6 +20,8 @@ from app.schemas.api_channel import (
     ApiMessageItem, ApiMessageList
 )
 from app.schemas.chat_message import ChatMessageCreate
+from app.core.config import settings
+from app.core.database import SessionLocal
 from app.services import (
     conversation_session_service,
     chat_service,
@@ -29,7 +29,9 @@ from app.services import (
     workflow_trigger_service,
     agent_service,
     agent_execution_service,
-    contact_service
+    contact_service,
+    inbound_webhook_service,
+    webhook_delivery_service
 )
 from app.services.workflow_execution_service import WorkflowExecutionService
 from app.api.v1.endpoints.websocket_conversations import manager as session_ws_manager
@@ -37,6 +39,9 @@ from app.schemas import chat_message as schemas_chat_message
 
 logger = logging.getLogger(__name__)
 
+# The event loop only keeps weak references to tasks; hold background runs until they finish
+_background_tasks: Set[asyncio.Task] = set()
+
 
 class ApiChannelService:
     """Service for processing API channel messages."""
@@ -59,6 +64,10 @@ class ApiChannelService:
         3. Save user message
         4. Execute workflow or agent
         5. Save and return response
+
+        In async mode, steps 4-5 run in the inbound webhook worker and the
+        result is delivered through the webhook outbox; this returns as soon
+        as the message is stored, with status "accepted".
         """
         # 1. Get or create contact for this external user
         contact = contact_service.get_or_create_contact_for_channel(
@@ -79,7 +88,10 @@ class ApiChannelService:
 
         # 3. Handle restart commands
         if conversation_session_service.is_restart_command(message_data.message):
-            return await self._handle_restart(session, company_id, message_data)
+            response = await self._handle_restart(session, company_id, message_data)
+            if message_data.response_mode == ResponseMode.ASYNC:
+                self._queue_webhook_callback(api_integration, session, response, message_data.external_user_id)
+            return response
 
         # 4. Reopen if resolved
         if session.status == 'resolved':
@@ -120,39 +132,77 @@ class ApiChannelService:
         except Exception as e:
             logger.warning(f"Failed to broadcast to WebSocket: {e}")
 
-        # 7. Check AI enabled
+        # 7. Async mode: acknowledge now and finish off the request path
+        if message_data.response_mode == ResponseMode.ASYNC:
+            return self._queue_message(session, message_data, api_integration, company_id, user_db_message.id)
+
+        return await self._complete_message(session, message_data, api_integration, company_id, user_db_message.id)
+
+    async def _complete_message(
+        self,
+        session: ConversationSession,
+        message_data: ApiMessageSend,
+        api_integration: ApiIntegration,
+        company_id: int,
+        user_message_id: int
+    ) -> ApiMessageResponse:
+        """Run the workflow or agent for a stored user message (steps 4-5)."""
+        # Check AI enabled
         if not session.is_ai_enabled:
             logger.info(f"AI is disabled for session {session.conversation_id}")
             return ApiMessageResponse(
                 session_id=session.conversation_id,
-                message_id=user_db_message.id,
+                message_id=user_message_id,
                 status="pending",
                 response_message=None,
                 metadata=message_data.metadata,
                 created_at=datetime.now(timezone.utc)
             )
 
-        # 8. Execute workflow or agent
-        response = await self._execute_response(
+        # Execute workflow or agent
+        return await self._execute_response(
             session=session,
             message_text=message_data.message,
             company_id=company_id,
             api_integration=api_integration,
             message_data=message_data,
-            user_message_id=user_db_message.id
+            user_message_id=user_message_id
         )
 
-        # 9. Handle async response mode (webhook callback)
-        if message_data.response_mode == ResponseMode.ASYNC:
-            if api_integration.webhook_enabled and api_integration.webhook_url:
-                await self._send_webhook_callback(
-                    api_integration=api_integration,
-                    session=session,
-                    response=response,
-                    external_user_id=message_data.external_user_id
-                )
+    def _queue_message(
+        self,
+        session: ConversationSession,
+        message_data: ApiMessageSend,
+        api_integration: ApiIntegration,
+        company_id: int,
+        user_message_id: int
+    ) -> ApiMessageResponse:
+        """Hand a stored user message to the background worker and acknowledge it."""
+        event = {
+            "provider_message_id": f"message-{user_message_id}",
+            # Messages of one conversation are processed in order
+            "conversation_key": session.conversation_id,
+            "payload": {
+                "company_id": company_id,
+                "conversation_id": session.conversation_id,
+                "user_message_id": user_message_id,
+                "message": message_data.model_dump(mode="json"),
+            },
+        }
+        if settings.WEBHOOK_QUEUE_ENABLED:
+            inbound_webhook_service.enqueue_events(self.db, "api", [event], integration_id=api_integration.id)
+        else:
+            task = asyncio.create_task(_process_in_background(event["payload"], api_integration.id))
+            _background_tasks.add(task)
+            task.add_done_callback(_background_tasks.discard)
 
-        return response
+        return ApiMessageResponse(
+            session_id=session.conversation_id,
+            message_id=user_message_id,
+            status="accepted",
+            metadata=message_data.metadata,
+            created_at=datetime.now(timezone.utc)
+        )
 
     def _get_or_create_session(
         self,
@@ -658,14 +708,17 @@ class ApiChannelService:
             created_at=datetime.now(timezone.utc)
         )
 
-    async def _send_webhook_callback(
+    def _queue_webhook_callback(
         self,
         api_integration: ApiIntegration,
         session: ConversationSession,
         response: ApiMessageResponse,
         external_user_id: str
     ):
-        """Send async response to webhook URL."""
+        """Add the response to the webhook outbox (delivered with retries by the delivery worker)."""
+        if not (api_integration.webhook_enabled and api_integration.webhook_url):
+            return None
+
         payload = {
             "event_type": "message_response",
             "session_id": session.conversation_id,
@@ -679,30 +732,65 @@ class ApiChannelService:
             "timestamp": datetime.now(timezone.utc).isoformat(),
             "metadata": response.metadata
         }
+        return webhook_delivery_service.enqueue_delivery(
+            self.db,
+            company_id=api_integration.company_id,
+            url=api_integration.webhook_url,
+            secret=api_integration.webhook_secret,
+            event_type="message_response",
+            payload=payload,
+            api_integration_id=api_integration.id
+        )
 
-        # Generate HMAC signature
-        payload_json = str(payload)
-        signature = hmac.new(
-            (api_integration.webhook_secret or "").encode(),
-            payload_json.encode(),
-            hashlib.sha256
-        ).hexdigest()
-
-        payload["signature"] = signature
 
-        try:
-            async with httpx.AsyncClient(timeout=30.0) as client:
-                await client.post(
-                    api_integration.webhook_url,
-                    json=payload,
-                    headers={
-                        "Content-Type": "application/json",
-                        "X-Webhook-Signature": signature
-                    }
-                )
-                logger.info(f"Webhook callback sent to {api_integration.webhook_url}")
-        except Exception as e:
-            logger.error(f"Webhook callback failed: {e}")
+async def process_queued_message(payload: dict, db: Session, integration_id: Optional[int]):
+    """
+    Inbound queue handler for async API messages: run the workflow or agent
+    for a message accepted earlier and queue the webhook callback.
+    """
+    api_integration = db.query(ApiIntegration).filter(ApiIntegration.id == integration_id).first()
+    session = conversation_session_service.get_session(db, payload["conversation_id"])
+    if api_integration is None or session is None:
+        logger.warning(f"[API] Dropping queued message {payload.get('user_message_id')}: integration or session no longer exists")
+        return
+
+    message_data = ApiMessageSend.model_validate(payload["message"])
+    service = ApiChannelService(db)
+    try:
+        response = await service._complete_message(
+            session=session,
+            message_data=message_data,
+            api_integration=api_integration,
+            company_id=payload["company_id"],
+            user_message_id=payload["user_message_id"]
+        )
+    except Exception:
+        db.rollback()
+        # Tell the integrator instead of leaving them waiting for a callback
+        service._queue_webhook_callback(api_integration, session, ApiMessageResponse(
+            session_id=session.conversation_id,
+            message_id=payload["user_message_id"],
+            response_message="The message could not be processed.",
+            response_type="error",
+            status="error",
+            metadata=message_data.metadata,
+            created_at=datetime.now(timezone.utc)
+        ), message_data.external_user_id)
+        raise
+
+    if response.status != "pending":  # AI disabled: a human answers, nothing to call back
+        service._queue_webhook_callback(api_integration, session, response, message_data.external_user_id)
+
+
+async def _process_in_background(payload: dict, integration_id: int):
+    # Used when the inbound queue is disabled: same handler, no persistence
+    db = SessionLocal()
+    try:
+        await process_queued_message(payload, db, integration_id)
+    except Exception as e:
+        logger.error(f"[API] Background processing of message {payload.get('user_message_id')} failed: {e}")
+    finally:
+        db.close()
 
 
 # ============ Helper Functions ============
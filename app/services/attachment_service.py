@@ -0,0 +1,340 @@
+"""
+Attachment Service
+Stores chat attachments in object storage without base64 round-trips.
+
+Attachments reach the backend in one of these forms:
+- raw bytes (``data``) from channel media downloads (WhatsApp, Messenger, Instagram)
+- chunked binary WebSocket frames, streamed to MinIO as a multipart upload
+  one part at a time (see StreamingAttachmentUpload)
+- a pre-signed PUT URL the client uploads to directly; only the object key
+  (``storage_key``) travels over the socket afterwards
+- legacy base64 ``file_data`` from older widgets, decoded exactly once
+
+Blocking S3 calls always run in a worker thread, never on the event loop.
+"""
+import asyncio
+import base64
+import binascii
+import io
+import logging
+import uuid
+from typing import Any, Dict, List, Optional, Set
+
+from boto3.s3.transfer import TransferConfig
+
+from app.core.config import settings
+from app.core.object_storage import s3_client, BUCKET_NAME
+
+logger = logging.getLogger(__name__)
+
+ATTACHMENT_PREFIX = "attachments/"
+
+# S3 rejects non-final multipart parts smaller than 5 MiB
+MIN_PART_BYTES = 5 * 1024 * 1024
+
+
+def _part_size() -> int:
+    return max(settings.ATTACHMENT_UPLOAD_PART_BYTES, MIN_PART_BYTES)
+
+
+_transfer_config = TransferConfig(
+    multipart_threshold=_part_size(),
+    multipart_chunksize=_part_size(),
+    use_threads=False,  # Already running in a worker thread
+)
+
+
+class AttachmentTooLargeError(ValueError):
+    pass
+
+
+# ==================== Keys & URLs ====================
+
+def new_attachment_key(file_name: str) -> str:
+    safe_filename = (file_name or 'file').replace(' ', '_').replace('/', '_')
+    return f"{ATTACHMENT_PREFIX}{uuid.uuid4()}_{safe_filename}"
+
+
+def is_attachment_key(key: Any) -> bool:
+    return isinstance(key, str) and key.startswith(ATTACHMENT_PREFIX) and '..' not in key
+
+
+def attachment_url(key: str) -> str:
+    """Public URL of a stored attachment (same format the chat UI already renders)."""
+    scheme = 'https' if settings.minio_secure else 'http'
+    return f"{scheme}://{settings.minio_endpoint}/{BUCKET_NAME}/{key}"
+
+
+# ==================== Uploads ====================
+
+def upload_attachment_bytes(data: bytes, file_name: str, file_type: str) -> Optional[str]:
+    """
+    Upload raw bytes (multipart above the part size) without copying them.
+
+    Returns:
+        The object key, or None if the upload failed
+    """
+    key = new_attachment_key(file_name)
+    try:
+        # BytesIO shares the bytes buffer until written to, so no extra copy is made
+        s3_client.upload_fileobj(
+            io.BytesIO(data),
+            BUCKET_NAME,
+            key,
+            ExtraArgs={"ContentType": file_type or 'application/octet-stream'},
+            Config=_transfer_config,
+        )
+        logger.info(f"[Attachments] Uploaded {file_name} ({len(data)} bytes) to {key}")
+        return key
+    except Exception as e:
+        logger.error(f"[Attachments] Failed to upload {file_name}: {e}")
+        return None
+
+
+async def store_attachment_bytes(data: bytes, file_name: str, file_type: str) -> Optional[str]:
+    """Upload raw bytes off the event loop. Returns the object key or None."""
+    return await asyncio.to_thread(upload_attachment_bytes, data, file_name, file_type)
+
+
+def read_attachment(key: str) -> bytes:
+    return s3_client.get_object(Bucket=BUCKET_NAME, Key=key)["Body"].read()
+
+
+async def load_attachment_bytes(key: str) -> bytes:
+    return await asyncio.to_thread(read_attachment, key)
+
+
+def create_presigned_upload(file_name: str, file_type: str) -> Dict[str, Any]:
+    """
+    Pre-signed PUT URL for a direct client upload to object storage.
+
+    The client must send the same Content-Type header it declared here, then
+    reference the upload by ``storage_key`` in its chat message.
+
+    Returns:
+        Dict with ``upload_url``, ``storage_key``, ``file_url`` and ``expires_in``
+    """
+    key = new_attachment_key(file_name)
+    content_type = file_type or 'application/octet-stream'
+    upload_url = s3_client.generate_presigned_url(
+        'put_object',
+        Params={"Bucket": BUCKET_NAME, "Key": key, "ContentType": content_type},
+        ExpiresIn=settings.ATTACHMENT_PRESIGN_EXPIRY,
+    )
+    return {
+        "upload_url": upload_url,
+        "storage_key": key,
+        "file_url": attachment_url(key),
+        "expires_in": settings.ATTACHMENT_PRESIGN_EXPIRY,
+    }
+
+
+def get_attachment_size(key: str) -> Optional[int]:
+    """Size of a stored attachment, or None when the object doesn't exist."""
+    try:
+        return s3_client.head_object(Bucket=BUCKET_NAME, Key=key)["ContentLength"]
+    except Exception:
+        return None
+
+
+class StreamingAttachmentUpload:
+    """
+    Streams an attachment received in chunks (e.g. binary WebSocket frames)
+    to object storage.
+
+    Chunks are buffered up to one multipart part; each full part is uploaded
+    before more data is accepted, so at most one part is held in memory.
+    Files smaller than a part are stored with a single PUT on completion.
+    """
+
+    def __init__(self, file_name: str, file_type: str, max_bytes: Optional[int] = None):
+        self.file_name = file_name or 'file'
+        self.file_type = file_type or 'application/octet-stream'
+        self.max_bytes = max_bytes if max_bytes is not None else settings.ATTACHMENT_MAX_BYTES
+        self.key = new_attachment_key(self.file_name)
+        self.size = 0
+        self._buffer = bytearray()
+        self._upload_id: Optional[str] = None
+        self._parts: List[Dict[str, Any]] = []
+
+    async def write(self, chunk: bytes):
+        self.size += len(chunk)
+        if self.size > self.max_bytes:
+            await self.abort()
+            raise AttachmentTooLargeError(f"Attachment exceeds {self.max_bytes} bytes")
+
+        self._buffer += chunk
+        if len(self._buffer) >= _part_size():
+            await self._flush_part()
+
+    async def _flush_part(self):
+        # Hand the buffer over instead of copying it
+        body, self._buffer = self._buffer, bytearray()
+        if self._upload_id is None:
+            response = await asyncio.to_thread(
+                s3_client.create_multipart_upload,
+                Bucket=BUCKET_NAME, Key=self.key, ContentType=self.file_type
+            )
+            self._upload_id = response["UploadId"]
+
+        part_number = len(self._parts) + 1
+        response = await asyncio.to_thread(
+            s3_client.upload_part,
+            Bucket=BUCKET_NAME, Key=self.key, UploadId=self._upload_id,
+            PartNumber=part_number, Body=body
+        )
+        self._parts.append({"ETag": response["ETag"], "PartNumber": part_number})
+
+    async def complete(self) -> Dict[str, Any]:
+        """
+        Finish the upload.
+
+        Returns:
+            Attachment metadata with ``storage_key`` and ``file_url``
+        """
+        if self._upload_id is None:
+            body, self._buffer = self._buffer, bytearray()
+            await asyncio.to_thread(
+                s3_client.put_object,
+                Bucket=BUCKET_NAME, Key=self.key, Body=body, ContentType=self.file_type
+            )
+        else:
+            if self._buffer:
+                await self._flush_part()
+            await asyncio.to_thread(
+                s3_client.complete_multipart_upload,
+                Bucket=BUCKET_NAME, Key=self.key, UploadId=self._upload_id,
+                MultipartUpload={"Parts": self._parts}
+            )
+
+        logger.info(f"[Attachments] Streamed {self.file_name} ({self.size} bytes) to {self.key}")
+        return {
+            "file_name": self.file_name,
+            "file_type": self.file_type,
+            "file_size": self.size,
+            "storage_key": self.key,
+            "file_url": attachment_url(self.key),
+        }
+
+    async def abort(self):
+        self._buffer = bytearray()
+        if self._upload_id is None:
+            return
+        upload_id, self._upload_id = self._upload_id, None
+        try:
+            await asyncio.to_thread(
+                s3_client.abort_multipart_upload,
+                Bucket=BUCKET_NAME, Key=self.key, UploadId=upload_id
+            )
+        except Exception as e:
+            logger.warning(f"[Attachments] Failed to abort upload of {self.key}: {e}")
+
+
+# ==================== Message Attachments ====================
+
+def _decode_base64(file_data: str) -> Optional[bytes]:
+    try:
+        return base64.b64decode(file_data)
+    except (binascii.Error, ValueError, TypeError):
+        return None
+
+
+async def _store_attachment(att: Dict[str, Any], issued_keys: Optional[Set[str]]):
+    file_name = att.get('file_name', 'file')
+    file_type = att.get('file_type', 'application/octet-stream')
+
+    if att.get('storage_key'):
+        key = att['storage_key']
+        if not is_attachment_key(key) or (issued_keys is not None and key not in issued_keys):
+            logger.warning(f"[Attachments] Ignoring unknown storage key for {file_name}")
+            att.pop('storage_key', None)
+            att.pop('file_url', None)
+            return
+        # Direct uploads bypass our size limit, so check what actually landed
+        size = await asyncio.to_thread(get_attachment_size, key)
+        if size is None or size > settings.ATTACHMENT_MAX_BYTES:
+            logger.warning(f"[Attachments] Ignoring missing or oversized upload {key}")
+            att.pop('storage_key', None)
+            att.pop('file_url', None)
+            return
+        att['file_size'] = size
+        # Never trust a client-supplied URL; derive it from the key
+        att['file_url'] = attachment_url(key)
+        return
+
+    data = att.get('data')
+    if data is None and att.get('file_data'):
+        data = await asyncio.to_thread(_decode_base64, att['file_data'])
+        if data is None:
+            logger.warning(f"[Attachments] Invalid base64 data for {file_name}")
+            return
+    if data is None:
+        return
+
+    key = await store_attachment_bytes(data, file_name, file_type)
+    if key:
+        att['storage_key'] = key
+        att['file_url'] = attachment_url(key)
+        att.setdefault('file_size', len(data))
+        # The stored object is now the only copy kept around
+        att.pop('data', None)
+        att.pop('file_data', None)
+    elif 'data' in att:
+        # Keep the attachment usable (and JSON-serializable) when storage is down
+        att['file_data'] = base64.b64encode(att.pop('data')).decode('utf-8')
+
+
+async def ingest_attachments(attachments: List[Dict[str, Any]], issued_keys: Optional[Set[str]] = None) -> str:
+    """
+    Store message attachments and build the message text.
+
+    Attachments with raw ``data`` or base64 ``file_data`` are uploaded (the
+    payload is dropped once stored); attachments already uploaded are
+    referenced by ``storage_key``. Uploads run concurrently off the loop.
+
+    Args:
+        attachments: Attachment dicts, updated in place with ``file_url``/``storage_key``
+        issued_keys: When given, only these storage keys are accepted (keys
+            handed out to this connection)
+
+    Returns:
+        Message text like "📎 filename.jpg" or "📍 Location (lat, lng)"
+    """
+    await asyncio.gather(*(
+        _store_attachment(att, issued_keys) for att in attachments if not att.get('location')
+    ))
+
+    parts = []
+    for att in attachments:
+        if att.get('location'):
+            loc = att['location']
+            lat = loc.get('latitude', 0)
+            lng = loc.get('longitude', 0)
+            parts.append(f"📍 Location ({lat:.4f}, {lng:.4f})")
+        elif att.get('file_url') or att.get('file_data'):
+            parts.append(f"📎 {att.get('file_name', 'file')}")
+
+    return '\n'.join(parts) if parts else ""
+
+
+async def image_data_url(attachment: Dict[str, Any]) -> Optional[str]:
+    """
+    ``data:`` URL of an image attachment for vision models, loading the bytes
+    from storage when the payload was dropped after upload.
+    """
+    file_type = attachment.get('file_type', '')
+    if not file_type.startswith('image/'):
+        return None
+
+    if attachment.get('file_data'):
+        encoded = attachment['file_data']
+    elif is_attachment_key(attachment.get('storage_key')):
+        try:
+            data = await load_attachment_bytes(attachment['storage_key'])
+        except Exception as e:
+            logger.error(f"[Attachments] Failed to load {attachment['storage_key']}: {e}")
+            return None
+        encoded = base64.b64encode(data).decode('utf-8')
+    else:
+        return None
+    return f"data:{file_type};base64,{encoded}"
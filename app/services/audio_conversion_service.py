@@ -7,11 +7,17 @@ Handles conversion between various audio formats:
 - OpenAI Whisper: 16kHz PCM
 - OpenAI TTS: 24kHz PCM
 """
+import asyncio
 import audioop
 import io
 import base64
+import time
 import wave
 import logging
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from typing import Callable, List
+
+from app.core.config import settings
 
 logger = logging.getLogger(__name__)
 
@@ -285,3 +291,218 @@ class AudioConversionService:
             chunk = audio_bytes[i:i + chunk_size]
             chunks.append(base64.b64encode(chunk).decode('utf-8'))
         return chunks
+
+
+# ==================== Off-loop Transcoding ====================
+#
+# audioop conversions, WAV packing and base64 encoding are CPU work. Running
+# them inside the websocket handlers adds event-loop lag to every other socket
+# on the worker, so the voice endpoints await them through a shared executor.
+# Every function handed to the executor is module-level and returns plain
+# bytes/str so thread and process pools behave the same. The batch helpers
+# thread ratecv state across chunks so batched resampling has no seams
+# between chunks.
+
+def _b64_chunks(audio_bytes: bytes, chunk_bytes: int) -> List[str]:
+    return [
+        base64.b64encode(audio_bytes[i:i + chunk_bytes]).decode('utf-8')
+        for i in range(0, len(audio_bytes), chunk_bytes)
+    ]
+
+
+def mulaw_batch_to_pcm(chunks: List[bytes], to_rate: int = 8000) -> List[bytes]:
+    """Convert a batch of mulaw 8kHz chunks to PCM 16-bit at ``to_rate``."""
+    state = None
+    converted = []
+    for chunk in chunks:
+        pcm = audioop.ulaw2lin(chunk, 2)
+        if to_rate != 8000:
+            pcm, state = audioop.ratecv(pcm, 2, 1, 8000, to_rate, state)
+        converted.append(pcm)
+    return converted
+
+
+def pcm_batch_to_mulaw_b64(chunks: List[bytes], from_rate: int = 24000) -> List[str]:
+    """Convert a batch of PCM chunks to base64 mulaw 8kHz payloads, one per input chunk."""
+    state = None
+    payloads = []
+    for chunk in chunks:
+        pcm_8k = chunk
+        if from_rate != 8000:
+            pcm_8k, state = audioop.ratecv(chunk, 2, 1, from_rate, 8000, state)
+        payloads.append(base64.b64encode(audioop.lin2ulaw(pcm_8k, 2)).decode('utf-8'))
+    return payloads
+
+
+def pcm_batch_to_l16_b64(chunks: List[bytes], from_rate: int = 24000, to_rate: int = 8000) -> List[str]:
+    """Convert a batch of PCM chunks to base64 L16 payloads at ``to_rate``, one per input chunk."""
+    state = None
+    payloads = []
+    for chunk in chunks:
+        l16 = chunk
+        if from_rate != to_rate:
+            l16, state = audioop.ratecv(chunk, 2, 1, from_rate, to_rate, state)
+        payloads.append(base64.b64encode(l16).decode('utf-8'))
+    return payloads
+
+
+def mulaw_to_pcm_bytes(mulaw_bytes: bytes) -> bytes:
+    """Module-level mulaw 8kHz to PCM 16-bit conversion."""
+    return audioop.ulaw2lin(mulaw_bytes, 2)
+
+
+def resample_bytes(audio_bytes: bytes, from_rate: int, to_rate: int) -> bytes:
+    """Module-level PCM 16-bit mono resample."""
+    if from_rate == to_rate:
+        return audio_bytes
+    converted, _ = audioop.ratecv(audio_bytes, 2, 1, from_rate, to_rate, None)
+    return converted
+
+
+def mulaw_8k_to_whisper_pcm(mulaw_bytes: bytes) -> bytes:
+    """Accumulated Twilio mulaw 8kHz audio to Whisper-ready PCM 16kHz."""
+    return resample_bytes(audioop.ulaw2lin(mulaw_bytes, 2), 8000, 16000)
+
+
+def l16_to_whisper_pcm(l16_bytes: bytes, sample_rate: int = 8000) -> bytes:
+    """Accumulated FreeSWITCH L16 audio to Whisper-ready PCM 16kHz."""
+    return resample_bytes(l16_bytes, sample_rate, 16000)
+
+
+def pcm_to_wav_bytes(pcm_bytes: bytes, sample_rate: int = 16000) -> bytes:
+    """Pack PCM 16-bit mono audio into WAV file bytes."""
+    buffer = io.BytesIO()
+    with wave.open(buffer, 'wb') as wav:
+        wav.setnchannels(1)
+        wav.setsampwidth(2)  # 16-bit
+        wav.setframerate(sample_rate)
+        wav.writeframes(pcm_bytes)
+    return buffer.getvalue()
+
+
+def pcm_to_mulaw_b64_chunks(pcm_bytes: bytes, from_rate: int = 24000, chunk_bytes: int = 640) -> List[str]:
+    """Convert PCM to mulaw 8kHz and split it into base64 payloads of ``chunk_bytes``."""
+    pcm_8k = resample_bytes(pcm_bytes, from_rate, 8000)
+    return _b64_chunks(audioop.lin2ulaw(pcm_8k, 2), chunk_bytes)
+
+
+def pcm_to_l16_b64_chunks(pcm_bytes: bytes, from_rate: int = 24000, to_rate: int = 8000, chunk_bytes: int = 640) -> List[str]:
+    """Resample PCM to L16 at ``to_rate`` and split it into base64 payloads of ``chunk_bytes``."""
+    return _b64_chunks(resample_bytes(pcm_bytes, from_rate, to_rate), chunk_bytes)
+
+
+class AudioTranscodingPool:
+    """
+    Executor-backed async facade over AudioConversionService.
+
+    Payloads smaller than ``inline_bytes`` are converted inline, since handing
+    a 20ms frame to the executor costs more than converting it.
+    """
+
+    def __init__(self, max_workers: int = 4, use_processes: bool = False, inline_bytes: int = 2048):
+        self.max_workers = max_workers
+        self.use_processes = use_processes
+        self.inline_bytes = inline_bytes
+        self._executor = None
+        self.offloaded_jobs = 0
+        self.inline_jobs = 0
+        self.total_offload_seconds = 0.0
+
+    def _get_executor(self):
+        if self._executor is None:
+            if self.use_processes:
+                self._executor = ProcessPoolExecutor(max_workers=self.max_workers)
+            else:
+                self._executor = ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix="audio-transcode")
+        return self._executor
+
+    async def run(self, func: Callable, *args, size_hint: int = None):
+        """
+        Run a conversion function off the event loop.
+
+        Args:
+            func: Module-level conversion function returning bytes or str
+                (must be picklable for the process pool)
+            *args: Arguments for ``func``
+            size_hint: Payload size in bytes; defaults to the first argument's length
+        """
+        if size_hint is None:
+            first = args[0] if args else b""
+            if isinstance(first, (list, tuple)):
+                size_hint = sum(len(item) for item in first)
+            else:
+                size_hint = len(first) if hasattr(first, "__len__") else 0
+
+        if size_hint < self.inline_bytes:
+            self.inline_jobs += 1
+            return func(*args)
+
+        started = time.perf_counter()
+        loop = asyncio.get_running_loop()
+        try:
+            return await loop.run_in_executor(self._get_executor(), func, *args)
+        finally:
+            self.offloaded_jobs += 1
+            self.total_offload_seconds += time.perf_counter() - started
+
+    # --- Single conversions ---
+
+    async def mulaw_to_pcm(self, mulaw_bytes: bytes) -> bytes:
+        return await self.run(mulaw_to_pcm_bytes, mulaw_bytes)
+
+    async def resample(self, audio_bytes: bytes, from_rate: int, to_rate: int) -> bytes:
+        if from_rate == to_rate:
+            return audio_bytes
+        return await self.run(resample_bytes, audio_bytes, from_rate, to_rate)
+
+    async def twilio_buffer_to_whisper(self, audio_buffer: bytearray) -> bytes:
+        return await self.run(mulaw_8k_to_whisper_pcm, bytes(audio_buffer))
+
+    async def freeswitch_buffer_to_whisper(self, audio_buffer: bytearray, sample_rate: int = 8000) -> bytes:
+        return await self.run(l16_to_whisper_pcm, bytes(audio_buffer), sample_rate)
+
+    async def create_wav_bytes(self, pcm_bytes: bytes, sample_rate: int = 16000) -> bytes:
+        return await self.run(pcm_to_wav_bytes, pcm_bytes, sample_rate)
+
+    # --- Batched conversions ---
+
+    async def mulaw_batch_to_pcm(self, chunks: List[bytes], to_rate: int = 8000) -> List[bytes]:
+        return await self.run(mulaw_batch_to_pcm, chunks, to_rate)
+
+    async def pcm_batch_to_mulaw_b64(self, chunks: List[bytes], from_rate: int = 24000) -> List[str]:
+        return await self.run(pcm_batch_to_mulaw_b64, chunks, from_rate)
+
+    async def pcm_batch_to_l16_b64(self, chunks: List[bytes], from_rate: int = 24000, to_rate: int = 8000) -> List[str]:
+        return await self.run(pcm_batch_to_l16_b64, chunks, from_rate, to_rate)
+
+    async def pcm_to_twilio_chunks(self, pcm_bytes: bytes, from_rate: int = 24000, chunk_bytes: int = 640) -> List[str]:
+        return await self.run(pcm_to_mulaw_b64_chunks, pcm_bytes, from_rate, chunk_bytes)
+
+    async def pcm_to_freeswitch_chunks(self, pcm_bytes: bytes, from_rate: int = 24000, to_rate: int = 8000, chunk_bytes: int = 640) -> List[str]:
+        return await self.run(pcm_to_l16_b64_chunks, pcm_bytes, from_rate, to_rate, chunk_bytes)
+
+    async def encode_b64_chunks(self, audio_bytes: bytes, chunk_bytes: int) -> List[str]:
+        """Split already-encoded audio into base64 payloads of ``chunk_bytes``."""
+        return await self.run(_b64_chunks, audio_bytes, chunk_bytes)
+
+    def stats(self) -> dict:
+        return {
+            "executor": "process" if self.use_processes else "thread",
+            "max_workers": self.max_workers,
+            "offloaded_jobs": self.offloaded_jobs,
+            "inline_jobs": self.inline_jobs,
+            "avg_offload_ms": round(self.total_offload_seconds * 1000 / self.offloaded_jobs, 3) if self.offloaded_jobs else 0.0,
+        }
+
+    def shutdown(self):
+        if self._executor is not None:
+            self._executor.shutdown(wait=False)
+            self._executor = None
+
+
+# Global instance shared by the voice endpoints
+audio_transcoder = AudioTranscodingPool(
+    max_workers=settings.AUDIO_TRANSCODE_WORKERS,
+    use_processes=settings.AUDIO_TRANSCODE_USE_PROCESSES,
+    inline_bytes=settings.AUDIO_TRANSCODE_INLINE_BYTES,
+)
@@ -1,5 +1,8 @@
 from sqlalchemy.orm import Session
-from sqlalchemy import func, desc, or_
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy import func, desc, or_, select, tuple_, update
+import base64
+import datetime
 from app.models import chat_message as models_chat_message, conversation_session as models_conversation_session, contact as models_contact
 from app.schemas import chat_message as schemas_chat_message
 from app.services import contact_service
@@ -24,6 +27,149 @@ def get_sessions_with_details(db: Session, company_id: int, agent_id: int = None
     return sessions
 
 
+CLOSED_SESSION_STATUSES = ('resolved', 'archived')
+
+
+def encode_session_cursor(updated_at: datetime.datetime, session_pk: int) -> str:
+    """Opaque keyset cursor for the inbox listing."""
+    raw = f"{updated_at.isoformat()}|{session_pk}"
+    return base64.urlsafe_b64encode(raw.encode()).decode()
+
+
+def decode_session_cursor(cursor: str):
+    """
+    Decode a cursor produced by ``encode_session_cursor``.
+
+    Raises:
+        ValueError: If the cursor is malformed
+    """
+    raw = base64.urlsafe_b64decode(cursor.encode()).decode()
+    updated_at, session_pk = raw.rsplit("|", 1)
+    return datetime.datetime.fromisoformat(updated_at), int(session_pk)
+
+
+def list_inbox_sessions(
+    db: Session,
+    company_id: int,
+    limit: int = None,
+    cursor: str = None,
+    status_filter: str = None,
+    assignee_id: int = None,
+    unassigned: bool = False,
+    channel: str = None,
+    priority: int = None,
+):
+    """
+    Inbox rows for a company, newest activity first, in a single query.
+
+    Only the columns the inbox renders are selected; the contact is joined and
+    the first and last message texts come from correlated subqueries served by
+    the (session_id, timestamp) index. Pages are keyed on (updated_at, id).
+
+    Args:
+        db: Database session
+        company_id: Company ID
+        limit: Page size (None returns every matching row)
+        cursor: Cursor returned as ``next_cursor`` by the previous page
+        status_filter: 'open', 'resolved' or an exact status
+        assignee_id: Only sessions assigned to this user
+        unassigned: Only sessions without an assignee
+        channel: Only sessions from this channel
+        priority: Only sessions with this priority
+
+    Returns:
+        Tuple of (rows, next_cursor); next_cursor is None on the last page
+    """
+    ConversationSession = models_conversation_session.ConversationSession
+    ChatMessage = models_chat_message.ChatMessage
+    Contact = models_contact.Contact
+
+    def message_text(order):
+        return select(ChatMessage.message).where(
+            ChatMessage.session_id == ConversationSession.id,
+            ChatMessage.company_id == company_id
+        ).order_by(order).limit(1).correlate(ConversationSession).scalar_subquery()
+
+    query = db.query(
+        ConversationSession.id,
+        ConversationSession.conversation_id,
+        ConversationSession.status,
+        ConversationSession.assignee_id,
+        ConversationSession.updated_at,
+        ConversationSession.channel,
+        ConversationSession.priority,
+        ConversationSession.is_client_connected,
+        ConversationSession.is_ai_enabled,
+        Contact.id.label("contact_id"),
+        Contact.name.label("contact_name"),
+        Contact.email.label("contact_email"),
+        Contact.phone_number.label("contact_phone"),
+        message_text(ChatMessage.timestamp.asc()).label("first_message"),
+        message_text(ChatMessage.timestamp.desc()).label("last_message"),
+    ).outerjoin(
+        Contact, Contact.id == ConversationSession.contact_id
+    ).filter(
+        ConversationSession.company_id == company_id
+    )
+
+    if status_filter == 'open':
+        query = query.filter(~ConversationSession.status.in_(CLOSED_SESSION_STATUSES))
+    elif status_filter == 'resolved':
+        query = query.filter(ConversationSession.status.in_(CLOSED_SESSION_STATUSES))
+    elif status_filter:
+        query = query.filter(ConversationSession.status == status_filter)
+    if assignee_id is not None:
+        query = query.filter(ConversationSession.assignee_id == assignee_id)
+    elif unassigned:
+        query = query.filter(ConversationSession.assignee_id.is_(None))
+    if channel:
+        query = query.filter(ConversationSession.channel == channel)
+    if priority is not None:
+        query = query.filter(ConversationSession.priority == priority)
+
+    if cursor:
+        cursor_updated_at, cursor_pk = decode_session_cursor(cursor)
+        query = query.filter(
+            tuple_(ConversationSession.updated_at, ConversationSession.id) < tuple_(cursor_updated_at, cursor_pk)
+        )
+
+    query = query.order_by(desc(ConversationSession.updated_at), desc(ConversationSession.id))
+    if limit is None:
+        return query.all(), None
+
+    rows = query.limit(limit + 1).all()  # One extra row tells us whether there is a next page
+    if len(rows) <= limit:
+        return rows, None
+    rows = rows[:limit]
+    return rows, encode_session_cursor(rows[-1].updated_at, rows[-1].id)
+
+
+def sync_client_connection_flags(db: Session, rows, connection_status) -> dict:
+    """
+    Reconcile ``is_client_connected`` of listed sessions with the real-time
+    status and persist any differences with one UPDATE per value.
+
+    Returns:
+        Mapping of conversation_id to the real-time connection status
+    """
+    realtime = {row.conversation_id: connection_status(row.conversation_id) for row in rows}
+    stale = {True: [], False: []}
+    for row in rows:
+        if realtime[row.conversation_id] != row.is_client_connected:
+            stale[realtime[row.conversation_id]].append(row.id)
+
+    for connected, session_pks in stale.items():
+        if session_pks:
+            db.execute(
+                update(models_conversation_session.ConversationSession)
+                .where(models_conversation_session.ConversationSession.id.in_(session_pks))
+                .values(is_client_connected=connected)
+            )
+    if stale[True] or stale[False]:
+        db.commit()
+    return realtime
+
+
 def get_session_details(db: Session, company_id: int, agent_id: int = None, broadcast_session_id: str = None,  status: str = None):
     """
     Gets session details by conversation_id for a company.
@@ -67,59 +213,82 @@ def get_first_message_for_session(db: Session, session_id: str, company_id: int)
         models_chat_message.ChatMessage.company_id == company_id
     ).order_by(models_chat_message.ChatMessage.timestamp).first()
 
-def create_chat_message(db: Session, message: schemas_chat_message.ChatMessageCreate, agent_id: int, session_id: str, company_id: int, sender: str, assignee_id: int = None, attachments: list = None, options: list = None):
-
-    # Get the session to retrieve the contact_id (if available)
-    session = db.query(models_conversation_session.ConversationSession).filter(
-        models_conversation_session.ConversationSession.conversation_id == session_id,
-        models_conversation_session.ConversationSession.company_id == company_id
-    ).first()
-
-    if not session:
-        raise ValueError(f"Session {session_id} not found.")
-
-    # issue = None
-    # if sender == 'user':
-    #     issue = tag_issue(message.message)
-
-    # Clean attachments for storage (remove base64 file_data, keep only metadata)
-    cleaned_attachments = None
-    if attachments:
-        cleaned_attachments = []
-        for att in attachments:
-            clean_att = {
-                'file_name': att.get('file_name'),
-                'file_type': att.get('file_type'),
-                'file_size': att.get('file_size'),
-            }
-            # Include file_url if available (uploaded to S3)
-            if att.get('file_url'):
-                clean_att['file_url'] = att['file_url']
-            # Include location data if present
-            if att.get('location'):
-                clean_att['location'] = att['location']
-            cleaned_attachments.append(clean_att)
+def _clean_attachments(attachments: list):
+    """Attachment metadata for storage (drops file payloads such as base64 file_data)."""
+    if not attachments:
+        return None
 
+    cleaned_attachments = []
+    for att in attachments:
+        clean_att = {
+            'file_name': att.get('file_name'),
+            'file_type': att.get('file_type'),
+            'file_size': att.get('file_size'),
+        }
+        # Include file_url if available (uploaded to S3)
+        if att.get('file_url'):
+            clean_att['file_url'] = att['file_url']
+        # Include location data if present
+        if att.get('location'):
+            clean_att['location'] = att['location']
+        cleaned_attachments.append(clean_att)
+    return cleaned_attachments
+
+
+def _build_chat_message(message: schemas_chat_message.ChatMessageCreate, agent_id: int, session_pk: int, contact_id, company_id: int, sender: str, assignee_id: int = None, attachments: list = None, options: list = None):
     # Contact_id can be NULL for anonymous conversations
-    db_message = models_chat_message.ChatMessage(
+    return models_chat_message.ChatMessage(
         message=message.message,
         sender=sender,
         agent_id=agent_id,
-        session_id=session.id,
+        session_id=session_pk,
         company_id=company_id,
         message_type=message.message_type,
         token=message.token, # Add the token here
-        contact_id=session.contact_id,  # Can be NULL for anonymous chats
+        contact_id=contact_id,  # Can be NULL for anonymous chats
         assignee_id=assignee_id,  # Store the agent/user who sent this message
-        attachments=cleaned_attachments,  # Store attachment metadata
+        attachments=_clean_attachments(attachments),  # Store attachment metadata
         options=options,  # Store prompt options for message_type='prompt'
-        # issue=issue
     )
+
+
+def create_chat_message(db: Session, message: schemas_chat_message.ChatMessageCreate, agent_id: int, session_id: str, company_id: int, sender: str, assignee_id: int = None, attachments: list = None, options: list = None):
+
+    # Get the session to retrieve the contact_id (if available)
+    session = db.query(models_conversation_session.ConversationSession).filter(
+        models_conversation_session.ConversationSession.conversation_id == session_id,
+        models_conversation_session.ConversationSession.company_id == company_id
+    ).first()
+
+    if not session:
+        raise ValueError(f"Session {session_id} not found.")
+
+    db_message = _build_chat_message(message, agent_id, session.id, session.contact_id, company_id, sender, assignee_id, attachments, options)
     db.add(db_message)
     db.commit()
     db.refresh(db_message)
     return db_message
 
+
+async def create_chat_message_async(db: AsyncSession, message: schemas_chat_message.ChatMessageCreate, agent_id: int, session_id: str, company_id: int, sender: str, assignee_id: int = None, attachments: list = None, options: list = None):
+    """Async variant of create_chat_message for the websocket and webhook hot paths."""
+    ConversationSession = models_conversation_session.ConversationSession
+    session = (await db.execute(
+        select(ConversationSession.id, ConversationSession.contact_id).where(
+            ConversationSession.conversation_id == session_id,
+            ConversationSession.company_id == company_id
+        )
+    )).first()
+
+    if not session:
+        raise ValueError(f"Session {session_id} not found.")
+
+    db_message = _build_chat_message(message, agent_id, session.id, session.contact_id, company_id, sender, assignee_id, attachments, options)
+    db.add(db_message)
+    await db.commit()
+    await db.refresh(db_message)
+    return db_message
+
 def get_chat_messages(db: Session, agent_id: int, session_id: str, company_id: int, skip: int = 0, limit: int = 50, before_id: int = None):
     """
     Get chat messages with pagination support.
@@ -169,6 +338,43 @@ def get_chat_messages(db: Session, agent_id: int, session_id: str, company_id: i
         # Reverse to return in chronological order (oldest to newest)
         return list(reversed(messages))
 
+async def get_chat_messages_async(db: AsyncSession, session_id: str, company_id: int, limit: int = 50, before_id: int = None):
+    """Async variant of get_chat_messages (chronological order, optional before_id cursor)."""
+    ChatMessage = models_chat_message.ChatMessage
+    ConversationSession = models_conversation_session.ConversationSession
+
+    session_pk = (await db.execute(
+        select(ConversationSession.id).where(
+            ConversationSession.conversation_id == session_id,
+            ConversationSession.company_id == company_id
+        )
+    )).scalar()
+    if session_pk is None:
+        return []
+
+    query = select(ChatMessage).where(
+        ChatMessage.session_id == session_pk,
+        ChatMessage.company_id == company_id
+    )
+    if before_id is not None:
+        query = query.where(ChatMessage.id < before_id)
+
+    messages = (await db.execute(query.order_by(desc(ChatMessage.id)).limit(limit))).scalars().all()
+    return list(reversed(messages))
+
+
+async def get_user_display_name_async(db: AsyncSession, user_id: int):
+    """Full name (or email) of a user, used to label agent messages in broadcasts."""
+    from app.models.user import User
+
+    user = (await db.execute(
+        select(User.first_name, User.last_name, User.email).where(User.id == user_id)
+    )).first()
+    if not user:
+        return None
+    name_parts = [part for part in (user.first_name, user.last_name) if part]
+    return ' '.join(name_parts) if name_parts else user.email
+
 async def update_conversation_status(db: Session, session_id: str, status: str, company_id: int):
     """
     Updates the status of a conversation session (e.g., 'resolved', 'active', 'pending').
@@ -22,7 +22,8 @@ def _index_if_published(db: Session, content_item, content_type):
     if content_item.status == ContentStatus.PUBLISHED.value:
         try:
             doc_id = search_service.index_content_item(db, content_item, content_type)
-            if doc_id and doc_id != content_item.chroma_doc_id:
+            if doc_id:
+                # Also persists the search_index_hash set by index_content_item
                 content_item.chroma_doc_id = doc_id
                 db.commit()
         except Exception as e:
@@ -409,6 +410,7 @@ def update_content_item(
         elif db_item.chroma_doc_id:
             # Remove from index if no longer published
             _remove_from_index(db, db_item)
+            db.commit()
 
     return db_item
 
@@ -426,6 +428,8 @@ def _remove_from_index(db: Session, content_item: ContentItem) -> None:
             )
         except Exception as e:
             print(f"Warning: Failed to remove content item {content_item.id} from index: {e}")
+    # Forget the indexed hash so a later reindex doesn't skip the item (caller commits)
+    content_item.search_index_hash = None
 
 
 def delete_content_item(db: Session, item_id: int, company_id: int) -> bool:
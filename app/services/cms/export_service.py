@@ -1,16 +1,41 @@
-from typing import List, Optional, Dict, Any
+from typing import List, Optional, Dict, Any, Iterable, Iterator, Tuple
 from sqlalchemy.orm import Session
-from sqlalchemy import and_
+from sqlalchemy import and_, select, func
 from datetime import datetime, timedelta
+from app.core.config import settings
+from app.core.database import SessionLocal
 from app.models.content_item import ContentItem
 from app.models.content_type import ContentType
 from app.models.content_publishing import ContentExport
 from app.schemas.cms import ContentStatus, ContentVisibility
 from app.core.object_storage import s3_client, BUCKET_NAME
+import abc
 import json
 import csv
 import io
 
+EXPORT_FORMATS = {
+    'json': ('application/json', 'json'),
+    'csv': ('text/csv', 'csv'),
+    'ndjson': ('application/x-ndjson', 'ndjson'),
+}
+
+# S3 rejects non-final multipart parts smaller than 5 MiB
+MIN_PART_BYTES = 5 * 1024 * 1024
+
+# Columns read for export; the ORM entity (and its relationships) is never loaded
+_EXPORT_COLUMNS = (
+    ContentItem.id,
+    ContentItem.content_type_id,
+    ContentItem.data,
+    ContentItem.status,
+    ContentItem.visibility,
+    ContentItem.version,
+    ContentItem.created_at,
+    ContentItem.updated_at,
+    ContentItem.published_at,
+)
+
 
 def create_export_request(
     db: Session,
@@ -23,8 +48,8 @@ def create_export_request(
     visibility_filter: Optional[str] = None
 ) -> ContentExport:
     """Create an export request record."""
-    if export_format not in ['json', 'csv']:
-        raise ValueError("Export format must be 'json' or 'csv'")
+    if export_format not in EXPORT_FORMATS:
+        raise ValueError("Export format must be 'json', 'csv' or 'ndjson'")
 
     # Build filter criteria for tracking
     filter_criteria = {
@@ -73,10 +98,257 @@ def get_exports(
     ).order_by(ContentExport.created_at.desc()).offset(skip).limit(limit).all()
 
 
+def _item_conditions(company_id: int, filters: Dict[str, Any]) -> list:
+    """WHERE clauses for the content items an export covers."""
+    conditions = [ContentItem.company_id == company_id]
+    if filters.get('knowledge_base_id'):
+        conditions.append(ContentItem.knowledge_base_id == filters['knowledge_base_id'])
+    if filters.get('content_type_id'):
+        conditions.append(ContentItem.content_type_id == filters['content_type_id'])
+    if filters.get('status'):
+        conditions.append(ContentItem.status == filters['status'])
+    if filters.get('visibility'):
+        conditions.append(ContentItem.visibility == filters['visibility'])
+    return conditions
+
+
+def _content_type_map(conn, conditions: list) -> Dict[int, Tuple[str, str]]:
+    """Slug and name of every content type used by the exported items, in one query."""
+    used_types = select(ContentItem.content_type_id).where(*conditions).distinct()
+    rows = conn.execute(
+        select(ContentType.id, ContentType.slug, ContentType.name).where(ContentType.id.in_(used_types))
+    )
+    return {row.id: (row.slug, row.name) for row in rows}
+
+
+def _data_keys(conn, conditions: list) -> List[str]:
+    """All top-level data keys across the exported items (the CSV columns), computed in SQL."""
+    key = func.jsonb_object_keys(ContentItem.data)
+    rows = conn.execute(
+        select(key).where(*conditions, func.jsonb_typeof(ContentItem.data) == 'object').distinct()
+    )
+    return sorted(row[0] for row in rows)
+
+
+def _iso(value: Optional[datetime]) -> Optional[str]:
+    return value.isoformat() if value else None
+
+
+def _export_item(row, content_types: Dict[int, Tuple[str, str]]) -> Dict[str, Any]:
+    content_type = content_types.get(row.content_type_id)
+    return {
+        "id": row.id,
+        "content_type": {
+            "id": row.content_type_id if content_type else None,
+            "slug": content_type[0] if content_type else None,
+            "name": content_type[1] if content_type else None
+        },
+        "data": row.data,
+        "status": row.status,
+        "visibility": row.visibility,
+        "version": row.version,
+        "created_at": _iso(row.created_at),
+        "updated_at": _iso(row.updated_at),
+        "published_at": _iso(row.published_at)
+    }
+
+
+class _ExportWriter(abc.ABC):
+    """
+    Incremental export writer: the file is produced as header, one chunk
+    per item and footer, so it never has to be held in memory as a whole.
+    """
+
+    def __init__(self, content_types: Dict[int, Tuple[str, str]], item_count: int, field_keys: Iterable[str] = ()):
+        self.content_types = content_types
+        self.item_count = item_count
+        self.field_keys = list(field_keys)
+        self.written = 0
+
+    def header(self) -> str:
+        return ''
+
+    @abc.abstractmethod
+    def item(self, row) -> str:
+        """One item's chunk of the file."""
+
+    def footer(self) -> str:
+        return ''
+
+    def write(self, rows: Iterable) -> Iterator[str]:
+        yield self.header()
+        for row in rows:
+            yield self.item(row)
+        yield self.footer()
+
+
+class _JsonExportWriter(_ExportWriter):
+    """Same document as json.dumps({...}, indent=2), written item by item."""
+
+    def header(self) -> str:
+        return (
+            '{\n'
+            f'  "exported_at": {json.dumps(datetime.utcnow().isoformat())},\n'
+            f'  "item_count": {self.item_count},\n'
+            '  "items": ['
+        )
+
+    def item(self, row) -> str:
+        separator = ',\n    ' if self.written else '\n    '
+        self.written += 1
+        content = json.dumps(_export_item(row, self.content_types), indent=2, ensure_ascii=False)
+        # Strings never contain raw newlines once encoded, so this only re-indents the structure
+        return separator + content.replace('\n', '\n    ')
+
+    def footer(self) -> str:
+        return '\n  ]\n}' if self.written else ']\n}'
+
+
+class _NdjsonExportWriter(_ExportWriter):
+    """One JSON object per line; the friendliest format for very large exports."""
+
+    def item(self, row) -> str:
+        self.written += 1
+        return json.dumps(_export_item(row, self.content_types), ensure_ascii=False) + '\n'
+
+
+class _CsvExportWriter(_ExportWriter):
+    BASE_COLUMNS = ['id', 'content_type_slug', 'status', 'visibility', 'version', 'created_at', 'updated_at', 'published_at']
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self._output = io.StringIO()
+        self._writer = csv.DictWriter(
+            self._output, fieldnames=self.BASE_COLUMNS + [f"data.{k}" for k in self.field_keys]
+        )
+
+    def _drain(self) -> str:
+        content = self._output.getvalue()
+        self._output.seek(0)
+        self._output.truncate()
+        return content
+
+    def header(self) -> str:
+        if not self.item_count:
+            return "No items to export"
+        self._writer.writeheader()
+        return self._drain()
+
+    def item(self, row) -> str:
+        self.written += 1
+        content_type = self.content_types.get(row.content_type_id)
+        csv_row = {
+            'id': row.id,
+            'content_type_slug': content_type[0] if content_type else '',
+            'status': row.status,
+            'visibility': row.visibility,
+            'version': row.version,
+            'created_at': _iso(row.created_at) or '',
+            'updated_at': _iso(row.updated_at) or '',
+            'published_at': _iso(row.published_at) or ''
+        }
+
+        data = row.data if isinstance(row.data, dict) else {}
+        for key in self.field_keys:
+            value = data.get(key, '')
+            # Convert complex values to JSON string
+            if isinstance(value, (dict, list)):
+                value = json.dumps(value, ensure_ascii=False)
+            csv_row[f"data.{key}"] = value
+
+        self._writer.writerow(csv_row)
+        return self._drain()
+
+
+_WRITERS = {
+    'json': _JsonExportWriter,
+    'csv': _CsvExportWriter,
+    'ndjson': _NdjsonExportWriter,
+}
+
+
+def _new_writer(export_format: str, content_types: Dict[int, Tuple[str, str]], item_count: int,
+                field_keys: Iterable[str] = ()) -> _ExportWriter:
+    return _WRITERS.get(export_format, _CsvExportWriter)(content_types, item_count, field_keys)
+
+
+class _ExportUpload:
+    """
+    Writes an export file to S3 as it is generated.
+
+    Text is buffered up to one multipart part, and each full part is uploaded
+    before more is accepted. Files smaller than a part use a single PUT.
+    """
+
+    def __init__(self, key: str, content_type: str, part_size: Optional[int] = None):
+        self.key = key
+        self.content_type = content_type
+        self.part_size = max(part_size or settings.EXPORT_UPLOAD_PART_BYTES, MIN_PART_BYTES)
+        self.size = 0
+        self._buffer = bytearray()
+        self._upload_id: Optional[str] = None
+        self._parts: List[Dict[str, Any]] = []
+
+    def write(self, text: str):
+        data = text.encode('utf-8')
+        self.size += len(data)
+        self._buffer += data
+        if len(self._buffer) >= self.part_size:
+            self._flush_part()
+
+    def _flush_part(self):
+        body, self._buffer = self._buffer, bytearray()
+        if self._upload_id is None:
+            response = s3_client.create_multipart_upload(
+                Bucket=BUCKET_NAME, Key=self.key, ContentType=self.content_type
+            )
+            self._upload_id = response['UploadId']
+
+        part_number = len(self._parts) + 1
+        response = s3_client.upload_part(
+            Bucket=BUCKET_NAME, Key=self.key, UploadId=self._upload_id,
+            PartNumber=part_number, Body=bytes(body)
+        )
+        self._parts.append({'ETag': response['ETag'], 'PartNumber': part_number})
+
+    def complete(self) -> int:
+        """Finish the upload. Returns the file size in bytes."""
+        if self._upload_id is None:
+            body, self._buffer = self._buffer, bytearray()
+            s3_client.put_object(
+                Body=bytes(body), Bucket=BUCKET_NAME, Key=self.key, ContentType=self.content_type
+            )
+        else:
+            if self._buffer:
+                self._flush_part()
+            s3_client.complete_multipart_upload(
+                Bucket=BUCKET_NAME, Key=self.key, UploadId=self._upload_id,
+                MultipartUpload={'Parts': self._parts}
+            )
+        return self.size
+
+    def abort(self):
+        self._buffer = bytearray()
+        if self._upload_id is None:
+            return
+        upload_id, self._upload_id = self._upload_id, None
+        try:
+            s3_client.abort_multipart_upload(Bucket=BUCKET_NAME, Key=self.key, UploadId=upload_id)
+        except Exception as e:
+            print(f"Error aborting export upload {self.key}: {e}")
+
+
 def process_export(db: Session, export_id: int, company_id: int) -> ContentExport:
     """
-    Process an export request - generates the export file and uploads to S3.
-    This should typically be run as a background task.
+    Process an export request - streams the export file to S3.
+
+    Items are read through a server-side cursor and written incrementally
+    (multipart upload above one part), so memory stays bounded regardless of
+    the number of items. The count, CSV columns and rows all come from one
+    REPEATABLE READ snapshot. Progress is stored on the export record every
+    EXPORT_PROGRESS_EVERY items.
+
+    This should run as a background task; see run_export.
     """
     export_record = get_export(db, export_id, company_id)
     if not export_record:
@@ -87,51 +359,55 @@ def process_export(db: Session, export_id: int, company_id: int) -> ContentExpor
 
     # Update status to processing
     export_record.status = 'processing'
+    export_record.processed_count = 0
     db.commit()
 
+    export_format = export_record.format if export_record.format in EXPORT_FORMATS else 'csv'
+    content_type, file_ext = EXPORT_FORMATS[export_format]
+    s3_key = f"exports/{company_id}/{export_id}/export_{datetime.utcnow().strftime('%Y%m%d_%H%M%S')}.{file_ext}"
+    upload = _ExportUpload(s3_key, content_type)
+
     try:
         # Parse filter criteria
         filters = json.loads(export_record.filter_criteria) if export_record.filter_criteria else {}
-
-        # Query content items
-        query = db.query(ContentItem).filter(ContentItem.company_id == company_id)
-
-        if filters.get('knowledge_base_id'):
-            query = query.filter(ContentItem.knowledge_base_id == filters['knowledge_base_id'])
-        if filters.get('content_type_id'):
-            query = query.filter(ContentItem.content_type_id == filters['content_type_id'])
-        if filters.get('status'):
-            query = query.filter(ContentItem.status == filters['status'])
-        if filters.get('visibility'):
-            query = query.filter(ContentItem.visibility == filters['visibility'])
-
-        items = query.order_by(ContentItem.created_at.desc()).all()
-
-        # Generate export content
-        if export_record.format == 'json':
-            content, file_size = _generate_json_export(db, items)
-            content_type = 'application/json'
-            file_ext = 'json'
-        else:  # csv
-            content, file_size = _generate_csv_export(db, items)
-            content_type = 'text/csv'
-            file_ext = 'csv'
-
-        # Upload to S3
-        s3_key = f"exports/{company_id}/{export_id}/export_{datetime.utcnow().strftime('%Y%m%d_%H%M%S')}.{file_ext}"
-
-        s3_client.put_object(
-            Body=content.encode('utf-8'),
-            Bucket=BUCKET_NAME,
-            Key=s3_key,
-            ContentType=content_type
-        )
+        conditions = _item_conditions(company_id, filters)
+
+        processed = 0
+        with db.get_bind().connect() as conn:
+            conn.execution_options(isolation_level='REPEATABLE READ')
+            with conn.begin():
+                total = conn.execute(select(func.count(ContentItem.id)).where(*conditions)).scalar_one()
+                export_record.total_count = total
+                db.commit()
+
+                content_types = _content_type_map(conn, conditions)
+                field_keys = _data_keys(conn, conditions) if export_format == 'csv' and total else []
+                writer = _new_writer(export_format, content_types, total, field_keys)
+
+                rows = conn.execute(
+                    select(*_EXPORT_COLUMNS)
+                    .where(*conditions)
+                    .order_by(ContentItem.created_at.desc())
+                    .execution_options(yield_per=settings.EXPORT_FETCH_SIZE)
+                )
+
+                upload.write(writer.header())
+                for row in rows:
+                    upload.write(writer.item(row))
+                    processed += 1
+                    if processed % settings.EXPORT_PROGRESS_EVERY == 0:
+                        export_record.processed_count = processed
+                        db.commit()
+                upload.write(writer.footer())
+
+        file_size = upload.complete()
 
         # Update export record
         export_record.status = 'completed'
         export_record.s3_key = s3_key
         export_record.file_size = file_size
-        export_record.item_count = len(items)
+        export_record.item_count = processed
+        export_record.processed_count = processed
         export_record.completed_at = datetime.utcnow()
 
         db.commit()
@@ -140,98 +416,23 @@ def process_export(db: Session, export_id: int, company_id: int) -> ContentExpor
         return export_record
 
     except Exception as e:
+        upload.abort()
+        db.rollback()
         export_record.status = 'failed'
+        export_record.error_message = str(e)
         db.commit()
         raise ValueError(f"Export failed: {str(e)}")
 
 
-def _generate_json_export(db: Session, items: List[ContentItem]) -> tuple[str, int]:
-    """Generate JSON export content."""
-    export_data = []
-
-    for item in items:
-        # Get content type info
-        content_type = db.query(ContentType).filter(
-            ContentType.id == item.content_type_id
-        ).first()
-
-        item_data = {
-            "id": item.id,
-            "content_type": {
-                "id": content_type.id if content_type else None,
-                "slug": content_type.slug if content_type else None,
-                "name": content_type.name if content_type else None
-            },
-            "data": item.data,
-            "status": item.status,
-            "visibility": item.visibility,
-            "version": item.version,
-            "created_at": item.created_at.isoformat() if item.created_at else None,
-            "updated_at": item.updated_at.isoformat() if item.updated_at else None,
-            "published_at": item.published_at.isoformat() if item.published_at else None
-        }
-        export_data.append(item_data)
-
-    content = json.dumps({
-        "exported_at": datetime.utcnow().isoformat(),
-        "item_count": len(export_data),
-        "items": export_data
-    }, indent=2, ensure_ascii=False)
-
-    return content, len(content.encode('utf-8'))
-
-
-def _generate_csv_export(db: Session, items: List[ContentItem]) -> tuple[str, int]:
-    """Generate CSV export content."""
-    if not items:
-        return "No items to export", 0
-
-    output = io.StringIO()
-
-    # Collect all unique field keys from all items
-    all_keys = set()
-    for item in items:
-        if item.data:
-            all_keys.update(item.data.keys())
-
-    # Sort keys for consistent column order
-    field_keys = sorted(all_keys)
-
-    # Define CSV columns
-    base_columns = ['id', 'content_type_slug', 'status', 'visibility', 'version', 'created_at', 'updated_at', 'published_at']
-    all_columns = base_columns + [f"data.{k}" for k in field_keys]
-
-    writer = csv.DictWriter(output, fieldnames=all_columns)
-    writer.writeheader()
-
-    for item in items:
-        content_type = db.query(ContentType).filter(
-            ContentType.id == item.content_type_id
-        ).first()
-
-        row = {
-            'id': item.id,
-            'content_type_slug': content_type.slug if content_type else '',
-            'status': item.status,
-            'visibility': item.visibility,
-            'version': item.version,
-            'created_at': item.created_at.isoformat() if item.created_at else '',
-            'updated_at': item.updated_at.isoformat() if item.updated_at else '',
-            'published_at': item.published_at.isoformat() if item.published_at else ''
-        }
-
-        # Add data fields
-        for key in field_keys:
-            value = item.data.get(key, '') if item.data else ''
-            # Convert complex values to JSON string
-            if isinstance(value, (dict, list)):
-                value = json.dumps(value, ensure_ascii=False)
-            row[f"data.{key}"] = value
-
-        writer.writerow(row)
-
-    content = output.getvalue()
-    return content, len(content.encode('utf-8'))
+def run_export(export_id: int, company_id: int) -> None:
+    """Background task entry point: processes an export with its own session."""
+    db = SessionLocal()
+    try:
+        process_export(db, export_id, company_id)
+    except ValueError as e:
+        print(f"Error processing export {export_id}: {e}")
+    finally:
+        db.close()
 
 
 def get_export_download_url(db: Session, export_id: int, company_id: int, expires_in: int = 3600) -> Optional[str]:
@@ -309,29 +510,34 @@ def export_content_immediate(
     Export content immediately and return the data directly.
     For smaller exports where we don't need async processing.
     """
-    # Query content items
-    query = db.query(ContentItem).filter(ContentItem.company_id == company_id)
-
-    if knowledge_base_id:
-        query = query.filter(ContentItem.knowledge_base_id == knowledge_base_id)
-    if content_type_id:
-        query = query.filter(ContentItem.content_type_id == content_type_id)
-    if status_filter:
-        query = query.filter(ContentItem.status == status_filter)
-
-    items = query.order_by(ContentItem.created_at.desc()).all()
+    conditions = _item_conditions(company_id, {
+        'knowledge_base_id': knowledge_base_id,
+        'content_type_id': content_type_id,
+        'status': status_filter
+    })
+
+    rows = db.execute(
+        select(*_EXPORT_COLUMNS).where(*conditions).order_by(ContentItem.created_at.desc())
+    ).all()
+    content_types = _content_type_map(db, conditions)
 
     if export_format == 'json':
-        content, file_size = _generate_json_export(db, items)
         return {
             "format": "json",
-            "content": json.loads(content),
-            "item_count": len(items)
-        }
-    else:  # csv
-        content, file_size = _generate_csv_export(db, items)
-        return {
-            "format": "csv",
-            "content": content,
-            "item_count": len(items)
+            "content": {
+                "exported_at": datetime.utcnow().isoformat(),
+                "item_count": len(rows),
+                "items": [_export_item(row, content_types) for row in rows]
+            },
+            "item_count": len(rows)
         }
+
+    if export_format != 'ndjson':
+        export_format = 'csv'
+    field_keys = sorted({key for row in rows if isinstance(row.data, dict) for key in row.data})
+    writer = _new_writer(export_format, content_types, len(rows), field_keys)
+    return {
+        "format": export_format,
+        "content": ''.join(writer.write(rows)),
+        "item_count": len(rows)
+    }
@@ -0,0 +1,231 @@
+"""
+Media Processing Service
+Probes uploaded CMS media and renders thumbnails off the request path.
+
+Uploads are streamed to storage and recorded with ``processing_status``
+'pending'; ``media_service.process_media`` then runs in this pool to fill in
+dimensions/duration and the default thumbnails. Other thumbnail sizes are
+rendered lazily on first request.
+
+Derived assets (thumbnails) live at deterministic keys next to the original,
+so a rendered size is found again by key and never rendered twice; work for
+the same key that is already in flight is shared rather than repeated.
+"""
+import contextlib
+import io
+import json
+import logging
+import os
+import subprocess
+import tempfile
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Callable, Dict, Iterator, List, Optional, Tuple
+
+from PIL import Image
+
+from app.core.config import settings
+from app.core.object_storage import s3_client, BUCKET_NAME
+
+logger = logging.getLogger(__name__)
+
+THUMBNAIL_QUALITY = 85
+
+
+def thumbnail_sizes() -> List[int]:
+    """Allowed thumbnail bounding boxes (px), smallest first."""
+    sizes = {int(size) for size in settings.MEDIA_THUMBNAIL_SIZES.split(',') if size.strip()}
+    return sorted(sizes)
+
+
+def thumbnail_key(company_id: int, filename: str, size: int) -> str:
+    stem = os.path.splitext(filename)[0]
+    return f"cms/{company_id}/thumbnails/{stem}_{size}.jpg"
+
+
+@contextlib.contextmanager
+def downloaded(s3_key: str, suffix: str = '') -> Iterator[str]:
+    """Stream an object to a temporary file and yield its path."""
+    fd, path = tempfile.mkstemp(suffix=suffix)
+    os.close(fd)
+    try:
+        s3_client.download_file(BUCKET_NAME, s3_key, path)
+        yield path
+    finally:
+        os.unlink(path)
+
+
+# ==================== Probes & Rendering ====================
+
+def get_image_dimensions(path: str) -> Tuple[Optional[int], Optional[int]]:
+    """Get image dimensions (reads the header only)."""
+    try:
+        with Image.open(path) as img:
+            return img.width, img.height
+    except Exception as e:
+        print(f"Error getting image dimensions: {e}")
+        return None, None
+
+
+def render_thumbnails(path: str, sizes: List[int]) -> Dict[int, bytes]:
+    """
+    Render JPEG thumbnails for several bounding boxes from one decode.
+
+    JPEGs are decoded at a reduced scale (``draft``) when the largest size
+    allows it, and each smaller size is resized from the previous result.
+    """
+    thumbnails = {}
+    try:
+        with Image.open(path) as img:
+            largest = max(sizes)
+            img.draft('RGB', (largest, largest))
+
+            # Convert to RGB if necessary (for PNG with transparency)
+            current = img.convert('RGB') if img.mode != 'RGB' else img.copy()
+
+            for size in sorted(sizes, reverse=True):
+                current.thumbnail((size, size), Image.Resampling.LANCZOS, reducing_gap=3.0)
+                thumb_io = io.BytesIO()
+                current.save(thumb_io, format='JPEG', quality=THUMBNAIL_QUALITY)
+                thumbnails[size] = thumb_io.getvalue()
+    except Exception as e:
+        print(f"Error generating thumbnail: {e}")
+    return thumbnails
+
+
+def get_audio_duration(path: str) -> Optional[int]:
+    """Get audio duration in seconds using mutagen."""
+    try:
+        from mutagen import File as MutagenFile
+
+        audio = MutagenFile(path)
+        if audio and audio.info:
+            return int(audio.info.length)
+        return None
+    except ImportError:
+        print("mutagen not installed, skipping audio duration extraction")
+        return None
+    except Exception as e:
+        print(f"Error getting audio duration: {e}")
+        return None
+
+
+def get_video_info(path: str) -> Tuple[Optional[int], Optional[int], Optional[int]]:
+    """Get video dimensions and duration with ffprobe. Returns (width, height, duration)."""
+    try:
+        cmd = [
+            'ffprobe', '-v', 'quiet', '-print_format', 'json',
+            '-show_format', '-show_streams', path
+        ]
+        result = subprocess.run(cmd, capture_output=True, text=True, timeout=30)
+        if result.returncode != 0:
+            return None, None, None
+
+        info = json.loads(result.stdout)
+        width = None
+        height = None
+        duration = None
+
+        # Get video stream info
+        for stream in info.get('streams', []):
+            if stream.get('codec_type') == 'video':
+                width = stream.get('width')
+                height = stream.get('height')
+                break
+
+        # Get duration
+        duration_str = info.get('format', {}).get('duration')
+        if duration_str:
+            duration = int(float(duration_str))
+
+        return width, height, duration
+    except Exception as e:
+        print(f"Error getting video info: {e}")
+        return None, None, None
+
+
+# ==================== Worker Pool ====================
+
+class MediaProcessingPool:
+    """
+    Bounded thread pool for media work (downloads, decoding, ffprobe).
+
+    Kept separate from the server's default thread pool so a burst of large
+    uploads can't starve request handlers. Jobs submitted with a key are
+    de-duplicated while in flight.
+    """
+
+    def __init__(self, max_workers: int = 2):
+        self.max_workers = max_workers
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self._inflight: Dict[str, Future] = {}
+        self._lock = threading.RLock()  # done callbacks may run under the lock
+        self.completed_jobs = 0
+        self.failed_jobs = 0
+        self.total_job_seconds = 0.0
+
+    def _get_executor(self) -> ThreadPoolExecutor:
+        if self._executor is None:
+            self._executor = ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix="media-processing")
+        return self._executor
+
+    def _timed(self, func: Callable, *args):
+        started = time.perf_counter()
+        try:
+            result = func(*args)
+            self.completed_jobs += 1
+            return result
+        except Exception:
+            self.failed_jobs += 1
+            logger.exception(f"[Media] {getattr(func, '__name__', func)} failed")
+            raise
+        finally:
+            self.total_job_seconds += time.perf_counter() - started
+
+    def submit(self, func: Callable, *args, key: Optional[str] = None) -> Future:
+        """
+        Run ``func(*args)`` in the pool.
+
+        Args:
+            func: Function to run
+            *args: Arguments for ``func``
+            key: When given, a job with the same key still in flight is
+                returned instead of starting another one
+
+        Returns:
+            Future of the job's result
+        """
+        if key is None:
+            return self._get_executor().submit(self._timed, func, *args)
+
+        with self._lock:
+            future = self._inflight.get(key)
+            if future is None:
+                future = self._get_executor().submit(self._timed, func, *args)
+                self._inflight[key] = future
+                future.add_done_callback(lambda _f: self._forget(key))
+            return future
+
+    def _forget(self, key: str):
+        with self._lock:
+            self._inflight.pop(key, None)
+
+    def stats(self) -> dict:
+        jobs = self.completed_jobs + self.failed_jobs
+        return {
+            "max_workers": self.max_workers,
+            "in_flight": len(self._inflight),
+            "completed_jobs": self.completed_jobs,
+            "failed_jobs": self.failed_jobs,
+            "avg_job_ms": round(self.total_job_seconds * 1000 / jobs, 3) if jobs else 0.0,
+        }
+
+    def shutdown(self):
+        if self._executor is not None:
+            self._executor.shutdown(wait=False)
+            self._executor = None
+
+
+# Global instance shared by the CMS media endpoints
+media_processor = MediaProcessingPool(max_workers=settings.MEDIA_PROCESSING_WORKERS)
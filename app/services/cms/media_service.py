@@ -1,16 +1,27 @@
-from typing import List, Optional, Tuple
+from typing import Dict, List, Optional, Tuple
 from sqlalchemy.orm import Session
 from sqlalchemy import and_
 from fastapi import UploadFile
+from boto3.s3.transfer import TransferConfig
 from app.models.content_media import ContentMedia
 from app.core.object_storage import s3_client, BUCKET_NAME
 from app.core.config import settings
+from app.core.database import SessionLocal
+from app.services.cms.media_processing_service import (
+    media_processor,
+    downloaded,
+    get_audio_duration,
+    get_image_dimensions,
+    get_video_info,
+    render_thumbnails,
+    thumbnail_key,
+    thumbnail_sizes,
+)
+import asyncio
 import uuid
 import os
-import io
 import mimetypes
-from PIL import Image
-from datetime import datetime
+from datetime import datetime, timedelta, timezone
 
 # Media type mappings
 MEDIA_TYPE_MAP = {
@@ -54,9 +65,16 @@ MAX_FILE_SIZES = {
     'file': 25 * 1024 * 1024,  # 25 MB
 }
 
-# Thumbnail settings
-THUMBNAIL_SIZE = (300, 300)
-THUMBNAIL_QUALITY = 85
+# Media types probed/thumbnailed in the background after upload
+PROCESSED_MEDIA_TYPES = {'image', 'audio', 'video'}
+UNPROCESSED_MIME_TYPES = {'image/svg+xml'}  # PIL can't rasterize SVG
+
+# S3 rejects non-final multipart parts smaller than 5 MiB
+_transfer_config = TransferConfig(
+    multipart_threshold=max(settings.MEDIA_UPLOAD_PART_BYTES, 5 * 1024 * 1024),
+    multipart_chunksize=max(settings.MEDIA_UPLOAD_PART_BYTES, 5 * 1024 * 1024),
+    use_threads=False,  # Already running in a worker thread
+)
 
 
 def get_media_type(mime_type: str, filename: str) -> str:
@@ -102,115 +120,6 @@ def validate_file(file: UploadFile, media_type: Optional[str] = None) -> Tuple[b
     return True, "", detected_type
 
 
-def generate_thumbnail(file_content: bytes, filename: str) -> Optional[bytes]:
-    """Generate thumbnail for an image."""
-    try:
-        img = Image.open(io.BytesIO(file_content))
-
-        # Convert to RGB if necessary (for PNG with transparency)
-        if img.mode in ('RGBA', 'P'):
-            img = img.convert('RGB')
-
-        # Create thumbnail
-        img.thumbnail(THUMBNAIL_SIZE, Image.Resampling.LANCZOS)
-
-        # Save to bytes
-        thumb_io = io.BytesIO()
-        img.save(thumb_io, format='JPEG', quality=THUMBNAIL_QUALITY)
-        thumb_io.seek(0)
-
-        return thumb_io.getvalue()
-    except Exception as e:
-        print(f"Error generating thumbnail: {e}")
-        return None
-
-
-def get_image_dimensions(file_content: bytes) -> Tuple[Optional[int], Optional[int]]:
-    """Get image dimensions."""
-    try:
-        img = Image.open(io.BytesIO(file_content))
-        return img.width, img.height
-    except Exception as e:
-        print(f"Error getting image dimensions: {e}")
-        return None, None
-
-
-def get_audio_duration(file_content: bytes, filename: str) -> Optional[int]:
-    """Get audio duration in seconds using mutagen."""
-    try:
-        from mutagen import File as MutagenFile
-        import tempfile
-
-        # Write to temp file for mutagen
-        ext = os.path.splitext(filename)[1]
-        with tempfile.NamedTemporaryFile(suffix=ext, delete=False) as tmp:
-            tmp.write(file_content)
-            tmp_path = tmp.name
-
-        try:
-            audio = MutagenFile(tmp_path)
-            if audio and audio.info:
-                return int(audio.info.length)
-        finally:
-            os.unlink(tmp_path)
-
-        return None
-    except ImportError:
-        print("mutagen not installed, skipping audio duration extraction")
-        return None
-    except Exception as e:
-        print(f"Error getting audio duration: {e}")
-        return None
-
-
-def get_video_info(file_content: bytes, filename: str) -> Tuple[Optional[int], Optional[int], Optional[int]]:
-    """Get video dimensions and duration. Returns (width, height, duration)."""
-    try:
-        import subprocess
-        import tempfile
-        import json
-
-        ext = os.path.splitext(filename)[1]
-        with tempfile.NamedTemporaryFile(suffix=ext, delete=False) as tmp:
-            tmp.write(file_content)
-            tmp_path = tmp.name
-
-        try:
-            # Use ffprobe to get video info
-            cmd = [
-                'ffprobe', '-v', 'quiet', '-print_format', 'json',
-                '-show_format', '-show_streams', tmp_path
-            ]
-            result = subprocess.run(cmd, capture_output=True, text=True, timeout=30)
-            if result.returncode == 0:
-                info = json.loads(result.stdout)
-                width = None
-                height = None
-                duration = None
-
-                # Get video stream info
-                for stream in info.get('streams', []):
-                    if stream.get('codec_type') == 'video':
-                        width = stream.get('width')
-                        height = stream.get('height')
-                        break
-
-                # Get duration
-                if 'format' in info:
-                    duration_str = info['format'].get('duration')
-                    if duration_str:
-                        duration = int(float(duration_str))
-
-                return width, height, duration
-        finally:
-            os.unlink(tmp_path)
-
-        return None, None, None
-    except Exception as e:
-        print(f"Error getting video info: {e}")
-        return None, None, None
-
-
 def get_content_media(db: Session, media_id: int, company_id: int) -> Optional[ContentMedia]:
     """Get a media item by ID."""
     return db.query(ContentMedia).filter(
@@ -258,6 +167,31 @@ def get_content_media_count(
     return query.count()
 
 
+def _file_size(file: UploadFile) -> int:
+    if file.size is not None:
+        return file.size
+    file.file.seek(0, os.SEEK_END)
+    size = file.file.tell()
+    file.file.seek(0)
+    return size
+
+
+def _upload_file(fileobj, s3_key: str, mime_type: Optional[str]) -> None:
+    """Stream a file object to S3 (multipart above the part size)."""
+    fileobj.seek(0)
+    s3_client.upload_fileobj(
+        fileobj,
+        BUCKET_NAME,
+        s3_key,
+        ExtraArgs={'ContentType': mime_type or 'application/octet-stream'},
+        Config=_transfer_config
+    )
+
+
+def needs_processing(media_type: str, mime_type: Optional[str]) -> bool:
+    return media_type in PROCESSED_MEDIA_TYPES and mime_type not in UNPROCESSED_MIME_TYPES
+
+
 async def upload_media(
     db: Session,
     file: UploadFile,
@@ -266,17 +200,20 @@ async def upload_media(
     alt_text: Optional[str] = None,
     caption: Optional[str] = None
 ) -> ContentMedia:
-    """Upload a media file to S3 and create database record."""
+    """
+    Stream a media file to S3 and create its database record.
+
+    Returns as soon as the file is stored. Dimensions, duration and the
+    default thumbnail are filled in by process_media in the media processing
+    pool; ``processing_status`` tracks its progress.
+    """
     # Validate file
     is_valid, error, media_type = validate_file(file)
     if not is_valid:
         raise ValueError(error)
 
-    # Read file content
-    file_content = await file.read()
-    file_size = len(file_content)
-
-    # Check file size
+    # Check file size (the upload is spooled to disk, never read into memory)
+    file_size = await asyncio.to_thread(_file_size, file)
     max_size = MAX_FILE_SIZES.get(media_type, MAX_FILE_SIZES['file'])
     if file_size > max_size:
         raise ValueError(f"File size exceeds maximum allowed ({max_size // (1024*1024)} MB)")
@@ -285,50 +222,16 @@ async def upload_media(
     ext = os.path.splitext(file.filename)[1].lower()
     unique_filename = f"{uuid.uuid4()}{ext}"
     s3_key = f"cms/{company_id}/media/{unique_filename}"
-
-    # Get file metadata
     mime_type = file.content_type or mimetypes.guess_type(file.filename)[0]
-    width = None
-    height = None
-    duration = None
-    thumbnail_s3_key = None
-
-    # Process based on media type
-    if media_type == 'image':
-        width, height = get_image_dimensions(file_content)
-
-        # Generate thumbnail
-        thumbnail_data = generate_thumbnail(file_content, file.filename)
-        if thumbnail_data:
-            thumbnail_key = f"cms/{company_id}/thumbnails/{unique_filename.replace(ext, '.jpg')}"
-            try:
-                s3_client.put_object(
-                    Body=thumbnail_data,
-                    Bucket=BUCKET_NAME,
-                    Key=thumbnail_key,
-                    ContentType='image/jpeg'
-                )
-                thumbnail_s3_key = thumbnail_key
-            except Exception as e:
-                print(f"Error uploading thumbnail: {e}")
-
-    elif media_type == 'audio':
-        duration = get_audio_duration(file_content, file.filename)
-
-    elif media_type == 'video':
-        width, height, duration = get_video_info(file_content, file.filename)
 
     # Upload to S3
     try:
-        s3_client.put_object(
-            Body=file_content,
-            Bucket=BUCKET_NAME,
-            Key=s3_key,
-            ContentType=mime_type
-        )
+        await asyncio.to_thread(_upload_file, file.file, s3_key, mime_type)
     except Exception as e:
         raise ValueError(f"Failed to upload file: {str(e)}")
 
+    process = needs_processing(media_type, mime_type)
+
     # Create database record
     db_media = ContentMedia(
         company_id=company_id,
@@ -339,10 +242,7 @@ async def upload_media(
         media_type=media_type,
         s3_bucket=BUCKET_NAME,
         s3_key=s3_key,
-        thumbnail_s3_key=thumbnail_s3_key,
-        width=width,
-        height=height,
-        duration=duration,
+        processing_status='pending' if process else 'completed',
         alt_text=alt_text,
         caption=caption,
         uploaded_by=user_id
@@ -352,9 +252,146 @@ async def upload_media(
     db.commit()
     db.refresh(db_media)
 
+    if process:
+        schedule_processing(db_media)
+
     return db_media
 
 
+def schedule_processing(db_media: ContentMedia) -> None:
+    """Queue probing/thumbnailing of a media item (no-op while it is already queued)."""
+    media_processor.submit(process_media, db_media.id, db_media.company_id, key=f"media:{db_media.id}")
+
+
+def resubmit_stale_media(db: Session, older_than_minutes: Optional[int] = None) -> int:
+    """
+    Queue again media left 'pending' or 'processing' by a worker that died.
+
+    The processing pool lives in memory, so a restart drops its queue. Rows
+    uploaded more than ``older_than_minutes`` ago (MEDIA_PROCESSING_STALE_MINUTES
+    by default) that still haven't finished are resubmitted; ones this worker
+    already has in flight are left alone.
+
+    Returns:
+        Number of media items resubmitted
+    """
+    minutes = settings.MEDIA_PROCESSING_STALE_MINUTES if older_than_minutes is None else older_than_minutes
+    cutoff = datetime.now(timezone.utc) - timedelta(minutes=minutes)
+    stale = db.query(ContentMedia.id, ContentMedia.company_id).filter(
+        and_(
+            ContentMedia.processing_status.in_(('pending', 'processing')),
+            ContentMedia.created_at < cutoff
+        )
+    ).order_by(ContentMedia.id).all()
+    for db_media in stale:
+        schedule_processing(db_media)
+    return len(stale)
+
+
+def _store_thumbnails(path: str, company_id: int, filename: str, sizes: List[int]) -> Dict[int, str]:
+    """Render thumbnails from a local image and upload them. Returns {size: s3_key}."""
+    keys = {}
+    for size, data in render_thumbnails(path, sizes).items():
+        key = thumbnail_key(company_id, filename, size)
+        try:
+            s3_client.put_object(Body=data, Bucket=BUCKET_NAME, Key=key, ContentType='image/jpeg')
+            keys[size] = key
+        except Exception as e:
+            print(f"Error uploading thumbnail: {e}")
+    return keys
+
+
+def _record_thumbnails(db_media: ContentMedia, keys: Dict[int, str]) -> None:
+    db_media.thumbnails = {**(db_media.thumbnails or {}), **{str(size): key for size, key in keys.items()}}
+    default_key = keys.get(settings.MEDIA_THUMBNAIL_DEFAULT_SIZE)
+    if default_key:
+        db_media.thumbnail_s3_key = default_key
+
+
+def process_media(media_id: int, company_id: int) -> None:
+    """
+    Probe an uploaded file and render its default thumbnail.
+
+    Runs in the media processing pool with its own session. The file is
+    streamed to a temporary file, so only decoders ever hold it in memory.
+    """
+    db = SessionLocal()
+    try:
+        db_media = get_content_media(db, media_id, company_id)
+        if not db_media or db_media.processing_status == 'completed':
+            return
+
+        db_media.processing_status = 'processing'
+        db.commit()
+
+        try:
+            ext = os.path.splitext(db_media.filename)[1]
+            with downloaded(db_media.s3_key, ext) as path:
+                if db_media.media_type == 'image':
+                    db_media.width, db_media.height = get_image_dimensions(path)
+                    _record_thumbnails(db_media, _store_thumbnails(
+                        path, company_id, db_media.filename, [settings.MEDIA_THUMBNAIL_DEFAULT_SIZE]
+                    ))
+                elif db_media.media_type == 'audio':
+                    db_media.duration = get_audio_duration(path)
+                elif db_media.media_type == 'video':
+                    db_media.width, db_media.height, db_media.duration = get_video_info(path)
+            db_media.processing_status = 'completed'
+        except Exception as e:
+            print(f"Error processing media {media_id}: {e}")
+            db_media.processing_status = 'failed'
+
+        db.commit()
+    finally:
+        db.close()
+
+
+def _render_thumbnail(s3_key: str, company_id: int, filename: str, size: int) -> Optional[str]:
+    with downloaded(s3_key, os.path.splitext(filename)[1]) as path:
+        return _store_thumbnails(path, company_id, filename, [size]).get(size)
+
+
+def _object_exists(key: str) -> bool:
+    try:
+        s3_client.head_object(Bucket=BUCKET_NAME, Key=key)
+        return True
+    except Exception:
+        return False
+
+
+def ensure_thumbnail(db: Session, db_media: ContentMedia, size: int) -> Optional[str]:
+    """
+    S3 key of an image's thumbnail at ``size``, rendering it on first request.
+
+    Rendered sizes are recorded on the media item; a thumbnail already in
+    storage (e.g. rendered by another worker) is reused rather than rendered
+    again, and concurrent requests for the same size share one render.
+
+    Returns:
+        The thumbnail key, or None if the media has no thumbnail
+    """
+    if size not in thumbnail_sizes():
+        raise ValueError(f"Thumbnail size must be one of {thumbnail_sizes()}")
+    if db_media.media_type != 'image' or db_media.mime_type in UNPROCESSED_MIME_TYPES:
+        return None
+
+    cached = (db_media.thumbnails or {}).get(str(size))
+    if cached:
+        return cached
+
+    key = thumbnail_key(db_media.company_id, db_media.filename, size)
+    if not _object_exists(key):
+        future = media_processor.submit(
+            _render_thumbnail, db_media.s3_key, db_media.company_id, db_media.filename, size, key=key
+        )
+        if not future.result():
+            return None
+
+    _record_thumbnails(db_media, {size: key})
+    db.commit()
+    return key
+
+
 def update_media(
     db: Session,
     media_id: int,
@@ -384,11 +421,14 @@ def delete_media(db: Session, media_id: int, company_id: int) -> bool:
     if not db_media:
         return False
 
-    # Delete from S3
+    # Delete from S3 (the original and every rendered thumbnail)
+    thumbnail_keys = set((db_media.thumbnails or {}).values())
+    if db_media.thumbnail_s3_key:
+        thumbnail_keys.add(db_media.thumbnail_s3_key)
     try:
         s3_client.delete_object(Bucket=BUCKET_NAME, Key=db_media.s3_key)
-        if db_media.thumbnail_s3_key:
-            s3_client.delete_object(Bucket=BUCKET_NAME, Key=db_media.thumbnail_s3_key)
+        for key in thumbnail_keys:
+            s3_client.delete_object(Bucket=BUCKET_NAME, Key=key)
     except Exception as e:
         print(f"Error deleting files from S3: {e}")
 
@@ -412,15 +452,16 @@ def get_media_url(db_media: ContentMedia, expires_in: int = 3600) -> str:
         return ""
 
 
-def get_thumbnail_url(db_media: ContentMedia, expires_in: int = 3600) -> Optional[str]:
-    """Generate a pre-signed URL for accessing the thumbnail."""
-    if not db_media.thumbnail_s3_key:
+def get_thumbnail_url(db_media: ContentMedia, expires_in: int = 3600, s3_key: Optional[str] = None) -> Optional[str]:
+    """Generate a pre-signed URL for accessing the thumbnail (the default size unless ``s3_key`` is given)."""
+    s3_key = s3_key or db_media.thumbnail_s3_key
+    if not s3_key:
         return None
 
     try:
         return s3_client.generate_presigned_url(
             'get_object',
-            Params={'Bucket': BUCKET_NAME, 'Key': db_media.thumbnail_s3_key},
+            Params={'Bucket': BUCKET_NAME, 'Key': s3_key},
             ExpiresIn=expires_in
         )
     except Exception as e:
@@ -1,15 +1,55 @@
 from typing import List, Optional, Dict, Any, Tuple
-from sqlalchemy.orm import Session
-from sqlalchemy import and_
+from sqlalchemy.orm import Session, object_session
+from sqlalchemy import and_, event, inspect
 from datetime import datetime
+from app.core.database import invalidate_on_commit
 from app.models.content_item import ContentItem
 from app.models.content_type import ContentType
 from app.models.content_publishing import ContentCopy, ContentApiToken
 from app.schemas.cms import ContentStatus, ContentVisibility
 from app.services.cms import content_item_service, content_type_service
+from app.services.cms.search_service import search_cache
 import copy as copy_module
 
 
+# ==================== Search Cache Invalidation ====================
+#
+# Cached search results carry item data and only cover published items, so a
+# company's cached searches are dropped once a commit publishes, unpublishes,
+# archives, re-scopes, edits or reindexes one of its items.
+
+_SEARCHED_ITEM_FIELDS = (
+    'status', 'visibility', 'data', 'content_type_id', 'knowledge_base_id',
+    'chroma_doc_id', 'search_index_hash'
+)
+
+
+_mark_company_dirty = invalidate_on_commit(
+    "cms_search_dirty_companies", lambda company_id: search_cache.invalidate_company(company_id)
+)
+
+
+def _mark_search_dirty(target) -> None:
+    db = object_session(target)
+    if db is not None and target.company_id is not None:
+        _mark_company_dirty(db, target.company_id)
+
+
+def _item_changed(mapper, connection, target):
+    state = inspect(target)
+    if any(state.attrs[field].history.has_changes() for field in _SEARCHED_ITEM_FIELDS):
+        _mark_search_dirty(target)
+
+
+def _item_added_or_removed(mapper, connection, target):
+    _mark_search_dirty(target)
+
+
+event.listen(ContentItem, "after_insert", _item_added_or_removed)
+event.listen(ContentItem, "after_delete", _item_added_or_removed)
+event.listen(ContentItem, "after_update", _item_changed)
+
+
 def get_marketplace_items(
     db: Session,
     content_type_slug: Optional[str] = None,
@@ -1,11 +1,20 @@
 from typing import List, Optional, Dict, Any, Tuple
 from sqlalchemy.orm import Session
 from sqlalchemy import and_
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from functools import lru_cache
+import hashlib
+import threading
+import time
 import uuid
 import json
 
+from app.core.config import settings
 from app.models.content_item import ContentItem
 from app.models.content_type import ContentType
+from app.models.content_publishing import ContentReindexJob
 from app.models.knowledge_base import KnowledgeBase
 from app.core.object_storage import get_company_chroma_client
 from app.llm_providers.nvidia_api_provider import NVIDIAEmbeddings
@@ -58,12 +67,16 @@ def get_searchable_text(content_type: ContentType, data: Dict[str, Any]) -> str:
     return "\n".join(searchable_texts)
 
 
+@lru_cache(maxsize=1)
+def _embeddings_client() -> NVIDIAEmbeddings:
+    """Shared embeddings client (it is stateless, so one instance serves all threads)."""
+    return NVIDIAEmbeddings()
+
+
 def get_embeddings(texts: List[str]) -> List[List[float]]:
     """Generate embeddings for a list of texts using NVIDIA embeddings."""
     try:
-        embeddings_client = NVIDIAEmbeddings()
-        embeddings = embeddings_client.embed_documents(texts)
-        return embeddings
+        return _embeddings_client().embed_documents(texts)
     except Exception as e:
         print(f"Error generating embeddings: {e}")
         raise ValueError(f"Failed to generate embeddings: {str(e)}")
@@ -72,8 +85,7 @@ def get_embeddings(texts: List[str]) -> List[List[float]]:
 def get_query_embedding(query: str) -> List[float]:
     """Generate embedding for a search query."""
     try:
-        embeddings_client = NVIDIAEmbeddings()
-        return embeddings_client.embed_query(query)
+        return _embeddings_client().embed_query(query)
     except Exception as e:
         print(f"Error generating query embedding: {e}")
         raise ValueError(f"Failed to generate query embedding: {str(e)}")
@@ -103,6 +115,85 @@ def get_kb_collection_name(db: Session, knowledge_base_id: int, company_id: int)
     return None
 
 
+def _get_or_create_collection(chroma_client, collection_name: str):
+    try:
+        return chroma_client.get_collection(name=collection_name)
+    except Exception:
+        return chroma_client.create_collection(name=collection_name)
+
+
+def _index_document(
+    db: Session,
+    content_item: ContentItem,
+    content_type: ContentType,
+    kb_collections: Optional[Dict[int, Optional[str]]] = None
+) -> Optional[Dict[str, Any]]:
+    """
+    Build the Chroma document for a content item.
+
+    If the content item is linked to a Knowledge Base, it goes in the same
+    collection as the KB's documents, enabling unified RAG search.
+
+    Args:
+        kb_collections: Optional cache of knowledge base id -> collection name
+
+    Returns:
+        Dict with collection_name, doc_id, text, metadata and a ``hash`` of
+        all of them, or None if the item has no searchable text
+    """
+    searchable_text = get_searchable_text(content_type, content_item.data)
+    if not searchable_text.strip():
+        return None
+
+    # Determine which collection to use
+    collection_name = None
+    kb_id = content_item.knowledge_base_id
+    if kb_id:
+        # Try to use the KB's existing collection for unified RAG search
+        if kb_collections is None:
+            collection_name = get_kb_collection_name(db, kb_id, content_item.company_id)
+        else:
+            if kb_id not in kb_collections:
+                kb_collections[kb_id] = get_kb_collection_name(db, kb_id, content_item.company_id)
+            collection_name = kb_collections[kb_id]
+
+    # Fall back to CMS-specific collection if no KB collection exists
+    if not collection_name:
+        collection_name = get_cms_collection_name(kb_id)
+
+    # Generate document ID with cms_ prefix to distinguish from document chunks
+    doc_id = content_item.chroma_doc_id or f"cms_{content_type.slug}_{content_item.id}"
+
+    # Prepare metadata with source_type for RAG retrieval
+    # Serialize the full structured data for agent responses
+    metadata = {
+        "source_type": "cms",  # Distinguishes from "document" chunks
+        "content_item_id": content_item.id,
+        "content_type_id": content_type.id,
+        "content_type_slug": content_type.slug,
+        "content_type_name": content_type.name,
+        "company_id": content_item.company_id,
+        "visibility": content_item.visibility,
+        "status": content_item.status,
+        # Store structured data as JSON string for retrieval
+        "structured_data": json.dumps(content_item.data, ensure_ascii=False)
+    }
+    if kb_id:
+        metadata["knowledge_base_id"] = kb_id
+
+    digest = hashlib.sha256(json.dumps(
+        [collection_name, doc_id, searchable_text, metadata], sort_keys=True, ensure_ascii=False
+    ).encode('utf-8')).hexdigest()
+
+    return {
+        "collection_name": collection_name,
+        "doc_id": doc_id,
+        "text": searchable_text,
+        "metadata": metadata,
+        "hash": digest,
+    }
+
+
 def index_content_item(
     db: Session,
     content_item: ContentItem,
@@ -113,6 +204,7 @@ def index_content_item(
 
     If the content item is linked to a Knowledge Base, it will be indexed
     in the same collection as the KB's documents, enabling unified RAG search.
+    On success the item's ``search_index_hash`` is updated (caller commits).
 
     Returns the chroma_doc_id.
     """
@@ -120,65 +212,28 @@ def index_content_item(
     if content_item.status != ContentStatus.PUBLISHED.value:
         return None
 
-    # Extract searchable text
-    searchable_text = get_searchable_text(content_type, content_item.data)
-    if not searchable_text.strip():
+    document = _index_document(db, content_item, content_type)
+    if not document:
         return None
 
     try:
         # Get company-specific ChromaDB client
         chroma_client = get_company_chroma_client(content_item.company_id)
-
-        # Determine which collection to use
-        collection_name = None
-        if content_item.knowledge_base_id:
-            # Try to use the KB's existing collection for unified RAG search
-            collection_name = get_kb_collection_name(
-                db, content_item.knowledge_base_id, content_item.company_id
-            )
-
-        # Fall back to CMS-specific collection if no KB collection exists
-        if not collection_name:
-            collection_name = get_cms_collection_name(content_item.knowledge_base_id)
-
-        # Get or create collection
-        try:
-            collection = chroma_client.get_collection(name=collection_name)
-        except Exception:
-            collection = chroma_client.create_collection(name=collection_name)
-
-        # Generate document ID with cms_ prefix to distinguish from document chunks
-        doc_id = content_item.chroma_doc_id or f"cms_{content_type.slug}_{content_item.id}"
+        collection = _get_or_create_collection(chroma_client, document["collection_name"])
 
         # Generate embedding
-        embedding = get_query_embedding(searchable_text)
-
-        # Prepare metadata with source_type for RAG retrieval
-        # Serialize the full structured data for agent responses
-        metadata = {
-            "source_type": "cms",  # Distinguishes from "document" chunks
-            "content_item_id": content_item.id,
-            "content_type_id": content_type.id,
-            "content_type_slug": content_type.slug,
-            "content_type_name": content_type.name,
-            "company_id": content_item.company_id,
-            "visibility": content_item.visibility,
-            "status": content_item.status,
-            # Store structured data as JSON string for retrieval
-            "structured_data": json.dumps(content_item.data, ensure_ascii=False)
-        }
-        if content_item.knowledge_base_id:
-            metadata["knowledge_base_id"] = content_item.knowledge_base_id
+        embedding = get_query_embedding(document["text"])
 
         # Upsert to collection
         collection.upsert(
-            ids=[doc_id],
+            ids=[document["doc_id"]],
             embeddings=[embedding],
-            documents=[searchable_text],
-            metadatas=[metadata]
+            documents=[document["text"]],
+            metadatas=[document["metadata"]]
         )
 
-        return doc_id
+        content_item.search_index_hash = document["hash"]
+        return document["doc_id"]
 
     except Exception as e:
         print(f"Error indexing content item {content_item.id}: {e}")
@@ -228,6 +283,155 @@ def remove_content_item_from_index(
         return False
 
 
+# ==================== Search Cache ====================
+
+class SearchCache:
+    """
+    Thread-safe LRU caches for semantic search.
+
+    Result sets are keyed by company and query parameters, and a company's
+    entries are dropped whenever one of its content items is published,
+    unpublished or edited (see publishing_service). Query embeddings only
+    depend on the query text, so they are shared by all companies; marketplace
+    search embeds each query once for every company it searches.
+    """
+
+    def __init__(self, max_results: int = 1000, max_embeddings: int = 2000, ttl: float = 300):
+        self.max_results = max_results
+        self.max_embeddings = max_embeddings
+        self.ttl = ttl
+        self._results: "OrderedDict[tuple, Tuple[float, List[Dict[str, Any]]]]" = OrderedDict()
+        self._embeddings: "OrderedDict[str, List[float]]" = OrderedDict()
+        self._generations: Dict[int, int] = {}
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def generation(self, company_id: int) -> int:
+        """Invalidation counter of a company; pass it back to put_results."""
+        with self._lock:
+            return self._generations.get(company_id, 0)
+
+    def get_results(self, key: tuple) -> Optional[List[Dict[str, Any]]]:
+        with self._lock:
+            entry = self._results.get(key)
+            if entry and entry[0] > time.monotonic():
+                self._results.move_to_end(key)
+                self.hits += 1
+                return list(entry[1])
+            self.misses += 1
+            return None
+
+    def put_results(self, key: tuple, results: List[Dict[str, Any]], generation: int) -> None:
+        with self._lock:
+            # Skip results computed before an invalidation that happened meanwhile
+            if self._generations.get(key[0], 0) != generation:
+                return
+            self._results[key] = (time.monotonic() + self.ttl, list(results))
+            self._results.move_to_end(key)
+            while len(self._results) > self.max_results:
+                self._results.popitem(last=False)
+
+    def get_embedding(self, query: str) -> Optional[List[float]]:
+        with self._lock:
+            embedding = self._embeddings.get(query)
+            if embedding is not None:
+                self._embeddings.move_to_end(query)
+            return embedding
+
+    def put_embedding(self, query: str, embedding: List[float]) -> None:
+        with self._lock:
+            self._embeddings[query] = embedding
+            self._embeddings.move_to_end(query)
+            while len(self._embeddings) > self.max_embeddings:
+                self._embeddings.popitem(last=False)
+
+    def invalidate_company(self, company_id: int) -> None:
+        with self._lock:
+            self._generations[company_id] = self._generations.get(company_id, 0) + 1
+            for key in [k for k in self._results if k[0] == company_id]:
+                del self._results[key]
+
+    def clear(self) -> None:
+        with self._lock:
+            self._results.clear()
+            self._embeddings.clear()
+
+    def stats(self) -> dict:
+        return {
+            "results": len(self._results),
+            "embeddings": len(self._embeddings),
+            "hits": self.hits,
+            "misses": self.misses,
+        }
+
+
+# Global instance
+search_cache = SearchCache(
+    max_results=settings.CMS_SEARCH_CACHE_MAX_ENTRIES,
+    max_embeddings=settings.CMS_SEARCH_EMBEDDING_CACHE_SIZE,
+    ttl=settings.CMS_SEARCH_CACHE_TTL,
+)
+
+
+def _cached_query_embedding(query: str) -> List[float]:
+    embedding = search_cache.get_embedding(query)
+    if embedding is None:
+        embedding = get_query_embedding(query)
+        search_cache.put_embedding(query, embedding)
+    return embedding
+
+
+def _hydrate_results(db: Session, company_id: int, results: Dict[str, Any]) -> List[Dict[str, Any]]:
+    """
+    Turn a Chroma query response into search results, in rank order.
+
+    Item data for all hits is loaded with a single ``IN`` query; hits whose
+    item no longer exists are dropped.
+    """
+    if not results or not results.get('ids') or not results['ids'][0]:
+        return []
+
+    hits = []
+    for i, doc_id in enumerate(results['ids'][0]):
+        metadata = results['metadatas'][0][i] if results.get('metadatas') else {}
+        document = results['documents'][0][i] if results.get('documents') else ""
+        distance = results['distances'][0][i] if results.get('distances') else 0
+        content_item_id = (metadata or {}).get('content_item_id')
+        if content_item_id:
+            hits.append((content_item_id, metadata, document, distance))
+
+    if not hits:
+        return []
+
+    item_data = dict(db.query(ContentItem.id, ContentItem.data).filter(
+        and_(
+            ContentItem.id.in_({hit[0] for hit in hits}),
+            ContentItem.company_id == company_id
+        )
+    ).all())
+
+    search_results = []
+    for content_item_id, metadata, document, distance in hits:
+        if content_item_id not in item_data:
+            continue
+
+        # Convert distance to similarity score (ChromaDB uses L2 distance)
+        # Lower distance = more similar, so we invert it
+        similarity_score = 1 / (1 + distance)
+
+        search_results.append({
+            "id": content_item_id,
+            "content_type_slug": metadata.get('content_type_slug', ''),
+            "data": item_data[content_item_id],
+            "score": similarity_score,
+            "highlights": {
+                "matched_text": document[:500] if document else ""
+            }
+        })
+    return search_results
+
+
 def search_content(
     db: Session,
     company_id: int,
@@ -240,7 +444,15 @@ def search_content(
     """
     Perform semantic search on CMS content.
     Returns list of search results with scores.
+
+    Results are cached per company until its content changes (see SearchCache).
     """
+    cache_key = (company_id, query, content_type_slug, knowledge_base_id, tuple(visibility_filter or ()), limit)
+    cached = search_cache.get_results(cache_key)
+    if cached is not None:
+        return cached
+    generation = search_cache.generation(company_id)
+
     try:
         # Get company-specific ChromaDB client
         chroma_client = get_company_chroma_client(company_id)
@@ -251,10 +463,11 @@ def search_content(
             collection = chroma_client.get_collection(name=collection_name)
         except Exception:
             # Collection doesn't exist, return empty results
+            search_cache.put_results(cache_key, [], generation)
             return []
 
         # Generate query embedding
-        query_embedding = get_query_embedding(query)
+        query_embedding = _cached_query_embedding(query)
 
         # Build where filter
         where_filter = {}
@@ -271,36 +484,8 @@ def search_content(
             include=["documents", "metadatas", "distances"]
         )
 
-        # Process results
-        search_results = []
-        if results and results.get('ids') and results['ids'][0]:
-            for i, doc_id in enumerate(results['ids'][0]):
-                metadata = results['metadatas'][0][i] if results.get('metadatas') else {}
-                document = results['documents'][0][i] if results.get('documents') else ""
-                distance = results['distances'][0][i] if results.get('distances') else 0
-
-                # Convert distance to similarity score (ChromaDB uses L2 distance)
-                # Lower distance = more similar, so we invert it
-                similarity_score = 1 / (1 + distance)
-
-                # Get the actual content item from database
-                content_item_id = metadata.get('content_item_id')
-                if content_item_id:
-                    content_item = db.query(ContentItem).filter(
-                        ContentItem.id == content_item_id
-                    ).first()
-
-                    if content_item:
-                        search_results.append({
-                            "id": content_item.id,
-                            "content_type_slug": metadata.get('content_type_slug', ''),
-                            "data": content_item.data,
-                            "score": similarity_score,
-                            "highlights": {
-                                "matched_text": document[:500] if document else ""
-                            }
-                        })
-
+        search_results = _hydrate_results(db, company_id, results)
+        search_cache.put_results(cache_key, search_results, generation)
         return search_results
 
     except Exception as e:
@@ -350,102 +535,230 @@ def search_marketplace(
     return all_results[:limit]
 
 
-def reindex_content_type(
-    db: Session,
-    content_type_id: int,
-    company_id: int
-) -> Tuple[int, int]:
-    """
-    Reindex all content items of a specific content type.
-    Returns (success_count, error_count).
-    """
-    content_type = db.query(ContentType).filter(
-        and_(
-            ContentType.id == content_type_id,
-            ContentType.company_id == company_id
-        )
-    ).first()
+# ==================== Bulk Reindexing ====================
+
+def _reindex_scope(content_type_id: Optional[int], knowledge_base_id: Optional[int]) -> str:
+    if content_type_id:
+        return f"type:{content_type_id}"
+    if knowledge_base_id:
+        return f"kb:{knowledge_base_id}"
+    return "all"
 
-    if not content_type:
-        raise ValueError("Content type not found")
 
-    content_items = db.query(ContentItem).filter(
+def _start_reindex_job(db: Session, company_id: int, scope: str, restart: bool) -> ContentReindexJob:
+    """Resume the unfinished reindex of ``scope``, or start a new one."""
+    job = db.query(ContentReindexJob).filter(
         and_(
-            ContentItem.content_type_id == content_type_id,
-            ContentItem.company_id == company_id,
-            ContentItem.status == ContentStatus.PUBLISHED.value
+            ContentReindexJob.company_id == company_id,
+            ContentReindexJob.scope == scope,
+            ContentReindexJob.status != 'completed'
         )
-    ).all()
+    ).order_by(ContentReindexJob.id.desc()).first()
+
+    if job and not restart:
+        print(f"Resuming {scope} reindex for company {company_id} after item {job.last_item_id}")
+        job.status = 'running'
+        db.commit()
+        return job
+
+    if job:
+        job.status = 'failed'  # superseded by the restart
+
+    job = ContentReindexJob(
+        company_id=company_id,
+        scope=scope,
+        status='running',
+        last_item_id=0,
+        indexed_count=0,
+        skipped_count=0,
+        error_count=0
+    )
+    db.add(job)
+    db.commit()
+    db.refresh(job)
+    return job
+
 
-    success_count = 0
-    error_count = 0
+def _embed_in_batches(texts: List[str], executor: ThreadPoolExecutor) -> List[Optional[List[float]]]:
+    """
+    Embed texts in provider-sized batches, with at most CMS_EMBED_CONCURRENCY
+    requests in flight. Texts of a failed batch get None.
+    """
+    client = _embeddings_client()
+    size = settings.CMS_EMBED_BATCH_SIZE
+    batches = [texts[i:i + size] for i in range(0, len(texts), size)]
+    futures = [executor.submit(client.embed_documents, batch) for batch in batches]
 
-    for item in content_items:
+    embeddings = []
+    for batch, future in zip(batches, futures):
         try:
-            doc_id = index_content_item(db, item, content_type)
-            if doc_id:
-                item.chroma_doc_id = doc_id
-                success_count += 1
-            else:
-                error_count += 1
+            embeddings.extend(future.result())
         except Exception as e:
-            print(f"Error indexing item {item.id}: {e}")
-            error_count += 1
-
-    db.commit()
-    return success_count, error_count
+            print(f"Error generating embeddings for {len(batch)} items: {e}")
+            embeddings.extend([None] * len(batch))
+    return embeddings
 
 
-def reindex_all_content(
+def bulk_index_content(
     db: Session,
     company_id: int,
-    knowledge_base_id: Optional[int] = None
-) -> Tuple[int, int]:
+    content_type_id: Optional[int] = None,
+    knowledge_base_id: Optional[int] = None,
+    restart: bool = False
+) -> ContentReindexJob:
     """
-    Reindex all published content for a company.
-    Returns (success_count, error_count).
+    Reindex published content in batches.
+
+    Items are read in id order, CMS_REINDEX_BATCH_SIZE at a time. Items with
+    no searchable text, or whose document (text, metadata and collection)
+    hashes the same as when last indexed, are skipped; the rest are embedded
+    in provider-sized batches concurrently and upserted with one Chroma call
+    per collection. The checkpoint is committed after every batch but never
+    moves past an item whose embedding or upsert failed: the run carries on,
+    ends as failed, and the next reindex of the same scope resumes from that
+    item unless ``restart`` is set.
+
+    Returns:
+        The reindex job with cumulative indexed/skipped/error counts
     """
+    job = _start_reindex_job(db, company_id, _reindex_scope(content_type_id, knowledge_base_id), restart)
+
     query = db.query(ContentItem).filter(
         and_(
             ContentItem.company_id == company_id,
             ContentItem.status == ContentStatus.PUBLISHED.value
         )
     )
-
+    if content_type_id:
+        query = query.filter(ContentItem.content_type_id == content_type_id)
     if knowledge_base_id:
         query = query.filter(ContentItem.knowledge_base_id == knowledge_base_id)
 
-    content_items = query.all()
+    content_types: Dict[int, Optional[ContentType]] = {}
+    kb_collections: Dict[int, Optional[str]] = {}
+    collections = {}
+    cursor = job.last_item_id
+    checkpoint_held = False
 
-    success_count = 0
-    error_count = 0
+    try:
+        chroma_client = get_company_chroma_client(company_id)
 
-    # Cache content types
-    content_types_cache = {}
+        with ThreadPoolExecutor(max_workers=settings.CMS_EMBED_CONCURRENCY, thread_name_prefix="cms-embed") as executor:
+            while True:
+                items = query.filter(ContentItem.id > cursor).order_by(
+                    ContentItem.id
+                ).limit(settings.CMS_REINDEX_BATCH_SIZE).all()
+                if not items:
+                    break
+
+                pending = []
+                retry_ids = set()  # failed to embed or upsert; worth another attempt
+                for item in items:
+                    if item.content_type_id not in content_types:
+                        content_types[item.content_type_id] = db.query(ContentType).filter(
+                            ContentType.id == item.content_type_id
+                        ).first()
+                    content_type = content_types[item.content_type_id]
+
+                    if content_type is None:
+                        job.error_count += 1
+                        continue
+                    document = _index_document(db, item, content_type, kb_collections)
+                    if not document:  # nothing searchable
+                        job.skipped_count += 1
+                    elif item.chroma_doc_id == document["doc_id"] and item.search_index_hash == document["hash"]:
+                        job.skipped_count += 1
+                    else:
+                        pending.append((item, document))
+
+                embeddings = _embed_in_batches([document["text"] for _, document in pending], executor)
+
+                by_collection: Dict[str, List[Tuple[ContentItem, Dict[str, Any], List[float]]]] = {}
+                for (item, document), embedding in zip(pending, embeddings):
+                    if embedding is None:
+                        job.error_count += 1
+                        retry_ids.add(item.id)
+                    else:
+                        by_collection.setdefault(document["collection_name"], []).append((item, document, embedding))
+
+                for collection_name, entries in by_collection.items():
+                    try:
+                        if collection_name not in collections:
+                            collections[collection_name] = _get_or_create_collection(chroma_client, collection_name)
+                        collections[collection_name].upsert(
+                            ids=[document["doc_id"] for _, document, _ in entries],
+                            embeddings=[embedding for _, _, embedding in entries],
+                            documents=[document["text"] for _, document, _ in entries],
+                            metadatas=[document["metadata"] for _, document, _ in entries]
+                        )
+                    except Exception as e:
+                        print(f"Error upserting {len(entries)} items to {collection_name}: {e}")
+                        job.error_count += len(entries)
+                        retry_ids.update(item.id for item, _, _ in entries)
+                        continue
+
+                    for item, document, _ in entries:
+                        item.chroma_doc_id = document["doc_id"]
+                        item.search_index_hash = document["hash"]
+                    job.indexed_count += len(entries)
+
+                # Checkpoint: up to the first item that has to be retried
+                cursor = items[-1].id
+                if not checkpoint_held:
+                    if retry_ids:
+                        first_retry = min(retry_ids)
+                        job.last_item_id = max((item.id for item in items if item.id < first_retry), default=job.last_item_id)
+                        checkpoint_held = True
+                    else:
+                        job.last_item_id = cursor
+                db.commit()
+
+        if checkpoint_held:
+            job.status = 'failed'  # resumable from the checkpoint
+        else:
+            job.status = 'completed'
+            job.completed_at = datetime.utcnow()
+        db.commit()
+        return job
 
-    for item in content_items:
-        try:
-            # Get content type (with caching)
-            if item.content_type_id not in content_types_cache:
-                content_type = db.query(ContentType).filter(
-                    ContentType.id == item.content_type_id
-                ).first()
-                content_types_cache[item.content_type_id] = content_type
-
-            content_type = content_types_cache[item.content_type_id]
-            if not content_type:
-                error_count += 1
-                continue
-
-            doc_id = index_content_item(db, item, content_type)
-            if doc_id:
-                item.chroma_doc_id = doc_id
-                success_count += 1
-            else:
-                error_count += 1
-        except Exception as e:
-            print(f"Error indexing item {item.id}: {e}")
-            error_count += 1
+    except Exception as e:
+        db.rollback()
+        job.status = 'failed'
+        db.commit()
+        raise ValueError(f"Reindex failed: {str(e)}")
 
-    db.commit()
-    return success_count, error_count
+
+def reindex_content_type(
+    db: Session,
+    content_type_id: int,
+    company_id: int,
+    restart: bool = False
+) -> ContentReindexJob:
+    """
+    Reindex all content items of a specific content type.
+    Returns the reindex job (see bulk_index_content).
+    """
+    content_type = db.query(ContentType).filter(
+        and_(
+            ContentType.id == content_type_id,
+            ContentType.company_id == company_id
+        )
+    ).first()
+
+    if not content_type:
+        raise ValueError("Content type not found")
+
+    return bulk_index_content(db, company_id, content_type_id=content_type_id, restart=restart)
+
+
+def reindex_all_content(
+    db: Session,
+    company_id: int,
+    knowledge_base_id: Optional[int] = None,
+    restart: bool = False
+) -> ContentReindexJob:
+    """
+    Reindex all published content for a company.
+    Returns the reindex job (see bulk_index_content).
+    """
+    return bulk_index_content(db, company_id, knowledge_base_id=knowledge_base_id, restart=restart)
@@ -0,0 +1,246 @@
+"""
+Code Execution Service
+Runs workflow code and data-manipulation nodes in a pool of warm worker processes.
+
+User code never runs in the API process: it gets no access to the live
+database session, and a runaway loop can't pin an event-loop executor
+thread. Each run is limited in CPU time and wall-clock time. A worker
+that doesn't give up by the deadline is killed and replaced; runs on the
+other workers carry on.
+
+Inputs and outputs cross the process boundary as JSON. Values that aren't
+JSON become strings, namespaces become dicts. Code nodes may still change
+the workflow context: the worker sends back the keys the code added,
+changed or removed, and they are applied to the caller's context.
+
+Workers (app.core.code_worker) cache compiled code by the SHA-256 of its
+source, so a node's code is compiled once per worker rather than once per run.
+"""
+import asyncio
+import hashlib
+import json
+import multiprocessing
+import queue
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Dict, List, Optional, Set
+
+from app.core.code_worker import ERROR_PREFIXES, dumps, worker_main
+from app.core.config import settings
+
+WORKER_START_TIMEOUT = 60.0  # Seconds a new worker process may take to start
+
+
+class _Worker:
+    """One worker process and the parent end of its pipe."""
+
+    def __init__(self, mp_context, cache_size: int, memory_mb: int):
+        self.conn, child_conn = mp_context.Pipe()
+        self.process = mp_context.Process(target=worker_main, args=(child_conn, cache_size, memory_mb), daemon=True)
+        self.process.start()
+        child_conn.close()
+        self.ready = False
+
+    def run(self, job: tuple, timeout: float) -> Optional[str]:
+        """
+        Send a job and wait for its result.
+
+        Returns:
+            The result JSON, or None if the worker didn't answer within ``timeout``
+
+        Raises:
+            EOFError, OSError: If the worker process died or never started
+        """
+        if not self.ready:
+            # Process start-up (interpreter and imports) doesn't count against the run's deadline
+            if not self.conn.poll(WORKER_START_TIMEOUT):
+                raise OSError("Worker process did not start")
+            self.conn.recv()
+            self.ready = True
+        self.conn.send(job)
+        if not self.conn.poll(timeout):
+            return None
+        return self.conn.recv()
+
+    def kill(self) -> None:
+        self.process.kill()
+        self.process.join(timeout=5)
+        self.conn.close()
+
+    def stop(self) -> None:
+        try:
+            self.conn.send(None)
+        except OSError:
+            pass
+        self.process.join(timeout=1)
+        if self.process.is_alive():
+            self.process.kill()
+        self.conn.close()
+
+
+class CodeExecutionPool:
+    """
+    Warm worker processes for code and data-manipulation nodes.
+
+    Each run is handed to one idle worker by a dispatch thread. A worker that
+    overruns its deadline or dies is killed and replaced on its own, so runs
+    on the other workers are unaffected. Workers are started with ``spawn``
+    (not fork) because the API process is multi-threaded.
+    """
+
+    def __init__(self, max_workers: int = 2, timeout: float = 10.0, cpu_seconds: float = 5.0,
+                 memory_mb: int = 0, cache_size: int = 256, kill_grace: float = 2.0, start_method: str = "spawn"):
+        self.max_workers = max_workers
+        self.timeout = timeout
+        self.cpu_seconds = cpu_seconds
+        self.memory_mb = memory_mb
+        self.cache_size = cache_size
+        self.kill_grace = kill_grace  # Extra seconds before a worker ignoring its limits is killed
+        self._mp_context = multiprocessing.get_context(start_method)
+        self._dispatch: Optional[ThreadPoolExecutor] = None
+        self._idle: "queue.SimpleQueue[Optional[_Worker]]" = queue.SimpleQueue()
+        self._workers: Set[_Worker] = set()
+        self._lock = threading.Lock()
+        self.restarts = 0
+        self._stats = {kind: {"runs": 0, "errors": 0, "timeouts": 0, "total_ms": 0.0, "max_ms": 0.0} for kind in ERROR_PREFIXES}
+
+    def _get_dispatch(self) -> ThreadPoolExecutor:
+        with self._lock:
+            if self._dispatch is None:
+                # One dispatch thread per worker slot, so a slot is always free for a thread
+                self._idle = queue.SimpleQueue()
+                for _ in range(self.max_workers):
+                    self._idle.put(None)  # Started on first use
+                self._dispatch = ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix="code-node")
+            return self._dispatch
+
+    def _start_worker(self) -> _Worker:
+        worker = _Worker(self._mp_context, self.cache_size, self.memory_mb)
+        with self._lock:
+            self._workers.add(worker)
+        return worker
+
+    def _discard_worker(self, worker: _Worker) -> None:
+        with self._lock:
+            self._workers.discard(worker)
+            self.restarts += 1
+        worker.kill()
+
+    def prewarm(self) -> None:
+        """Start the worker processes now rather than on the first node run."""
+        self._get_dispatch()
+        slots = [self._idle.get() for _ in range(self.max_workers)]
+        for worker in slots:
+            self._idle.put(worker if worker is not None else self._start_worker())
+
+    def _execute(self, kind: str, job: tuple) -> dict:
+        """Run a job on an idle worker (in a dispatch thread)."""
+        idle = self._idle
+        worker = idle.get()
+        if worker is None or not worker.process.is_alive():
+            worker = self._start_worker()
+        try:
+            output = worker.run(job, self.timeout + self.kill_grace)
+            result = json.loads(output) if output is not None else {
+                "error": f"{ERROR_PREFIXES[kind]}: Time limit exceeded", "timeout": True
+            }
+        except (EOFError, OSError):
+            output = None
+            result = {"error": f"{ERROR_PREFIXES[kind]}: Worker process exited unexpectedly"}
+        if output is None:
+            # Only this run's worker is replaced
+            self._discard_worker(worker)
+            worker = None
+        idle.put(worker)
+        return result
+
+    async def _run(self, kind: str, source: str, inputs: dict) -> dict:
+        payload = dumps(inputs)
+        digest = hashlib.sha256(source.encode("utf-8")).hexdigest()
+        job = (kind, source, digest, payload, self.cpu_seconds, self.timeout)
+
+        started = time.perf_counter()
+        result = await asyncio.get_running_loop().run_in_executor(self._get_dispatch(), self._execute, kind, job)
+        duration_ms = round((time.perf_counter() - started) * 1000, 3)
+        result["duration_ms"] = duration_ms
+
+        stats = self._stats[kind]
+        stats["runs"] += 1
+        stats["errors"] += int("error" in result)
+        stats["timeouts"] += int(bool(result.pop("timeout", False)))
+        stats["total_ms"] += duration_ms
+        stats["max_ms"] = max(stats["max_ms"], duration_ms)
+        return result
+
+    async def evaluate(self, expression: str, context: dict, results: dict) -> dict:
+        """
+        Evaluate a data-manipulation expression (no builtins).
+
+        Returns:
+            {"output": value} or {"error": message}, plus "duration_ms"
+        """
+        return await self._run("expression", expression, {"context": context, "results": results})
+
+    async def run_code(self, code: str, context: dict, results: dict, args: Dict[str, Any],
+                       arg_names: List[str], return_variables: List[str]) -> dict:
+        """
+        Execute a code node and apply its context changes to ``context``.
+
+        Args:
+            code: Python source; a defined function is auto-called with ``args``
+            context: Workflow context (updated in place)
+            results: Results of the nodes run so far
+            args: Resolved arguments, also available as variables
+            arg_names: Argument order for the auto-call
+            return_variables: Variables collected into the output
+
+        Returns:
+            {"output": value} or {"error": message, "traceback": text}, plus "duration_ms"
+        """
+        result = await self._run("code", code, {
+            "context": context,
+            "results": results,
+            "args": args,
+            "arg_names": arg_names,
+            "return_variables": return_variables,
+        })
+        for key in result.pop("context_removed", []):
+            context.pop(key, None)
+        context.update(result.pop("context_updates", {}))
+        return result
+
+    def stats(self) -> dict:
+        return {
+            "max_workers": self.max_workers,
+            "restarts": self.restarts,
+            **{
+                kind: {
+                    "runs": stats["runs"],
+                    "errors": stats["errors"],
+                    "timeouts": stats["timeouts"],
+                    "avg_ms": round(stats["total_ms"] / stats["runs"], 3) if stats["runs"] else 0.0,
+                    "max_ms": stats["max_ms"],
+                }
+                for kind, stats in self._stats.items()
+            },
+        }
+
+    def shutdown(self):
+        with self._lock:
+            dispatch, self._dispatch = self._dispatch, None
+            workers, self._workers = list(self._workers), set()
+        if dispatch is not None:
+            dispatch.shutdown(wait=False, cancel_futures=True)
+        for worker in workers:
+            worker.stop()
+
+
+# Global instance shared by workflow executions in this worker
+code_executor = CodeExecutionPool(
+    max_workers=settings.CODE_NODE_WORKERS,
+    timeout=settings.CODE_NODE_TIMEOUT,
+    cpu_seconds=settings.CODE_NODE_CPU_SECONDS,
+    memory_mb=settings.CODE_NODE_MEMORY_MB,
+    cache_size=settings.CODE_NODE_CACHE_SIZE,
+)
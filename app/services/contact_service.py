@@ -1,5 +1,6 @@
 from sqlalchemy.orm import Session
-from sqlalchemy import and_, or_
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy import and_, or_, select
 from typing import List, Optional
 from app.models import contact as models_contact, chat_message as models_chat_message
 from app.models.tag import contact_tags, Tag
@@ -58,16 +59,16 @@ def update_contact(db: Session, contact_id: int, contact: schemas_contact.Contac
     return db_contact
 
 
-def _link_channel_to_contact(
-    db: Session,
+def _apply_channel_link(
     contact: models_contact.Contact,
     attribute_key: str,
     channel_identifier: str,
     is_phone_channel: bool
-) -> models_contact.Contact:
+) -> bool:
     """
     Links a channel to an existing contact by updating custom_attributes.
     Also updates phone_number if this is a phone-based channel and not already set.
+    Returns True when the contact was changed.
     """
     needs_update = False
 
@@ -88,46 +89,30 @@ def _link_channel_to_contact(
         contact.phone_number = channel_identifier
         needs_update = True
 
-    if needs_update:
-        db.commit()
-        db.refresh(contact)
-
-    return contact
+    return needs_update
 
 
-def get_or_create_contact_for_channel(
+def _link_channel_to_contact(
     db: Session,
-    company_id: int,
-    channel: str,
+    contact: models_contact.Contact,
+    attribute_key: str,
     channel_identifier: str,
-    name: str = None,
-    email: str = None
-):
-    """
-    Finds a contact using cascading lookup, or creates one if none exists.
-    This is the central function for handling contacts from different platforms.
+    is_phone_channel: bool
+) -> models_contact.Contact:
+    if _apply_channel_link(contact, attribute_key, channel_identifier, is_phone_channel):
+        db.commit()
+        db.refresh(contact)
 
-    Implements contact deduplication across channels by checking multiple identifiers
-    in priority order:
-    1. Channel-specific ID (e.g., custom_attributes['whatsapp_id'])
-    2. Phone number (for phone-based channels like WhatsApp, Twilio Voice, FreeSWITCH)
-    3. Email (if provided)
+    return contact
 
-    If a match is found:
-    - Returns the existing contact
-    - Updates custom_attributes[{channel}_id] if not already set (links channel to contact)
-    - Updates phone_number if it's a phone channel and phone was not set
 
-    Args:
-        db: The database session.
-        company_id: The ID of the company.
-        channel: The name of the channel (e.g., 'whatsapp', 'messenger', 'telegram').
-        channel_identifier: The unique ID for the user on that channel (e.g., phone number, PSID).
-        name: The contact's name, if available.
-        email: The contact's email, if available (used for additional matching).
+def _channel_contact_lookup(company_id: int, channel: str, channel_identifier: str, email: str = None):
+    """
+    Channel config and the cascading lookup statement shared by the sync and
+    async get-or-create functions.
 
     Returns:
-        The existing or newly created contact object.
+        (attribute_key, is_phone_channel, select statement)
     """
     # Get channel configuration (with fallback for unknown channels)
     config = CHANNEL_CONFIG.get(channel, {
@@ -155,17 +140,14 @@ def get_or_create_contact_for_channel(
             models_contact.Contact.email == email
         )
 
-    # Execute single query with OR conditions
-    contact = db.query(models_contact.Contact).filter(
+    stmt = select(models_contact.Contact).where(
         models_contact.Contact.company_id == company_id,
         or_(*lookup_conditions)
-    ).first()
+    ).limit(1)
+    return attribute_key, is_phone_channel, stmt
 
-    if contact:
-        # Link this channel to existing contact if not already set
-        return _link_channel_to_contact(db, contact, attribute_key, channel_identifier, is_phone_channel)
 
-    # No match found - create new contact
+def _new_channel_contact(company_id: int, attribute_key: str, is_phone_channel: bool, channel_identifier: str, name: str = None, email: str = None) -> models_contact.Contact:
     contact_details = {
         "custom_attributes": {attribute_key: channel_identifier},
         "company_id": company_id
@@ -179,5 +161,82 @@ def get_or_create_contact_for_channel(
         contact_details["phone_number"] = channel_identifier
 
     new_contact_schema = schemas_contact.ContactCreate(**contact_details)
-    return create_contact(db, contact=new_contact_schema, company_id=company_id)
+    return models_contact.Contact(**new_contact_schema.model_dump(), company_id=company_id)
+
+
+def get_or_create_contact_for_channel(
+    db: Session,
+    company_id: int,
+    channel: str,
+    channel_identifier: str,
+    name: str = None,
+    email: str = None
+):
+    """
+    Finds a contact using cascading lookup, or creates one if none exists.
+    This is the central function for handling contacts from different platforms.
+
+    Implements contact deduplication across channels by checking multiple identifiers
+    in priority order:
+    1. Channel-specific ID (e.g., custom_attributes['whatsapp_id'])
+    2. Phone number (for phone-based channels like WhatsApp, Twilio Voice, FreeSWITCH)
+    3. Email (if provided)
+
+    If a match is found:
+    - Returns the existing contact
+    - Updates custom_attributes[{channel}_id] if not already set (links channel to contact)
+    - Updates phone_number if it's a phone channel and phone was not set
+
+    Args:
+        db: The database session.
+        company_id: The ID of the company.
+        channel: The name of the channel (e.g., 'whatsapp', 'messenger', 'telegram').
+        channel_identifier: The unique ID for the user on that channel (e.g., phone number, PSID).
+        name: The contact's name, if available.
+        email: The contact's email, if available (used for additional matching).
+
+    Returns:
+        The existing or newly created contact object.
+    """
+    attribute_key, is_phone_channel, stmt = _channel_contact_lookup(company_id, channel, channel_identifier, email)
+
+    # Execute single query with OR conditions
+    contact = db.execute(stmt).scalars().first()
+
+    if contact:
+        # Link this channel to existing contact if not already set
+        return _link_channel_to_contact(db, contact, attribute_key, channel_identifier, is_phone_channel)
+
+    # No match found - create new contact
+    db_contact = _new_channel_contact(company_id, attribute_key, is_phone_channel, channel_identifier, name, email)
+    db.add(db_contact)
+    db.commit()
+    db.refresh(db_contact)
+    return db_contact
+
+
+async def get_or_create_contact_for_channel_async(
+    db: AsyncSession,
+    company_id: int,
+    channel: str,
+    channel_identifier: str,
+    name: str = None,
+    email: str = None
+):
+    """Async variant of get_or_create_contact_for_channel (same cascading lookup)."""
+    attribute_key, is_phone_channel, stmt = _channel_contact_lookup(company_id, channel, channel_identifier, email)
+
+    contact = (await db.execute(stmt)).scalars().first()
+
+    if contact:
+        if _apply_channel_link(contact, attribute_key, channel_identifier, is_phone_channel):
+            await db.commit()
+            await db.refresh(contact)
+        return contact
+
+    db_contact = _new_channel_contact(company_id, attribute_key, is_phone_channel, channel_identifier, name, email)
+    db.add(db_contact)
+    await db.commit()
+    await db.refresh(db_contact)
+    return db_contact
 
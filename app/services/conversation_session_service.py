@@ -1,5 +1,6 @@
 from sqlalchemy.orm import Session
-from sqlalchemy import and_
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy import and_, select
 from app.models.conversation_session import ConversationSession
 from app.models.chat_message import ChatMessage
 from app.schemas.conversation_session import ConversationSessionCreate, ConversationSessionUpdate
@@ -128,6 +129,32 @@ def get_or_create_session(db: Session, conversation_id: str, workflow_id: int, c
         return new_session
 
 
+async def get_or_create_session_async(db: AsyncSession, conversation_id: str, workflow_id: int, contact_id: int, channel: str, company_id: int, agent_id: int = None):
+    """Async variant of get_or_create_session."""
+    session = await get_session_by_conversation_id_async(db, conversation_id, company_id)
+
+    if session:
+        # If the session exists but has no workflow_id, update it.
+        if session.workflow_id is None and workflow_id is not None:
+            session.workflow_id = workflow_id
+            await db.commit()
+            await db.refresh(session)
+        return session
+
+    new_session = ConversationSession(
+        conversation_id=conversation_id,
+        workflow_id=workflow_id,
+        contact_id=contact_id,
+        channel=channel,
+        company_id=company_id,
+        agent_id=agent_id,
+        status='active'
+    )
+    db.add(new_session)
+    await db.commit()
+    await db.refresh(new_session)
+    return new_session
+
 def toggle_ai_for_session(db: Session, conversation_id: str, company_id: int, is_enabled: bool) -> ConversationSession:
     """
     Updates the is_ai_enabled flag for a specific conversation session.
@@ -150,6 +177,15 @@ def get_session_by_conversation_id(db: Session, conversation_id: str, company_id
         ConversationSession.company_id == company_id
     ).first()
 
+async def get_session_by_conversation_id_async(db: AsyncSession, conversation_id: str, company_id: int):
+    result = await db.execute(
+        select(ConversationSession).where(
+            ConversationSession.conversation_id == conversation_id,
+            ConversationSession.company_id == company_id
+        )
+    )
+    return result.scalars().first()
+
 def get_session_by_contact_and_channel(db: Session, contact_id: int, channel: str, company_id: int):
     """
     Find an existing session by contact_id and channel.
@@ -177,6 +213,49 @@ def update_session_context(db: Session, conversation_id: str, context: dict) ->
 
     return db_session
 
+def _apply_connection_status(db_session: ConversationSession, is_connected: bool):
+    """Set the connection flag (and status for non-assigned sessions). Returns the previous values."""
+    old_connection_status = db_session.is_client_connected
+    old_status = db_session.status
+
+    # Always update the connection field
+    db_session.is_client_connected = is_connected
+
+    # Only update status if the session is not resolved, completed, closed, or assigned
+    if db_session.status not in ['resolved', 'completed', 'closed', 'assigned']:
+        new_status = 'active' if is_connected else 'inactive'
+        db_session.status = new_status
+
+    return old_connection_status, old_status
+
+
+async def _broadcast_connection_status(db_session: ConversationSession, conversation_id: str, is_connected: bool, old_connection_status, old_status):
+    from app.services.connection_manager import manager
+    import json
+
+    if old_connection_status == is_connected and old_status == db_session.status:
+        return
+
+    # Log the change
+    print(f"[conversation_session_service] Updated session {conversation_id}:")
+    print(f"  - Connection: {old_connection_status} -> {is_connected}")
+    print(f"  - Status: {old_status} -> {db_session.status}")
+
+    # Broadcast connection status change to all connected agents in the company
+    status_update_message = json.dumps({
+        "type": "session_status_update",
+        "session_id": conversation_id,
+        "status": db_session.status,
+        "assignee_id": db_session.assignee_id,
+        "is_client_connected": is_connected,
+        "updated_at": db_session.updated_at.isoformat()
+    })
+
+    # Broadcast to company WebSocket channel
+    if db_session.company_id:
+        await manager.broadcast(status_update_message, str(db_session.company_id))
+
+
 async def update_session_connection_status(db: Session, conversation_id: str, is_connected: bool) -> ConversationSession:
     """
     Updates the session connection state and status based on client connection.
@@ -184,48 +263,35 @@ async def update_session_connection_status(db: Session, conversation_id: str, is
     - For non-assigned sessions: sets status to 'active' if connected, 'inactive' if disconnected
     - For assigned sessions: keeps status as 'assigned', only updates is_client_connected
     """
-    from app.services.connection_manager import manager
-    import json
-
     db_session = db.query(ConversationSession).filter(
         ConversationSession.conversation_id == conversation_id
     ).first()
 
     if db_session:
-        old_connection_status = db_session.is_client_connected
-        old_status = db_session.status
-
-        # Always update the connection field
-        db_session.is_client_connected = is_connected
-
-        # Only update status if the session is not resolved, completed, closed, or assigned
-        if db_session.status not in ['resolved', 'completed', 'closed', 'assigned']:
-            new_status = 'active' if is_connected else 'inactive'
-            db_session.status = new_status
+        old_connection_status, old_status = _apply_connection_status(db_session, is_connected)
 
         # Commit changes
         db.commit()
         db.refresh(db_session)
 
-        # Log the change
-        if old_connection_status != is_connected or old_status != db_session.status:
-            print(f"[conversation_session_service] Updated session {conversation_id}:")
-            print(f"  - Connection: {old_connection_status} -> {is_connected}")
-            print(f"  - Status: {old_status} -> {db_session.status}")
-
-            # Broadcast connection status change to all connected agents in the company
-            status_update_message = json.dumps({
-                "type": "session_status_update",
-                "session_id": conversation_id,
-                "status": db_session.status,
-                "assignee_id": db_session.assignee_id,
-                "is_client_connected": is_connected,
-                "updated_at": db_session.updated_at.isoformat()
-            })
-
-            # Broadcast to company WebSocket channel
-            if db_session.company_id:
-                await manager.broadcast(status_update_message, str(db_session.company_id))
+        await _broadcast_connection_status(db_session, conversation_id, is_connected, old_connection_status, old_status)
+
+    return db_session
+
+
+async def update_session_connection_status_async(db: AsyncSession, conversation_id: str, is_connected: bool) -> ConversationSession:
+    """Async variant of update_session_connection_status."""
+    result = await db.execute(
+        select(ConversationSession).where(ConversationSession.conversation_id == conversation_id)
+    )
+    db_session = result.scalars().first()
+
+    if db_session:
+        old_connection_status, old_status = _apply_connection_status(db_session, is_connected)
+        await db.commit()
+        await db.refresh(db_session)
+
+        await _broadcast_connection_status(db_session, conversation_id, is_connected, old_connection_status, old_status)
 
     return db_session
 
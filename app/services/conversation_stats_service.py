@@ -0,0 +1,125 @@
+"""
+Conversation Stats Service
+Reads the per-company conversation counters maintained by the
+ConversationSession flush hooks in ``app.models.conversation_stats``.
+"""
+import datetime
+from typing import Any, Dict, Optional
+
+from sqlalchemy import case, func
+from sqlalchemy.orm import Session
+
+from app.models.conversation_session import ConversationSession
+from app.models.conversation_stats import CLOSED_STATUSES, COUNTER_COLUMNS, ConversationStats
+
+
+def get_company_stats(db: Session, company_id: int) -> Optional[ConversationStats]:
+    return db.query(ConversationStats).filter(ConversationStats.company_id == company_id).first()
+
+
+def get_session_counts(db: Session, company_id: int) -> Dict[str, int]:
+    """Open/resolved/all counts for the inbox badge (single primary-key read)."""
+    stats = get_company_stats(db, company_id)
+    if not stats:
+        return {"open": 0, "resolved": 0, "all": 0, "unattended": 0, "waiting_for_agent": 0}
+
+    return {
+        "open": stats.open_count,
+        "resolved": stats.closed_count,
+        "all": stats.total_count,
+        "unattended": stats.unattended_count,
+        "waiting_for_agent": stats.waiting_for_agent_count,
+    }
+
+
+def _reopen_analytics(reopened: int, reopen_events: int, total: int, delay_seconds: float, delay_samples: int) -> Dict[str, Any]:
+    avg_reopen_count = reopen_events / reopened if reopened else 0
+    avg_time_to_reopen = delay_seconds / delay_samples if delay_samples else 0
+    reopen_rate = (reopened / total * 100) if total > 0 else 0
+
+    return {
+        "total_conversations_reopened": reopened,
+        "total_reopen_events": reopen_events,
+        "average_reopens_per_conversation": round(avg_reopen_count, 2),
+        "average_time_to_reopen_hours": round(avg_time_to_reopen / 3600, 2) if avg_time_to_reopen > 0 else 0,
+        "reopen_rate_percentage": round(reopen_rate, 2),
+    }
+
+
+def get_reopen_analytics(
+    db: Session,
+    company_id: int,
+    start_datetime: Optional[datetime.datetime] = None,
+    end_datetime: Optional[datetime.datetime] = None,
+) -> Dict[str, Any]:
+    """
+    Conversation reopen analytics.
+
+    Without a date range this is served from the counters row. With a range,
+    the numbers are aggregated in SQL: reopened sessions are filtered by
+    ``last_reopened_at`` and the total by ``created_at``, as before.
+    """
+    if not start_datetime and not end_datetime:
+        stats = get_company_stats(db, company_id)
+        if not stats:
+            return _reopen_analytics(0, 0, 0, 0.0, 0)
+        return _reopen_analytics(
+            stats.reopened_count, stats.reopen_events, stats.total_count,
+            stats.reopen_delay_seconds, stats.reopen_delay_samples,
+        )
+
+    has_delay = ConversationSession.resolved_at.isnot(None) & ConversationSession.last_reopened_at.isnot(None)
+    delay_seconds = func.extract('epoch', ConversationSession.last_reopened_at - ConversationSession.resolved_at)
+
+    reopen_query = db.query(
+        func.count(ConversationSession.id),
+        func.coalesce(func.sum(ConversationSession.reopen_count), 0),
+        func.coalesce(func.sum(case((has_delay, delay_seconds), else_=0)), 0),
+        func.coalesce(func.sum(case((has_delay, 1), else_=0)), 0),
+    ).filter(
+        ConversationSession.company_id == company_id,
+        ConversationSession.reopen_count > 0
+    )
+    total_query = db.query(func.count(ConversationSession.id)).filter(
+        ConversationSession.company_id == company_id
+    )
+    if start_datetime:
+        reopen_query = reopen_query.filter(ConversationSession.last_reopened_at >= start_datetime)
+        total_query = total_query.filter(ConversationSession.created_at >= start_datetime)
+    if end_datetime:
+        reopen_query = reopen_query.filter(ConversationSession.last_reopened_at <= end_datetime)
+        total_query = total_query.filter(ConversationSession.created_at <= end_datetime)
+
+    reopened, reopen_events, delay_total, delay_samples = reopen_query.one()
+    return _reopen_analytics(
+        reopened, int(reopen_events), total_query.scalar() or 0, float(delay_total), int(delay_samples)
+    )
+
+
+def rebuild_company_stats(db: Session, company_id: int) -> ConversationStats:
+    """
+    Recompute a company's counters from its sessions (repairs drift from
+    writes that bypassed the ORM, e.g. bulk updates or manual SQL).
+    """
+    is_closed = ConversationSession.status.in_(CLOSED_STATUSES)
+    is_waiting = ConversationSession.waiting_for_agent == True
+    has_delay = ConversationSession.resolved_at.isnot(None) & ConversationSession.last_reopened_at.isnot(None)
+
+    row = db.query(
+        func.count(ConversationSession.id),
+        func.sum(case((is_closed, 1), else_=0)),
+        func.sum(case((~is_closed & (ConversationSession.assignee_id.is_(None) | is_waiting), 1), else_=0)),
+        func.sum(case((~is_closed & is_waiting, 1), else_=0)),
+        func.sum(case((ConversationSession.reopen_count > 0, 1), else_=0)),
+        func.sum(ConversationSession.reopen_count),
+        func.sum(case((has_delay, func.extract('epoch', ConversationSession.last_reopened_at - ConversationSession.resolved_at)), else_=0)),
+        func.sum(case((has_delay, 1), else_=0)),
+    ).filter(ConversationSession.company_id == company_id).one()
+
+    stats = get_company_stats(db, company_id) or ConversationStats(company_id=company_id)
+    for column, value in zip(COUNTER_COLUMNS, row):
+        setattr(stats, column, float(value or 0) if column == 'reopen_delay_seconds' else int(value or 0))
+    db.add(stats)
+    db.commit()
+    db.refresh(stats)
+    return stats
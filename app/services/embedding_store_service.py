@@ -0,0 +1,145 @@
+"""
+Embedding Store Service
+Dense float32 embedding matrices with single-product top-k search.
+
+Rows are L2-normalized when stored, so cosine similarity against a query is
+one matrix-vector product, and the best k rows come from ``argpartition``
+rather than a full sort.
+
+``KnowledgeBaseEmbeddingStore`` keeps one matrix per knowledge base for the
+legacy (non-Chroma, non-FAISS) path: ``{company_id}/{kb_id}.npy`` plus the
+chunk texts in ``{kb_id}.chunks.json`` under KB_EMBEDDING_DIR. Matrices are
+memory-mapped by default, so large knowledge bases are paged in by the OS
+instead of being read into each worker.
+"""
+import json
+import os
+import threading
+from collections import OrderedDict
+from typing import List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from app.core.config import settings
+
+
+def normalize_rows(vectors) -> np.ndarray:
+    """float32 copy of ``vectors`` with every row scaled to unit length (zero rows stay zero)."""
+    matrix = np.asarray(vectors, dtype=np.float32)
+    if matrix.ndim == 1:
+        matrix = matrix.reshape(1, -1)
+    norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+    norms[norms == 0] = 1.0
+    return matrix / norms
+
+
+def top_k(matrix: np.ndarray, query, k: int) -> List[Tuple[int, float]]:
+    """
+    Rank the rows of a normalized matrix by cosine similarity to ``query``.
+
+    Returns:
+        Up to ``k`` (row index, similarity) pairs, best first
+    """
+    if k <= 0 or len(matrix) == 0:
+        return []
+    scores = matrix @ normalize_rows(query)[0]
+    if k < len(scores):
+        best = np.argpartition(-scores, k - 1)[:k]
+    else:
+        best = np.arange(len(scores))
+    best = best[np.argsort(-scores[best], kind="stable")]
+    return [(int(row), float(scores[row])) for row in best]
+
+
+class KnowledgeBaseEmbeddingStore:
+    """Per-knowledge-base embedding matrices on disk, LRU-cached per worker."""
+
+    def __init__(self, base_dir: str, mmap: bool = True, cache_size: int = 64):
+        self.base_dir = base_dir
+        self.mmap = mmap
+        self.cache_size = cache_size
+        self._cache: "OrderedDict[str, Tuple[float, np.ndarray, List[str]]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def _paths(self, company_id: int, knowledge_base_id: int) -> Tuple[str, str]:
+        stem = os.path.join(self.base_dir, str(company_id), str(knowledge_base_id))
+        return f"{stem}.npy", f"{stem}.chunks.json"
+
+    def save(self, company_id: int, knowledge_base_id: int, chunks: Sequence[str], embeddings) -> None:
+        """Replace a knowledge base's chunks and their embeddings (one row per chunk)."""
+        matrix_path, chunks_path = self._paths(company_id, knowledge_base_id)
+        os.makedirs(os.path.dirname(matrix_path), exist_ok=True)
+        matrix = normalize_rows(embeddings) if len(chunks) else np.zeros((0, 0), dtype=np.float32)
+
+        # Chunks first: a reader that sees the new matrix also finds its texts
+        with open(f"{chunks_path}.tmp", "w", encoding="utf-8") as f:
+            json.dump(list(chunks), f, ensure_ascii=False)
+        os.replace(f"{chunks_path}.tmp", chunks_path)
+        with open(f"{matrix_path}.tmp", "wb") as f:
+            np.save(f, matrix)
+        os.replace(f"{matrix_path}.tmp", matrix_path)
+        self._forget(matrix_path)
+
+    def load(self, company_id: int, knowledge_base_id: int) -> Optional[Tuple[np.ndarray, List[str]]]:
+        """The knowledge base's (matrix, chunks), or None if it has none stored."""
+        matrix_path, chunks_path = self._paths(company_id, knowledge_base_id)
+        try:
+            mtime = os.path.getmtime(matrix_path)
+        except OSError:
+            return None
+
+        with self._lock:
+            entry = self._cache.get(matrix_path)
+            if entry and entry[0] == mtime:
+                self._cache.move_to_end(matrix_path)
+                return entry[1], entry[2]
+
+        try:
+            matrix = np.load(matrix_path, mmap_mode="r" if self.mmap else None)
+            with open(chunks_path, encoding="utf-8") as f:
+                chunks = json.load(f)
+        except Exception as e:
+            print(f"Error loading embeddings for knowledge base {knowledge_base_id}: {e}")
+            return None
+
+        with self._lock:
+            self._cache[matrix_path] = (mtime, matrix, chunks)
+            self._cache.move_to_end(matrix_path)
+            while len(self._cache) > self.cache_size:
+                self._cache.popitem(last=False)
+        return matrix, chunks
+
+    def exists(self, company_id: int, knowledge_base_id: int) -> bool:
+        return os.path.exists(self._paths(company_id, knowledge_base_id)[0])
+
+    def search(self, company_id: int, knowledge_base_id: int, query_embedding, k: int) -> List[Tuple[str, float]]:
+        """
+        Find a knowledge base's chunks most similar to a query embedding.
+
+        Returns:
+            Up to ``k`` (chunk text, cosine similarity) pairs, best first
+        """
+        loaded = self.load(company_id, knowledge_base_id)
+        if loaded is None:
+            return []
+        matrix, chunks = loaded
+        return [(chunks[row], score) for row, score in top_k(matrix, query_embedding, k)]
+
+    def delete(self, company_id: int, knowledge_base_id: int) -> None:
+        matrix_path, chunks_path = self._paths(company_id, knowledge_base_id)
+        self._forget(matrix_path)
+        for path in (matrix_path, chunks_path):
+            if os.path.exists(path):
+                os.remove(path)
+
+    def _forget(self, matrix_path: str) -> None:
+        with self._lock:
+            self._cache.pop(matrix_path, None)
+
+
+# Global instance for legacy knowledge base embeddings
+kb_embedding_store = KnowledgeBaseEmbeddingStore(
+    base_dir=settings.KB_EMBEDDING_DIR,
+    mmap=settings.KB_EMBEDDING_MMAP,
+    cache_size=settings.KB_EMBEDDING_CACHE_SIZE,
+)
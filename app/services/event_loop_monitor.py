@@ -0,0 +1,77 @@
+import asyncio
+import time
+from collections import deque
+import logging
+
+logger = logging.getLogger(__name__)
+
+
+class EventLoopLagMonitor:
+    """
+    Background service that measures event-loop lag.
+
+    Sleeps for a fixed interval and records how late it wakes up. Any blocking
+    work on the loop (ORM queries, audio transcoding, large JSON encoding)
+    shows up directly as lag.
+    """
+
+    def __init__(self, interval: float = 0.5, window: int = 600, warn_threshold_ms: float = 200.0):
+        """
+        Initialize the event loop lag monitor
+
+        Args:
+            interval: Seconds between samples
+            window: Number of recent samples kept for percentiles
+            warn_threshold_ms: Lag above which a warning is logged
+        """
+        self.interval = interval
+        self.warn_threshold_ms = warn_threshold_ms
+        self.samples = deque(maxlen=window)
+        self.max_lag_ms = 0.0
+        self.sample_count = 0
+        self.is_running = False
+
+    def record(self, lag_ms: float):
+        self.samples.append(lag_ms)
+        self.sample_count += 1
+        self.max_lag_ms = max(self.max_lag_ms, lag_ms)
+        if lag_ms > self.warn_threshold_ms:
+            logger.warning(f"Event loop lag {lag_ms:.1f}ms exceeded {self.warn_threshold_ms:.0f}ms")
+
+    def stats(self) -> dict:
+        """Return lag statistics over the recent window (milliseconds)."""
+        if not self.samples:
+            return {"samples": 0, "avg_ms": 0.0, "p50_ms": 0.0, "p99_ms": 0.0, "window_max_ms": 0.0, "max_ms": 0.0}
+        ordered = sorted(self.samples)
+
+        def percentile(p: float) -> float:
+            return round(ordered[min(len(ordered) - 1, int(p * len(ordered)))], 3)
+
+        return {
+            "samples": self.sample_count,
+            "avg_ms": round(sum(ordered) / len(ordered), 3),
+            "p50_ms": percentile(0.50),
+            "p99_ms": percentile(0.99),
+            "window_max_ms": round(ordered[-1], 3),
+            "max_ms": round(self.max_lag_ms, 3),
+        }
+
+    async def start(self):
+        """Start sampling event loop lag"""
+        self.is_running = True
+        logger.info(f"Event loop lag monitor started (interval: {self.interval}s)")
+
+        while self.is_running:
+            started = time.perf_counter()
+            await asyncio.sleep(self.interval)
+            lag_ms = max(0.0, (time.perf_counter() - started - self.interval) * 1000)
+            self.record(lag_ms)
+
+    def stop(self):
+        """Stop the background service"""
+        self.is_running = False
+        logger.info("Event loop lag monitor stopped")
+
+
+# Global instance
+event_loop_monitor = EventLoopLagMonitor()
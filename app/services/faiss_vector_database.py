@@ -200,6 +200,45 @@ class VectorDatabase:
             logger.error(f"Failed to add documents: {str(e)}")
             return False
     
+    def add_embeddings(
+        self,
+        texts: List[str],
+        embeddings: List[List[float]],
+        metadatas: Optional[List[Dict[str, Any]]] = None
+    ) -> bool:
+        """
+        Add texts with precomputed embeddings, creating the index if needed
+
+        Args:
+            texts: Texts to add
+            embeddings: One embedding per text
+            metadatas: Optional metadata per text
+
+        Returns:
+            True if successful, False otherwise
+        """
+        if not texts:
+            logger.warning("No texts provided to add")
+            return False
+
+        try:
+            text_embeddings = list(zip(texts, embeddings))
+            if not self.vectorstore:
+                self.vectorstore = FAISS.from_embeddings(
+                    text_embeddings=text_embeddings,
+                    embedding=self.embeddings,
+                    metadatas=metadatas
+                )
+            else:
+                self.vectorstore.add_embeddings(text_embeddings=text_embeddings, metadatas=metadatas)
+
+            logger.debug(f"Added {len(texts)} embedded texts to index")
+            return True
+
+        except Exception as e:
+            logger.error(f"Failed to add embeddings: {str(e)}")
+            return False
+
     def similarity_search(
         self,
         query: str,
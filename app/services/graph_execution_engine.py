@@ -1,33 +1,28 @@
 
-import json
-from collections import deque
+from app.services.workflow_plan_service import WorkflowPlan
 
 class GraphExecutionEngine:
-    def __init__(self, workflow_data):
-        # Handle None or empty workflow_data
-        if workflow_data is None:
-            workflow_data = {}
-
-        self.nodes = {node['id']: node for node in workflow_data.get('nodes', [])}
-        self.edges = workflow_data.get('edges', [])
-        self.adjacency_list = self._build_adjacency_list()
-
-    def _build_adjacency_list(self):
-        adj = {node_id: [] for node_id in self.nodes}
-        for edge in self.edges:
-            source, target = edge['source'], edge['target']
-            adj[source].append(target)
-        return adj
+    def __init__(self, workflow_data, plan: WorkflowPlan = None):
+        # A precompiled plan (see workflow_plan_service) skips re-deriving the graph
+        if plan is None:
+            # Handle None or empty workflow_data
+            plan = WorkflowPlan(None, None, workflow_data or {})
+
+        self.plan = plan
+        self.nodes = plan.nodes
+        self.edges = plan.edges
+        self.adjacency_list = plan.adjacency_list
+
+    @classmethod
+    def from_plan(cls, plan: WorkflowPlan):
+        return cls(None, plan=plan)
 
     def find_start_node(self):
-        in_degrees = {node_id: 0 for node_id in self.nodes}
-        for edge in self.edges:
-            in_degrees[edge['target']] += 1
-        
-        start_nodes = [node_id for node_id, degree in in_degrees.items() if degree == 0]
-        # In a valid workflow, there should be exactly one start node.
-        # We can add more robust error handling here later.
-        return start_nodes[0] if start_nodes else None
+        return self.plan.start_node_id
+
+    def get_fan_out(self, node_id):
+        """The fan-out whose first branch starts at ``node_id``, if any (see WorkflowPlan.fan_outs)."""
+        return self.plan.fan_outs.get(node_id)
 
     def get_next_node(self, current_node_id, result):
         print(f"DEBUG: [GraphEngine] get_next_node called for node '{current_node_id}'.")
@@ -61,11 +56,11 @@ class GraphExecutionEngine:
 
                 print(f"DEBUG: [GraphEngine] Looking for edge with handle: '{handle_to_find}'")
 
-                edge = next((edge for edge in self.edges if edge['source'] == current_node_id and edge.get('sourceHandle') == handle_to_find), None)
+                target = self.plan.target(current_node_id, handle_to_find)
 
-                if edge:
-                    print(f"DEBUG: [GraphEngine] Found edge to '{edge['target']}' via handle '{handle_to_find}'.")
-                    return edge['target']
+                if target:
+                    print(f"DEBUG: [GraphEngine] Found edge to '{target}' via handle '{handle_to_find}'.")
+                    return target
                 else:
                     print(f"WARNING: [GraphEngine] No edge found for handle '{handle_to_find}' from node '{current_node_id}'.")
                     return None
@@ -80,21 +75,17 @@ class GraphExecutionEngine:
                 print(f"DEBUG: [GraphEngine] Question classifier output: '{class_output}'")
 
                 # Look for edge with sourceHandle matching the classification result
-                edge = next((e for e in self.edges
-                            if e['source'] == current_node_id
-                            and e.get('sourceHandle') == class_output), None)
+                target = self.plan.target(current_node_id, class_output)
 
-                if edge:
-                    print(f"DEBUG: [GraphEngine] Found edge to '{edge['target']}' via handle '{class_output}'.")
-                    return edge['target']
+                if target:
+                    print(f"DEBUG: [GraphEngine] Found edge to '{target}' via handle '{class_output}'.")
+                    return target
 
                 # If no matching class edge, try default
-                default_edge = next((e for e in self.edges
-                                    if e['source'] == current_node_id
-                                    and e.get('sourceHandle') == 'default'), None)
-                if default_edge:
-                    print(f"DEBUG: [GraphEngine] No edge for '{class_output}', using default to '{default_edge['target']}'.")
-                    return default_edge['target']
+                default_target = self.plan.target(current_node_id, 'default')
+                if default_target:
+                    print(f"DEBUG: [GraphEngine] No edge for '{class_output}', using default to '{default_target}'.")
+                    return default_target
 
                 print(f"WARNING: [GraphEngine] No edge found for question classifier output '{class_output}' or default.")
                 return None
@@ -110,16 +101,11 @@ class GraphExecutionEngine:
                 handle_to_find = result['output']  # 'loop' or 'exit'
                 print(f"DEBUG: [GraphEngine] Loop node result: '{handle_to_find}'")
 
-                edge = next(
-                    (e for e in self.edges
-                     if e['source'] == current_node_id
-                     and e.get('sourceHandle') == handle_to_find),
-                    None
-                )
+                target = self.plan.target(current_node_id, handle_to_find)
 
-                if edge:
-                    print(f"DEBUG: [GraphEngine] Found edge to '{edge['target']}' via loop handle '{handle_to_find}'.")
-                    return edge['target']
+                if target:
+                    print(f"DEBUG: [GraphEngine] Found edge to '{target}' via loop handle '{handle_to_find}'.")
+                    return target
                 else:
                     print(f"WARNING: [GraphEngine] No edge found for loop handle '{handle_to_find}' from node '{current_node_id}'.")
                     return None
@@ -129,15 +115,11 @@ class GraphExecutionEngine:
 
         elif result and "error" in result:
             print(f"DEBUG: [GraphEngine] Node '{current_node_id}' produced an error. Looking for error path.")
-            error_edge = next((edge for edge in self.edges if edge['source'] == current_node_id and edge.get('sourceHandle') == 'error'), None)
-            if error_edge:
-                return error_edge['target']
-            return None
+            return self.plan.target(current_node_id, 'error')
             
         else:
             # Default path for non-conditional, non-error nodes
-            edge = next((edge for edge in self.edges if edge['source'] == current_node_id), None)
-            if edge:
-                print(f"DEBUG: [GraphEngine] Found default edge to '{edge['target']}'.")
-                return edge['target']
-            return None
+            target = self.plan.default_target(current_node_id)
+            if target:
+                print(f"DEBUG: [GraphEngine] Found default edge to '{target}'.")
+            return target
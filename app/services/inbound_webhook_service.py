@@ -0,0 +1,381 @@
+"""
+Inbound webhook pipeline for messaging channels.
+
+Webhook endpoints split each provider payload into single-message events,
+persist them (deduplicated by provider message id) and acknowledge at once.
+The InboundWebhookWorker then runs the channel handler for every event,
+strictly in arrival order per conversation, off the request path.
+"""
+import asyncio
+import datetime
+import logging
+import traceback
+import uuid
+from typing import Awaitable, Callable, Dict, List, Optional, Tuple
+
+from sqlalchemy import delete, func, select, update
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session, aliased
+
+from app.core.config import settings
+from app.core.database import SessionLocal
+from app.models.inbound_webhook_event import InboundWebhookEvent
+
+logger = logging.getLogger(__name__)
+
+# handler(payload, db, integration_id)
+WebhookHandler = Callable[[dict, Session, Optional[int]], Awaitable[object]]
+
+
+# ==================== Payload Splitting ====================
+
+def _event(provider_message_id, conversation_key, payload: dict) -> dict:
+    return {
+        # Events without a provider id can't be deduplicated; give them a unique one
+        "provider_message_id": str(provider_message_id) if provider_message_id else f"local-{uuid.uuid4()}",
+        "conversation_key": str(conversation_key),
+        "payload": payload,
+    }
+
+
+def split_whatsapp_payload(data: dict) -> List[dict]:
+    """
+    One event per message across every entry and change of a WhatsApp Cloud
+    API webhook. Each event payload keeps the webhook shape with a single
+    entry, change, contact and message. Status callbacks are dropped.
+    """
+    events = []
+    for entry in data.get("entry", []) or []:
+        for change in entry.get("changes", []) or []:
+            value = change.get("value", {}) or {}
+            if change.get("field") != "messages" or "messages" not in value:
+                continue
+            contacts = value.get("contacts", []) or []
+            for message in value.get("messages", []) or []:
+                sender = message.get("from")
+                contact = next((c for c in contacts if c.get("wa_id") == sender), contacts[0] if contacts else None)
+                single_value = {key: val for key, val in value.items() if key not in ("messages", "contacts", "statuses")}
+                single_value["messages"] = [message]
+                if contact:
+                    single_value["contacts"] = [contact]
+                payload = {
+                    **{key: val for key, val in data.items() if key != "entry"},
+                    "entry": [{"id": entry.get("id"), "changes": [{"field": "messages", "value": single_value}]}],
+                }
+                phone_number_id = value.get("metadata", {}).get("phone_number_id")
+                events.append(_event(message.get("id"), f"{phone_number_id}:{sender}", payload))
+    return events
+
+
+def split_meta_messaging_payload(data: dict, object_type: str) -> List[dict]:
+    """
+    One event per ``messaging`` item for Messenger (``page``) and Instagram
+    (``instagram``) webhooks, keyed by page/account and sender.
+    """
+    if data.get("object") != object_type:
+        return []
+
+    events = []
+    for entry in data.get("entry", []) or []:
+        for messaging_event in entry.get("messaging", []) or []:
+            message = messaging_event.get("message", {}) or {}
+            sender_id = messaging_event.get("sender", {}).get("id")
+            payload = {
+                "object": object_type,
+                "entry": [{"id": entry.get("id"), "time": entry.get("time"), "messaging": [messaging_event]}],
+            }
+            events.append(_event(message.get("mid"), f"{entry.get('id')}:{sender_id}", payload))
+    return events
+
+
+def split_telegram_update(data: dict, integration_id: int) -> List[dict]:
+    """Telegram delivers one update per webhook call; key it by bot and chat."""
+    message = data.get("message") or data.get("edited_message") or {}
+    chat_id = message.get("chat", {}).get("id")
+    update_id = data.get("update_id")
+    return [_event(
+        f"{integration_id}:{update_id}" if update_id is not None else None,
+        f"{integration_id}:{chat_id}",
+        data,
+    )]
+
+
+# ==================== Queue ====================
+
+def _insert_events_stmt(channel: str, events: List[dict], integration_id: Optional[int]):
+    table = InboundWebhookEvent.__table__
+    return pg_insert(table).values([
+        {
+            "channel": channel,
+            "provider_message_id": event["provider_message_id"],
+            "conversation_key": event["conversation_key"],
+            "integration_id": integration_id,
+            "payload": event["payload"],
+            "status": "pending",
+        }
+        for event in events
+    ]).on_conflict_do_nothing(
+        index_elements=["channel", "provider_message_id"]
+    ).returning(table.c.conversation_key)
+
+
+def _submit_new_events(channel: str, events: List[dict], conversation_keys) -> List[Tuple[str, str]]:
+    keys = [(channel, conversation_key) for conversation_key in conversation_keys]
+
+    duplicates = len(events) - len(keys)
+    if duplicates:
+        logger.info(f"[InboundWebhook] Skipped {duplicates} duplicate {channel} event(s)")
+
+    inbound_webhook_worker.submit(keys)
+    return keys
+
+
+def enqueue_events(db: Session, channel: str, events: List[dict], integration_id: Optional[int] = None) -> List[Tuple[str, str]]:
+    """
+    Persist webhook events, skipping provider message ids already stored
+    (provider retries), and hand the new ones to the worker.
+
+    Returns:
+        (channel, conversation_key) of every newly stored event
+    """
+    if not events:
+        return []
+
+    conversation_keys = db.execute(_insert_events_stmt(channel, events, integration_id)).scalars().all()
+    db.commit()
+    return _submit_new_events(channel, events, conversation_keys)
+
+
+async def enqueue_events_async(db: AsyncSession, channel: str, events: List[dict], integration_id: Optional[int] = None) -> List[Tuple[str, str]]:
+    """Async variant of enqueue_events, used by the webhook endpoints."""
+    if not events:
+        return []
+
+    conversation_keys = (await db.execute(_insert_events_stmt(channel, events, integration_id))).scalars().all()
+    await db.commit()
+    return _submit_new_events(channel, events, conversation_keys)
+
+
+class InboundWebhookWorker:
+    """
+    Background service that drains stored webhook events.
+
+    Conversations are scheduled on an asyncio queue; a worker owns one
+    conversation at a time and processes its pending events oldest first.
+    Claims take a per-conversation advisory lock and refuse to start while
+    another event of the conversation is in flight, so ordering also holds
+    across application processes.
+    """
+
+    def __init__(
+        self,
+        worker_count: int = 8,
+        sweep_interval: int = 30,
+        stale_after_seconds: int = 600,
+        retention_days: int = 7,
+    ):
+        """
+        Initialize the inbound webhook worker
+
+        Args:
+            worker_count: Number of conversations processed concurrently
+            sweep_interval: Seconds between sweeps for orphaned/stale events
+            stale_after_seconds: Processing claims older than this are retried
+            retention_days: Processed events are deleted after this many days
+        """
+        self.worker_count = worker_count
+        self.sweep_interval = sweep_interval
+        self.stale_after_seconds = stale_after_seconds
+        self.retention_days = retention_days
+        self.handlers: Dict[str, WebhookHandler] = {}
+        self.is_running = False
+        self._queue: Optional[asyncio.Queue] = None
+        self._queued = set()
+        self._active = set()
+        self._rerun = set()
+        self._tasks: List[asyncio.Task] = []
+
+    def register_handler(self, channel: str, handler: WebhookHandler):
+        self.handlers[channel] = handler
+
+    def submit(self, keys: List[Tuple[str, str]]):
+        """Schedule conversations that have new pending events."""
+        if self._queue is None:
+            return  # Not started yet; the startup sweep picks them up
+        for key in keys:
+            if key not in self._queued:
+                self._queued.add(key)
+                self._queue.put_nowait(key)
+
+    # ---- Claiming ----
+
+    def _claim_next(self, db: Session, channel: str, conversation_key: str):
+        event = InboundWebhookEvent
+        in_flight = aliased(InboundWebhookEvent)
+
+        db.execute(select(func.pg_advisory_xact_lock(func.hashtext(f"{channel}:{conversation_key}"))))
+
+        busy = select(in_flight.id).where(
+            in_flight.channel == channel,
+            in_flight.conversation_key == conversation_key,
+            in_flight.status == "processing"
+        ).exists()
+        next_id = select(event.id).where(
+            event.channel == channel,
+            event.conversation_key == conversation_key,
+            event.status == "pending",
+            ~busy
+        ).order_by(event.id).limit(1).scalar_subquery()
+
+        row = db.execute(
+            update(event)
+            .where(event.id == next_id)
+            .values(status="processing", attempts=event.attempts + 1, processed_at=func.now())
+            .returning(event.id, event.payload, event.integration_id)
+        ).first()
+        db.commit()
+        return row
+
+    def _finish(self, db: Session, event_id: int, error: Optional[str] = None):
+        db.execute(
+            update(InboundWebhookEvent)
+            .where(InboundWebhookEvent.id == event_id)
+            .values(status="failed" if error else "done", error=error, processed_at=func.now())
+        )
+        db.commit()
+
+    @staticmethod
+    def _in_session(method, *args):
+        """Call a claim/finish method with its own short-lived session."""
+        db = SessionLocal()
+        try:
+            return method(db, *args)
+        finally:
+            db.close()
+
+    # ---- Processing ----
+
+    async def _drain(self, channel: str, conversation_key: str):
+        handler = self.handlers.get(channel)
+        if handler is None:
+            logger.error(f"[InboundWebhook] No handler registered for channel '{channel}'")
+            return
+
+        while True:
+            # Claim/finish queries run in a thread so they don't block the event loop
+            claimed = await asyncio.to_thread(self._in_session, self._claim_next, channel, conversation_key)
+            if claimed is None:
+                return
+
+            event_id, payload, integration_id = claimed
+            error = None
+            handler_db = SessionLocal()
+            try:
+                await handler(payload, handler_db, integration_id)
+            except Exception as e:
+                logger.error(f"[InboundWebhook] {channel} event {event_id} failed: {e}\n{traceback.format_exc()}")
+                error = str(e)
+                handler_db.rollback()
+            finally:
+                handler_db.close()
+            await asyncio.to_thread(self._in_session, self._finish, event_id, error)
+
+    async def _worker(self):
+        while self.is_running:
+            key = await self._queue.get()
+            self._queued.discard(key)
+            if key in self._active:
+                # Another worker owns this conversation; it re-drains when done
+                self._rerun.add(key)
+                continue
+
+            self._active.add(key)
+            try:
+                while True:
+                    self._rerun.discard(key)
+                    await self._drain(*key)
+                    if key not in self._rerun:
+                        break
+            except Exception as e:
+                logger.error(f"[InboundWebhook] Worker error for {key}: {e}")
+            finally:
+                self._active.discard(key)
+
+    def sweep(self):
+        """Re-queue orphaned or stale events and prune old processed ones."""
+        db = SessionLocal()
+        try:
+            now = datetime.datetime.now(datetime.timezone.utc)
+            db.execute(
+                update(InboundWebhookEvent)
+                .where(
+                    InboundWebhookEvent.status == "processing",
+                    InboundWebhookEvent.processed_at < now - datetime.timedelta(seconds=self.stale_after_seconds)
+                )
+                .values(status="pending")
+            )
+            db.execute(
+                delete(InboundWebhookEvent).where(
+                    InboundWebhookEvent.status.in_(("done", "failed")),
+                    InboundWebhookEvent.created_at < now - datetime.timedelta(days=self.retention_days)
+                )
+            )
+            db.commit()
+
+            pending = db.query(InboundWebhookEvent.channel, InboundWebhookEvent.conversation_key).filter(
+                InboundWebhookEvent.status == "pending"
+            ).distinct().all()
+            self.submit([(channel, conversation_key) for channel, conversation_key in pending])
+        finally:
+            db.close()
+
+    async def start(self):
+        """Start the worker tasks and the periodic sweep"""
+        self.is_running = True
+        self._queue = asyncio.Queue()
+        self._tasks = [asyncio.create_task(self._worker()) for _ in range(self.worker_count)]
+        logger.info(f"Inbound webhook worker started ({self.worker_count} workers)")
+
+        while self.is_running:
+            try:
+                await asyncio.to_thread(self.sweep)
+            except Exception as e:
+                logger.error(f"[InboundWebhook] Sweep failed: {e}")
+            await asyncio.sleep(self.sweep_interval)
+
+    def stop(self):
+        """Stop the background service"""
+        self.is_running = False
+        for task in self._tasks:
+            task.cancel()
+        self._tasks = []
+        logger.info("Inbound webhook worker stopped")
+
+
+# Global instance
+inbound_webhook_worker = InboundWebhookWorker(
+    worker_count=settings.WEBHOOK_QUEUE_WORKERS,
+    sweep_interval=settings.WEBHOOK_QUEUE_SWEEP_INTERVAL,
+    stale_after_seconds=settings.WEBHOOK_QUEUE_STALE_SECONDS,
+    retention_days=settings.WEBHOOK_EVENT_RETENTION_DAYS,
+)
+
+
+async def accept_webhook(db: AsyncSession, channel: str, events: List[dict], integration_id: Optional[int] = None):
+    """
+    Store and acknowledge a webhook's events; with the queue disabled, run
+    the channel handler inline for each event instead.
+    """
+    if settings.WEBHOOK_QUEUE_ENABLED:
+        await enqueue_events_async(db, channel, events, integration_id)
+        return
+
+    # Channel handlers still run on the synchronous ORM session
+    handler = inbound_webhook_worker.handlers[channel]
+    handler_db = SessionLocal()
+    try:
+        for event in events:
+            await handler(event["payload"], handler_db, integration_id)
+    finally:
+        handler_db.close()
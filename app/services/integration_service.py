@@ -1,4 +1,6 @@
 from sqlalchemy.orm import Session
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy import select
 import json
 from typing import List, Dict, Any
 
@@ -125,6 +127,21 @@ def get_integration_by_telegram_bot_token(db: Session, bot_token: str) -> models
             
     return None
 
+async def get_integration_by_telegram_bot_token_async(db: AsyncSession, bot_token: str) -> models_integration.Integration:
+    """Async variant of get_integration_by_telegram_bot_token."""
+    result = await db.execute(
+        select(models_integration.Integration).where(
+            models_integration.Integration.type == "telegram",
+            models_integration.Integration.enabled == True
+        )
+    )
+    for integration in result.scalars().all():
+        credentials = get_decrypted_credentials(integration)
+        if credentials.get("bot_token") == bot_token:
+            return integration
+
+    return None
+
 def get_integration_by_linkedin_company_id(db: Session, linkedin_company_id: str) -> models_integration.Integration:
     """
     Finds an active LinkedIn integration by the LinkedIn Company ID.
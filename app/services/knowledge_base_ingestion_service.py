@@ -0,0 +1,422 @@
+"""
+Knowledge Base Ingestion Service
+Builds a knowledge base from an uploaded document as a tracked background job.
+
+The upload is streamed to storage and a KnowledgeBaseIngestionJob is returned
+right away; clients poll it. The job then:
+1. parses the document in a process pool (a range of PDF pages per task);
+2. chunks each range as it arrives and groups chunks into embedding batches;
+3. embeds up to KB_INGEST_EMBED_CONCURRENCY batches at a time;
+4. appends each embedded batch to the new Chroma collection or FAISS index.
+
+Progress is committed as pages and batches complete. If the job fails, the
+partially written vector store is removed.
+"""
+import multiprocessing
+import os
+import shutil
+import tempfile
+import uuid
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from datetime import datetime, timezone
+from types import SimpleNamespace
+from typing import Dict, Iterator, List, Optional, Tuple
+
+from sqlalchemy.orm import Session
+from langchain.text_splitter import RecursiveCharacterTextSplitter
+
+from app.core.config import settings
+from app.core.database import SessionLocal
+from app.core.object_storage import s3_client, BUCKET_NAME, get_company_chroma_client
+from app.models.knowledge_base import KnowledgeBase
+from app.models.knowledge_base_ingestion_job import KnowledgeBaseIngestionJob
+from app.services import lexical_index_service
+
+SUPPORTED_EXTENSIONS = ('.pdf', '.txt', '.docx')
+VECTOR_STORE_TYPES = ('chroma', 'faiss')
+
+Page = Tuple[int, str]  # (page number, text)
+
+
+def text_splitter() -> RecursiveCharacterTextSplitter:
+    return RecursiveCharacterTextSplitter(
+        chunk_size=1000,
+        chunk_overlap=200,
+        length_function=len,
+        separators=["\n\n", "\n", " ", ""]
+    )
+
+
+# ==================== Parsing (worker processes) ====================
+
+def _extract_pdf_pages(path: str, start: int, stop: int) -> List[Page]:
+    from pypdf import PdfReader
+
+    reader = PdfReader(path)
+    return [(number, reader.pages[number].extract_text() or "") for number in range(start, stop)]
+
+
+def _extract_document(path: str, extension: str) -> List[Page]:
+    """Whole-file formats (.txt, .docx) are a single page."""
+    if extension == '.txt':
+        from langchain_community.document_loaders import TextLoader
+        loader = TextLoader(path)
+    else:
+        from app.services.docx_loader import DOCXLoader
+        loader = DOCXLoader(path)
+    return [(0, "\n".join(doc.page_content for doc in loader.load()))]
+
+
+class DocumentParsePool:
+    """
+    Process pool that extracts document text page range by page range.
+
+    PDF text extraction is CPU-bound and holds the GIL, so it runs in separate
+    processes; ranges are yielded in page order with a bounded number in flight.
+    """
+
+    def __init__(self, max_workers: int = 2, pages_per_task: int = 16):
+        self.max_workers = max_workers
+        self.pages_per_task = pages_per_task
+        self._executor: Optional[ProcessPoolExecutor] = None
+        self.documents_parsed = 0
+        self.pages_parsed = 0
+
+    def _get_executor(self) -> ProcessPoolExecutor:
+        if self._executor is None:
+            # spawn, not fork: forking the multi-threaded API process can copy held locks into the worker
+            self._executor = ProcessPoolExecutor(max_workers=self.max_workers, mp_context=multiprocessing.get_context("spawn"))
+        return self._executor
+
+    @staticmethod
+    def page_count(path: str, extension: str) -> int:
+        if extension != '.pdf':
+            return 1
+        from pypdf import PdfReader
+        return len(PdfReader(path).pages)
+
+    def iter_pages(self, path: str, extension: str, total_pages: int) -> Iterator[List[Page]]:
+        """
+        Extract a document's text.
+
+        Args:
+            path: Local path of the document
+            extension: Lower-cased file extension
+            total_pages: Result of page_count
+
+        Yields:
+            Lists of (page number, text), in page order
+        """
+        executor = self._get_executor()
+        if extension != '.pdf':
+            pages = executor.submit(_extract_document, path, extension).result()
+        else:
+            window = deque()
+            for start in range(0, total_pages, self.pages_per_task):
+                stop = min(start + self.pages_per_task, total_pages)
+                window.append(executor.submit(_extract_pdf_pages, path, start, stop))
+                if len(window) > self.max_workers:
+                    pages = window.popleft().result()
+                    self.pages_parsed += len(pages)
+                    yield pages
+            while len(window) > 1:
+                pages = window.popleft().result()
+                self.pages_parsed += len(pages)
+                yield pages
+            pages = window.popleft().result() if window else []
+
+        self.pages_parsed += len(pages)
+        self.documents_parsed += 1
+        yield pages
+
+    def stats(self) -> dict:
+        return {
+            "max_workers": self.max_workers,
+            "documents_parsed": self.documents_parsed,
+            "pages_parsed": self.pages_parsed,
+        }
+
+    def shutdown(self):
+        if self._executor is not None:
+            self._executor.shutdown(wait=False)
+            self._executor = None
+
+
+# Global instance shared by ingestion jobs in this worker
+document_parser = DocumentParsePool(
+    max_workers=settings.KB_INGEST_PARSE_WORKERS,
+    pages_per_task=settings.KB_INGEST_PAGES_PER_TASK,
+)
+
+
+# ==================== Vector Store Writers ====================
+
+class _ChromaSink:
+    """Appends embedded chunks to a new collection in the company's Chroma tenant."""
+
+    def __init__(self, company_id: int):
+        self.company_id = company_id
+        self.client = get_company_chroma_client(company_id)
+        self.collection_name = f"kb_{uuid.uuid4()}"
+        self.collection = self.client.create_collection(name=self.collection_name)
+
+    def embed(self, agent, texts: List[str]) -> List[List[float]]:
+        from app.services.agent_execution_service import _get_embeddings
+        return _get_embeddings(agent, texts).tolist()
+
+    def add(self, offset: int, texts: List[str], embeddings: List[List[float]], metadatas: List[Dict]):
+        self.collection.add(
+            embeddings=embeddings,
+            documents=texts,
+            metadatas=metadatas,
+            ids=[f"id_{offset + i}" for i in range(len(texts))]
+        )
+
+    def finish(self):
+        pass
+
+    def discard(self):
+        try:
+            self.client.delete_collection(name=self.collection_name)
+        except Exception as e:
+            print(f"Error deleting chroma collection {self.collection_name}: {e}")
+
+    def lexical_index_path(self) -> str:
+        return lexical_index_service.chroma_index_path(self.company_id, self.collection_name)
+
+    def knowledge_base_fields(self) -> Dict:
+        return {"chroma_collection_name": self.collection_name}
+
+
+class _FaissSink:
+    """Appends embedded chunks to a new FAISS index, saved once complete."""
+
+    def __init__(self, company_id: int):
+        from app.services.faiss_vector_database import VectorDatabase
+        from app.llm_providers.nvidia_api_provider import NVIDIAEmbeddings
+
+        self.company_id = company_id
+        self.faiss_index_id = str(uuid.uuid4())
+        self.path = os.path.join(settings.FAISS_INDEX_DIR, str(company_id), self.faiss_index_id)
+        # FAISS indexes are queried with NVIDIA embeddings, so they are built with them too
+        self.embeddings = NVIDIAEmbeddings()
+        self.db = VectorDatabase(embeddings=self.embeddings, db_path=self.path, index_name=self.faiss_index_id)
+
+    def embed(self, agent, texts: List[str]) -> List[List[float]]:
+        return self.embeddings.embed_documents(texts)
+
+    def add(self, offset: int, texts: List[str], embeddings: List[List[float]], metadatas: List[Dict]):
+        if not self.db.add_embeddings(texts, embeddings, metadatas):
+            raise RuntimeError("Failed to add chunks to the FAISS index")
+
+    def finish(self):
+        if not self.db.save_index():
+            raise RuntimeError("Failed to save the FAISS index")
+
+    def discard(self):
+        shutil.rmtree(self.path, ignore_errors=True)
+
+    def lexical_index_path(self) -> str:
+        return lexical_index_service.faiss_index_path(self.company_id, self.faiss_index_id)
+
+    def knowledge_base_fields(self) -> Dict:
+        return {"faiss_index_id": self.faiss_index_id}
+
+
+def _new_sink(vector_store_type: str, company_id: int):
+    if vector_store_type == 'faiss':
+        return _FaissSink(company_id)
+    return _ChromaSink(company_id)
+
+
+# ==================== Jobs ====================
+
+def start_document_ingestion(
+    db: Session,
+    file,
+    company_id: int,
+    name: str,
+    description: Optional[str],
+    embedding_model: str = "nvidia",
+    vector_store_type: str = "chroma"
+) -> KnowledgeBaseIngestionJob:
+    """
+    Store an uploaded document and create its ingestion job.
+
+    The upload is streamed to storage; run the job with run_ingestion_job.
+
+    Args:
+        db: Database session
+        file: UploadFile to ingest
+        company_id: Owning company
+        name: Knowledge base name
+        description: Knowledge base description
+        embedding_model: Embedding model for Chroma knowledge bases
+        vector_store_type: 'chroma' or 'faiss'
+
+    Returns:
+        The pending job
+
+    Raises:
+        ValueError: For unsupported file or vector store types
+    """
+    extension = os.path.splitext(file.filename)[1].lower()
+    if extension not in SUPPORTED_EXTENSIONS:
+        raise ValueError(
+            f"Unsupported file type: {extension}. "
+            f"Supported formats: {', '.join(SUPPORTED_EXTENSIONS)}. "
+            f"Note: Legacy .doc files must be converted to .docx or .pdf first."
+        )
+    if vector_store_type not in VECTOR_STORE_TYPES:
+        raise ValueError(f"Unsupported vector store type: {vector_store_type}")
+
+    storage_key = f"{company_id}/{uuid.uuid4()}-{file.filename}"
+    file.file.seek(0)
+    s3_client.upload_fileobj(file.file, BUCKET_NAME, storage_key)
+
+    job = KnowledgeBaseIngestionJob(
+        company_id=company_id,
+        name=name,
+        description=description,
+        file_name=file.filename,
+        storage_key=storage_key,
+        embedding_model=embedding_model,
+        vector_store_type=vector_store_type,
+        status='pending',
+    )
+    db.add(job)
+    db.commit()
+    db.refresh(job)
+    return job
+
+
+def get_ingestion_job(db: Session, job_id: int, company_id: int) -> Optional[KnowledgeBaseIngestionJob]:
+    return db.query(KnowledgeBaseIngestionJob).filter(
+        KnowledgeBaseIngestionJob.id == job_id,
+        KnowledgeBaseIngestionJob.company_id == company_id
+    ).first()
+
+
+def _ingest_pages(db: Session, job: KnowledgeBaseIngestionJob, pages: Iterator[List[Page]], agent, sink) -> List[str]:
+    """
+    Chunk, embed and write a document's pages, committing progress on the job.
+
+    Returns:
+        Every chunk written, in order
+    """
+    splitter = text_splitter()
+    batch_size = settings.KB_INGEST_EMBED_BATCH_SIZE
+    concurrency = max(1, settings.KB_INGEST_EMBED_CONCURRENCY)
+
+    chunks: List[str] = []
+    batch_texts: List[str] = []
+    batch_metadatas: List[Dict] = []
+    in_flight = deque()
+
+    with ThreadPoolExecutor(max_workers=concurrency, thread_name_prefix="kb-ingest-embed") as executor:
+        def write_oldest():
+            offset, texts, metadatas, future = in_flight.popleft()
+            sink.add(offset, texts, future.result(), metadatas)
+            job.chunk_count += len(texts)
+            db.commit()
+
+        def submit(texts: List[str], metadatas: List[Dict]):
+            offset = len(chunks)
+            chunks.extend(texts)
+            in_flight.append((offset, texts, metadatas, executor.submit(sink.embed, agent, texts)))
+            # Batches are written in order; wait for the oldest once the window is full
+            if len(in_flight) >= concurrency:
+                write_oldest()
+
+        for page_range in pages:
+            for page_number, text in page_range:
+                for chunk in splitter.split_text(text):
+                    batch_texts.append(chunk)
+                    batch_metadatas.append({"source": job.file_name, "page": page_number})
+                    if len(batch_texts) >= batch_size:
+                        submit(batch_texts, batch_metadatas)
+                        batch_texts, batch_metadatas = [], []
+            job.processed_pages += len(page_range)
+            db.commit()
+
+        if batch_texts:
+            submit(batch_texts, batch_metadatas)
+        while in_flight:
+            write_oldest()
+
+    return chunks
+
+
+def process_ingestion_job(db: Session, job_id: int) -> Optional[KnowledgeBaseIngestionJob]:
+    """
+    Run a pending ingestion job to completion.
+
+    Returns:
+        The job (completed or failed), or None if it doesn't exist
+    """
+    job = db.query(KnowledgeBaseIngestionJob).filter(KnowledgeBaseIngestionJob.id == job_id).first()
+    if not job or job.status != 'pending':
+        return job
+
+    job.status = 'running'
+    job.started_at = datetime.now(timezone.utc)
+    db.commit()
+
+    agent = SimpleNamespace(embedding_model=job.embedding_model)
+    extension = os.path.splitext(job.file_name)[1].lower()
+    sink = None
+    fd, path = tempfile.mkstemp(suffix=extension)
+    os.close(fd)
+    try:
+        s3_client.download_file(BUCKET_NAME, job.storage_key, path)
+        job.total_pages = document_parser.page_count(path, extension)
+        db.commit()
+
+        sink = _new_sink(job.vector_store_type, job.company_id)
+        chunks = _ingest_pages(db, job, document_parser.iter_pages(path, extension, job.total_pages), agent, sink)
+        if not chunks:
+            raise ValueError("No text content found in the document")
+        sink.finish()
+
+        # BM25 index beside the vector index, for exact-identifier matches (hybrid retrieval)
+        lexical_index_service.build_index(sink.lexical_index_path(), chunks)
+
+        kb = KnowledgeBase(
+            name=job.name,
+            description=job.description,
+            company_id=job.company_id,
+            type='local',
+            storage_type='s3',
+            storage_details={"bucket": BUCKET_NAME, "key": job.storage_key},
+            **sink.knowledge_base_fields()
+        )
+        db.add(kb)
+        db.flush()
+
+        job.knowledge_base_id = kb.id
+        job.status = 'completed'
+        job.completed_at = datetime.now(timezone.utc)
+        db.commit()
+    except Exception as e:
+        print(f"Error ingesting document for job {job_id}: {e}")
+        db.rollback()
+        if sink is not None:
+            sink.discard()
+        job.status = 'failed'
+        job.error_message = str(e)
+        job.completed_at = datetime.now(timezone.utc)
+        db.commit()
+    finally:
+        os.remove(path)
+
+    return job
+
+
+def run_ingestion_job(job_id: int) -> None:
+    """Background task entry point: processes an ingestion job with its own session."""
+    db = SessionLocal()
+    try:
+        process_ingestion_job(db, job_id)
+    finally:
+        db.close()
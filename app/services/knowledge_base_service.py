@@ -1,13 +1,15 @@
 from typing import List
+from sqlalchemy import JSON, column, inspect, text
 from sqlalchemy.orm import Session
 from app.models import knowledge_base as models_knowledge_base
 from app.schemas import knowledge_base as schemas_knowledge_base
 import requests
 from bs4 import BeautifulSoup
 import httpx
-from app.services import credential_service, vectorization_service
+from app.services import credential_service, vectorization_service, lexical_index_service
 from app.services.vault_service import vault_service
 from app.core.object_storage import s3_client, BUCKET_NAME, get_company_chroma_client
+from app.services.embedding_store_service import kb_embedding_store
 import numpy as np
 import os
 import shutil
@@ -105,26 +107,64 @@ def _chunk_content(content: str, chunk_size: int = 500, chunk_overlap: int = 50)
         chunks.append(chunk)
     return chunks
 
+def _store_embeddings(db_knowledge_base, content: str):
+    """Chunk and embed content into the knowledge base's embedding matrix."""
+    chunks = _chunk_content(content or "")
+    embeddings = vectorization_service.get_embeddings(chunks) if chunks else []
+    kb_embedding_store.save(db_knowledge_base.company_id, db_knowledge_base.id, chunks, embeddings)
+
+_legacy_columns = None  # knowledge_bases columns, looked up once per process
+
+
+def _backfill_legacy_embeddings(db: Session, kb) -> bool:
+    """
+    Build a knowledge base's embedding matrix from the legacy JSON
+    knowledge_bases.embeddings column, on databases that still have it.
+
+    Returns:
+        True if a matrix was stored
+    """
+    global _legacy_columns
+    if _legacy_columns is None:
+        _legacy_columns = {column['name'] for column in inspect(db.connection()).get_columns('knowledge_bases')}
+    if 'embeddings' not in _legacy_columns:
+        return False
+
+    has_content = 'content' in _legacy_columns
+    select = text(
+        "SELECT embeddings{} FROM knowledge_bases WHERE id = :id".format(", content" if has_content else "")
+    ).columns(column('embeddings', JSON))
+    row = db.execute(select, {"id": kb.id}).mappings().first()
+    embeddings = (row or {}).get('embeddings') or []
+    if not embeddings:
+        return False
+
+    chunks = _chunk_content(row['content'] or "") if has_content else []
+    if len(chunks) != len(embeddings):
+        # Texts can't be recovered; keep the rows searchable by position
+        chunks = [""] * len(embeddings)
+    kb_embedding_store.save(kb.company_id, kb.id, chunks, embeddings)
+    print(f"Backfilled embedding matrix for legacy knowledge base {kb.id} ({len(embeddings)} chunks)")
+    return True
+
 def create_knowledge_base(db: Session, knowledge_base: schemas_knowledge_base.KnowledgeBaseCreate, company_id: int):
-    chunks = _chunk_content(knowledge_base.content)
-    chunk_embeddings = [vectorization_service.get_embedding(chunk).tolist() for chunk in chunks]
-    db_knowledge_base = models_knowledge_base.KnowledgeBase(**knowledge_base.dict(), company_id=company_id, embeddings=chunk_embeddings)
+    db_knowledge_base = models_knowledge_base.KnowledgeBase(**knowledge_base.dict(), company_id=company_id)
     db.add(db_knowledge_base)
     db.commit()
     db.refresh(db_knowledge_base)
+    _store_embeddings(db_knowledge_base, knowledge_base.content)
     return db_knowledge_base
 
 def update_knowledge_base(db: Session, knowledge_base_id: int, knowledge_base: schemas_knowledge_base.KnowledgeBaseUpdate, company_id: int):
     db_knowledge_base = get_knowledge_base(db, knowledge_base_id, company_id)
     if db_knowledge_base:
         update_data = knowledge_base.model_dump(exclude_unset=True)
-        if 'content' in update_data:
-            chunks = _chunk_content(update_data['content'])
-            db_knowledge_base.embeddings = [vectorization_service.get_embedding(chunk).tolist() for chunk in chunks]
         for key, value in update_data.items():
             setattr(db_knowledge_base, key, value)
         db.commit()
         db.refresh(db_knowledge_base)
+        if 'content' in update_data:
+            _store_embeddings(db_knowledge_base, update_data['content'])
     return db_knowledge_base
 
 def delete_knowledge_base(db: Session, knowledge_base_id: int, company_id: int):
@@ -156,6 +196,9 @@ def delete_knowledge_base(db: Session, knowledge_base_id: int, company_id: int):
             except Exception as e:
                 print(f"Error deleting FAISS index: {e}")
 
+        lexical_index_service.delete_kb_index(db_knowledge_base)
+        kb_embedding_store.delete(company_id, db_knowledge_base.id)
+
         db.delete(db_knowledge_base)
         db.commit()
     return db_knowledge_base
@@ -170,7 +213,8 @@ def find_relevant_chunks(
     include_metadata: bool = False
 ):
     """
-    Find relevant chunks from a knowledge base using Chroma or FAISS vector stores.
+    Find relevant chunks from a knowledge base using Chroma or FAISS vector stores
+    (or, for legacy knowledge bases, their embedding matrix).
     Uses NVIDIA embeddings by default to match how knowledge bases are indexed.
 
     The knowledge base may contain:
@@ -271,6 +315,10 @@ def find_relevant_chunks(
 
         return processed
 
+    def lexical_hit(text: str):
+        """Result for a document chunk without a vector score (FAISS or BM25-only hits)."""
+        return {"text": text, "source_type": "document", "score": 0.0, "metadata": {}}
+
     try:
         if kb.type == "local" and kb.chroma_collection_name:
             # Query the local ChromaDB collection using company-specific client
@@ -279,16 +327,19 @@ def find_relevant_chunks(
             collection = company_chroma_client.get_collection(name=kb.chroma_collection_name)
             results = collection.query(
                 query_embeddings=[query_embedding],
-                n_results=top_k,
+                n_results=lexical_index_service.candidate_count(top_k),
                 include=["documents", "metadatas", "distances"]
             )
 
+            hits = lexical_index_service.fuse_with_lexical(
+                kb, query, process_chroma_results(results), top_k,
+                text_of=lambda hit: hit["text"], make_hit=lexical_hit
+            )
             if include_metadata:
-                retrieved_results = process_chroma_results(results)
+                retrieved_results = hits
             else:
                 # Backward compatible: return just the text
-                if results and results.get('documents') and results['documents'][0]:
-                    retrieved_results = results['documents'][0]
+                retrieved_results = [hit["text"] for hit in hits]
 
         elif kb.type == "local" and kb.faiss_index_id:
             # Query the local FAISS index (documents only, no CMS support)
@@ -296,19 +347,16 @@ def find_relevant_chunks(
             faiss_db_path = os.path.join(settings.FAISS_INDEX_DIR, str(company_id), kb.faiss_index_id)
             faiss_db = VectorDatabase(embeddings=embeddings_instance, db_path=faiss_db_path, index_name=kb.faiss_index_id)
             if faiss_db.load_index():
-                results = faiss_db.similarity_search(query, k=top_k)
+                results = faiss_db.similarity_search(query, k=lexical_index_service.candidate_count(top_k))
+                # FAISS doesn't return scores in this implementation
+                hits = lexical_index_service.fuse_with_lexical(
+                    kb, query, [lexical_hit(doc.page_content) for doc in results], top_k,
+                    text_of=lambda hit: hit["text"], make_hit=lexical_hit
+                )
                 if include_metadata:
-                    retrieved_results = [
-                        {
-                            "text": doc.page_content,
-                            "source_type": "document",
-                            "score": 0.0,  # FAISS doesn't return scores in this implementation
-                            "metadata": {}
-                        }
-                        for doc in results
-                    ]
+                    retrieved_results = hits
                 else:
-                    retrieved_results = [doc.page_content for doc in results]
+                    retrieved_results = [hit["text"] for hit in hits]
 
         elif kb.type == "remote" and kb.provider == "chroma" and kb.connection_details:
             # Query a remote ChromaDB instance
@@ -330,6 +378,15 @@ def find_relevant_chunks(
                 if results and results.get('documents') and results['documents'][0]:
                     retrieved_results = results['documents'][0]
 
+        elif kb_embedding_store.exists(company_id, kb.id) or _backfill_legacy_embeddings(db, kb):
+            # Legacy knowledge base: embedding matrix built from its content
+            query_embedding = vectorization_service.get_embedding(query)
+            hits = [
+                {"text": text, "source_type": "document", "score": score, "metadata": {}}
+                for text, score in kb_embedding_store.search(company_id, kb.id, query_embedding, top_k)
+            ]
+            retrieved_results = hits if include_metadata else [hit["text"] for hit in hits]
+
     except Exception as e:
         print(f"Error querying knowledge base {kb.name} (ID: {kb.id}): {e}")
         return []
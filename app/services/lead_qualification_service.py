@@ -1,11 +1,15 @@
 """
 Lead Qualification Service
 Implements hybrid lead scoring: AI intent + engagement + behavioral + workflow + manual
+
+rescore_leads re-scores many leads at once: one grouped query for engagement,
+the formulas evaluated as NumPy arrays, and bulk inserts/updates per batch.
 """
 from sqlalchemy.orm import Session
-from sqlalchemy import func
+from sqlalchemy import func, insert, or_, update
 from typing import Optional, Dict, Any, List
 from datetime import datetime, timedelta
+import numpy as np
 from app.models.lead import Lead, LeadStage, QualificationStatus
 from app.models.lead_score import LeadScore, ScoreType
 from app.models.campaign_contact import CampaignContact
@@ -13,6 +17,49 @@ from app.models.campaign_activity import CampaignActivity, ActivityType
 from app.models.intent import IntentMatch
 from app.schemas.lead_score import LeadScoreCreate
 
+# Engagement points per opens, clicks, replies and completed calls, and the cap for each
+ENGAGEMENT_POINTS = np.array([3, 5, 8, 10])
+ENGAGEMENT_CAPS = np.array([30, 30, 25, 15])
+
+DEFAULT_SCORE_WEIGHTS = {
+    ScoreType.AI_INTENT: 0.25,
+    ScoreType.ENGAGEMENT: 0.25,
+    ScoreType.DEMOGRAPHIC: 0.15,
+    ScoreType.WORKFLOW: 0.20,
+    ScoreType.MANUAL: 0.15
+}
+
+
+def engagement_scores(counts) -> np.ndarray:
+    """
+    Engagement score for each row of (opens, clicks, replies, calls_completed) totals.
+
+    Returns:
+        int array of 0-100 scores, one per row
+    """
+    counts = np.asarray(counts, dtype=np.int64).reshape(-1, len(ENGAGEMENT_POINTS))
+    return np.minimum(100, np.minimum(counts * ENGAGEMENT_POINTS, ENGAGEMENT_CAPS).sum(axis=1))
+
+
+def combine_scores(values, weights) -> np.ndarray:
+    """
+    Weighted average of each row of score values, skipping missing (NaN) ones.
+
+    Args:
+        values: (leads, score types) array, NaN where a lead has no score of that type
+        weights: Weight per score type (column)
+
+    Returns:
+        int array of combined scores; 0 for rows with no scores
+    """
+    values = np.asarray(values, dtype=np.float64)
+    weights = np.asarray(weights, dtype=np.float64)
+    present = ~np.isnan(values)
+    total_weight = present @ weights
+    weighted_sum = np.where(present, values, 0.0) @ weights
+    combined = np.divide(weighted_sum, total_weight, out=np.zeros_like(weighted_sum), where=total_weight > 0)
+    return combined.astype(np.int64)
+
 
 def calculate_ai_intent_score(
     db: Session,
@@ -123,14 +170,8 @@ def calculate_engagement_score(
     total_replies = sum(e.replies for e in enrollments)
     total_calls_completed = sum(e.calls_completed for e in enrollments)
 
-    # Scoring formula (weighted)
-    score_value = 0
-    score_value += min(30, total_opens * 3)  # Max 30 points from opens
-    score_value += min(30, total_clicks * 5)  # Max 30 points from clicks
-    score_value += min(25, total_replies * 8)  # Max 25 points from replies
-    score_value += min(15, total_calls_completed * 10)  # Max 15 points from calls
-
-    score_value = min(100, int(score_value))
+    # Scoring formula (weighted): max 30 points from opens, 30 from clicks, 25 from replies, 15 from calls
+    score_value = int(engagement_scores([total_opens, total_clicks, total_replies, total_calls_completed])[0])
 
     # Create score record
     score = LeadScore(
@@ -325,13 +366,7 @@ def calculate_combined_score(
     Calculate weighted combined score from all score types
     """
     if not weights:
-        weights = {
-            ScoreType.AI_INTENT: 0.25,
-            ScoreType.ENGAGEMENT: 0.25,
-            ScoreType.DEMOGRAPHIC: 0.15,
-            ScoreType.WORKFLOW: 0.20,
-            ScoreType.MANUAL: 0.15
-        }
+        weights = DEFAULT_SCORE_WEIGHTS
 
     # Get latest scores of each type
     scores = db.query(LeadScore).filter(
@@ -420,6 +455,138 @@ def auto_qualify_lead(
     return lead
 
 
+def rescore_leads(
+    db: Session,
+    company_id: Optional[int] = None,
+    lookback_days: int = 30,
+    full: bool = False,
+    weights: Optional[Dict[str, float]] = None,
+    batch_size: int = 1000
+) -> Dict[str, int]:
+    """
+    Re-score engagement and combined scores for many leads at once.
+
+    Engagement totals for every lead come from one grouped query over
+    CampaignContact; scores are computed with NumPy and written with bulk
+    inserts (LeadScore) and a bulk update (Lead.score, Lead.last_scored_at),
+    committed once per batch. Qualification status and stage are left alone.
+
+    Args:
+        company_id: Only this company's leads; None for every company
+        lookback_days: Enrollments considered, as in calculate_engagement_score
+        full: Re-score every lead with enrollments in the window, not only those
+              with campaign activity since they were last scored
+        weights: Score type weights for the combined score
+        batch_size: Leads written per transaction
+
+    Returns:
+        Counts of leads re-scored and score rows written
+    """
+    weights = weights or DEFAULT_SCORE_WEIGHTS
+    score_types = list(weights)
+    weight_vector = np.array([weights[score_type] for score_type in score_types])
+    since_date = datetime.utcnow() - timedelta(days=lookback_days)
+
+    query = db.query(
+        CampaignContact.lead_id,
+        Lead.company_id,
+        func.sum(CampaignContact.opens),
+        func.sum(CampaignContact.clicks),
+        func.sum(CampaignContact.replies),
+        func.sum(CampaignContact.calls_completed)
+    ).join(
+        Lead, Lead.id == CampaignContact.lead_id
+    ).filter(
+        CampaignContact.enrolled_at >= since_date
+    )
+    if company_id is not None:
+        query = query.filter(Lead.company_id == company_id)
+    if full:
+        query = query.group_by(CampaignContact.lead_id, Lead.company_id)
+    else:
+        # Only leads whose enrollments changed since the lead was last scored
+        query = query.group_by(CampaignContact.lead_id, Lead.company_id, Lead.last_scored_at).having(or_(
+            Lead.last_scored_at.is_(None),
+            func.max(CampaignContact.updated_at) > Lead.last_scored_at
+        ))
+    rows = query.order_by(CampaignContact.lead_id).all()
+
+    summary = {"leads": 0, "engagement_scores": 0, "combined_scores": 0}
+    for start in range(0, len(rows), batch_size):
+        batch = rows[start:start + batch_size]
+        lead_ids = [row[0] for row in batch]
+        counts = np.array([row[2:6] for row in batch], dtype=np.int64)
+        scores = engagement_scores(counts)
+        now = datetime.utcnow()
+
+        db.execute(insert(LeadScore), [
+            {
+                "lead_id": lead_id,
+                "company_id": lead_company_id,
+                "score_type": ScoreType.ENGAGEMENT,
+                "score_value": score,
+                "score_reason": f"Based on {lookback_days} days of campaign engagement",
+                "score_factors": {
+                    'opens': opens,
+                    'clicks': clicks,
+                    'replies': replies,
+                    'calls_completed': calls_completed,
+                    'lookback_days': lookback_days
+                },
+                "scored_at": now
+            }
+            for (lead_id, lead_company_id, *_), score, (opens, clicks, replies, calls_completed)
+            in zip(batch, scores.tolist(), counts.tolist())
+        ])
+
+        # Latest score of each type per lead (including the engagement scores just written)
+        latest = db.query(
+            LeadScore.lead_id, LeadScore.score_type, LeadScore.score_value
+        ).filter(
+            LeadScore.lead_id.in_(lead_ids),
+            LeadScore.score_type.in_(score_types)
+        ).distinct(
+            LeadScore.lead_id, LeadScore.score_type
+        ).order_by(
+            LeadScore.lead_id, LeadScore.score_type, LeadScore.scored_at.desc()
+        ).all()
+
+        row_of = {lead_id: i for i, lead_id in enumerate(lead_ids)}
+        column_of = {score_type: j for j, score_type in enumerate(score_types)}
+        values = np.full((len(lead_ids), len(score_types)), np.nan)
+        for lead_id, score_type, score_value in latest:
+            values[row_of[lead_id], column_of[score_type]] = score_value
+        combined = combine_scores(values, weight_vector).tolist()
+        type_counts = (~np.isnan(values)).sum(axis=1).tolist()
+
+        db.execute(insert(LeadScore), [
+            {
+                "lead_id": lead_id,
+                "company_id": row[1],
+                "score_type": ScoreType.COMBINED,
+                "score_value": combined_score,
+                "score_reason": f"Weighted combination of {type_count} score types",
+                "score_factors": {
+                    'weights': {str(k): v for k, v in weights.items()},
+                    'scores': {str(score_types[j]): int(values[i, j]) for j in range(len(score_types)) if not np.isnan(values[i, j])}
+                },
+                "scored_at": now
+            }
+            for i, (lead_id, row, combined_score, type_count) in enumerate(zip(lead_ids, batch, combined, type_counts))
+        ])
+        db.execute(update(Lead), [
+            {"id": lead_id, "score": combined_score, "last_scored_at": now}
+            for lead_id, combined_score in zip(lead_ids, combined)
+        ])
+        db.commit()
+
+        summary["leads"] += len(batch)
+        summary["engagement_scores"] += len(batch)
+        summary["combined_scores"] += len(batch)
+
+    return summary
+
+
 def get_lead_scoring_breakdown(db: Session, lead_id: int) -> Dict[str, Any]:
     """
     Get detailed breakdown of all scores for a lead
@@ -0,0 +1,255 @@
+"""
+Lexical Index Service
+BM25 inverted index over knowledge base chunks, used next to the vector
+index so exact identifiers (SKUs, order numbers, product names) that
+embeddings blur together are still found.
+
+An index is built when a knowledge base is ingested and stored beside its
+vector index: inside the FAISS index directory, or under LEXICAL_INDEX_DIR
+keyed by the Chroma collection name. Retrieval fuses the vector and BM25
+rankings with reciprocal rank fusion (see fuse_with_lexical).
+"""
+import gzip
+import heapq
+import json
+import math
+import os
+import re
+import threading
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Iterable, List, Optional, Tuple
+
+from app.core.config import settings
+
+# Words and identifiers; "SKU-12.4/B" stays one token and is also split into parts
+_TOKEN_RE = re.compile(r"[^\W_]+(?:[-_./#][^\W_]+)*")
+_SEPARATOR_RE = re.compile(r"[-_./#]")
+
+INDEX_FILENAME = "bm25.json.gz"
+
+
+def tokenize(text: str) -> List[str]:
+    tokens = []
+    for match in _TOKEN_RE.finditer(text.lower()):
+        token = match.group()
+        tokens.append(token)
+        if _SEPARATOR_RE.search(token):
+            tokens.extend(part for part in _SEPARATOR_RE.split(token) if part)
+    return tokens
+
+
+class BM25Index:
+    """In-memory BM25 (Okapi) index over a list of text chunks."""
+
+    def __init__(self, documents: Iterable[str] = (), k1: float = 1.5, b: float = 0.75):
+        self.k1 = k1
+        self.b = b
+        self.documents: List[str] = []
+        self.doc_lengths: List[int] = []
+        self.postings: Dict[str, Dict[int, int]] = {}
+        self.add_documents(documents)
+
+    def add_documents(self, documents: Iterable[str]) -> None:
+        for text in documents:
+            doc_id = len(self.documents)
+            tokens = tokenize(text)
+            self.documents.append(text)
+            self.doc_lengths.append(len(tokens))
+            for token in tokens:
+                postings = self.postings.setdefault(token, {})
+                postings[doc_id] = postings.get(doc_id, 0) + 1
+
+    def search(self, query: str, k: int = 10) -> List[Tuple[int, float]]:
+        """
+        Rank chunks against a query.
+
+        Returns:
+            Up to ``k`` (chunk index, score) pairs, best first
+        """
+        total = len(self.documents)
+        if not total:
+            return []
+        avg_length = (sum(self.doc_lengths) / total) or 1.0
+
+        scores: Dict[int, float] = {}
+        for term in set(tokenize(query)):
+            postings = self.postings.get(term)
+            if not postings:
+                continue
+            idf = math.log(1 + (total - len(postings) + 0.5) / (len(postings) + 0.5))
+            for doc_id, tf in postings.items():
+                norm = self.k1 * (1 - self.b + self.b * self.doc_lengths[doc_id] / avg_length)
+                scores[doc_id] = scores.get(doc_id, 0.0) + idf * tf * (self.k1 + 1) / (tf + norm)
+
+        return heapq.nlargest(k, scores.items(), key=lambda item: item[1])
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "k1": self.k1,
+            "b": self.b,
+            "documents": self.documents,
+            "doc_lengths": self.doc_lengths,
+            "postings": {term: list(postings.items()) for term, postings in self.postings.items()},
+        }
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "BM25Index":
+        index = cls(k1=data["k1"], b=data["b"])
+        index.documents = data["documents"]
+        index.doc_lengths = data["doc_lengths"]
+        index.postings = {term: dict(postings) for term, postings in data["postings"].items()}
+        return index
+
+    def save(self, path: str) -> None:
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        tmp_path = f"{path}.tmp"
+        with gzip.open(tmp_path, "wt", encoding="utf-8") as f:
+            json.dump(self.to_dict(), f, ensure_ascii=False)
+        os.replace(tmp_path, path)
+
+    @classmethod
+    def load(cls, path: str) -> "BM25Index":
+        with gzip.open(path, "rt", encoding="utf-8") as f:
+            return cls.from_dict(json.load(f))
+
+
+# ==================== Storage ====================
+
+def faiss_index_path(company_id: int, faiss_index_id: str) -> str:
+    return os.path.join(settings.FAISS_INDEX_DIR, str(company_id), faiss_index_id, INDEX_FILENAME)
+
+
+def chroma_index_path(company_id: int, collection_name: str) -> str:
+    return os.path.join(settings.LEXICAL_INDEX_DIR, str(company_id), f"{collection_name}.{INDEX_FILENAME}")
+
+
+def kb_index_path(kb) -> Optional[str]:
+    """Lexical index location of a local knowledge base, or None for remote ones."""
+    if kb.type != "local":
+        return None
+    if kb.chroma_collection_name:
+        return chroma_index_path(kb.company_id, kb.chroma_collection_name)
+    if kb.faiss_index_id:
+        return faiss_index_path(kb.company_id, kb.faiss_index_id)
+    return None
+
+
+def build_index(path: str, texts: List[str]) -> Optional[BM25Index]:
+    """Build and store the lexical index of a knowledge base's chunks."""
+    try:
+        index = BM25Index(texts)
+        index.save(path)
+        return index
+    except Exception as e:
+        print(f"Error building lexical index at {path}: {e}")
+        return None
+
+
+def delete_kb_index(kb) -> None:
+    path = kb_index_path(kb)
+    if path and os.path.exists(path):
+        try:
+            os.remove(path)
+        except OSError as e:
+            print(f"Error deleting lexical index {path}: {e}")
+    _forget(path)
+
+
+_cache: "OrderedDict[str, Tuple[float, BM25Index]]" = OrderedDict()
+_cache_lock = threading.Lock()
+
+
+def _forget(path: Optional[str]) -> None:
+    with _cache_lock:
+        _cache.pop(path, None)
+
+
+def load_kb_index(kb) -> Optional[BM25Index]:
+    """The knowledge base's lexical index (LRU-cached per worker), or None if it has none."""
+    path = kb_index_path(kb)
+    if not path:
+        return None
+    try:
+        mtime = os.path.getmtime(path)
+    except OSError:
+        return None
+
+    with _cache_lock:
+        entry = _cache.get(path)
+        if entry and entry[0] == mtime:
+            _cache.move_to_end(path)
+            return entry[1]
+
+    try:
+        index = BM25Index.load(path)
+    except Exception as e:
+        print(f"Error loading lexical index {path}: {e}")
+        return None
+
+    with _cache_lock:
+        _cache[path] = (mtime, index)
+        _cache.move_to_end(path)
+        while len(_cache) > settings.LEXICAL_INDEX_CACHE_SIZE:
+            _cache.popitem(last=False)
+    return index
+
+
+# ==================== Fusion ====================
+
+def reciprocal_rank_fusion(rankings: List[List[str]], k: int, rrf_k: Optional[int] = None) -> List[str]:
+    """
+    Fuse several rankings of keys: score(key) = sum over rankings of 1 / (rrf_k + rank).
+    Ties keep the order in which keys first appear.
+    """
+    rrf_k = settings.KB_RRF_K if rrf_k is None else rrf_k
+    scores: Dict[str, float] = {}
+    for ranking in rankings:
+        for rank, key in enumerate(ranking, start=1):
+            scores[key] = scores.get(key, 0.0) + 1.0 / (rrf_k + rank)
+    return sorted(scores, key=scores.get, reverse=True)[:k]
+
+
+def candidate_count(k: int) -> int:
+    """How many hits to take from each ranking before fusion."""
+    if not settings.KB_HYBRID_SEARCH_ENABLED:
+        return k
+    return max(k, settings.KB_HYBRID_CANDIDATES)
+
+
+def fuse_with_lexical(
+    kb,
+    query: str,
+    vector_hits: List[Any],
+    k: int,
+    text_of: Callable[[Any], str] = lambda hit: hit,
+    make_hit: Callable[[str], Any] = lambda text: text,
+) -> List[Any]:
+    """
+    Fuse a knowledge base's vector hits with its BM25 hits for ``query``.
+
+    Args:
+        kb: The knowledge base
+        query: User query
+        vector_hits: Vector search results, best first (see candidate_count)
+        k: Number of results to return
+        text_of: Chunk text of a vector hit (hits are matched by text)
+        make_hit: Builds a result for a chunk only the lexical index found
+
+    Returns:
+        The top ``k`` hits; just the vector hits when the KB has no lexical index
+    """
+    index = load_kb_index(kb) if settings.KB_HYBRID_SEARCH_ENABLED else None
+    if index is None:
+        return vector_hits[:k]
+
+    lexical_texts = [index.documents[doc_id] for doc_id, _ in index.search(query, candidate_count(k))]
+
+    hits_by_text: Dict[str, Any] = {}
+    for hit in vector_hits:
+        hits_by_text.setdefault(text_of(hit), hit)
+    for text in lexical_texts:
+        if text not in hits_by_text:
+            hits_by_text[text] = make_hit(text)
+
+    fused = reciprocal_rank_fusion([[text_of(hit) for hit in vector_hits], lexical_texts], k)
+    return [hits_by_text[text] for text in fused]
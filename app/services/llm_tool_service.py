@@ -5,6 +5,7 @@ from app.llm_providers.openai_provider import generate_response as oai
 from app.services import knowledge_base_service
 from app.services.prompt_guard_service import prompt_guard, get_safe_system_prompt
 from app.services import token_usage_service
+from app.services import attachment_service
 from sqlalchemy.orm import Session
 from fastmcp.client import Client
 import asyncio
@@ -25,7 +26,8 @@ class LLMToolService:
         behaves correctly.
 
         Args:
-            attachments: List of attachment dicts with file_name, file_type, file_size, file_data (base64)
+            attachments: List of attachment dicts with file_name, file_type, file_size and
+                either file_data (base64) or storage_key (uploaded attachment)
             session_id: Optional session ID for rate limiting
         """
         # === SECURITY: Scan user input for prompt injection ===
@@ -71,12 +73,12 @@ class LLMToolService:
             # Build multimodal content array for vision models
             content = [{"type": "text", "text": augmented_prompt}]
             for attachment in attachments:
-                file_type = attachment.get('file_type', '')
-                if file_type.startswith('image/'):
+                image_url = await attachment_service.image_data_url(attachment)
+                if image_url:
                     content.append({
                         "type": "image_url",
                         "image_url": {
-                            "url": f"data:{file_type};base64,{attachment['file_data']}"
+                            "url": image_url
                         }
                     })
                     print(f"DEBUG: Added image attachment to LLM request: {attachment.get('file_name')}")
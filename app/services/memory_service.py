@@ -1,3 +1,4 @@
+from sqlalchemy.dialects.postgresql import insert as pg_insert
 from sqlalchemy.orm import Session
 from app.models import memory as models_memory
 from app.schemas import memory as schemas_memory
@@ -24,6 +25,34 @@ def set_memory(db: Session, memory_in: schemas_memory.MemoryCreate, agent_id: in
     db.refresh(db_memory)
     return db_memory
 
+def upsert_memories(db: Session, values: dict, agent_id: int, session_id: str, commit: bool = True) -> int:
+    """
+    Creates or updates several memory keys with one INSERT ... ON CONFLICT statement.
+
+    Args:
+        values: Memory values by key
+        commit: Commit the transaction (False when the caller batches writes)
+
+    Returns:
+        Number of keys written
+    """
+    if not values:
+        return 0
+
+    table = models_memory.Memory.__table__
+    stmt = pg_insert(table).values([
+        {"agent_id": agent_id, "session_id": session_id, "key": key, "value": value}
+        for key, value in values.items()
+    ])
+    stmt = stmt.on_conflict_do_update(
+        index_elements=[table.c.agent_id, table.c.session_id, table.c.key],
+        set_={"value": stmt.excluded.value},
+    )
+    db.execute(stmt)
+    if commit:
+        db.commit()
+    return len(values)
+
 def get_memory(db: Session, agent_id: int, session_id: str, key: str):
     return db.query(models_memory.Memory).filter(
         models_memory.Memory.agent_id == agent_id,
@@ -37,7 +66,7 @@ def get_all_memories(db: Session, agent_id: int, session_id: str):
         models_memory.Memory.session_id == session_id
     ).all()
 
-def delete_all_memories(db: Session, agent_id: int, session_id: str):
+def delete_all_memories(db: Session, agent_id: int, session_id: str, commit: bool = True):
     """
     Deletes all memory entries for a given agent and session.
     Used when a workflow completes to start fresh on next execution.
@@ -46,5 +75,6 @@ def delete_all_memories(db: Session, agent_id: int, session_id: str):
         models_memory.Memory.agent_id == agent_id,
         models_memory.Memory.session_id == session_id
     ).delete()
-    db.commit()
+    if commit:
+        db.commit()
     return deleted_count
@@ -1,17 +1,40 @@
 
-from ultralytics import YOLO
-import cv2
 import numpy as np
+from app.core.model_registry import model_registry
+
+def _yolo_loader(model_path: str):
+    def load():
+        from ultralytics import YOLO
+        return YOLO(model_path)
+    return load
+
+def _decode_image(image_data: bytes):
+    import cv2
+    nparr = np.frombuffer(image_data, np.uint8)
+    return cv2.imdecode(nparr, cv2.IMREAD_COLOR)
 
 class ObjectDetectionService:
+    """YOLO detection, segmentation and pose estimation. Each model loads on first use."""
+
     def __init__(self, detection_model_path='yolov8n.pt', segmentation_model_path='yolov8n-seg.pt', pose_model_path='yolov8n-pose.pt'):
-        self.detection_model = YOLO(detection_model_path)
-        self.segmentation_model = YOLO(segmentation_model_path)
-        self.pose_model = YOLO(pose_model_path)
+        model_registry.register("yolo_detection", _yolo_loader(detection_model_path), f"YOLO {detection_model_path}")
+        model_registry.register("yolo_segmentation", _yolo_loader(segmentation_model_path), f"YOLO {segmentation_model_path}")
+        model_registry.register("yolo_pose", _yolo_loader(pose_model_path), f"YOLO {pose_model_path}")
+
+    @property
+    def detection_model(self):
+        return model_registry.get("yolo_detection")
+
+    @property
+    def segmentation_model(self):
+        return model_registry.get("yolo_segmentation")
+
+    @property
+    def pose_model(self):
+        return model_registry.get("yolo_pose")
 
     def detect_objects(self, image_data: bytes):
-        nparr = np.frombuffer(image_data, np.uint8)
-        img = cv2.imdecode(nparr, cv2.IMREAD_COLOR)
+        img = _decode_image(image_data)
         
         results = self.detection_model(img)
         
@@ -27,8 +50,7 @@ class ObjectDetectionService:
         return detections
 
     def segment_image(self, image_data: bytes):
-        nparr = np.frombuffer(image_data, np.uint8)
-        img = cv2.imdecode(nparr, cv2.IMREAD_COLOR)
+        img = _decode_image(image_data)
         
         results = self.segmentation_model(img)
         
@@ -46,8 +68,7 @@ class ObjectDetectionService:
         return segmentations
 
     def estimate_pose(self, image_data: bytes):
-        nparr = np.frombuffer(image_data, np.uint8)
-        img = cv2.imdecode(nparr, cv2.IMREAD_COLOR)
+        img = _decode_image(image_data)
         
         results = self.pose_model(img)
         
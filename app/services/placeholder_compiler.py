@@ -0,0 +1,113 @@
+"""
+Placeholder Compiler
+Parses workflow placeholder strings once into literal and path segments.
+
+``{{context.a.b}}`` walks the conversation context; ``{{step_id.x.y}}`` walks
+a node's result, and a bare ``{{step_id}}`` is the node's output (with
+``output.content`` unwrapped). A string that is exactly one placeholder
+renders to the resolved value itself, preserving its type; otherwise each
+placeholder is rendered with ``str()`` into the surrounding text.
+
+Templates found in node data are compiled with the workflow plan (see
+workflow_plan_service); strings built at run time go through a bounded
+compile cache.
+"""
+import re
+from functools import lru_cache
+from typing import Any, Iterator, List, Union
+
+_SINGLE_PLACEHOLDER_RE = re.compile(r"^\s*\{\{([^{}]+)\}\}\s*$")
+_PLACEHOLDER_RE = re.compile(r"\{\{(.*?)\}\}")
+
+
+def _drill_down(obj, keys):
+    """Walk nested dicts; anything missing or non-dict along the way is ''."""
+    for key in keys:
+        if isinstance(obj, dict):
+            obj = obj.get(key, '')
+        else:
+            return ''
+    return obj
+
+
+class PlaceholderPath:
+    """One ``{{source.key.key}}`` reference."""
+
+    __slots__ = ("source", "keys")
+
+    def __init__(self, placeholder: str):
+        path = placeholder.strip().split(".")
+        self.source = path[0]
+        self.keys = tuple(path[1:])
+
+    def resolve(self, context: dict, results: dict) -> Any:
+        if self.source == "context":
+            return _drill_down(context, self.keys)
+
+        step_result = results.get(self.source)
+        if not step_result:
+            return ''
+        if self.keys:
+            return _drill_down(step_result, self.keys)
+
+        output_value = step_result.get("output")
+        if isinstance(output_value, dict):
+            return output_value.get("content", '')
+        if output_value is None:
+            return ''
+        return output_value
+
+
+class PlaceholderTemplate:
+    """A compiled placeholder string."""
+
+    __slots__ = ("source", "single", "segments")
+
+    def __init__(self, source: str):
+        self.source = source
+        self.segments: List[Union[str, PlaceholderPath]] = []
+
+        single = _SINGLE_PLACEHOLDER_RE.match(source)
+        self.single = PlaceholderPath(single.group(1)) if single else None
+        if self.single:
+            return
+
+        position = 0
+        for match in _PLACEHOLDER_RE.finditer(source):
+            if match.start() > position:
+                self.segments.append(source[position:match.start()])
+            self.segments.append(PlaceholderPath(match.group(1)))
+            position = match.end()
+        if position < len(source):
+            self.segments.append(source[position:])
+
+    def render(self, context: dict, results: dict) -> Any:
+        if self.single:
+            return self.single.resolve(context, results)
+
+        parts = []
+        for segment in self.segments:
+            if isinstance(segment, str):
+                parts.append(segment)
+            else:
+                value = segment.resolve(context, results)
+                parts.append(str(value) if value is not None else '')
+        return "".join(parts)
+
+
+@lru_cache(maxsize=4096)
+def compile_placeholders(source: str) -> PlaceholderTemplate:
+    return PlaceholderTemplate(source)
+
+
+def iter_placeholder_strings(value: Any) -> Iterator[str]:
+    """Every string containing a placeholder, anywhere inside nested dicts/lists."""
+    if isinstance(value, str):
+        if '{{' in value:
+            yield value
+    elif isinstance(value, dict):
+        for item in value.values():
+            yield from iter_placeholder_strings(item)
+    elif isinstance(value, (list, tuple)):
+        for item in value:
+            yield from iter_placeholder_strings(item)
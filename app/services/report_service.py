@@ -0,0 +1,279 @@
+"""
+Report Service
+Computes the reports dashboard metrics with a handful of aggregate queries
+and caches them per company for a short time.
+
+Conversation metrics (totals, active/resolved/unattended counts, status and
+channel distributions) all come from a single conditional-aggregation pass
+over ``conversation_sessions``. Cached entries of a company are dropped as
+soon as one of its sessions changes status, assignee or handoff state.
+"""
+import datetime
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Optional, Tuple
+
+from sqlalchemy import case, event, func
+from sqlalchemy.orm import Session, object_session
+
+from app.core.config import settings
+from app.core.database import invalidate_on_commit
+from app.models.agent import Agent
+from app.models.chat_message import ChatMessage
+from app.models.conversation_session import ConversationSession
+from app.models.user import User
+
+CLOSED_STATUSES = ('resolved', 'archived')
+
+# Session columns that feed the conversation metrics
+_TRACKED_SESSION_FIELDS = ('status', 'assignee_id', 'waiting_for_agent', 'channel', 'created_at')
+
+
+class ReportCache:
+    """Small thread-safe TTL cache keyed by company, report name and date range."""
+
+    def __init__(self, max_entries: int = 1000):
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[tuple, Tuple[float, Any]]" = OrderedDict()
+        self._generations: Dict[Optional[int], int] = {}  # company -> invalidation count
+        self._generation = 0  # clear() count
+        self._lock = threading.Lock()
+
+    def _generation_of(self, company_id: Optional[int]) -> Tuple[int, int]:
+        return self._generation, self._generations.get(company_id, 0)
+
+    def get_or_compute(self, key: tuple, ttl: float, compute: Callable[[], Any]) -> Any:
+        now = time.monotonic()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry and entry[0] > now:
+                self._entries.move_to_end(key)
+                return entry[1]
+            generation = self._generation_of(key[0])
+
+        value = compute()
+
+        with self._lock:
+            # Invalidated while computing: the value may predate the change, so don't keep it
+            if self._generation_of(key[0]) != generation:
+                return value
+            self._entries[key] = (now + ttl, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+        return value
+
+    def invalidate_company(self, company_id: Optional[int]) -> None:
+        with self._lock:
+            self._generations[company_id] = self._generations.get(company_id, 0) + 1
+            for key in [k for k in self._entries if k[0] == company_id]:
+                del self._entries[key]
+
+    def clear(self) -> None:
+        with self._lock:
+            self._generation += 1
+            self._entries.clear()
+
+
+# Global instance
+report_cache = ReportCache(max_entries=settings.REPORTS_CACHE_MAX_ENTRIES)
+
+
+def _end_of_day(end_date: Optional[datetime.date]) -> Optional[datetime.datetime]:
+    """Convert end_date to include the entire day (23:59:59)."""
+    return datetime.datetime.combine(end_date, datetime.time.max) if end_date else None
+
+
+def _date_filters(column, start_date, end_date) -> list:
+    filters = []
+    if start_date:
+        filters.append(column >= start_date)
+    end_datetime = _end_of_day(end_date)
+    if end_datetime:
+        filters.append(column <= end_datetime)
+    return filters
+
+
+def _percentage(count: int, total: int) -> float:
+    return round((count / total) * 100, 2) if total > 0 else 0
+
+
+# ==================== Conversation Metrics ====================
+
+def _compute_conversation_metrics(db: Session, company_id: int, start_date, end_date) -> Dict[str, Any]:
+    is_open = ~ConversationSession.status.in_(CLOSED_STATUSES)
+    is_unattended = (
+        (ConversationSession.assignee_id.is_(None) | (ConversationSession.waiting_for_agent == True))
+        & is_open
+    )
+
+    rows = db.query(
+        ConversationSession.status,
+        ConversationSession.channel,
+        func.count(ConversationSession.id),
+        func.sum(case((is_unattended, 1), else_=0)),
+    ).filter(
+        ConversationSession.company_id == company_id,
+        *_date_filters(ConversationSession.created_at, start_date, end_date)
+    ).group_by(ConversationSession.status, ConversationSession.channel).all()
+
+    by_status: Dict[str, int] = {}
+    by_channel: Dict[str, int] = {}
+    total = unattended = 0
+    for status, channel, count, unattended_count in rows:
+        by_status[status] = by_status.get(status, 0) + count
+        by_channel[channel] = by_channel.get(channel, 0) + count
+        total += count
+        unattended += int(unattended_count or 0)
+
+    return {
+        "total": total,
+        "active": sum(count for status, count in by_status.items() if status not in CLOSED_STATUSES),
+        "resolved": by_status.get('resolved', 0),
+        "unattended": unattended,
+        "by_status": by_status,
+        "by_channel": by_channel,
+    }
+
+
+def get_conversation_metrics(db: Session, company_id: int, start_date=None, end_date=None) -> Dict[str, Any]:
+    """
+    Conversation counts for a company and date range from one aggregate query.
+
+    Returns:
+        Dict with total, active, resolved and unattended counts plus
+        ``by_status`` and ``by_channel`` distributions
+    """
+    return report_cache.get_or_compute(
+        (company_id, "conversations", start_date, end_date),
+        settings.REPORTS_CACHE_TTL,
+        lambda: _compute_conversation_metrics(db, company_id, start_date, end_date),
+    )
+
+
+def get_conversation_trends(db: Session, company_id: int, start_date=None, end_date=None) -> list:
+    """Daily conversation counts for trend analysis."""
+    def compute():
+        day = func.date(ConversationSession.created_at)
+        rows = db.query(day.label('date'), func.count(ConversationSession.id)).filter(
+            ConversationSession.company_id == company_id,
+            *_date_filters(ConversationSession.created_at, start_date, end_date)
+        ).group_by(day).order_by(day).all()
+        return [{"date": str(date), "count": count} for date, count in rows]
+
+    return report_cache.get_or_compute(
+        (company_id, "trends", start_date, end_date), settings.REPORTS_CACHE_TTL, compute
+    )
+
+
+# ==================== Message Metrics ====================
+
+def get_satisfaction_distribution(db: Session, company_id: int, start_date=None, end_date=None) -> Dict[int, int]:
+    """Count of rated messages per feedback rating."""
+    def compute():
+        rows = db.query(ChatMessage.feedback_rating, func.count(ChatMessage.id)).filter(
+            ChatMessage.company_id == company_id,
+            ChatMessage.feedback_rating != None,
+            *_date_filters(ChatMessage.timestamp, start_date, end_date)
+        ).group_by(ChatMessage.feedback_rating).all()
+        return {rating: count for rating, count in rows}
+
+    return report_cache.get_or_compute(
+        (company_id, "satisfaction", start_date, end_date), settings.REPORTS_CACHE_SLOW_TTL, compute
+    )
+
+
+def get_average_satisfaction(db: Session, company_id: int, start_date=None, end_date=None) -> float:
+    distribution = get_satisfaction_distribution(db, company_id, start_date, end_date)
+    total = sum(distribution.values())
+    if not total:
+        return 0
+    return sum(rating * count for rating, count in distribution.items()) / total
+
+
+def get_top_issues(db: Session, company_id: int, start_date=None, end_date=None, limit: int = 10) -> list:
+    """Most frequent message issues."""
+    def compute():
+        issue_count = func.count(ChatMessage.id)
+        rows = db.query(ChatMessage.issue, issue_count).filter(
+            ChatMessage.company_id == company_id,
+            ChatMessage.issue != None,
+            *_date_filters(ChatMessage.timestamp, start_date, end_date)
+        ).group_by(ChatMessage.issue).order_by(issue_count.desc()).limit(limit).all()
+        return [{"issue": issue, "count": count} for issue, count in rows]
+
+    return report_cache.get_or_compute(
+        (company_id, "top_issues", start_date, end_date, limit), settings.REPORTS_CACHE_SLOW_TTL, compute
+    )
+
+
+# ==================== Team Metrics ====================
+
+def get_team_availability(db: Session, company_id: int) -> Dict[str, int]:
+    """Active users, online users and active AI agents of a company."""
+    def compute():
+        total_users, available_users = db.query(
+            func.count(User.id),
+            func.sum(case((User.presence_status == 'online', 1), else_=0)),
+        ).filter(User.company_id == company_id, User.is_active == True).one()
+
+        active_agents = db.query(func.count(Agent.id)).filter(
+            Agent.company_id == company_id,
+            Agent.is_active == True
+        ).scalar()
+
+        return {
+            "total_users": total_users or 0,
+            "available_users": int(available_users or 0),
+            "active_agents": active_agents or 0,
+        }
+
+    return report_cache.get_or_compute((company_id, "team"), settings.REPORTS_CACHE_TTL, compute)
+
+
+def get_overall_metrics(db: Session, company_id: int, start_date=None, end_date=None) -> Dict[str, Any]:
+    """Dashboard tile metrics, assembled from the cached aggregates above."""
+    conversations = get_conversation_metrics(db, company_id, start_date, end_date)
+    team = get_team_availability(db, company_id)
+    avg_satisfaction = get_average_satisfaction(db, company_id, start_date, end_date)
+
+    return {
+        "total_sessions": conversations["total"],
+        "customer_satisfaction": round(avg_satisfaction, 2),
+        "active_agents": team["active_agents"],
+        "active_conversations": conversations["active"],
+        "resolution_rate": f"{_percentage(conversations['resolved'], conversations['total'])}%",
+        "available_users": team["available_users"],
+        "total_users": team["total_users"],
+        "agent_availability_rate": f"{_percentage(team['available_users'], team['total_users'])}%",
+        "unattended_conversations": conversations["unattended"],
+    }
+
+
+# ==================== Cache Invalidation ====================
+
+_mark_dirty = invalidate_on_commit("report_dirty_companies", lambda company_id: report_cache.invalidate_company(company_id))
+
+
+def _mark_company_dirty(target) -> None:
+    db = object_session(target)
+    if db is not None and target.company_id is not None:
+        _mark_dirty(db, target.company_id)
+
+
+def _session_changed(mapper, connection, target):
+    from sqlalchemy import inspect
+
+    state = inspect(target)
+    if any(state.attrs[field].history.has_changes() for field in _TRACKED_SESSION_FIELDS):
+        _mark_company_dirty(target)
+
+
+def _session_added_or_removed(mapper, connection, target):
+    _mark_company_dirty(target)
+
+
+event.listen(ConversationSession, "after_insert", _session_added_or_removed)
+event.listen(ConversationSession, "after_delete", _session_added_or_removed)
+event.listen(ConversationSession, "after_update", _session_changed)
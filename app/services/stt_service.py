@@ -59,16 +59,16 @@ class OpenAISTTService:
         Returns:
             Transcription result dict with 'text' field
         """
-        from app.services.audio_conversion_service import AudioConversionService
+        from app.services.audio_conversion_service import audio_transcoder
 
-        wav_buffer = AudioConversionService.create_wav_buffer(pcm_bytes, sample_rate)
+        wav_bytes = await audio_transcoder.create_wav_bytes(pcm_bytes, sample_rate)
 
         url = f"{self.base_url}/transcriptions"
         async with aiohttp.ClientSession() as session:
             form = aiohttp.FormData()
             form.add_field(
                 "file",
-                wav_buffer.read(),
+                wav_bytes,
                 filename="audio.wav",
                 content_type="audio/wav"
             )
@@ -7,6 +7,7 @@ from typing import Optional
 from sqlalchemy.orm import Session
 from app.models.tool import Tool
 from app.services import workflow_service, tool_followup_service, tool_service
+from app.services.workflow_http_service import workflow_http
 from fastmcp.client import Client
 
 # Import builtin tool implementations
@@ -55,7 +56,8 @@ def execute_custom_tool(db: Session, tool: Tool, company_id: int, session_id: st
         config = {
             "db": db,
             "company_id": company_id,
-            "session_id": session_id
+            "session_id": session_id,
+            "http_session": workflow_http.session  # Pooled keep-alive requests.Session
         }
 
         result = tool_function(params=parameters, config=config)
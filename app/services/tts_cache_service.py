@@ -0,0 +1,692 @@
+"""
+TTS audio cache for static prompts.
+
+Greetings, hold messages and most workflow node prompts are identical across
+calls. Instead of re-synthesizing them on every call, the synthesized audio is
+stored already encoded for its destination:
+
+- Twilio: mulaw 8kHz (``mulaw_8000``)
+- FreeSWITCH: L16 PCM at the configured rate (``l16_8000``, ``l16_16000``, ``l16_48000``)
+- Browser widget: provider-native stream as sent over the websocket (``browser``)
+
+Entries are keyed by provider, voice, text and output format and live in a
+small in-memory LRU in front of a persistent backend: a size-capped local
+directory, or a prefix in the MinIO bucket used by ``s3_client`` (give that
+prefix a bucket lifecycle rule to expire old entries).
+"""
+import asyncio
+import hashlib
+import json
+import logging
+import os
+import re
+import time
+from collections import OrderedDict
+from typing import AsyncGenerator, Awaitable, Callable, Dict, Iterable, List, Optional
+
+from app.core.config import settings
+from app.services.audio_conversion_service import AudioConversionService
+
+logger = logging.getLogger(__name__)
+
+# Output formats
+FORMAT_TWILIO_MULAW_8K = "mulaw_8000"
+FORMAT_BROWSER = "browser"
+FREESWITCH_SAMPLE_RATES = (8000, 16000, 48000)
+
+# Chunk size used when replaying cached browser audio over the websocket
+BROWSER_REPLAY_CHUNK_SIZE = 16384
+
+# Texts found not to be static prompts are remembered per process for a while,
+# so free-form answers don't cost a backend read each; other workers'
+# registrations show up once the entry expires
+STATIC_PROMPT_MISS_TTL = 300
+STATIC_PROMPT_MISS_MAX_ENTRIES = 10000
+
+# Telephony endpoints always synthesize with OpenAI PCM output
+TELEPHONY_TTS_PROVIDER = "openai"
+TELEPHONY_TTS_VOICE = "alloy"
+
+
+def l16_format(sample_rate: int) -> str:
+    """Cache format name for FreeSWITCH L16 audio at the given sample rate."""
+    return f"l16_{sample_rate}"
+
+
+def normalize_text(text) -> str:
+    """Collapse whitespace so cosmetic edits don't produce new cache entries."""
+    if text is None:
+        return ""
+    if not isinstance(text, str):
+        text = str(text)
+    return re.sub(r"\s+", " ", text).strip()
+
+
+def encode_pcm_for_format(pcm_audio: bytes, output_format: str, source_rate: int = 24000) -> bytes:
+    """
+    Encode raw 16-bit PCM (OpenAI TTS output) into a telephony cache format.
+
+    Args:
+        pcm_audio: Raw PCM 16-bit mono audio
+        output_format: ``mulaw_8000`` or ``l16_<rate>``
+        source_rate: Sample rate of ``pcm_audio``
+
+    Returns:
+        Encoded audio bytes (not base64)
+    """
+    if output_format == FORMAT_TWILIO_MULAW_8K:
+        pcm_8k = AudioConversionService.resample(pcm_audio, source_rate, 8000)
+        return AudioConversionService.pcm_to_mulaw(pcm_8k)
+    if output_format.startswith("l16_"):
+        target_rate = int(output_format.split("_", 1)[1])
+        return AudioConversionService.resample(pcm_audio, source_rate, target_rate)
+    raise ValueError(f"Unsupported telephony TTS format: {output_format}")
+
+
+# ==================== Storage Backends ====================
+
+class LocalTTSCacheBackend:
+    """
+    Stores cached audio as files under a local directory.
+
+    The directory is capped at ``max_bytes``: every ``sweep_every`` writes the
+    least recently used files (by mtime, refreshed on read) are removed until
+    the total is back under the cap.
+    """
+
+    def __init__(self, directory: str, max_bytes: int, sweep_every: int = 50):
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self.sweep_every = sweep_every
+        self._writes_since_sweep = 0
+
+    def _path(self, key: str) -> str:
+        return os.path.join(self.directory, *key.split("/"))
+
+    def read(self, key: str) -> Optional[bytes]:
+        path = self._path(key)
+        if not os.path.exists(path):
+            return None
+        with open(path, "rb") as f:
+            data = f.read()
+        try:
+            os.utime(path, None)
+        except OSError:
+            pass
+        return data
+
+    def write(self, key: str, audio: bytes) -> None:
+        path = self._path(key)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        tmp_path = f"{path}.tmp"
+        with open(tmp_path, "wb") as f:
+            f.write(audio)
+        os.replace(tmp_path, path)
+
+        self._writes_since_sweep += 1
+        if self._writes_since_sweep >= self.sweep_every:
+            self._writes_since_sweep = 0
+            self.sweep()
+
+    def sweep(self) -> int:
+        """Evict least recently used files until the directory fits ``max_bytes``."""
+        entries = []
+        total = 0
+        for root, _, files in os.walk(self.directory):
+            for name in files:
+                path = os.path.join(root, name)
+                try:
+                    stat = os.stat(path)
+                except OSError:
+                    continue
+                entries.append((stat.st_mtime, stat.st_size, path))
+                total += stat.st_size
+
+        removed = 0
+        for _, size, path in sorted(entries):
+            if total <= self.max_bytes:
+                break
+            try:
+                os.remove(path)
+                total -= size
+                removed += 1
+            except OSError:
+                continue
+        return removed
+
+
+class S3TTSCacheBackend:
+    """Stores cached audio in the MinIO/S3 bucket."""
+
+    def __init__(self, client, bucket: str, prefix: str):
+        self.client = client
+        self.bucket = bucket
+        self.prefix = prefix.strip("/")
+
+    def _object_key(self, key: str) -> str:
+        return f"{self.prefix}/{key}"
+
+    def read(self, key: str) -> Optional[bytes]:
+        from botocore.exceptions import ClientError
+        try:
+            response = self.client.get_object(Bucket=self.bucket, Key=self._object_key(key))
+        except ClientError as e:
+            if e.response.get("Error", {}).get("Code") in ("NoSuchKey", "404"):
+                return None
+            raise
+        return response["Body"].read()
+
+    def write(self, key: str, audio: bytes) -> None:
+        self.client.put_object(
+            Bucket=self.bucket,
+            Key=self._object_key(key),
+            Body=audio,
+            ContentType="application/octet-stream",
+        )
+
+
+def _create_backend():
+    if settings.TTS_CACHE_BACKEND == "s3":
+        from app.core.object_storage import s3_client, BUCKET_NAME
+        return S3TTSCacheBackend(s3_client, BUCKET_NAME, settings.TTS_CACHE_S3_PREFIX)
+    return LocalTTSCacheBackend(settings.TTS_CACHE_DIR, settings.TTS_CACHE_DIR_MAX_BYTES)
+
+
+# ==================== Cache ====================
+
+class TTSAudioCache:
+    """
+    Two-level cache (memory LRU + persistent backend) for synthesized audio.
+
+    Lookups are cheap, so callers opt in for any text that may be static.
+    Entries are only written for texts known to be static: either the caller
+    says so (greetings) or the text was registered by a workflow warmup.
+    Registrations are persisted as marker entries in the backend so every
+    worker (and the same worker after a restart) recognizes them.
+    """
+
+    def __init__(self, backend, memory_max_bytes: int):
+        self.backend = backend
+        self.memory_max_bytes = memory_max_bytes
+        self._memory: "OrderedDict[str, bytes]" = OrderedDict()
+        self._memory_bytes = 0
+        self._static_prompts = set()
+        self._not_static: "OrderedDict[str, float]" = OrderedDict()  # normalized text -> expiry
+        self._inflight: Dict[str, asyncio.Future] = {}
+        self.hits = 0
+        self.misses = 0
+
+    @staticmethod
+    def make_key(provider: str, voice: str, text: str, output_format: str) -> str:
+        digest = hashlib.sha256(
+            "\x00".join([provider or "", voice or "", output_format, normalize_text(text)]).encode("utf-8")
+        ).hexdigest()
+        return f"{provider or 'default'}/{output_format}/{digest}"
+
+    @staticmethod
+    def _static_marker_key(normalized_text: str) -> str:
+        return f"static/{hashlib.sha256(normalized_text.encode('utf-8')).hexdigest()}"
+
+    async def register_static_prompts(self, texts: Iterable[str]) -> None:
+        for text in texts:
+            normalized = normalize_text(text)
+            if not normalized or normalized in self._static_prompts:
+                continue
+            self._static_prompts.add(normalized)
+            self._not_static.pop(normalized, None)
+            try:
+                await asyncio.to_thread(self.backend.write, self._static_marker_key(normalized), b"1")
+            except Exception as e:
+                logger.warning(f"TTS cache could not persist static prompt marker: {e}")
+
+    async def is_static_prompt(self, text) -> bool:
+        """Whether a workflow warmup registered the text; answers are memoized per process."""
+        if not self.is_cacheable(text):
+            return False
+        normalized = normalize_text(text)
+        if normalized in self._static_prompts:
+            return True
+        expires = self._not_static.get(normalized)
+        if expires is not None:
+            if expires > time.monotonic():
+                return False
+            del self._not_static[normalized]
+        try:
+            marker = await asyncio.to_thread(self.backend.read, self._static_marker_key(normalized))
+        except Exception as e:
+            logger.warning(f"TTS cache static prompt lookup failed: {e}")
+            return False
+        if marker:
+            self._static_prompts.add(normalized)
+            return True
+        self._not_static[normalized] = time.monotonic() + STATIC_PROMPT_MISS_TTL
+        while len(self._not_static) > STATIC_PROMPT_MISS_MAX_ENTRIES:
+            self._not_static.popitem(last=False)
+        return False
+
+    def is_cacheable(self, text) -> bool:
+        if not isinstance(text, str):
+            return False
+        normalized = normalize_text(text)
+        return bool(
+            settings.TTS_CACHE_ENABLED
+            and normalized
+            and len(normalized) <= settings.TTS_CACHE_MAX_TEXT_LENGTH
+        )
+
+    def _remember(self, key: str, audio: bytes) -> None:
+        if len(audio) > self.memory_max_bytes:
+            return
+        if key in self._memory:
+            self._memory_bytes -= len(self._memory.pop(key))
+        self._memory[key] = audio
+        self._memory_bytes += len(audio)
+        while self._memory_bytes > self.memory_max_bytes:
+            _, evicted = self._memory.popitem(last=False)
+            self._memory_bytes -= len(evicted)
+
+    async def get(self, key: str) -> Optional[bytes]:
+        audio = self._memory.get(key)
+        if audio is not None:
+            self._memory.move_to_end(key)
+            return audio
+        try:
+            audio = await asyncio.to_thread(self.backend.read, key)
+        except Exception as e:
+            logger.warning(f"TTS cache read failed for {key}: {e}")
+            return None
+        if audio:
+            self._remember(key, audio)
+        return audio
+
+    async def put(self, key: str, audio: bytes) -> None:
+        if not audio:
+            return
+        self._remember(key, audio)
+        try:
+            await asyncio.to_thread(self.backend.write, key, audio)
+        except Exception as e:
+            logger.warning(f"TTS cache write failed for {key}: {e}")
+
+    async def get_or_synthesize(
+        self,
+        provider: str,
+        voice: str,
+        text: str,
+        output_format: str,
+        synthesize: Callable[[], Awaitable[bytes]],
+        static: bool = False,
+    ) -> bytes:
+        """
+        Return cached audio for the prompt, synthesizing it on a miss.
+
+        Concurrent misses for the same key share a single synthesis call.
+
+        Args:
+            provider: TTS provider name
+            voice: Voice identifier
+            text: Text to speak
+            output_format: Cache format of the audio returned by ``synthesize``
+            synthesize: Coroutine factory producing the encoded audio
+            static: Store the result even if the text was not registered by warmup
+        """
+        if not self.is_cacheable(text):
+            return await synthesize()
+
+        key = self.make_key(provider, voice, text, output_format)
+        audio = await self.get(key)
+        if audio:
+            self.hits += 1
+            return audio
+
+        self.misses += 1
+        inflight = self._inflight.get(key)
+        if inflight:
+            return await asyncio.shield(inflight)
+
+        future = asyncio.get_running_loop().create_future()
+        self._inflight[key] = future
+        try:
+            audio = await synthesize()
+            if audio and (static or await self.is_static_prompt(text)):
+                await self.put(key, audio)
+            future.set_result(audio)
+            return audio
+        except Exception as e:
+            future.set_exception(e)
+            # Mark retrieved so waiters-less futures don't log "exception never retrieved"
+            future.exception()
+            raise
+        finally:
+            self._inflight.pop(key, None)
+
+    def stats(self) -> dict:
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "memory_entries": len(self._memory),
+            "memory_bytes": self._memory_bytes,
+            "static_prompts": len(self._static_prompts),
+        }
+
+
+tts_audio_cache = TTSAudioCache(_create_backend(), settings.TTS_CACHE_MEMORY_MAX_BYTES)
+
+
+# ==================== Cached Synthesis Helpers ====================
+
+async def synthesize_telephony_pcm(text: str, openai_api_key: str) -> bytes:
+    """Synthesize ``text`` with OpenAI TTS as raw PCM 16-bit 24kHz."""
+    from app.services.tts_service import OpenAITTSService
+
+    tts_service = OpenAITTSService(api_key=openai_api_key)
+    return await tts_service.text_to_speech_pcm(text, voice=TELEPHONY_TTS_VOICE)
+
+
+async def get_telephony_audio(
+    text: str,
+    openai_api_key: str,
+    output_format: str,
+    static: bool = False,
+    cacheable: bool = True,
+) -> bytes:
+    """
+    Synthesize ``text`` with OpenAI TTS and return it encoded for a telephony leg.
+
+    Args:
+        text: Text to speak
+        openai_api_key: OpenAI API key used on a cache miss
+        output_format: ``mulaw_8000`` for Twilio or ``l16_<rate>`` for FreeSWITCH
+        static: Always store the result (greetings, hold messages)
+        cacheable: Set False for free-form LLM answers to bypass the cache
+
+    Returns:
+        Encoded audio bytes (not base64)
+    """
+    async def synthesize() -> bytes:
+        pcm_audio = await synthesize_telephony_pcm(text, openai_api_key)
+        return await asyncio.to_thread(encode_pcm_for_format, pcm_audio, output_format)
+
+    if not cacheable:
+        return await synthesize()
+
+    return await tts_audio_cache.get_or_synthesize(
+        TELEPHONY_TTS_PROVIDER, TELEPHONY_TTS_VOICE, text, output_format, synthesize, static=static
+    )
+
+
+async def _collect_complete_stream(tts_service, text: str, voice_id: str, provider: str) -> bytes:
+    """Collect a full provider stream; raises if the provider fails or truncates it."""
+    collected = bytearray()
+    async for chunk in tts_service.text_to_speech_stream(text, voice_id, provider, strict=True):
+        collected.extend(chunk)
+    return bytes(collected)
+
+
+async def stream_browser_tts(
+    tts_service,
+    text: str,
+    voice_id: str,
+    provider: str,
+    static: bool = False,
+) -> AsyncGenerator[bytes, None]:
+    """
+    Drop-in replacement for ``TTSService.text_to_speech_stream`` that serves
+    cached prompts instantly and records static prompts while streaming them.
+
+    Audio is only stored when the provider stream completed; a failed or
+    truncated stream ends playback early (as the plain stream would) and
+    leaves the cache untouched.
+    """
+    if not tts_audio_cache.is_cacheable(text):
+        async for chunk in tts_service.text_to_speech_stream(text, voice_id, provider):
+            yield chunk
+        return
+
+    key = tts_audio_cache.make_key(provider, voice_id, text, FORMAT_BROWSER)
+    audio = await tts_audio_cache.get(key)
+    if audio:
+        tts_audio_cache.hits += 1
+        for i in range(0, len(audio), BROWSER_REPLAY_CHUNK_SIZE):
+            yield audio[i:i + BROWSER_REPLAY_CHUNK_SIZE]
+        return
+
+    tts_audio_cache.misses += 1
+    should_store = static or await tts_audio_cache.is_static_prompt(text)
+    collected = bytearray() if should_store else None
+    try:
+        async for chunk in tts_service.text_to_speech_stream(text, voice_id, provider, strict=True):
+            if collected is not None:
+                collected.extend(chunk)
+            yield chunk
+    except Exception as e:
+        logger.warning(f"TTS stream failed, not caching '{normalize_text(text)[:40]}': {e}")
+        return
+
+    if collected:
+        await tts_audio_cache.put(key, bytes(collected))
+
+
+# ==================== Workflow Warmup ====================
+
+def _parse_visual_steps(visual_steps) -> dict:
+    if isinstance(visual_steps, str):
+        try:
+            visual_steps = json.loads(visual_steps)
+        except json.JSONDecodeError:
+            return {}
+    return visual_steps if isinstance(visual_steps, dict) else {}
+
+
+def _manual_option_labels(options) -> List[str]:
+    if isinstance(options, str):
+        return [o.strip() for o in options.split(",") if o.strip()]
+    labels = []
+    for option in options or []:
+        if isinstance(option, dict):
+            labels.append(str(option.get("label", option.get("value", option.get("key", "")))))
+        else:
+            labels.append(str(option))
+    return [label for label in labels if label]
+
+
+def extract_static_prompts(visual_steps) -> List[str]:
+    """
+    Collect the texts a workflow will speak verbatim.
+
+    Only fields without ``{{placeholders}}`` are static. Prompt and form
+    nodes also produce the "Your options are" / "Please provide" variants
+    spoken on telephony channels and the web widget.
+    """
+    steps = _parse_visual_steps(visual_steps)
+    prompts: List[str] = []
+
+    def add(text):
+        if isinstance(text, str) and text.strip() and "{{" not in text:
+            prompts.append(text)
+
+    for node in steps.get("nodes", []):
+        node_type = node.get("type")
+        node_data = node.get("data", {}) or {}
+        params = node_data.get("params", {}) or {}
+
+        if node_type == "response":
+            add(node_data.get("output_value"))
+        elif node_type == "listen":
+            add(params.get("question_text"))
+        elif node_type == "form":
+            form_title = params.get("title", "Please fill out this form.")
+            add(form_title)
+            field_names = [
+                f.get("label", f.get("name", "")) for f in params.get("fields", []) or []
+                if isinstance(f, dict) and (f.get("label") or f.get("name"))
+            ]
+            if field_names and isinstance(form_title, str):
+                # Web widget variant
+                add(form_title + " Please provide: " + ", ".join(field_names))
+        elif node_type == "prompt":
+            prompt_text = params.get("prompt_text", "Please provide input.")
+            add(prompt_text)
+            if params.get("options_mode", "manual") == "manual" and isinstance(prompt_text, str):
+                option_names = _manual_option_labels(params.get("options", []))
+                if option_names:
+                    # Telephony and web widget variants
+                    add(f"{prompt_text}. Your options are: {', '.join(option_names)}")
+                    add(prompt_text + " Your options are: " + ", ".join(option_names))
+
+    # Preserve order, drop duplicates
+    return list(dict.fromkeys(prompts))
+
+
+async def warm_prompts(
+    texts: List[str],
+    browser_voices: List[tuple],
+    telephony_formats: List[str],
+    openai_api_key: Optional[str],
+) -> int:
+    """
+    Synthesize and store the given prompts for every requested target.
+
+    Telephony PCM is synthesized once per text and encoded for each format.
+
+    Args:
+        texts: Static prompt texts
+        browser_voices: ``(provider, voice_id)`` pairs used by web widget agents
+        telephony_formats: Telephony cache formats to prepare
+        openai_api_key: Key for OpenAI synthesis (browser 'openai' provider and telephony)
+
+    Returns:
+        Number of entries synthesized (cache hits are skipped)
+    """
+    from app.services.tts_service import TTSService
+
+    texts = [text for text in texts if tts_audio_cache.is_cacheable(text)]
+    await tts_audio_cache.register_static_prompts(texts)
+    warmed = 0
+
+    if browser_voices:
+        tts_service = TTSService(openai_api_key=openai_api_key)
+        try:
+            for provider, voice_id in browser_voices:
+                for text in texts:
+                    key = tts_audio_cache.make_key(provider, voice_id, text, FORMAT_BROWSER)
+                    if await tts_audio_cache.get(key):
+                        continue
+                    try:
+                        audio = await _collect_complete_stream(tts_service, text, voice_id, provider)
+                    except Exception as e:
+                        logger.warning(f"TTS warmup failed for '{text[:40]}' ({provider}/{voice_id}): {e}")
+                        continue
+                    if audio:
+                        await tts_audio_cache.put(key, audio)
+                        warmed += 1
+        finally:
+            await tts_service.close()
+
+    if openai_api_key and telephony_formats:
+        for text in texts:
+            missing = []
+            for output_format in telephony_formats:
+                key = tts_audio_cache.make_key(TELEPHONY_TTS_PROVIDER, TELEPHONY_TTS_VOICE, text, output_format)
+                if not await tts_audio_cache.get(key):
+                    missing.append((output_format, key))
+            if not missing:
+                continue
+            try:
+                pcm_audio = await synthesize_telephony_pcm(text, openai_api_key)
+            except Exception as e:
+                logger.warning(f"TTS warmup failed for '{text[:40]}' (telephony): {e}")
+                continue
+            for output_format, key in missing:
+                encoded = await asyncio.to_thread(encode_pcm_for_format, pcm_audio, output_format)
+                await tts_audio_cache.put(key, encoded)
+                warmed += 1
+
+    return warmed
+
+
+def _company_telephony_targets(db, company_id: int) -> tuple:
+    """
+    Telephony formats the company can actually play (none without active voice
+    numbers) and each FreeSWITCH greeting mapped to the formats it is played in.
+    """
+    from app.models.twilio_phone_number import TwilioPhoneNumber
+    from app.models.freeswitch_phone_number import FreeSwitchPhoneNumber
+
+    formats = []
+    greetings = {}
+
+    # Twilio greetings are spoken by <Say>, so only workflow prompts need mulaw
+    has_twilio = db.query(TwilioPhoneNumber.id).filter(
+        TwilioPhoneNumber.company_id == company_id,
+        TwilioPhoneNumber.is_active == True
+    ).first()
+    if has_twilio:
+        formats.append(FORMAT_TWILIO_MULAW_8K)
+
+    freeswitch_numbers = db.query(
+        FreeSwitchPhoneNumber.sample_rate, FreeSwitchPhoneNumber.welcome_message
+    ).filter(
+        FreeSwitchPhoneNumber.company_id == company_id,
+        FreeSwitchPhoneNumber.is_active == True
+    ).all()
+    if freeswitch_numbers:
+        # Realtime-mode workflow responses are always sent as L16 8kHz
+        rates = {8000}
+        for sample_rate, welcome_message in freeswitch_numbers:
+            output_format = l16_format(sample_rate or 8000)
+            rates.add(sample_rate or 8000)
+            if welcome_message:
+                greetings.setdefault(welcome_message, set()).add(output_format)
+        formats.extend(l16_format(rate) for rate in sorted(rates))
+
+    return formats, greetings
+
+
+async def warm_workflow_prompts(workflow_id: int, company_id: int) -> int:
+    """
+    Background task run after a workflow is saved: pre-synthesize its static
+    prompts for the voices of the agents it is assigned to and for the
+    telephony formats of the company's active voice numbers (including the
+    numbers' greetings).
+    """
+    from app.core.database import SessionLocal
+    from app.services import credential_service, widget_settings_service, workflow_service
+
+    if not settings.TTS_CACHE_ENABLED or not settings.TTS_CACHE_WARMUP_ON_SAVE:
+        return 0
+
+    db = SessionLocal()
+    try:
+        workflow = workflow_service.get_workflow(db, workflow_id, company_id)
+        if not workflow:
+            return 0
+
+        texts = extract_static_prompts(workflow.visual_steps)
+        if not texts:
+            return 0
+
+        openai_api_key = None
+        openai_credential = credential_service.get_credential_by_service_name(db, 'openai', company_id)
+        if openai_credential:
+            try:
+                openai_api_key = credential_service.get_decrypted_credential(db, openai_credential.id, company_id)
+            except Exception:
+                pass
+
+        browser_voices = []
+        for agent in workflow.agents or []:
+            widget_settings = widget_settings_service.get_widget_settings(db, agent.id)
+            if widget_settings and widget_settings.communication_mode == 'chat_and_voice':
+                browser_voices.append((agent.tts_provider or 'voice_engine', agent.voice_id or 'default'))
+        browser_voices = list(dict.fromkeys(browser_voices))
+
+        telephony_formats, greetings = _company_telephony_targets(db, company_id)
+    finally:
+        db.close()
+
+    warmed = await warm_prompts(texts, browser_voices, telephony_formats, openai_api_key)
+    for greeting, greeting_formats in greetings.items():
+        warmed += await warm_prompts([greeting], [], sorted(greeting_formats), openai_api_key)
+    logger.info(f"TTS warmup for workflow {workflow_id}: {len(texts)} prompts, {warmed} entries synthesized")
+    return warmed
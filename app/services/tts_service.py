@@ -7,35 +7,53 @@ import os
 OPENAI_API_KEY = os.getenv("OPENAI_API_KEY")
 OPENAI_TTS_URL = "https://api.openai.com/v1/audio/speech"
 
+async def _iter_complete(response: aiohttp.ClientResponse, strict: bool) -> AsyncGenerator[bytes, None]:
+    """
+    Yield response chunks; in strict mode raise if the body ended before the
+    advertised Content-Length.
+    """
+    received = 0
+    async for chunk in response.content.iter_any():
+        received += len(chunk)
+        yield chunk
+    expected = response.content_length
+    if strict and expected is not None and received != expected:
+        raise aiohttp.ClientPayloadError(f"TTS stream truncated: received {received} of {expected} bytes")
+
+
 # --- Service for our custom Voice Engine ---
 VOICE_ENGINE_URL = os.getenv("VOICE_ENGINE_URL", "http://voice-engine-service:8001/api/v1/synthesize")
 
 class VoiceEngineTTSService:
-    async def text_to_speech_stream(self, text: str, voice_id: str, session: aiohttp.ClientSession) -> AsyncGenerator[bytes, None]:
+    async def text_to_speech_stream(self, text: str, voice_id: str, session: aiohttp.ClientSession, strict: bool = False) -> AsyncGenerator[bytes, None]:
         headers = { "Content-Type": "application/json" }
         data = { "text": text, "voice_id": voice_id }
         try:
             async with session.post(VOICE_ENGINE_URL, json=data, headers=headers) as response:
                 response.raise_for_status()
-                async for chunk in response.content.iter_any():
+                async for chunk in _iter_complete(response, strict):
                     yield chunk
         except Exception as e:
             print(f"Error streaming from Voice Engine: {e}")
+            if strict:
+                raise
 
 # --- Service for Local AI ---
 LOCALAI_TTS_URL = os.getenv("LOCALAI_TTS_URL", "http://localhost:8082/tts")
 
 class LocalAITTSService:
-    async def text_to_speech_stream(self, text: str, voice_id: str, session: aiohttp.ClientSession) -> AsyncGenerator[bytes, None]:
+    async def text_to_speech_stream(self, text: str, voice_id: str, session: aiohttp.ClientSession, strict: bool = False) -> AsyncGenerator[bytes, None]:
         headers = { "Content-Type": "application/json" }
         data = { "model": "voice-en-us-ryan-medium", "input": text, "voice": voice_id }
         try:
             async with session.post(LOCALAI_TTS_URL, json=data, headers=headers) as response:
                 response.raise_for_status()
-                async for chunk in response.content.iter_any():
+                async for chunk in _iter_complete(response, strict):
                     yield chunk
         except Exception as e:
             print(f"Error streaming from Local AI: {e}")
+            if strict:
+                raise
 
 
 # --- Service for OpenAI TTS ---
@@ -48,7 +66,7 @@ class OpenAITTSService:
     def __init__(self, api_key: str = None):
         self.api_key = api_key or OPENAI_API_KEY
 
-    async def text_to_speech_stream(self, text: str, voice_id: str, session: aiohttp.ClientSession) -> AsyncGenerator[bytes, None]:
+    async def text_to_speech_stream(self, text: str, voice_id: str, session: aiohttp.ClientSession, strict: bool = False) -> AsyncGenerator[bytes, None]:
         """
         Convert text to speech using OpenAI's TTS API.
 
@@ -56,9 +74,12 @@ class OpenAITTSService:
             text: The text to convert to speech
             voice_id: OpenAI voice name (alloy, echo, fable, onyx, nova, shimmer)
             session: aiohttp client session
+            strict: Re-raise errors instead of ending the stream early
         """
         if not self.api_key:
             print("Error: OpenAI API key not configured for TTS")
+            if strict:
+                raise ValueError("OpenAI API key not configured for TTS")
             return
 
         # Map common voice IDs or use the provided one
@@ -80,12 +101,16 @@ class OpenAITTSService:
         try:
             async with session.post(OPENAI_TTS_URL, json=data, headers=headers) as response:
                 response.raise_for_status()
-                async for chunk in response.content.iter_any():
+                async for chunk in _iter_complete(response, strict):
                     yield chunk
         except aiohttp.ClientResponseError as e:
             print(f"OpenAI TTS API error: {e.status} - {e.message}")
+            if strict:
+                raise
         except Exception as e:
             print(f"Error streaming from OpenAI TTS: {e}")
+            if strict:
+                raise
 
     async def text_to_speech_pcm(
         self,
@@ -139,7 +164,7 @@ class TTSService:
             self.session = aiohttp.ClientSession()
         return self.session
 
-    async def text_to_speech_stream(self, text: str, voice_id: str, provider: str) -> AsyncGenerator[bytes, None]:
+    async def text_to_speech_stream(self, text: str, voice_id: str, provider: str, strict: bool = False) -> AsyncGenerator[bytes, None]:
         """
         Routes the TTS request to the appropriate provider based on the agent's configuration.
 
@@ -147,21 +172,25 @@ class TTSService:
         - openai: OpenAI TTS (voices: alloy, echo, fable, onyx, nova, shimmer)
         - localai: Local AI TTS
         - voice_engine: Custom voice engine service
+
+        With ``strict=True`` provider errors and truncated responses raise
+        instead of silently ending the stream (used by the TTS cache so it
+        never stores partial audio).
         """
         session = await self._get_session()
 
         if provider == 'openai':
-            async for chunk in self.openai_service.text_to_speech_stream(text, voice_id, session):
+            async for chunk in self.openai_service.text_to_speech_stream(text, voice_id, session, strict=strict):
                 yield chunk
         elif provider == 'localai':
-            async for chunk in self.localai_service.text_to_speech_stream(text, voice_id, session):
+            async for chunk in self.localai_service.text_to_speech_stream(text, voice_id, session, strict=strict):
                 yield chunk
         elif provider == 'voice_engine':
-            async for chunk in self.voice_engine_service.text_to_speech_stream(text, voice_id, session):
+            async for chunk in self.voice_engine_service.text_to_speech_stream(text, voice_id, session, strict=strict):
                 yield chunk
         else:
             print(f"Unknown TTS provider: {provider}. Defaulting to openai.")
-            async for chunk in self.openai_service.text_to_speech_stream(text, voice_id, session):
+            async for chunk in self.openai_service.text_to_speech_stream(text, voice_id, session, strict=strict):
                 yield chunk
 
     async def close(self):
@@ -4,7 +4,6 @@ Voice Activity Detection (VAD) service using Silero VAD.
 Provides streaming VAD for real-time speech detection in voice calls.
 Supports both Twilio (mulaw 8kHz) and FreeSWITCH (L16 PCM) audio formats.
 """
-import torch
 import numpy as np
 import audioop
 import logging
@@ -12,6 +11,8 @@ from typing import Optional, Dict, Any
 from dataclasses import dataclass
 from enum import Enum
 
+from app.core.model_registry import model_registry
+
 logger = logging.getLogger(__name__)
 
 
@@ -101,16 +102,7 @@ class SileroVADService:
     def _ensure_model_loaded(cls):
         """Load the Silero VAD model (singleton)."""
         if cls._model is None:
-            logger.info("Loading Silero VAD model...")
-            cls._model, _ = torch.hub.load(
-                repo_or_dir='snakers4/silero-vad',
-                model='silero_vad',
-                force_reload=False,
-                onnx=False,
-                trust_repo=True
-            )
-            cls._model.eval()
-            logger.info("Silero VAD model loaded successfully")
+            cls._model = model_registry.get("silero_vad")
 
     def _reset_model_state(self):
         """Reset the model's internal state."""
@@ -219,6 +211,8 @@ class SileroVADService:
         Returns:
             VADResult if state changed, None otherwise
         """
+        import torch
+
         # Convert to tensor
         audio_tensor = torch.from_numpy(audio_chunk)
 
@@ -307,6 +301,26 @@ class SileroVADService:
         }
 
 
+def _load_silero_model():
+    import torch
+
+    logger.info("Loading Silero VAD model...")
+    model, _ = torch.hub.load(
+        repo_or_dir='snakers4/silero-vad',
+        model='silero_vad',
+        force_reload=False,
+        onnx=False,
+        trust_repo=True
+    )
+    model.eval()
+    logger.info("Silero VAD model loaded successfully")
+    return model
+
+
+# torch and the model load when the first voice call needs them (or at startup via PRELOAD_MODELS)
+model_registry.register("silero_vad", _load_silero_model, "Silero voice activity detection")
+
+
 # Global VAD instance for prewarming
 _global_vad: Optional[SileroVADService] = None
 
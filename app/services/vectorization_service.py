@@ -1,10 +1,22 @@
-from sentence_transformers import SentenceTransformer
 import numpy as np
+from app.core.model_registry import model_registry
 
-model = SentenceTransformer('all-MiniLM-L6-v2')
+def _load_model():
+    from sentence_transformers import SentenceTransformer
+    return SentenceTransformer('all-MiniLM-L6-v2')
+
+# Loaded on first use (or at startup via PRELOAD_MODELS)
+model_registry.register("sentence_transformer", _load_model, "all-MiniLM-L6-v2 text embeddings")
+
+def get_model():
+    return model_registry.get("sentence_transformer")
 
 def get_embedding(text: str):
-    return model.encode(text)
+    return get_model().encode(text)
+
+def get_embeddings(texts: list[str]):
+    """Embed several texts in one batched call; returns a (len(texts), dim) array."""
+    return get_model().encode(texts)
 
 def cosine_similarity(v1, v2):
     return np.dot(v1, v2) / (np.linalg.norm(v1) * np.linalg.norm(v2))
@@ -0,0 +1,334 @@
+"""
+Webhook delivery outbox.
+
+Outbound callbacks are stored in ``webhook_deliveries`` with their body
+already serialized and signed, then posted by the WebhookDeliveryWorker.
+Failed attempts are retried with exponential backoff; a 2xx marks the row
+delivered, and other 4xx responses (except 408/429) fail it for good.
+Receivers should use the ``X-Webhook-Delivery`` header to drop duplicates:
+a delivery is retried whenever its outcome wasn't recorded.
+"""
+import asyncio
+import datetime
+import hashlib
+import hmac
+import json
+import logging
+import random
+from typing import Dict, Optional, Set, Tuple
+from urllib.parse import urlsplit
+
+import httpx
+from sqlalchemy import delete, func, select, update
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.core.database import SessionLocal
+from app.models.webhook_delivery import WebhookDelivery
+
+logger = logging.getLogger(__name__)
+
+RETRYABLE_CLIENT_ERRORS = frozenset({408, 429})
+
+
+def sign_payload(payload: dict, secret: Optional[str]) -> Tuple[str, str]:
+    """
+    Serialize a payload and sign the exact bytes that will be sent.
+
+    Returns:
+        (body, hex HMAC-SHA256 signature of body)
+    """
+    body = json.dumps(payload, separators=(",", ":"), default=str)
+    signature = hmac.new((secret or "").encode(), body.encode(), hashlib.sha256).hexdigest()
+    return body, signature
+
+
+def enqueue_delivery(
+    db: Session,
+    company_id: int,
+    url: str,
+    secret: Optional[str],
+    event_type: str,
+    payload: dict,
+    api_integration_id: Optional[int] = None,
+    commit: bool = True,
+) -> WebhookDelivery:
+    """
+    Add a callback to the outbox.
+
+    Args:
+        commit: Commit the transaction (False when the caller commits it with its own writes)
+
+    Returns:
+        The stored delivery
+    """
+    body, signature = sign_payload(payload, secret)
+    delivery = WebhookDelivery(
+        company_id=company_id,
+        api_integration_id=api_integration_id,
+        event_type=event_type,
+        url=url,
+        body=body,
+        signature=signature,
+    )
+    db.add(delivery)
+    if commit:
+        db.commit()
+        webhook_delivery_worker.submit()
+    return delivery
+
+
+class WebhookDeliveryWorker:
+    """
+    Background service that posts due outbox rows.
+
+    Claims use ``FOR UPDATE SKIP LOCKED`` and lease the row by pushing its
+    ``next_attempt_at`` forward, so several application processes can share
+    the outbox and a crashed worker's claims are picked up once the lease runs
+    out. Requests go through one pooled client, at most ``concurrency`` at a
+    time and ``per_endpoint`` per receiving host.
+    """
+
+    def __init__(
+        self,
+        concurrency: int = 16,
+        per_endpoint: int = 4,
+        timeout: float = 15.0,
+        max_attempts: int = 8,
+        backoff: float = 5.0,
+        backoff_max: float = 3600.0,
+        poll_interval: float = 5.0,
+        retention_days: int = 7,
+    ):
+        """
+        Initialize the webhook delivery worker
+
+        Args:
+            concurrency: Deliveries in flight at once
+            per_endpoint: Deliveries in flight per receiving host
+            timeout: Seconds per request
+            max_attempts: Attempts before a delivery is marked failed
+            backoff: Delay before the first retry; doubles per attempt
+            backoff_max: Longest delay between attempts
+            poll_interval: Seconds between checks for due retries
+            retention_days: Delivered and failed rows are deleted after this many days
+        """
+        self.concurrency = concurrency
+        self.per_endpoint = per_endpoint
+        self.timeout = timeout
+        self.max_attempts = max_attempts
+        self.backoff = backoff
+        self.backoff_max = backoff_max
+        self.poll_interval = poll_interval
+        self.retention_days = retention_days
+        self.is_running = False
+        self._client: Optional[httpx.AsyncClient] = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._wake: Optional[asyncio.Event] = None
+        self._endpoint_limits: Dict[str, asyncio.Semaphore] = {}
+        self._in_flight: Set[asyncio.Task] = set()
+        self.delivered = 0
+        self.retried = 0
+        self.failed = 0
+
+    def submit(self):
+        """Wake the worker after new deliveries were committed."""
+        if self._loop is None or self._wake is None:
+            return  # Not started; the first poll picks them up
+        self._loop.call_soon_threadsafe(self._wake.set)
+
+    def retry_delay(self, attempts: int) -> float:
+        """Seconds before the next attempt after ``attempts`` failed ones (with jitter)."""
+        delay = min(self.backoff * (2 ** max(attempts - 1, 0)), self.backoff_max)
+        return delay * random.uniform(0.8, 1.0)
+
+    # ---- Claiming ----
+
+    def _claim_due(self, db: Session, limit: int):
+        now = func.now()
+        # Long enough to cover waiting behind other deliveries to the same host
+        rounds = -(-self.concurrency // max(self.per_endpoint, 1))
+        lease = datetime.timedelta(seconds=self.timeout * rounds + 30)
+        due = select(WebhookDelivery.id).where(
+            WebhookDelivery.status.in_(("pending", "delivering")),
+            WebhookDelivery.next_attempt_at <= now,
+        ).order_by(WebhookDelivery.next_attempt_at).limit(limit).with_for_update(skip_locked=True)
+
+        rows = db.execute(
+            update(WebhookDelivery)
+            .where(WebhookDelivery.id.in_(due.scalar_subquery()))
+            .values(status="delivering", attempts=WebhookDelivery.attempts + 1, next_attempt_at=now + lease)
+            .returning(WebhookDelivery.id, WebhookDelivery.url, WebhookDelivery.body,
+                       WebhookDelivery.signature, WebhookDelivery.event_type, WebhookDelivery.attempts)
+        ).all()
+        db.commit()
+        return rows
+
+    def _finish(self, delivery_id: int, attempts: int, status_code: Optional[int], error: Optional[str]):
+        succeeded = error is None
+        permanent = status_code is not None and 400 <= status_code < 500 and status_code not in RETRYABLE_CLIENT_ERRORS
+        if succeeded:
+            values = {"status": "delivered", "delivered_at": func.now(), "last_error": None}
+            self.delivered += 1
+        elif permanent or attempts >= self.max_attempts:
+            values = {"status": "failed", "last_error": error}
+            self.failed += 1
+        else:
+            retry_at = datetime.datetime.now(datetime.timezone.utc) + datetime.timedelta(seconds=self.retry_delay(attempts))
+            values = {"status": "pending", "next_attempt_at": retry_at, "last_error": error}
+            self.retried += 1
+
+        db = SessionLocal()
+        try:
+            db.execute(
+                update(WebhookDelivery)
+                .where(WebhookDelivery.id == delivery_id)
+                .values(last_status_code=status_code, **values)
+            )
+            db.commit()
+        finally:
+            db.close()
+        return values["status"]
+
+    # ---- Delivery ----
+
+    def _get_client(self) -> httpx.AsyncClient:
+        if self._client is None:
+            self._client = httpx.AsyncClient(
+                timeout=self.timeout,
+                limits=httpx.Limits(max_connections=self.concurrency, max_keepalive_connections=self.concurrency),
+            )
+        return self._client
+
+    def _endpoint_limit(self, url: str) -> asyncio.Semaphore:
+        host = urlsplit(url).netloc
+        if host not in self._endpoint_limits:
+            self._endpoint_limits[host] = asyncio.Semaphore(self.per_endpoint)
+        return self._endpoint_limits[host]
+
+    async def deliver(self, delivery_id: int, url: str, body: str, signature: str, event_type: str, attempts: int) -> str:
+        """
+        Post one claimed delivery and record the outcome.
+
+        Returns:
+            The delivery's new status
+        """
+        status_code, error = None, None
+        async with self._endpoint_limit(url):
+            try:
+                response = await self._get_client().post(url, content=body.encode(), headers={
+                    "Content-Type": "application/json",
+                    "X-Webhook-Signature": signature,
+                    "X-Webhook-Event": event_type,
+                    "X-Webhook-Delivery": str(delivery_id),
+                    "X-Webhook-Attempt": str(attempts),
+                })
+                status_code = response.status_code
+                if not response.is_success:
+                    error = f"HTTP {status_code}: {response.text[:500]}"
+            except httpx.HTTPError as e:
+                error = f"{type(e).__name__}: {e}"
+
+        status = await asyncio.to_thread(self._finish, delivery_id, attempts, status_code, error)
+        if error:
+            logger.warning(f"[WebhookDelivery] {event_type} {delivery_id} to {url} attempt {attempts} {status}: {error}")
+        else:
+            logger.info(f"[WebhookDelivery] {event_type} {delivery_id} delivered to {url} (attempt {attempts})")
+        return status
+
+    async def _dispatch_due(self) -> int:
+        free = self.concurrency - len(self._in_flight)
+        if free <= 0:
+            return 0
+
+        def claim():
+            db = SessionLocal()
+            try:
+                return self._claim_due(db, free)
+            finally:
+                db.close()
+
+        rows = await asyncio.to_thread(claim)
+        for row in rows:
+            task = asyncio.create_task(self.deliver(*row))
+            self._in_flight.add(task)
+            task.add_done_callback(self._delivery_done)
+        return len(rows)
+
+    def _delivery_done(self, task: asyncio.Task):
+        self._in_flight.discard(task)
+        if not task.cancelled() and task.exception() is not None:
+            logger.error(f"[WebhookDelivery] Delivery task failed: {task.exception()}")
+        if self._wake is not None:
+            self._wake.set()  # A slot is free
+
+    def prune(self):
+        """Delete delivered and failed rows past retention."""
+        db = SessionLocal()
+        try:
+            cutoff = datetime.datetime.now(datetime.timezone.utc) - datetime.timedelta(days=self.retention_days)
+            db.execute(
+                delete(WebhookDelivery).where(
+                    WebhookDelivery.status.in_(("delivered", "failed")),
+                    WebhookDelivery.created_at < cutoff
+                )
+            )
+            db.commit()
+        finally:
+            db.close()
+
+    async def start(self):
+        """Deliver due callbacks until stopped"""
+        self.is_running = True
+        self._loop = asyncio.get_running_loop()
+        self._wake = asyncio.Event()
+        logger.info(f"Webhook delivery worker started (concurrency {self.concurrency}, {self.per_endpoint} per endpoint)")
+
+        last_prune = 0.0
+        while self.is_running:
+            self._wake.clear()
+            try:
+                if self._loop.time() - last_prune > 3600:
+                    await asyncio.to_thread(self.prune)
+                    last_prune = self._loop.time()
+                await self._dispatch_due()
+            except Exception as e:
+                logger.error(f"[WebhookDelivery] Dispatch failed: {e}")
+            try:
+                await asyncio.wait_for(self._wake.wait(), timeout=self.poll_interval)
+            except asyncio.TimeoutError:
+                pass
+
+    async def stop(self):
+        """Stop polling, cancel in-flight deliveries (their leases expire and they are retried) and close the client"""
+        self.is_running = False
+        if self._wake is not None:
+            self._wake.set()
+        for task in list(self._in_flight):
+            task.cancel()
+        self._in_flight.clear()
+        if self._client is not None:
+            await self._client.aclose()
+            self._client = None
+        logger.info("Webhook delivery worker stopped")
+
+    def stats(self) -> dict:
+        return {
+            "in_flight": len(self._in_flight),
+            "delivered": self.delivered,
+            "retried": self.retried,
+            "failed": self.failed,
+        }
+
+
+# Global instance
+webhook_delivery_worker = WebhookDeliveryWorker(
+    concurrency=settings.WEBHOOK_DELIVERY_CONCURRENCY,
+    per_endpoint=settings.WEBHOOK_DELIVERY_PER_ENDPOINT,
+    timeout=settings.WEBHOOK_DELIVERY_TIMEOUT,
+    max_attempts=settings.WEBHOOK_DELIVERY_MAX_ATTEMPTS,
+    backoff=settings.WEBHOOK_DELIVERY_BACKOFF,
+    backoff_max=settings.WEBHOOK_DELIVERY_BACKOFF_MAX,
+    poll_interval=settings.WEBHOOK_DELIVERY_POLL_INTERVAL,
+    retention_days=settings.WEBHOOK_DELIVERY_RETENTION_DAYS,
+)
@@ -1,5 +1,7 @@
 
 from sqlalchemy.orm import Session
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy import select
 from app.models.widget_settings import WidgetSettings
 from app.models.agent import Agent
 from app.schemas.widget_settings import WidgetSettingsCreate, WidgetSettingsUpdate
@@ -37,6 +39,30 @@ def get_widget_settings(db: Session, agent_id: int, create_if_missing: bool = Fa
         return settings_from_db
     return None
 
+async def get_widget_settings_async(db: AsyncSession, agent_id: int):
+    """Async variant of get_widget_settings (read-only, never creates defaults)."""
+    settings_from_db = (await db.execute(
+        select(WidgetSettings).where(WidgetSettings.agent_id == agent_id)
+    )).scalars().first()
+    if not settings_from_db:
+        return None
+
+    if not settings_from_db.livekit_url:
+        settings_from_db.livekit_url = settings.LIVEKIT_URL
+    if not settings_from_db.frontend_url:
+        settings_from_db.frontend_url = settings.FRONTEND_URL
+
+    voice = (await db.execute(
+        select(Agent.voice_id, Agent.stt_provider, Agent.tts_provider).where(Agent.id == agent_id)
+    )).first()
+    if voice:
+        # Transient attributes - not persisted to widget_settings table
+        settings_from_db.voice_id = voice.voice_id
+        settings_from_db.stt_provider = voice.stt_provider
+        settings_from_db.tts_provider = voice.tts_provider
+
+    return settings_from_db
+
 def create_widget_settings(db: Session, widget_settings: WidgetSettingsCreate):
     widget_settings_data = widget_settings.model_dump(exclude={"voice_id", "stt_provider", "tts_provider"})
     widget_settings_data["livekit_url"] = settings.LIVEKIT_URL
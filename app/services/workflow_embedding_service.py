@@ -0,0 +1,167 @@
+"""
+Workflow Embedding Service
+Per-company matrices of workflow embeddings for similarity routing.
+
+Each company's active workflows are embedded once (name plus description),
+stored as L2-normalized float32 rows, and matched against a query with a
+single matrix-vector product. Rows are refreshed when a workflow is created
+or updated; lookups also re-embed any workflow whose text no longer matches
+its row, so workers that didn't see the update catch up on their own.
+"""
+import hashlib
+import threading
+from collections import OrderedDict
+from typing import Callable, Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from app.core.config import settings
+from app.services.embedding_store_service import normalize_rows, top_k
+
+
+def workflow_text(workflow) -> str:
+    """Text a workflow is embedded from."""
+    return f"{workflow.name} {workflow.description or ''}"
+
+
+def _digest(text: str) -> str:
+    return hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+
+class _CompanyMatrix:
+    __slots__ = ("rows", "digests", "matrix")
+
+    def __init__(self):
+        self.rows: Dict[int, int] = {}  # workflow id -> row
+        self.digests: Dict[int, str] = {}
+        self.matrix: Optional[np.ndarray] = None
+
+
+class WorkflowEmbeddingIndex:
+    """LRU of per-company workflow embedding matrices."""
+
+    def __init__(self, embed: Callable[[List[str]], "np.ndarray"], max_companies: int = 256):
+        """
+        Args:
+            embed: Batch embedding function, texts -> (len(texts), dim) array
+            max_companies: Companies whose matrices are kept per worker
+        """
+        self.embed = embed
+        self.max_companies = max_companies
+        self._companies: "OrderedDict[int, _CompanyMatrix]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.embedded = 0
+        self.lookups = 0
+
+    def _company(self, company_id: int) -> _CompanyMatrix:
+        entry = self._companies.get(company_id)
+        if entry is None:
+            entry = self._companies[company_id] = _CompanyMatrix()
+        self._companies.move_to_end(company_id)
+        while len(self._companies) > self.max_companies:
+            self._companies.popitem(last=False)
+        return entry
+
+    def upsert(self, company_id: int, workflows: Sequence) -> int:
+        """
+        Embed workflows whose text changed since they were last stored.
+
+        Returns:
+            Number of workflows embedded
+        """
+        with self._lock:
+            entry = self._company(company_id)
+            texts = {w.id: workflow_text(w) for w in workflows}
+            stale = [(workflow_id, text) for workflow_id, text in texts.items()
+                     if entry.digests.get(workflow_id) != _digest(text)]
+        if not stale:
+            return 0
+
+        # Embed outside the lock: one batched model call for every stale workflow
+        vectors = normalize_rows(self.embed([text for _, text in stale]))
+
+        with self._lock:
+            entry = self._company(company_id)
+            if entry.matrix is None or entry.matrix.shape[1] != vectors.shape[1]:
+                entry.rows, entry.digests = {}, {}
+                entry.matrix = np.zeros((0, vectors.shape[1]), dtype=np.float32)
+            new_rows = []
+            for (workflow_id, text), vector in zip(stale, vectors):
+                row = entry.rows.get(workflow_id)
+                if row is None:
+                    entry.rows[workflow_id] = len(entry.rows)
+                    new_rows.append(vector)
+                else:
+                    entry.matrix[row] = vector
+                entry.digests[workflow_id] = _digest(text)
+            if new_rows:
+                entry.matrix = np.vstack([entry.matrix, np.asarray(new_rows, dtype=np.float32)])
+            self.embedded += len(stale)
+        return len(stale)
+
+    def remove(self, company_id: int, workflow_id: int) -> None:
+        with self._lock:
+            entry = self._companies.get(company_id)
+            if entry is None or workflow_id not in entry.rows:
+                return
+            row = entry.rows.pop(workflow_id)
+            entry.digests.pop(workflow_id, None)
+            entry.matrix = np.delete(entry.matrix, row, axis=0)
+            for other, other_row in entry.rows.items():
+                if other_row > row:
+                    entry.rows[other] = other_row - 1
+
+    def best_match(self, company_id: int, query_embedding, workflows: Sequence) -> Optional[Tuple[object, float]]:
+        """
+        Most similar of ``workflows`` to a query embedding.
+
+        Args:
+            company_id: Company the workflows belong to
+            query_embedding: Embedding of the user message
+            workflows: Candidate workflows; any missing or outdated rows are embedded first
+
+        Returns:
+            (workflow, cosine similarity), or None if there are no candidates
+        """
+        if not workflows:
+            return None
+        self.upsert(company_id, workflows)
+        with self._lock:
+            entry = self._company(company_id)
+            rows = [entry.rows[w.id] for w in workflows]
+            matrix = entry.matrix[rows]
+            self.lookups += 1
+        ranked = top_k(matrix, query_embedding, 1)
+        if not ranked:
+            return None
+        index, score = ranked[0]
+        return workflows[index], score
+
+    def invalidate(self, company_id: Optional[int] = None) -> None:
+        with self._lock:
+            if company_id is None:
+                self._companies.clear()
+            else:
+                self._companies.pop(company_id, None)
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "companies": len(self._companies),
+                "rows": sum(len(entry.rows) for entry in self._companies.values()),
+                "embedded": self.embedded,
+                "lookups": self.lookups,
+            }
+
+
+def _embed_texts(texts: List[str]):
+    # Imported on first use so loading this module doesn't load the model
+    from app.services import vectorization_service
+    return vectorization_service.get_embeddings(texts)
+
+
+# Global instance shared by workflow routing in this worker
+workflow_embeddings = WorkflowEmbeddingIndex(
+    embed=_embed_texts,
+    max_companies=settings.WORKFLOW_EMBEDDING_MAX_COMPANIES,
+)
@@ -1,20 +1,27 @@
+import copy
 import json
 import re
 import uuid
 import asyncio
 from datetime import datetime
+from typing import Optional
 from sqlalchemy.orm import Session
 from app.models import workflow
 from app.models.workflow import Workflow
 from app.models.tool import Tool
-from app.services import tool_service, conversation_session_service, knowledge_base_service, workflow_service, memory_service, geocoding_service
+from app.services import tool_service, conversation_session_service, knowledge_base_service, workflow_service, geocoding_service
 from app.schemas.conversation_session import ConversationSessionUpdate
-from app.schemas.memory import MemoryCreate
 from app.services.graph_execution_engine import GraphExecutionEngine
+from app.services.workflow_plan_service import workflow_plan_cache, WorkflowPlanError, FanOut, PARALLEL_NODE_TYPES
+from app.services.workflow_turn_state import WorkflowTurnState
+from app.services.code_execution_service import code_executor
+from app.services.workflow_http_service import workflow_http
+from app.services.placeholder_compiler import compile_placeholders
 from app.services.llm_tool_service import LLMToolService
 from app.services.workflow_intent_service import WorkflowIntentService
 from app.services.input_validation_service import InputValidationService, ValidationMode, ValidationResult
 from app.core.config import settings
+from app.core.database import SessionLocal
 
 import httpx
 import numexpr
@@ -26,6 +33,8 @@ class WorkflowExecutionService:
         self.llm_tool_service = LLMToolService(db)
         self.workflow_intent_service = WorkflowIntentService(db)
         self.input_validation_service = InputValidationService()
+        # Session and memory writes of the running turn (see execute_workflow)
+        self._turn_state = None
 
     async def _execute_tool(self, tool_name: str, params: dict, company_id: int = None, session_id: str = None):
         """
@@ -70,67 +79,11 @@ class WorkflowExecutionService:
         if not isinstance(value, str) or '{{' not in value:
             return value
 
-        print(f"DEBUG: Resolving placeholders in: '{value}' with context: {context}")
-
-        def drill_down(obj, keys):
-            """Helper to drill down into nested objects/dicts."""
-            for key in keys:
-                if isinstance(obj, dict):
-                    obj = obj.get(key, '')
-                else:
-                    return ''
-            return obj
-
-        def resolve_single_placeholder(placeholder: str):
-            """Resolve a single placeholder and return the actual value (preserving type)."""
-            path = placeholder.split(".")
-            source = path[0]
-
-            resolved_value = ''
-            if source == "context":
-                remaining_path = path[1:]
-                resolved_value = drill_down(context, remaining_path)
-                print(f"    - Source: context, Path: {remaining_path}, Value: '{resolved_value}'")
-            else:
-                step_result = results.get(source)
-                print(f"    - Source: results, Step: {source}, Result: {step_result}")
-                if step_result:
-                    remaining_path = path[1:]
-                    resolved_value = drill_down(step_result, remaining_path) if remaining_path else step_result
-
-                    if not remaining_path:
-                        output_value = step_result.get("output")
-                        if isinstance(output_value, dict):
-                            resolved_value = output_value.get("content", '')
-                        elif output_value is None:
-                            resolved_value = ''
-                        else:
-                            resolved_value = output_value
-                print(f"    - Resolved value: '{resolved_value}'")
-
-            return resolved_value
-
-        # Check if the entire value is a single placeholder (e.g., "{{code-123.output.show_dict}}")
-        # If so, return the actual value (dict, list, etc.) instead of converting to string
-        # Use [^{}]+ to ensure we don't match strings with multiple placeholders
-        single_placeholder_match = re.match(r"^\s*\{\{([^{}]+)\}\}\s*$", value)
-        if single_placeholder_match:
-            placeholder = single_placeholder_match.group(1).strip()
-            print(f"  - Found single placeholder: {placeholder}")
-            resolved = resolve_single_placeholder(placeholder)
-            print(f"DEBUG: Returning actual value (type: {type(resolved).__name__}): {resolved}")
-            return resolved
-
-        # For embedded placeholders in text, convert to strings
-        def replace_func(match):
-            placeholder = match.group(1).strip()
-            print(f"  - Found placeholder: {placeholder}")
-            resolved_value = resolve_single_placeholder(placeholder)
-            return str(resolved_value) if resolved_value is not None else ''
-
-        resolved_string = re.sub(r"\{\{(.*?)\}\}", replace_func, value)
-        print(f"DEBUG: Final resolved string: '{resolved_string}'")
-        return resolved_string
+        # A string that is a single placeholder returns the actual value (dict, list, etc.);
+        # embedded placeholders are converted to strings
+        plan = getattr(self, '_plan', None)
+        template = plan.template(value) if plan else compile_placeholders(value)
+        return template.render(context, results)
 
     def _clear_validation_state(self, context: dict):
         """Clear all prompt validation-related state from context."""
@@ -161,50 +114,22 @@ class WorkflowExecutionService:
             context.pop(key, None)
 
     async def _execute_data_manipulation_node(self, node_data: dict, context: dict, results: dict):
-        from types import SimpleNamespace
-
         expression = node_data.get("expression", "")
         output_variable = node_data.get("output_variable", "output")
 
-        # Helper function to convert nested dicts to SimpleNamespace for dot notation access
-        def dict_to_namespace(d):
-            if isinstance(d, dict):
-                return SimpleNamespace(**{k: dict_to_namespace(v) for k, v in d.items()})
-            elif isinstance(d, list):
-                return [dict_to_namespace(item) for item in d]
-            return d
-
-        # Create namespace versions for dot notation access
-        context_ns = dict_to_namespace(context)
-        results_ns = dict_to_namespace(results)
-
-        # Create a safe execution environment for eval
-        # Allow both dict access (context['key']) and dot notation (context.key)
-        safe_globals = {"__builtins__": None}
-        safe_locals = {
-            "context": context_ns,  # Dot notation access
-            "ctx": context,         # Dict access alternative
-            "results": results_ns,  # Dot notation access
-            "res": results          # Dict access alternative
-        }
-
         try:
             # Resolve placeholders in the expression before evaluation
             resolved_expression = self._resolve_placeholders(expression, context, results)
-
-            # Run eval in thread pool to avoid blocking the event loop
-            def run_eval():
-                return eval(resolved_expression, safe_globals, safe_locals)
-
-            manipulated_data = await asyncio.to_thread(run_eval)
-
-            # Store the result in the context
-            context[output_variable] = manipulated_data
-
-            return {"output": manipulated_data}
         except Exception as e:
             return {"error": f"Error manipulating data: {e}"}
 
+        # Evaluated without builtins in the code execution pool, off the event loop
+        result = await code_executor.evaluate(resolved_expression, context, results)
+        if "error" not in result:
+            # Store the result in the context
+            context[output_variable] = result["output"]
+        return result
+
     async def _execute_code_node(self, node_data: dict, context: dict, results: dict):
         code = node_data.get("code", "")
         arguments = node_data.get("arguments", [])  # [{name: "arg1", value: "{{context.var}}"}]
@@ -234,95 +159,12 @@ class WorkflowExecutionService:
 
         print(f"[CODE NODE] Arguments: {resolved_args}, Return vars: {return_variables}")
 
-        # Build execution scope with arguments directly available
-        execution_scope = {
-            "context": context,
-            "results": results,
-            "db": self.db,
-            "output": None,  # Legacy support for setting output directly
-            **resolved_args  # Spread arguments into scope so they're directly accessible
-        }
-
-        # Define synchronous code execution function to run in thread pool
-        def run_code_sync():
-            try:
-                # Execute the code
-                exec(code, execution_scope)
-
-                # Check if a function was defined and should be auto-called
-                # Only auto-call if the function wasn't already called in the code
-                import re
-                func_match = re.search(r'def\s+(\w+)\s*\(', code)
-                if func_match:
-                    func_name = func_match.group(1)
-                    # Check if function was manually called in the code (look for "func_name(" after the def block)
-                    func_call_pattern = rf'{func_name}\s*\('
-                    # Find all calls - if there's a call outside the def, user called it manually
-                    func_def_end = code.find('def ' + func_name)
-                    code_after_def = code[func_def_end:] if func_def_end >= 0 else ""
-                    # Check if there's a call that's not the def line itself
-                    lines_after_def = code_after_def.split('\n')[1:]  # Skip the def line
-                    manual_call_exists = any(re.search(func_call_pattern, line) and not line.strip().startswith('def ') for line in lines_after_def)
-
-                    # Also check if return variables are already set (user assigned them manually)
-                    return_vars_already_set = return_variables and all(
-                        var_name.strip() in execution_scope and execution_scope[var_name.strip()] is not None
-                        for var_name in return_variables if var_name.strip()
-                    )
-
-                    if not manual_call_exists and not return_vars_already_set:
-                        if func_name in execution_scope and callable(execution_scope[func_name]):
-                            # Call the function with arguments in order
-                            func = execution_scope[func_name]
-                            arg_values = [resolved_args[name] for name in arg_names_ordered if name in resolved_args]
-                            print(f"[CODE NODE] Auto-calling function '{func_name}' with args: {arg_values}")
-                            func_result = func(*arg_values)
-
-                            # If there's one return variable, assign the function result to it
-                            if return_variables and len(return_variables) == 1:
-                                var_name = return_variables[0].strip()
-                                execution_scope[var_name] = func_result
-                                context[var_name] = func_result
-                                print(f"[CODE NODE] Output: {{{var_name}: {func_result}}}")
-                                return {"output": {var_name: func_result}}
-                            elif return_variables and len(return_variables) > 1 and isinstance(func_result, (tuple, list)):
-                                # Multiple return values
-                                output = {}
-                                for i, var_name in enumerate(return_variables):
-                                    var_name = var_name.strip()
-                                    if i < len(func_result):
-                                        output[var_name] = func_result[i]
-                                        context[var_name] = func_result[i]
-                                print(f"[CODE NODE] Output: {output}")
-                                return {"output": output if output else func_result}
-                            else:
-                                # No return variables defined, just return the function result
-                                print(f"[CODE NODE] Output: {func_result}")
-                                return {"output": func_result}
-
-                # Collect return variables into output (for non-function code or manually called functions)
-                if return_variables:
-                    output = {}
-                    for var_name in return_variables:
-                        var_name = var_name.strip()
-                        if var_name and var_name in execution_scope:
-                            output[var_name] = execution_scope[var_name]
-                            # Also store in context for later use in workflow
-                            context[var_name] = execution_scope[var_name]
-
-                    print(f"[CODE NODE] Output: {output}")
-                    return {"output": output if output else "Code executed successfully."}
-                else:
-                    # Legacy behavior: return the 'output' variable if set
-                    return {"output": execution_scope.get("output", "Code executed successfully.")}
-
-            except Exception as e:
-                import traceback
-                print(f"[CODE NODE] Error: {e}")
-                return {"error": f"Error executing code: {e}", "traceback": traceback.format_exc()}
-
-        # Run the synchronous code execution in a thread pool to avoid blocking the event loop
-        return await asyncio.to_thread(run_code_sync)
+        # Runs in the code execution pool: arguments are directly available as variables,
+        # context changes (including return variables) are applied to this context
+        result = await code_executor.run_code(code, context, results, resolved_args, arg_names_ordered, return_variables)
+        if "error" not in result:
+            print(f"[CODE NODE] Output: {result.get('output')} ({result['duration_ms']} ms)")
+        return result
 
     async def _execute_knowledge_retrieval_node(self, node_data: dict, context: dict, results: dict, company_id: int, workflow):
         knowledge_base_id = node_data.get("knowledge_base_id")
@@ -570,6 +412,19 @@ class WorkflowExecutionService:
                 del context[iteration_key]
             return {"output": "exit"}
 
+    @staticmethod
+    def _node_number(node_data: dict, key: str, cast):
+        """A numeric node setting, or None (the default) when it is unset, malformed or negative."""
+        value = node_data.get(key)
+        if value in (None, ""):
+            return None
+        try:
+            value = cast(value)
+        except (ValueError, TypeError):
+            print(f"WARNING: Ignoring invalid {key} '{value}' on http_request node")
+            return None
+        return value if value >= 0 else None
+
     async def _execute_http_request_node(self, node_data: dict, context: dict, results: dict):
         url = node_data.get("url", "")
         method = node_data.get("method", "GET").upper()
@@ -590,28 +445,29 @@ class WorkflowExecutionService:
         except json.JSONDecodeError:
             return {"error": f"Invalid JSON in body: {resolved_body_str}"}
 
-        try:
-            async with httpx.AsyncClient(timeout=settings.HTTP_REQUEST_TIMEOUT) as client:
-                response = None
-                if method == "GET":
-                    response = await client.get(resolved_url, headers=headers)
-                elif method == "POST":
-                    response = await client.post(resolved_url, headers=headers, json=body)
-                elif method == "PUT":
-                    response = await client.put(resolved_url, headers=headers, json=body)
-                elif method == "PATCH":
-                    response = await client.patch(resolved_url, headers=headers, json=body)
-                elif method == "DELETE":
-                    response = await client.delete(resolved_url, headers=headers)
-                else:
-                    return {"error": f"Unsupported HTTP method: {method}"}
+        if method not in ["GET", "POST", "PUT", "PATCH", "DELETE"]:
+            return {"error": f"Unsupported HTTP method: {method}"}
 
-                response.raise_for_status()  # Raise HTTPError for bad responses (4xx or 5xx)
-                content_type = response.headers.get('Content-Type', '')
-                if 'application/json' in content_type:
-                    return {"output": response.json()}
-                else:
-                    return {"output": response.text}
+        # Optional per-node overrides: timeout (seconds), retries, and caching of GET responses
+        plan = getattr(self, '_plan', None)
+        try:
+            response = await workflow_http.request(
+                method,
+                resolved_url,
+                headers=headers,
+                json_body=body,
+                timeout=self._node_number(node_data, "timeout", float),
+                retries=self._node_number(node_data, "retries", int),
+                cache=bool(node_data.get("cache_enabled")),
+                cache_ttl=self._node_number(node_data, "cache_ttl", float),
+                cache_scope=plan.workflow_id if plan else None,
+            )
+            response.raise_for_status()  # Raise HTTPError for bad responses (4xx or 5xx)
+            content_type = response.headers.get('Content-Type', '')
+            if 'application/json' in content_type:
+                return {"output": response.json()}
+            else:
+                return {"output": response.text}
         except httpx.HTTPStatusError as e:
             return {"error": f"HTTP {e.response.status_code}: {e.response.text}"}
         except httpx.RequestError as e:
@@ -876,7 +732,7 @@ class WorkflowExecutionService:
 
         # Update conversation session with tags
         try:
-            session = conversation_session_service.get_session(self.db, conversation_id)
+            session = self._turn_state.session(conversation_id)
             if session:
                 current_tags = session.context.get("tags", []) if session.context else []
                 updated_tags = list(set(current_tags + resolved_tags))  # Remove duplicates
@@ -884,9 +740,7 @@ class WorkflowExecutionService:
                 session_context = session.context or {}
                 session_context["tags"] = updated_tags
 
-                conversation_session_service.update_session_context(
-                    self.db, conversation_id, session_context
-                )
+                self._turn_state.update_context(conversation_id, session_context)
 
                 print(f"✓ Added tags to conversation: {resolved_tags}")
 
@@ -914,13 +768,13 @@ class WorkflowExecutionService:
         resolved_notes = self._resolve_placeholders(notes, context, results)
 
         try:
-            session = conversation_session_service.get_session(self.db, conversation_id)
+            session = self._turn_state.session(conversation_id)
             if session:
                 # Update status for agent assignment (AI stays enabled - can be toggled manually)
                 session_update = ConversationSessionUpdate(
                     status='pending_agent_assignment'
                 )
-                conversation_session_service.update_session(self.db, conversation_id, session_update)
+                self._turn_state.update_session(conversation_id, session_update)
 
                 # Store assignment info in context
                 assignment_info = {
@@ -936,9 +790,7 @@ class WorkflowExecutionService:
 
                 session_context = session.context or {}
                 session_context["assignment"] = assignment_info
-                conversation_session_service.update_session_context(
-                    self.db, conversation_id, session_context
-                )
+                self._turn_state.update_context(conversation_id, session_context)
 
                 print(f"✓ Assigned conversation to {assignment_type}: {pool_name or agent_id}")
 
@@ -963,10 +815,10 @@ class WorkflowExecutionService:
             session_update = ConversationSessionUpdate(
                 status=status
             )
-            conversation_session_service.update_session(self.db, conversation_id, session_update)
+            self._turn_state.update_session(conversation_id, session_update)
 
             # Also store in context
-            session = conversation_session_service.get_session(self.db, conversation_id)
+            session = self._turn_state.session(conversation_id)
             if session:
                 session_context = session.context or {}
                 session_context["status_history"] = session_context.get("status_history", [])
@@ -975,9 +827,7 @@ class WorkflowExecutionService:
                     "reason": resolved_reason,
                     "timestamp": datetime.now().isoformat()
                 })
-                conversation_session_service.update_session_context(
-                    self.db, conversation_id, session_context
-                )
+                self._turn_state.update_context(conversation_id, session_context)
 
             print(f"✓ Set conversation status to: {status}")
 
@@ -1372,7 +1222,7 @@ class WorkflowExecutionService:
         """
         Handles the original session based on the configured behavior.
         """
-        session = conversation_session_service.get_session(self.db, original_conversation_id)
+        session = self._turn_state.session(original_conversation_id)
         if not session:
             return
 
@@ -1383,12 +1233,10 @@ class WorkflowExecutionService:
                 "target_session": target_conversation_id,
                 "paused_at": datetime.now().isoformat()
             }
-            conversation_session_service.update_session_context(
-                self.db, original_conversation_id, session_context
-            )
+            self._turn_state.update_context(original_conversation_id, session_context)
 
             session_update = ConversationSessionUpdate(status="paused")
-            conversation_session_service.update_session(self.db, original_conversation_id, session_update)
+            self._turn_state.update_session(original_conversation_id, session_update)
             print(f"  → Original session paused")
 
         elif behavior == "close":
@@ -1398,12 +1246,10 @@ class WorkflowExecutionService:
                 "target_session": target_conversation_id,
                 "closed_at": datetime.now().isoformat()
             }
-            conversation_session_service.update_session_context(
-                self.db, original_conversation_id, session_context
-            )
+            self._turn_state.update_context(original_conversation_id, session_context)
 
             session_update = ConversationSessionUpdate(status="resolved")
-            conversation_session_service.update_session(self.db, original_conversation_id, session_update)
+            self._turn_state.update_session(original_conversation_id, session_update)
             print(f"  → Original session closed/resolved")
 
         else:  # keep_active
@@ -1414,9 +1260,7 @@ class WorkflowExecutionService:
                 "target_session": target_conversation_id,
                 "redirected_at": datetime.now().isoformat()
             })
-            conversation_session_service.update_session_context(
-                self.db, original_conversation_id, session_context
-            )
+            self._turn_state.update_context(original_conversation_id, session_context)
             print(f"  → Original session kept active, linked to target")
 
     async def _execute_question_classifier_node(self, node_data: dict, context: dict, results: dict, company_id: int):
@@ -1622,12 +1466,7 @@ Extracted value:"""
                         if is_valid:
                             context[extracting_entity_name] = extracted_value
                             # Save to memory for persistence
-                            memory_service.set_memory(
-                                self.db,
-                                MemoryCreate(key=extracting_entity_name, value=extracted_value),
-                                agent_id=self._executing_agent_id,
-                                session_id=conversation_id
-                            )
+                            self._turn_state.set_memory(self._executing_agent_id, conversation_id, extracting_entity_name, extracted_value)
                             print(f"✓ Extracted and validated '{extracted_value}' for {extracting_entity_name} (type: {entity_type})")
                         else:
                             # Validation failed - don't save, keep in missing list
@@ -1675,24 +1514,9 @@ Extracted value:"""
                     context["variable_to_save"] = next_entity_name  # Standard pause/resume mechanism expects this
 
                     # Save to memory (for debugging and backup)
-                    memory_service.set_memory(
-                        self.db,
-                        MemoryCreate(key="variable_to_save", value=next_entity_name),
-                        agent_id=self._executing_agent_id,
-                        session_id=conversation_id
-                    )
-                    memory_service.set_memory(
-                        self.db,
-                        MemoryCreate(key="_extracting_entity_name", value=next_entity_name),
-                        agent_id=self._executing_agent_id,
-                        session_id=conversation_id
-                    )
-                    memory_service.set_memory(
-                        self.db,
-                        MemoryCreate(key="_missing_entities", value=json.dumps(missing_entities)),
-                        agent_id=self._executing_agent_id,
-                        session_id=conversation_id
-                    )
+                    self._turn_state.set_memory(self._executing_agent_id, conversation_id, "variable_to_save", next_entity_name)
+                    self._turn_state.set_memory(self._executing_agent_id, conversation_id, "_extracting_entity_name", next_entity_name)
+                    self._turn_state.set_memory(self._executing_agent_id, conversation_id, "_missing_entities", json.dumps(missing_entities))
 
                     print(f"ℹ Extract entities: Still missing {len(missing_entities)} entities, asking for '{next_entity_name}'")
 
@@ -1831,12 +1655,7 @@ Return only valid JSON, nothing else:"""
                     # Successfully extracted and validated
                     context[entity_name] = entity_value
                     # Also save to memory to ensure persistence across pauses
-                    memory_service.set_memory(
-                        self.db,
-                        MemoryCreate(key=entity_name, value=entity_value),
-                        agent_id=self._executing_agent_id,
-                        session_id=conversation_id
-                    )
+                    self._turn_state.set_memory(self._executing_agent_id, conversation_id, entity_name, entity_value)
                     print(f"✓ Entity '{entity_name}' extracted and validated: {entity_value} (type: {entity_type})")
                 else:
                     # Validation failed - treat as missing
@@ -1877,24 +1696,9 @@ Return only valid JSON, nothing else:"""
         context["variable_to_save"] = first_missing  # Standard pause/resume mechanism expects this
 
         # Save to memory (for debugging and backup)
-        memory_service.set_memory(
-            self.db,
-            MemoryCreate(key="variable_to_save", value=first_missing),
-            agent_id=self._executing_agent_id,
-            session_id=conversation_id
-        )
-        memory_service.set_memory(
-            self.db,
-            MemoryCreate(key="_extracting_entity_name", value=first_missing),
-            agent_id=self._executing_agent_id,
-            session_id=conversation_id
-        )
-        memory_service.set_memory(
-            self.db,
-            MemoryCreate(key="_missing_entities", value=json.dumps(missing_entities)),
-            agent_id=self._executing_agent_id,
-            session_id=conversation_id
-        )
+        self._turn_state.set_memory(self._executing_agent_id, conversation_id, "variable_to_save", first_missing)
+        self._turn_state.set_memory(self._executing_agent_id, conversation_id, "_extracting_entity_name", first_missing)
+        self._turn_state.set_memory(self._executing_agent_id, conversation_id, "_missing_entities", json.dumps(missing_entities))
 
         print(f"ℹ Extract entities: {len(missing_entities)} entities missing, asking for '{first_missing}'")
 
@@ -1912,9 +1716,80 @@ Return only valid JSON, nothing else:"""
     # SUBWORKFLOW EXECUTION METHODS
     # ============================================================
 
+    async def _execute_parallel_node(self, node_id: str, node: dict, context: dict, results: dict, workflow_obj: Workflow, conversation_id: str):
+        """Run a tool, http_request, llm or knowledge node (the node types a fan-out may contain)."""
+        node_type = node.get("type")
+        node_data = node.get("data", {})
+
+        if node_type == "tool":
+            # Support multiple keys for backwards compatibility: tool_name, tool, name
+            tool_name = node_data.get("tool_name") or node_data.get("tool") or node_data.get("name")
+            if not tool_name:
+                return {"error": f"Tool node '{node_id}' has no tool configured. Please select a tool in the properties panel."}
+            raw_params = node_data.get("parameters", {}) or node_data.get("params", {})
+            resolved_params = {k: self._resolve_placeholders(v, context, results) for k, v in raw_params.items()}
+            return await self._execute_tool(tool_name, resolved_params, company_id=workflow_obj.company_id, session_id=conversation_id)
+
+        if node_type == "http_request":
+            return await self._execute_http_request_node(node_data, context, results)
+
+        if node_type == "llm":
+            return await self._execute_llm_node(node_data, context, results, company_id=workflow_obj.company_id, workflow=workflow_obj, conversation_id=conversation_id)
+
+        return await self._execute_knowledge_retrieval_node(node_data, context, results, company_id=workflow_obj.company_id, workflow=workflow_obj)
+
+    async def _execute_fan_out(self, fan_out: FanOut, context: dict, results: dict, workflow_obj: Workflow, conversation_id: str) -> Optional[str]:
+        """
+        Run the branches of a fan-out concurrently, at most
+        WORKFLOW_MAX_PARALLEL_BRANCHES at a time.
+
+        Each branch works on its own deep copy of the context, its own results
+        and its own database session, so branches don't see each other's writes.
+        A branch stops at its first error, since branch nodes have no error
+        edges. Once every branch is done, their results and context changes
+        are merged in branch order.
+
+        Returns:
+            The first failed node (in branch order), at which the workflow
+            ends as it would when run serially; None to continue at the join
+        """
+        semaphore = asyncio.Semaphore(settings.WORKFLOW_MAX_PARALLEL_BRANCHES)
+
+        async def run_branch(branch):
+            branch_context = copy.deepcopy(context)
+            branch_results = dict(results)
+            failed = None
+            async with semaphore:
+                # The sync Session isn't safe to share between concurrent branches
+                runner = copy.copy(self)
+                runner.db = SessionLocal()
+                try:
+                    for node_id in branch:
+                        result = await runner._execute_parallel_node(node_id, self._plan.nodes[node_id], branch_context, branch_results, workflow_obj, conversation_id)
+                        branch_results[node_id] = result
+                        if result and "error" in result:
+                            print(f"DEBUG: Branch node '{node_id}' failed, skipping the rest of its branch")
+                            failed = node_id
+                            break
+                finally:
+                    runner.db.close()
+            return branch_context, {node_id: branch_results[node_id] for node_id in branch if node_id in branch_results}, failed
+
+        print(f"DEBUG: Fanning out from '{fan_out.source}' into {len(fan_out.branches)} branches, joining at '{fan_out.join}'")
+        outcomes = await asyncio.gather(*(run_branch(branch) for branch in fan_out.branches))
+
+        original = dict(context)
+        for branch_context, branch_results, _ in outcomes:
+            context.update({key: value for key, value in branch_context.items() if key not in original or original[key] != value})
+            for key in original:
+                if key not in branch_context:
+                    context.pop(key, None)
+            results.update(branch_results)
+        return next((failed for _, _, failed in outcomes if failed), None)
+
     def _get_execution_chain(self, conversation_id: str) -> list:
         """Get list of workflow IDs currently in the execution chain (for circular reference detection)."""
-        session = conversation_session_service.get_session(self.db, conversation_id)
+        session = self._turn_state.session(conversation_id)
         if not session or not session.subworkflow_stack:
             return []
         return [entry["workflow_id"] for entry in session.subworkflow_stack]
@@ -2018,6 +1893,34 @@ Return only valid JSON, nothing else:"""
         }
 
     async def execute_workflow(self, user_message: str, company_id: int, workflow_id: int = None, workflow: Workflow = None, conversation_id: str = None, attachments: list = None, option_key: str = None, agent_id: int = None):
+        """
+        Run one conversation turn of a workflow.
+
+        Session, context and memory changes are staged on a WorkflowTurnState
+        and written in one transaction when the turn returns, whether it
+        completed or paused for input. Subworkflow hops re-enter this method
+        and share the outer turn's state.
+        """
+        if self._turn_state is not None:
+            return await self._execute_workflow_turn(user_message, company_id, workflow_id, workflow, conversation_id, attachments, option_key, agent_id)
+
+        turn_state = self._turn_state = WorkflowTurnState(self.db)
+        try:
+            result = await self._execute_workflow_turn(user_message, company_id, workflow_id, workflow, conversation_id, attachments, option_key, agent_id)
+        except Exception:
+            # Keep what the turn got through, as the per-call commits used to
+            try:
+                turn_state.flush()
+            except Exception as flush_error:
+                print(f"ERROR: Failed to save workflow state after an execution error: {flush_error}")
+            raise
+        finally:
+            self._turn_state = None
+
+        turn_state.flush()
+        return result
+
+    async def _execute_workflow_turn(self, user_message: str, company_id: int, workflow_id: int = None, workflow: Workflow = None, conversation_id: str = None, attachments: list = None, option_key: str = None, agent_id: int = None):
         if workflow_id:
             workflow_obj = workflow_service.get_workflow(self.db, workflow_id, company_id)
         elif workflow:
@@ -2050,12 +1953,13 @@ Return only valid JSON, nothing else:"""
         if not conversation_id:
             conversation_id = str(uuid.uuid4())
 
-        session = conversation_session_service.get_or_create_session(
+        conversation_session_service.get_or_create_session(
             self.db, conversation_id, workflow_obj.id, contact_id=1, channel="test", company_id=workflow_obj.company_id
         )
+        session = self._turn_state.session(conversation_id)
 
         # Load all memories for this session into the context
-        context = {memory.key: memory.value for memory in memory_service.get_all_memories(self.db, agent_id=executing_agent_id, session_id=conversation_id)} if executing_agent_id else {}
+        context = self._turn_state.memories(executing_agent_id, conversation_id)
 
         # Also merge session.context which contains validation state and other transient data
         # Session context takes precedence for keys like pending_listen_validation_mode, pending_question_text, etc.
@@ -2094,12 +1998,7 @@ Return only valid JSON, nothing else:"""
                     # Save entities to memory for persistence
                     if self._executing_agent_id:
                         for entity_name, entity_value in entities.items():
-                            memory_service.set_memory(
-                                self.db,
-                                MemoryCreate(key=entity_name, value=entity_value),
-                                agent_id=self._executing_agent_id,
-                                session_id=conversation_id
-                            )
+                            self._turn_state.set_memory(self._executing_agent_id, conversation_id, entity_name, entity_value)
 
                 # Check if confidence meets auto-trigger threshold
                 if not self.workflow_intent_service.should_auto_trigger(workflow_obj, confidence):
@@ -2111,33 +2010,23 @@ Return only valid JSON, nothing else:"""
 
         results = {}
 
-        # Ensure visual_steps is a dictionary
-        visual_steps_data = workflow_obj.visual_steps
+        # Compiled graph of the version being run (cached per workflow version)
+        plan_source = workflow_obj
 
         # If this is a parent workflow with no visual_steps, try to use the active version instead
-        if visual_steps_data is None and hasattr(workflow_obj, 'versions') and workflow_obj.versions:
+        if workflow_obj.visual_steps is None and hasattr(workflow_obj, 'versions') and workflow_obj.versions:
             active_version = next((v for v in workflow_obj.versions if v.is_active), None)
             if active_version and active_version.visual_steps:
                 print(f"DEBUG: Using active version {active_version.id} (v{active_version.version}) instead of parent {workflow_obj.id}")
-                visual_steps_data = active_version.visual_steps
-
-        # Handle None or empty visual_steps
-        if visual_steps_data is None:
-            print(f"WARNING: Workflow {workflow_obj.id} has no visual_steps defined")
-            return {"status": "error", "response": "Workflow configuration is incomplete. Please contact support."}
-
-        if isinstance(visual_steps_data, str):
-            try:
-                visual_steps_data = json.loads(visual_steps_data)
-            except json.JSONDecodeError:
-                return {"status": "error", "response": "Failed to parse workflow visual steps."}
+                plan_source = active_version
 
-        # Validate that visual_steps_data has required structure
-        if not isinstance(visual_steps_data, dict):
-            print(f"WARNING: Workflow {workflow_obj.id} visual_steps is not a dict: {type(visual_steps_data)}")
-            return {"status": "error", "response": "Workflow configuration is invalid. Please contact support."}
+        try:
+            plan = workflow_plan_cache.get(plan_source)
+        except WorkflowPlanError as e:
+            return {"status": "error", "response": str(e)}
 
-        graph_engine = GraphExecutionEngine(visual_steps_data)
+        graph_engine = GraphExecutionEngine.from_plan(plan)
+        self._plan = plan
         
         print(f"DEBUG: Workflow resumed with user_message: '{user_message}'")
         # Check if workflow is paused (indicated by next_step_id being set)
@@ -2154,13 +2043,13 @@ Return only valid JSON, nothing else:"""
                     next_step_id=None,
                     context={}
                 )
-                conversation_session_service.update_session(self.db, conversation_id, session_update)
+                self._turn_state.update_session(conversation_id, session_update)
                 # Clear memories for clean restart
-                memory_service.delete_all_memories(self.db, agent_id=self._executing_agent_id, session_id=conversation_id)
+                self._turn_state.clear_memories(self._executing_agent_id, conversation_id)
                 # Start from beginning
                 current_node_id = graph_engine.find_start_node()
                 context = {"initial_user_message": user_message, "user_attachments": attachments or []}
-                memory_service.set_memory(self.db, MemoryCreate(key="initial_user_message", value=user_message), agent_id=self._executing_agent_id, session_id=conversation_id)
+                self._turn_state.set_memory(self._executing_agent_id, conversation_id, "initial_user_message", user_message)
             else:
                 should_resume = True
                 print(f"DEBUG: Resuming from paused state. Context from memory: {context}")
@@ -2227,7 +2116,7 @@ Return only valid JSON, nothing else:"""
                                 context=context,
                                 status='active'
                             )
-                            conversation_session_service.update_session(self.db, conversation_id, session_update)
+                            self._turn_state.update_session(conversation_id, session_update)
 
                             return {
                                 "status": "paused_for_prompt",
@@ -2317,7 +2206,7 @@ Return only valid JSON, nothing else:"""
                                 context=context,
                                 status='active'
                             )
-                            conversation_session_service.update_session(self.db, conversation_id, session_update)
+                            self._turn_state.update_session(conversation_id, session_update)
 
                             return {
                                 "status": "paused_for_input",
@@ -2398,13 +2287,13 @@ Return only valid JSON, nothing else:"""
                         context.pop("expected_input_type", None)
                     print(f"DEBUG: Context after updating with user message: {context}")
                     # Save the updated context back to memory
-                    memory_service.set_memory(self.db, MemoryCreate(key=variable_to_save, value=context[variable_to_save]), agent_id=self._executing_agent_id, session_id=conversation_id)
+                    self._turn_state.set_memory(self._executing_agent_id, conversation_id, variable_to_save, context[variable_to_save])
         else:
             current_node_id = graph_engine.find_start_node()
             # For the very first message in a workflow
             context["initial_user_message"] = user_message
             context["user_attachments"] = attachments or []
-            memory_service.set_memory(self.db, MemoryCreate(key="initial_user_message", value=user_message), agent_id=self._executing_agent_id, session_id=conversation_id)
+            self._turn_state.set_memory(self._executing_agent_id, conversation_id, "initial_user_message", user_message)
 
         last_executed_node_id = None
         response_messages = []  # Collect all response node outputs
@@ -2413,26 +2302,26 @@ Return only valid JSON, nothing else:"""
             node_type = node.get("type")
             node_data = node.get("data", {})
 
+            # Independent branches that join again run concurrently, then execution continues at the join
+            fan_out = graph_engine.get_fan_out(current_node_id)
+            if fan_out:
+                failed_node_id = await self._execute_fan_out(fan_out, context, results, workflow_obj, conversation_id)
+                if failed_node_id:
+                    # No error edges inside a fan-out: like a serial run, the workflow ends at the failed node
+                    last_executed_node_id = failed_node_id
+                    current_node_id = None
+                else:
+                    last_executed_node_id = fan_out.branches[-1][-1]
+                    current_node_id = fan_out.join
+                continue
+
             result = None
             if node_type == "start":
                 initial_input_variable = node_data.get("initial_input_variable", "user_message")
                 context[initial_input_variable] = user_message
                 result = {"output": "Start node processed"} # Indicate success, no real output
-            elif node_type == "tool":
-                # Support multiple keys for backwards compatibility: tool_name, tool, name
-                tool_name = node_data.get("tool_name") or node_data.get("tool") or node_data.get("name")
-                if not tool_name:
-                    result = {"error": f"Tool node '{current_node_id}' has no tool configured. Please select a tool in the properties panel."}
-                else:
-                    raw_params = node_data.get("parameters", {}) or node_data.get("params", {})
-                    resolved_params = {k: self._resolve_placeholders(v, context, results) for k, v in raw_params.items()}
-                    result = await self._execute_tool(tool_name, resolved_params, company_id=workflow_obj.company_id, session_id=conversation_id)
-
-            elif node_type == "http_request":
-                result = await self._execute_http_request_node(node_data, context, results)
-
-            elif node_type == "llm":
-                result = await self._execute_llm_node(node_data, context, results, company_id=workflow_obj.company_id, workflow=workflow_obj, conversation_id=conversation_id)
+            elif node_type in PARALLEL_NODE_TYPES:
+                result = await self._execute_parallel_node(current_node_id, node, context, results, workflow_obj, conversation_id)
 
             elif node_type == "data_manipulation":
                 result = await self._execute_data_manipulation_node(node_data, context, results)
@@ -2440,9 +2329,6 @@ Return only valid JSON, nothing else:"""
             elif node_type == "code":
                 result = await self._execute_code_node(node_data, context, results)
 
-            elif node_type == "knowledge":
-                result = await self._execute_knowledge_retrieval_node(node_data, context, results, company_id=workflow_obj.company_id, workflow=workflow_obj)
-
             elif node_type == "condition":
                 result = self._execute_conditional_node(node_data, context, results)
 
@@ -2659,6 +2545,7 @@ Return only valid JSON, nothing else:"""
                             try:
                                 from app.services import widget_settings_service, credential_service
                                 from app.services.tts_service import TTSService
+                                from app.services.tts_cache_service import stream_browser_tts
                                 widget_settings = widget_settings_service.get_widget_settings(self.db, self._executing_agent_id)
                                 if widget_settings and widget_settings.communication_mode == 'chat_and_voice':
                                     tts_provider = (self._executing_agent.tts_provider if self._executing_agent else None) or 'voice_engine'
@@ -2672,7 +2559,7 @@ Return only valid JSON, nothing else:"""
                                             pass
                                     tts_service = TTSService(openai_api_key=openai_api_key)
                                     # Use message_text (already extracted from dict if needed)
-                                    audio_stream = tts_service.text_to_speech_stream(message_text, voice_id, tts_provider)
+                                    audio_stream = stream_browser_tts(tts_service, message_text, voice_id, tts_provider)
                                     async for audio_chunk in audio_stream:
                                         await ws_manager.broadcast_bytes_to_session(str(conversation_id), audio_chunk)
                                     await tts_service.close()
@@ -2791,12 +2678,12 @@ Return only valid JSON, nothing else:"""
                 print(f"DEBUG: 'output_variable' from node data is: '{variable_to_save}'")
                 if variable_to_save:
                     context["variable_to_save"] = variable_to_save
-                    memory_service.set_memory(self.db, MemoryCreate(key="variable_to_save", value=variable_to_save), agent_id=self._executing_agent_id, session_id=conversation_id)
+                    self._turn_state.set_memory(self._executing_agent_id, conversation_id, "variable_to_save", variable_to_save)
 
                 # Store expected_input_type for use when resuming (e.g., for geocoding text locations)
                 if "expected_input_type" in result:
                     context["expected_input_type"] = result["expected_input_type"]
-                    memory_service.set_memory(self.db, MemoryCreate(key="expected_input_type", value=result["expected_input_type"]), agent_id=self._executing_agent_id, session_id=conversation_id)
+                    self._turn_state.set_memory(self._executing_agent_id, conversation_id, "expected_input_type", result["expected_input_type"])
 
                 # Keep session status as 'active' so it remains visible in the UI
                 # The presence of next_step_id indicates the workflow is paused waiting for input
@@ -2805,7 +2692,7 @@ Return only valid JSON, nothing else:"""
                     context=context,
                     status='active'  # Keep as active instead of paused to keep conversation visible
                 )
-                conversation_session_service.update_session(self.db, conversation_id, session_update)
+                self._turn_state.update_session(conversation_id, session_update)
                 
                 response_payload = {
                     "status": result.get("status"),
@@ -2850,8 +2737,7 @@ Return only valid JSON, nothing else:"""
                     next_step_id=None,  # Start from beginning of subworkflow
                     context=context
                 )
-                conversation_session_service.update_session(self.db, conversation_id, session_update)
-                self.db.refresh(session)
+                self._turn_state.update_session(conversation_id, session_update)
 
                 print(f"✓ Subworkflow: Pushed to stack, entering subworkflow {subworkflow_id} at depth {depth}")
 
@@ -2878,7 +2764,7 @@ Return only valid JSON, nothing else:"""
                     context=context,
                     status='active'
                 )
-                conversation_session_service.update_session(self.db, conversation_id, session_update)
+                self._turn_state.update_session(conversation_id, session_update)
 
                 return {
                     "status": "workflow_transferred",
@@ -2923,8 +2809,7 @@ Return only valid JSON, nothing else:"""
                 next_step_id=parent_next_step_id,
                 context=context
             )
-            conversation_session_service.update_session(self.db, conversation_id, session_update)
-            self.db.refresh(session)
+            self._turn_state.update_session(conversation_id, session_update)
 
             # Continue parent workflow from where it left off
             # Pass empty user_message since we're continuing, not responding to new input
@@ -2942,32 +2827,27 @@ Return only valid JSON, nothing else:"""
         context['last_workflow_completed_at'] = datetime.now().isoformat()
         context['last_workflow_id'] = workflow_obj.id
 
-        # Clean up any extraction-related markers from context and memory so they don't interfere with future runs
+        # Clean up any extraction-related markers from context so they don't interfere with future runs
+        # (their memory rows go with the memory clear below)
         extraction_markers = ['_extracting_entity_name', '_missing_entities', '_extraction_attempts', 'variable_to_save']
         for marker in extraction_markers:
             context.pop(marker, None)
-            # Also delete from memory service
-            try:
-                if self._executing_agent_id:
-                    memory_service.delete_memory(self.db, marker, self._executing_agent_id, conversation_id)
-            except:
-                pass  # Marker might not exist in memory
-        print(f"DEBUG: Cleaned up extraction markers from context and memory on workflow completion")
-
-        # Update session context
-        session_update = ConversationSessionUpdate(status='active', context=context, subworkflow_stack=None)
-        conversation_session_service.update_session(self.db, conversation_id, session_update)
-
-        # Clear workflow_id and next_step_id directly so next message triggers fresh workflow search
-        session.workflow_id = None
-        session.next_step_id = None
-        self.db.commit()
-        self.db.refresh(session)
+        print(f"DEBUG: Cleaned up extraction markers from context on workflow completion")
+
+        # Update session context and clear workflow_id and next_step_id so next message triggers fresh workflow search
+        session_update = ConversationSessionUpdate(
+            status='active',
+            context=context,
+            subworkflow_stack=None,
+            workflow_id=None,
+            next_step_id=None
+        )
+        self._turn_state.update_session(conversation_id, session_update)
         print(f"DEBUG: Workflow completed. Cleared workflow_id and next_step_id for session {conversation_id}")
 
         # Clear all memory for this session so next workflow starts fresh
         if self._executing_agent_id:
-            memory_service.delete_all_memories(self.db, agent_id=self._executing_agent_id, session_id=conversation_id)
+            self._turn_state.clear_memories(self._executing_agent_id, conversation_id)
             print(f"DEBUG: Cleared all memory for session {conversation_id}")
 
         return {"status": "completed", "response": final_output, "conversation_id": conversation_id}
\ No newline at end of file
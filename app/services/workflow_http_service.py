@@ -0,0 +1,270 @@
+"""
+Workflow HTTP Service
+Shared HTTP clients for workflow http_request nodes and HTTP-calling custom tools.
+
+Requests reuse one client per worker. Its connection pool keeps idle
+keep-alive connections per host, so a workflow that calls the same API every
+turn skips the TCP and TLS setup after the first request. Each node can set
+its own timeout and retry count. Retries back off exponentially and only
+repeat requests that are safe to send again: idempotent methods on transport
+errors or 502/503/504, and any method whose connection never opened.
+
+Caching is opt-in per node and applies to successful GETs only. Entries live
+for the node's ``cache_ttl`` or, failing that, the response's
+``Cache-Control: max-age``. ``no-store``/``no-cache``/``private`` responses
+are never cached. Latency is tracked per host and logged with each request.
+"""
+import asyncio
+import hashlib
+import json
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Optional, Tuple
+from urllib.parse import urlsplit
+
+import httpx
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+from app.core.config import settings
+
+IDEMPOTENT_METHODS = frozenset({"GET", "HEAD", "OPTIONS", "PUT", "DELETE"})
+RETRY_STATUSES = frozenset({502, 503, 504})
+BODY_METHODS = frozenset({"POST", "PUT", "PATCH"})
+
+
+def cache_control_ttl(headers) -> Optional[float]:
+    """
+    Seconds a response may be cached for according to its Cache-Control header.
+
+    Returns:
+        0 if it must not be cached, None if the header doesn't say
+    """
+    directives = {}
+    for part in headers.get("cache-control", "").split(","):
+        name, _, value = part.strip().partition("=")
+        if name:
+            directives[name.lower()] = value.strip('"')
+
+    if {"no-store", "no-cache", "private"} & directives.keys():
+        return 0
+    for name in ("s-maxage", "max-age"):
+        if name in directives:
+            try:
+                return max(float(directives[name]), 0)
+            except ValueError:
+                return 0
+    return None
+
+
+class ResponseCache:
+    """LRU of GET responses with per-entry expiry."""
+
+    def __init__(self, max_entries: int = 500, max_body_bytes: int = 1024 * 1024):
+        self.max_entries = max_entries
+        self.max_body_bytes = max_body_bytes
+        self._entries: "OrderedDict[str, Tuple[float, str, int, Dict[str, str], bytes]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    @staticmethod
+    def key(scope: Any, url: str, headers: Dict[str, str]) -> str:
+        # Headers are part of the key: an Authorization header changes who the response is for
+        raw = json.dumps([scope, url, sorted((k.lower(), str(v)) for k, v in (headers or {}).items())])
+        return hashlib.sha256(raw.encode("utf-8")).hexdigest()
+
+    def get(self, key: str) -> Optional[httpx.Response]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None or entry[0] <= time.monotonic():
+                if entry is not None:
+                    del self._entries[key]
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+        _, url, status_code, headers, content = entry
+        return httpx.Response(status_code, headers=headers, content=content, request=httpx.Request("GET", url))
+
+    def put(self, key: str, response: httpx.Response, ttl: float) -> None:
+        if ttl <= 0 or len(response.content) > self.max_body_bytes:
+            return
+        entry = (time.monotonic() + ttl, str(response.request.url), response.status_code, dict(response.headers), response.content)
+        with self._lock:
+            self._entries[key] = entry
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self) -> dict:
+        return {"entries": len(self._entries), "hits": self.hits, "misses": self.misses}
+
+
+class WorkflowHttpClient:
+    """Pooled, retrying, optionally caching HTTP client shared by workflow executions."""
+
+    def __init__(self, max_connections: int = 100, max_keepalive: int = 20, keepalive_expiry: float = 30.0,
+                 timeout: float = 30.0, retries: int = 0, retry_backoff: float = 0.5,
+                 cache_max_entries: int = 500, cache_max_bytes: int = 1024 * 1024,
+                 transport: Optional[httpx.AsyncBaseTransport] = None):
+        self.limits = httpx.Limits(
+            max_connections=max_connections,
+            max_keepalive_connections=max_keepalive,
+            keepalive_expiry=keepalive_expiry,
+        )
+        self.timeout = timeout
+        self.retries = retries
+        self.retry_backoff = retry_backoff
+        self.cache = ResponseCache(max_entries=cache_max_entries, max_body_bytes=cache_max_bytes)
+        self.transport = transport
+        self._client: Optional[httpx.AsyncClient] = None
+        self._client_loop = None
+        self._session: Optional[requests.Session] = None
+        self._hosts: Dict[str, Dict[str, float]] = {}
+        self._lock = threading.Lock()
+
+    async def _get_client(self) -> httpx.AsyncClient:
+        # Connections belong to the event loop that opened them
+        loop = asyncio.get_running_loop()
+        if self._client is None or self._client_loop is not loop:
+            previous = self._client
+            self._client = httpx.AsyncClient(limits=self.limits, timeout=self.timeout, transport=self.transport)
+            self._client_loop = loop
+            if previous is not None:
+                try:
+                    # Its sockets can't be reused from this loop, but their file descriptors still need closing
+                    await previous.aclose()
+                except Exception as e:
+                    print(f"[HTTP] Closing the previous loop's client failed: {e}")
+        return self._client
+
+    @property
+    def session(self) -> requests.Session:
+        """Pooled requests session for synchronous callers (custom tool code)."""
+        if self._session is None:
+            session = requests.Session()
+            adapter = HTTPAdapter(
+                pool_connections=self.limits.max_keepalive_connections,
+                pool_maxsize=self.limits.max_keepalive_connections,
+                max_retries=Retry(total=self.retries, backoff_factor=self.retry_backoff,
+                                  status_forcelist=sorted(RETRY_STATUSES), raise_on_status=False),
+            )
+            session.mount("http://", adapter)
+            session.mount("https://", adapter)
+            session.hooks["response"].append(self._record_sync_response)
+            self._session = session
+        return self._session
+
+    def _record_sync_response(self, response, *args, **kwargs):
+        self._record(urlsplit(response.url).netloc, response.elapsed.total_seconds() * 1000, response.status_code >= 400)
+
+    def _record(self, host: str, elapsed_ms: float, failed: bool) -> None:
+        with self._lock:
+            stats = self._hosts.setdefault(host, {"requests": 0, "errors": 0, "total_ms": 0.0, "max_ms": 0.0})
+            stats["requests"] += 1
+            stats["errors"] += int(failed)
+            stats["total_ms"] += elapsed_ms
+            stats["max_ms"] = max(stats["max_ms"], elapsed_ms)
+
+    async def request(self, method: str, url: str, headers: Optional[Dict[str, str]] = None, json_body: Any = None,
+                      timeout: Optional[float] = None, retries: Optional[int] = None,
+                      cache: bool = False, cache_ttl: Optional[float] = None, cache_scope: Any = None) -> httpx.Response:
+        """
+        Send a request through the shared pool.
+
+        Args:
+            method: HTTP method (upper-case)
+            url: Absolute URL
+            headers: Request headers
+            json_body: JSON body, sent when not None and the method takes a body
+            timeout: Seconds; defaults to the client's timeout
+            retries: Extra attempts after a retryable failure; defaults to the client's
+            cache: Serve and store successful GETs from the response cache
+            cache_ttl: Seconds to cache for; None follows Cache-Control
+            cache_scope: Separates cache entries (e.g. per workflow)
+
+        Returns:
+            The response; any status code is returned as-is
+
+        Raises:
+            httpx.RequestError: If every attempt failed in transport
+        """
+        host = urlsplit(url).netloc
+        cacheable = cache and method == "GET"
+        cache_key = ResponseCache.key(cache_scope, url, headers) if cacheable else None
+        if cacheable:
+            cached = self.cache.get(cache_key)
+            if cached is not None:
+                print(f"[HTTP] {method} {host} -> {cached.status_code} (cached)")
+                return cached
+
+        attempts = 1 + (self.retries if retries is None else max(retries, 0))
+        client = await self._get_client()
+        body = {"json": json_body} if json_body is not None and method in BODY_METHODS else {}
+        for attempt in range(attempts):
+            last_attempt = attempt == attempts - 1
+            started = time.perf_counter()
+            try:
+                response = await client.request(method, url, headers=headers, **body,
+                                                timeout=self.timeout if timeout is None else timeout)
+            except httpx.RequestError as e:
+                elapsed_ms = (time.perf_counter() - started) * 1000
+                self._record(host, elapsed_ms, True)
+                print(f"[HTTP] {method} {host} failed after {elapsed_ms:.1f} ms (attempt {attempt + 1}/{attempts}): {e}")
+                # A request that never connected can be resent whatever the method
+                if last_attempt or not (method in IDEMPOTENT_METHODS or isinstance(e, (httpx.ConnectError, httpx.ConnectTimeout))):
+                    raise
+            else:
+                elapsed_ms = (time.perf_counter() - started) * 1000
+                self._record(host, elapsed_ms, response.status_code >= 400)
+                print(f"[HTTP] {method} {host} -> {response.status_code} in {elapsed_ms:.1f} ms")
+                if last_attempt or response.status_code not in RETRY_STATUSES or method not in IDEMPOTENT_METHODS:
+                    break
+            await asyncio.sleep(self.retry_backoff * (2 ** attempt))
+
+        if cacheable and response.status_code == 200:
+            ttl = cache_ttl if cache_ttl is not None else cache_control_ttl(response.headers)
+            if ttl:
+                self.cache.put(cache_key, response, ttl)
+        return response
+
+    def stats(self) -> dict:
+        with self._lock:
+            hosts = {
+                host: {
+                    "requests": int(stats["requests"]),
+                    "errors": int(stats["errors"]),
+                    "avg_ms": round(stats["total_ms"] / stats["requests"], 3) if stats["requests"] else 0.0,
+                    "max_ms": round(stats["max_ms"], 3),
+                }
+                for host, stats in self._hosts.items()
+            }
+        return {"hosts": hosts, "cache": self.cache.stats()}
+
+    async def aclose(self) -> None:
+        if self._client is not None:
+            await self._client.aclose()
+            self._client = None
+        if self._session is not None:
+            self._session.close()
+            self._session = None
+
+
+# Global instance shared by workflow executions in this worker
+workflow_http = WorkflowHttpClient(
+    max_connections=settings.WORKFLOW_HTTP_MAX_CONNECTIONS,
+    max_keepalive=settings.WORKFLOW_HTTP_MAX_KEEPALIVE,
+    keepalive_expiry=settings.WORKFLOW_HTTP_KEEPALIVE_EXPIRY,
+    timeout=settings.HTTP_REQUEST_TIMEOUT,
+    retries=settings.WORKFLOW_HTTP_RETRIES,
+    retry_backoff=settings.WORKFLOW_HTTP_RETRY_BACKOFF,
+    cache_max_entries=settings.WORKFLOW_HTTP_CACHE_MAX_ENTRIES,
+    cache_max_bytes=settings.WORKFLOW_HTTP_CACHE_MAX_BYTES,
+)
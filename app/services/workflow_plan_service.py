@@ -0,0 +1,230 @@
+"""
+Workflow Plan Service
+Compiled, immutable execution plans for workflow graphs, cached per version.
+
+A plan is derived once from a workflow's ``visual_steps``: the parsed graph,
+node lookup, edges indexed by (source, sourceHandle), the start node and the
+compiled placeholder templates of every node field.
+``GraphExecutionEngine`` steps through a plan with dictionary lookups, so a
+conversation turn never re-parses or re-scans the graph.
+
+Where a node's edges fan out into independent chains of ``http_request``,
+``llm``, ``knowledge`` or ``tool`` nodes that all lead into the same node, the
+plan records a ``FanOut`` so the executor can run the chains concurrently and
+join them there.
+
+Plans are keyed by workflow id and version plus the stored ``visual_steps``
+text, so an edit saved through any worker is picked up on the next turn;
+``invalidate`` drops a workflow's plans when it is saved or deleted here.
+Execution treats plans as read-only and shares them between conversations.
+"""
+import json
+import threading
+from collections import OrderedDict
+from types import MappingProxyType
+from typing import Any, Dict, Hashable, List, Mapping, NamedTuple, Optional, Tuple
+
+from app.core.config import settings
+from app.services.placeholder_compiler import PlaceholderTemplate, compile_placeholders, iter_placeholder_strings
+
+
+# Node types that only read the context and call out (no pauses, no routing), safe to run side by side
+PARALLEL_NODE_TYPES = frozenset({"http_request", "llm", "knowledge", "tool"})
+# Node types whose outgoing edges are alternatives chosen by handle, never fan-outs
+ROUTING_NODE_TYPES = frozenset({"condition", "question_classifier", "foreach_loop", "while_loop", "intent_router"})
+
+
+class WorkflowPlanError(ValueError):
+    """The workflow's visual steps can't be compiled; the message is user-facing."""
+
+
+class FanOut(NamedTuple):
+    """Independent branches leaving ``source`` that all continue at ``join``."""
+    source: str
+    branches: Tuple[Tuple[str, ...], ...]
+    join: str
+
+
+class WorkflowPlan:
+    """Immutable, pre-indexed view of one workflow version's graph."""
+
+    __slots__ = ("workflow_id", "version", "nodes", "edges", "adjacency_list",
+                 "start_node_id", "templates", "fan_outs", "_edges_by_handle", "_first_edge")
+
+    def __init__(self, workflow_id: Optional[int], version: Optional[int], visual_steps: Dict[str, Any]):
+        self.workflow_id = workflow_id
+        self.version = version
+
+        nodes = {node['id']: node for node in visual_steps.get('nodes', [])}
+        edges = tuple(visual_steps.get('edges', []))
+
+        adjacency_list = {node_id: [] for node_id in nodes}
+        in_degrees = {node_id: 0 for node_id in nodes}
+        edges_by_handle: Dict[Tuple[str, Any], str] = {}
+        first_edge: Dict[str, str] = {}
+        out_edges: Dict[str, List[Dict[str, Any]]] = {}
+        for edge in edges:
+            source, target = edge['source'], edge['target']
+            adjacency_list.setdefault(source, []).append(target)
+            out_edges.setdefault(source, []).append(edge)
+            in_degrees[target] = in_degrees.get(target, 0) + 1
+            # The first matching edge wins, as with a linear scan
+            edges_by_handle.setdefault((source, edge.get('sourceHandle')), target)
+            first_edge.setdefault(source, target)
+
+        self.nodes: Mapping[str, Dict[str, Any]] = MappingProxyType(nodes)
+        self.edges = edges
+        self.adjacency_list = MappingProxyType({node_id: tuple(targets) for node_id, targets in adjacency_list.items()})
+        # In a valid workflow, there should be exactly one start node
+        self.start_node_id = next((node_id for node_id in nodes if in_degrees[node_id] == 0), None)
+        self._edges_by_handle = edges_by_handle
+        self._first_edge = first_edge
+
+        # Keyed by the first branch's head: the node get_next_node (and a resumed pause) lands on
+        fan_outs: Dict[str, FanOut] = {}
+        for source in nodes:
+            fan_out = _find_fan_out(source, nodes, out_edges, in_degrees)
+            if fan_out:
+                fan_outs[fan_out.branches[0][0]] = fan_out
+        self.fan_outs: Mapping[str, FanOut] = MappingProxyType(fan_outs)
+
+        templates: Dict[str, PlaceholderTemplate] = {}
+        for node in nodes.values():
+            for text in iter_placeholder_strings(node.get('data')):
+                if text not in templates:
+                    templates[text] = compile_placeholders(text)
+        self.templates: Mapping[str, PlaceholderTemplate] = MappingProxyType(templates)
+
+    def target(self, source: str, handle: Any) -> Optional[str]:
+        """Target of the first edge leaving ``source`` through ``handle``."""
+        return self._edges_by_handle.get((source, handle))
+
+    def default_target(self, source: str) -> Optional[str]:
+        """Target of the first edge leaving ``source``, whatever its handle."""
+        return self._first_edge.get(source)
+
+    def template(self, text: str) -> PlaceholderTemplate:
+        """Compiled form of a placeholder string (node fields are precompiled)."""
+        return self.templates.get(text) or compile_placeholders(text)
+
+
+def _find_fan_out(source: str, nodes: Dict[str, Dict[str, Any]], out_edges: Dict[str, List[Dict[str, Any]]],
+                  in_degrees: Dict[str, int]) -> Optional[FanOut]:
+    """
+    The fan-out leaving ``source``, if its edges form one.
+
+    Every outgoing edge of ``source`` must start a chain of parallel-safe
+    nodes, each reached only from the previous one and with a single
+    non-error outgoing edge, and every chain must lead into the same node.
+    """
+    edges = out_edges.get(source, [])
+    if len(edges) < 2 or nodes[source].get('type') in ROUTING_NODE_TYPES:
+        return None
+    if any(edge.get('sourceHandle') == 'error' for edge in edges):
+        return None
+
+    branches = []
+    joins = set()
+    for edge in edges:
+        chain = []
+        node_id = edge['target']
+        while nodes.get(node_id, {}).get('type') in PARALLEL_NODE_TYPES:
+            node_edges = out_edges.get(node_id, [])
+            if in_degrees.get(node_id) != 1 or len(node_edges) != 1 or node_edges[0].get('sourceHandle') == 'error':
+                return None
+            chain.append(node_id)
+            node_id = node_edges[0]['target']
+        if not chain or node_id not in nodes:
+            return None
+        branches.append(tuple(chain))
+        joins.add(node_id)
+
+    if len(joins) != 1:
+        return None
+    return FanOut(source, tuple(branches), joins.pop())
+
+
+def load_visual_steps(visual_steps: Any, workflow_id: Optional[int] = None) -> Dict[str, Any]:
+    """
+    Parse a workflow's stored ``visual_steps`` (a dict or JSON text).
+
+    Raises:
+        WorkflowPlanError: If they are missing, unparsable or not an object
+    """
+    if visual_steps is None:
+        print(f"WARNING: Workflow {workflow_id} has no visual_steps defined")
+        raise WorkflowPlanError("Workflow configuration is incomplete. Please contact support.")
+
+    if isinstance(visual_steps, str):
+        try:
+            visual_steps = json.loads(visual_steps)
+        except json.JSONDecodeError:
+            raise WorkflowPlanError("Failed to parse workflow visual steps.")
+
+    if not isinstance(visual_steps, dict):
+        print(f"WARNING: Workflow {workflow_id} visual_steps is not a dict: {type(visual_steps)}")
+        raise WorkflowPlanError("Workflow configuration is invalid. Please contact support.")
+
+    return visual_steps
+
+
+class WorkflowPlanCache:
+    """LRU of compiled plans, keyed by workflow id, version and visual steps."""
+
+    def __init__(self, max_entries: int = 500):
+        self.max_entries = max_entries
+        self._plans: "OrderedDict[Tuple[Any, Any, Hashable], WorkflowPlan]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    @staticmethod
+    def _key(workflow) -> Tuple[Any, Any, Hashable]:
+        visual_steps = workflow.visual_steps
+        # Stored JSON text doubles as the fingerprint; dicts rely on invalidate()
+        fingerprint = visual_steps if isinstance(visual_steps, str) else None
+        return workflow.id, workflow.version, fingerprint
+
+    def get(self, workflow) -> WorkflowPlan:
+        """
+        The compiled plan of a workflow row, compiling it on first use.
+
+        Raises:
+            WorkflowPlanError: If the workflow's visual steps are unusable
+        """
+        key = self._key(workflow)
+        cacheable = isinstance(key[0], int)
+        if cacheable:
+            with self._lock:
+                plan = self._plans.get(key)
+                if plan is not None:
+                    self._plans.move_to_end(key)
+                    self.hits += 1
+                    return plan
+
+        plan = WorkflowPlan(workflow.id, workflow.version, load_visual_steps(workflow.visual_steps, workflow.id))
+        if cacheable:
+            with self._lock:
+                self.misses += 1
+                self._plans[key] = plan
+                self._plans.move_to_end(key)
+                while len(self._plans) > self.max_entries:
+                    self._plans.popitem(last=False)
+        return plan
+
+    def invalidate(self, workflow_id: int) -> None:
+        """Drop every cached plan of a workflow (all versions and edits)."""
+        with self._lock:
+            for key in [key for key in self._plans if key[0] == workflow_id]:
+                del self._plans[key]
+
+    def clear(self) -> None:
+        with self._lock:
+            self._plans.clear()
+
+    def stats(self) -> dict:
+        return {"entries": len(self._plans), "hits": self.hits, "misses": self.misses}
+
+
+# Global instance shared by workflow executions in this worker
+workflow_plan_cache = WorkflowPlanCache(max_entries=settings.WORKFLOW_PLAN_CACHE_MAX_ENTRIES)
@@ -4,6 +4,8 @@ from sqlalchemy.orm.attributes import flag_modified
 from app.models import workflow as models_workflow, agent as models_agent
 from app.schemas import workflow as schemas_workflow
 from app.services import vectorization_service, workflow_trigger_service
+from app.services.workflow_plan_service import workflow_plan_cache
+from app.services.workflow_embedding_service import workflow_embeddings
 
 def get_workflow(db: Session, workflow_id: int, company_id: int):
     return db.query(models_workflow.Workflow).options(
@@ -75,6 +77,7 @@ def create_workflow(db: Session, workflow: schemas_workflow.WorkflowCreate, comp
 
     db.commit()
     db.refresh(db_workflow)
+    _refresh_embedding(db_workflow)
 
     # Sync workflow triggers if visual_steps exist
     if visual_steps_data:
@@ -191,6 +194,8 @@ def update_workflow(db: Session, workflow_id: int, workflow: schemas_workflow.Wo
 
         db.commit()
         db.refresh(db_workflow)
+        workflow_plan_cache.invalidate(workflow_id)
+        _refresh_embedding(db_workflow)
 
         # Sync workflow triggers if visual_steps were updated
         if visual_steps_updated and visual_steps_data:
@@ -208,9 +213,20 @@ def delete_workflow(db: Session, workflow_id: int, company_id: int):
     if db_workflow:
         db.delete(db_workflow)
         db.commit()
+        workflow_plan_cache.invalidate(workflow_id)
+        workflow_embeddings.remove(company_id, workflow_id)
         return True
     return False
 
+def _refresh_embedding(db_workflow):
+    """Re-embed a root workflow for similarity routing; routing still works (lazily) if this fails."""
+    if db_workflow.parent_workflow_id is not None:
+        return
+    try:
+        workflow_embeddings.upsert(db_workflow.company_id, [db_workflow])
+    except Exception as e:
+        print(f"Error embedding workflow {db_workflow.id}: {e}")
+
 def _parse_json_field(value, default):
     """Helper to parse potentially double-encoded JSON fields."""
     if value is None:
@@ -497,22 +513,11 @@ def find_similar_workflow(db: Session, company_id: int, query: str, agent_id: in
                 print(f"DEBUG: Found direct match for query '{query}' in workflow '{workflow.name}'")
                 return get_workflow(db, workflow.id, company_id)
 
-    # 2. If no direct match, fall back to similarity search
+    # 2. If no direct match, fall back to similarity search against the company's
+    # cached workflow embeddings (one model call for the query, one matrix product)
     query_embedding = vectorization_service.get_embedding(query)
-    
-    best_match = None
-    highest_similarity = -1
+    best_match, highest_similarity = workflow_embeddings.best_match(company_id, query_embedding, active_workflows)
 
-    for workflow in active_workflows:
-        workflow_text = f"{workflow.name} {workflow.description or ''}"
-        workflow_embedding = vectorization_service.get_embedding(workflow_text)
-        
-        similarity = vectorization_service.cosine_similarity(query_embedding, workflow_embedding)
-        
-        if similarity > highest_similarity:
-            highest_similarity = similarity
-            best_match = workflow
-            
     # Adjust the threshold as needed (0.75 = high confidence matches only)
     SIMILARITY_THRESHOLD = 0.75
     if highest_similarity > SIMILARITY_THRESHOLD:
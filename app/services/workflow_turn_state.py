@@ -0,0 +1,149 @@
+"""
+Workflow Turn State
+Write-behind unit of work for the session state a workflow turn changes.
+
+A conversation turn used to commit every context, next-step and memory
+change as it happened, one query and commit per call. ``execute_workflow``
+now stages those changes here and ``flush`` writes them in one transaction
+when the turn ends or pauses.
+
+Nothing touches the session row before the flush: a dirty row would be
+autoflushed by the turn's next query and hold its row lock through every LLM
+and HTTP call that follows. Reads in the turn go through a ``StagedSession``
+that shows the staged fields over the row. Memory keys stay in the buffer
+until the flush, which upserts them with one statement per agent;
+``memories`` merges the buffer over the stored rows for reads in the turn.
+"""
+from typing import Any, Dict, Optional, Set, Tuple
+
+from sqlalchemy.orm import Session
+from sqlalchemy.orm.attributes import flag_modified
+
+from app.models.conversation_session import ConversationSession
+from app.schemas.conversation_session import ConversationSessionUpdate
+from app.services import conversation_session_service, memory_service
+
+MemoryScope = Tuple[int, str]  # (agent_id, session_id)
+
+
+class StagedSession:
+    """Read-only view of a session row with the turn's staged fields applied."""
+
+    __slots__ = ("_row", "_fields")
+
+    def __init__(self, row: ConversationSession, fields: Dict[str, Any]):
+        self._row = row
+        self._fields = fields
+
+    def __getattr__(self, name: str) -> Any:
+        if name in self._fields:
+            return self._fields[name]
+        return getattr(self._row, name)
+
+    def __setattr__(self, name: str, value: Any) -> None:
+        if name in self.__slots__:
+            object.__setattr__(self, name, value)
+            return
+        raise AttributeError(f"Stage '{name}' with WorkflowTurnState.update_session")
+
+
+class WorkflowTurnState:
+    """Session and memory changes of one turn, flushed in a single commit."""
+
+    def __init__(self, db: Session):
+        self.db = db
+        self._session_rows: Dict[str, ConversationSession] = {}
+        self._session_fields: Dict[str, Dict[str, Any]] = {}
+        self._memories: Dict[MemoryScope, Dict[str, Any]] = {}
+        self._cleared: Set[MemoryScope] = set()
+
+    @property
+    def pending(self) -> bool:
+        return any(self._session_fields.values()) or bool(self._memories or self._cleared)
+
+    def session(self, conversation_id: str) -> Optional[StagedSession]:
+        """The conversation's session as this turn sees it; the row is queried once per turn."""
+        row = self._row(conversation_id)
+        if row is None:
+            return None
+        return StagedSession(row, self._session_fields.setdefault(conversation_id, {}))
+
+    def update_session(self, conversation_id: str, session_update: ConversationSessionUpdate) -> Optional[StagedSession]:
+        """Stage the fields explicitly set on ``session_update``."""
+        return self._stage(conversation_id, session_update.model_dump(exclude_unset=True))
+
+    def update_context(self, conversation_id: str, context: dict) -> Optional[StagedSession]:
+        """Stage a new value for the session's context."""
+        return self._stage(conversation_id, {"context": context})
+
+    def _row(self, conversation_id: str) -> Optional[ConversationSession]:
+        row = self._session_rows.get(conversation_id)
+        if row is None:
+            row = conversation_session_service.get_session(self.db, conversation_id)
+            if row is not None:
+                self._session_rows[conversation_id] = row
+        return row
+
+    def _stage(self, conversation_id: str, fields: Dict[str, Any]) -> Optional[StagedSession]:
+        session = self.session(conversation_id)
+        if session is not None:
+            self._session_fields[conversation_id].update(fields)
+        return session
+
+    def set_memory(self, agent_id: Optional[int], session_id: str, key: str, value: Any) -> None:
+        """
+        Stage a memory key; the last value staged for a key wins.
+
+        Memories without an agent are never loaded back by a workflow, so
+        they are not written.
+        """
+        if agent_id is None:
+            return
+        self._memories.setdefault((agent_id, session_id), {})[key] = value
+
+    def clear_memories(self, agent_id: Optional[int], session_id: str) -> None:
+        """Stage deleting every memory of the agent and session, including staged keys."""
+        if agent_id is None:
+            return
+        scope = (agent_id, session_id)
+        self._memories.pop(scope, None)
+        self._cleared.add(scope)
+
+    def memories(self, agent_id: Optional[int], session_id: str) -> Dict[str, Any]:
+        """Stored memories of the agent and session with this turn's changes applied."""
+        if agent_id is None:
+            return {}
+        scope = (agent_id, session_id)
+        values = {} if scope in self._cleared else {
+            memory.key: memory.value
+            for memory in memory_service.get_all_memories(self.db, agent_id=agent_id, session_id=session_id)
+        }
+        values.update(self._memories.get(scope, {}))
+        return values
+
+    def flush(self) -> None:
+        """Write every staged change in one transaction and empty the buffers."""
+        if not self.pending:
+            return
+        try:
+            for agent_id, session_id in self._cleared:
+                memory_service.delete_all_memories(self.db, agent_id=agent_id, session_id=session_id, commit=False)
+            for (agent_id, session_id), values in self._memories.items():
+                memory_service.upsert_memories(self.db, values, agent_id=agent_id, session_id=session_id, commit=False)
+            for conversation_id, fields in self._session_fields.items():
+                row = self._row(conversation_id)
+                if row is None or not fields:
+                    continue
+                for key, value in fields.items():
+                    setattr(row, key, value)
+                if "context" in fields:
+                    # Nodes mutate the context dict in place, so equality checks can't see the change
+                    flag_modified(row, "context")
+            self.db.commit()
+        except Exception:
+            self.db.rollback()
+            raise
+
+        self._session_fields.clear()
+        self._memories.clear()
+        self._cleared.clear()
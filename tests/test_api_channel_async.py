@@ -0,0 +1,108 @@
+import asyncio
+from types import SimpleNamespace
+from unittest.mock import MagicMock
+
+import pytest
+from sqlalchemy import create_engine
+from sqlalchemy.orm import Session
+
+from app.models.api_integration import ApiIntegration
+from app.schemas.api_channel import ApiMessageResponse, ApiMessageSend
+from app.services import api_channel_service, inbound_webhook_service, webhook_delivery_service
+from app.services.api_channel_service import ApiChannelService
+
+
+def _integration(**kwargs):
+    values = {"id": 3, "company_id": 9, "webhook_enabled": True, "webhook_url": "https://hooks.test/cb", "webhook_secret": "s"}
+    values.update(kwargs)
+    return SimpleNamespace(**values)
+
+
+def test_async_message_is_queued_and_acknowledged(monkeypatch):
+    queued = []
+    monkeypatch.setattr(inbound_webhook_service, "enqueue_events",
+                        lambda db, channel, events, integration_id: queued.append((channel, events, integration_id)))
+    session = SimpleNamespace(conversation_id="api_9_u1")
+    message = ApiMessageSend(external_user_id="u1", message="hi", response_mode="async", metadata={"ref": 1})
+
+    response = ApiChannelService(MagicMock())._queue_message(session, message, _integration(), 9, 42)
+
+    assert (response.status, response.message_id, response.metadata) == ("accepted", 42, {"ref": 1})
+    [(channel, [event], integration_id)] = queued
+    assert (channel, integration_id, event["conversation_key"]) == ("api", 3, "api_9_u1")
+    assert event["payload"]["message"]["response_mode"] == "async"
+    assert ApiMessageSend.model_validate(event["payload"]["message"]) == message
+
+
+def test_queued_message_result_goes_to_the_outbox(monkeypatch):
+    deliveries = []
+    monkeypatch.setattr(webhook_delivery_service, "enqueue_delivery", lambda db, **kwargs: deliveries.append(kwargs))
+    session = SimpleNamespace(conversation_id="api_9_u1")
+    monkeypatch.setattr(api_channel_service.conversation_session_service, "get_session", lambda db, cid: session)
+
+    async def complete(self, **kwargs):
+        return ApiMessageResponse(session_id="api_9_u1", message_id=43, response_message="Hello!", status="completed",
+                                  created_at="2026-01-01T00:00:00Z")
+
+    monkeypatch.setattr(ApiChannelService, "_complete_message", complete)
+    db = MagicMock()
+    db.query.return_value.filter.return_value.first.return_value = _integration()
+    payload = {"company_id": 9, "conversation_id": "api_9_u1", "user_message_id": 42,
+               "message": {"external_user_id": "u1", "message": "hi", "response_mode": "async"}}
+
+    asyncio.run(api_channel_service.process_queued_message(payload, db, 3))
+
+    [delivery] = deliveries
+    assert delivery["url"] == "https://hooks.test/cb" and delivery["event_type"] == "message_response"
+    assert delivery["payload"]["message"] == "Hello!" and delivery["payload"]["external_user_id"] == "u1"
+    assert "signature" not in delivery["payload"]
+
+
+def test_failed_message_rolls_back_and_queues_an_error_callback(monkeypatch):
+    engine = create_engine("sqlite://")
+    ApiIntegration.__table__.create(engine)
+    db = Session(engine)
+    db.add(ApiIntegration(id=3, name="api", api_key_id=1, company_id=9, webhook_enabled=True,
+                          webhook_url="https://hooks.test/cb", webhook_secret="s"))
+    db.commit()
+    deliveries = []
+    monkeypatch.setattr(webhook_delivery_service, "enqueue_delivery", lambda db, **kwargs: deliveries.append(kwargs))
+    session = SimpleNamespace(conversation_id="api_9_u1")
+    monkeypatch.setattr(api_channel_service.conversation_session_service, "get_session", lambda db, cid: session)
+
+    async def complete(self, **kwargs):
+        raise RuntimeError("LLM timeout")
+
+    monkeypatch.setattr(ApiChannelService, "_complete_message", complete)
+    payload = {"company_id": 9, "conversation_id": "api_9_u1", "user_message_id": 42,
+               "message": {"external_user_id": "u1", "message": "hi", "response_mode": "async"}}
+
+    with pytest.raises(RuntimeError):
+        asyncio.run(api_channel_service.process_queued_message(payload, db, 3))
+
+    [delivery] = deliveries
+    assert delivery["payload"]["status"] == "error" and delivery["payload"]["message_id"] == 42
+    db.close()
+
+
+def test_background_runs_are_held_until_done(monkeypatch):
+    monkeypatch.setattr(api_channel_service.settings, "WEBHOOK_QUEUE_ENABLED", False)
+    finished = []
+
+    async def process(payload, integration_id):
+        await asyncio.sleep(0)
+        finished.append(payload["user_message_id"])
+
+    monkeypatch.setattr(api_channel_service, "_process_in_background", process)
+    message = ApiMessageSend(external_user_id="u1", message="hi", response_mode="async")
+
+    async def scenario():
+        ApiChannelService(MagicMock())._queue_message(SimpleNamespace(conversation_id="api_9_u1"), message, _integration(), 9, 42)
+        assert len(api_channel_service._background_tasks) == 1
+        await asyncio.gather(*api_channel_service._background_tasks)
+        await asyncio.sleep(0)
+
+    asyncio.run(scenario())
+
+    assert finished == [42]
+    assert not api_channel_service._background_tasks
@@ -0,0 +1,149 @@
+import asyncio
+import base64
+
+import pytest
+
+from app.services import attachment_service
+
+
+class FakeS3:
+    def __init__(self, fail=False):
+        self.fail = fail
+        self.objects = {}
+        self.parts = {}
+        self.calls = []
+
+    def upload_fileobj(self, fileobj, bucket, key, ExtraArgs=None, Config=None):
+        self.calls.append("upload_fileobj")
+        if self.fail:
+            raise RuntimeError("storage down")
+        self.objects[key] = fileobj.read()
+
+    def put_object(self, Bucket, Key, Body, ContentType):
+        self.calls.append("put_object")
+        self.objects[Key] = bytes(Body)
+
+    def head_object(self, Bucket, Key):
+        if Key not in self.objects:
+            raise RuntimeError("404")
+        return {"ContentLength": len(self.objects[Key])}
+
+    def create_multipart_upload(self, Bucket, Key, ContentType):
+        self.calls.append("create_multipart_upload")
+        self.parts[Key] = []
+        return {"UploadId": "upload-1"}
+
+    def upload_part(self, Bucket, Key, UploadId, PartNumber, Body):
+        self.parts[Key].append(bytes(Body))
+        return {"ETag": f"etag-{PartNumber}"}
+
+    def complete_multipart_upload(self, Bucket, Key, UploadId, MultipartUpload):
+        self.calls.append("complete_multipart_upload")
+        self.objects[Key] = b"".join(self.parts.pop(Key))
+
+    def abort_multipart_upload(self, Bucket, Key, UploadId):
+        self.calls.append("abort_multipart_upload")
+        self.parts.pop(Key, None)
+
+
+@pytest.fixture
+def s3(monkeypatch):
+    fake = FakeS3()
+    monkeypatch.setattr(attachment_service, "s3_client", fake)
+    return fake
+
+
+def test_raw_bytes_are_stored_and_dropped(s3):
+    attachments = [{"data": b"\x89PNG-bytes", "file_name": "photo one.png", "file_type": "image/png"}]
+
+    text = asyncio.run(attachment_service.ingest_attachments(attachments))
+
+    att = attachments[0]
+    assert text == "📎 photo one.png"
+    assert "data" not in att and "file_data" not in att
+    assert att["storage_key"].startswith("attachments/") and att["storage_key"].endswith("photo_one.png")
+    assert att["file_url"].endswith(att["storage_key"])
+    assert s3.objects[att["storage_key"]] == b"\x89PNG-bytes"
+
+
+def test_legacy_base64_is_decoded_once(s3):
+    attachments = [
+        {"file_data": base64.b64encode(b"hello").decode(), "file_name": "a.txt", "file_type": "text/plain"},
+        {"location": {"latitude": 1.5, "longitude": 2.25}},
+    ]
+
+    text = asyncio.run(attachment_service.ingest_attachments(attachments))
+
+    assert text == "📎 a.txt\n📍 Location (1.5000, 2.2500)"
+    assert "file_data" not in attachments[0]
+    assert s3.objects[attachments[0]["storage_key"]] == b"hello"
+
+
+def test_failed_upload_keeps_a_json_safe_copy(monkeypatch):
+    monkeypatch.setattr(attachment_service, "s3_client", FakeS3(fail=True))
+    attachments = [{"data": b"abc", "file_name": "a.bin", "file_type": "application/octet-stream"}]
+
+    asyncio.run(attachment_service.ingest_attachments(attachments))
+
+    assert attachments[0]["file_data"] == base64.b64encode(b"abc").decode()
+    assert "data" not in attachments[0] and "file_url" not in attachments[0]
+
+
+def test_storage_keys_must_be_issued_and_present(s3):
+    s3.objects["attachments/known_a.png"] = b"12345"
+    attachments = [
+        {"storage_key": "attachments/known_a.png", "file_url": "http://evil/x", "file_name": "a.png"},
+        {"storage_key": "attachments/other_b.png", "file_name": "b.png"},
+        {"storage_key": "attachments/missing_c.png", "file_name": "c.png"},
+    ]
+
+    text = asyncio.run(attachment_service.ingest_attachments(
+        attachments, issued_keys={"attachments/known_a.png", "attachments/missing_c.png"}
+    ))
+
+    assert attachments[0]["file_url"] == attachment_service.attachment_url("attachments/known_a.png")
+    assert attachments[0]["file_size"] == 5
+    assert "storage_key" not in attachments[1] and "storage_key" not in attachments[2]
+    assert text == "📎 a.png"
+
+
+def test_streaming_upload_small_file_uses_single_put(s3):
+    async def run():
+        upload = attachment_service.StreamingAttachmentUpload("clip.mp3", "audio/mpeg")
+        for chunk in (b"ab", b"cd", b"ef"):
+            await upload.write(chunk)
+        return await upload.complete()
+
+    attachment = asyncio.run(run())
+
+    assert s3.calls == ["put_object"]
+    assert s3.objects[attachment["storage_key"]] == b"abcdef"
+    assert attachment["file_size"] == 6
+
+
+def test_streaming_upload_large_file_uses_multipart(s3):
+    part = attachment_service._part_size()
+    chunk = b"x" * (1024 * 1024)
+    chunks = part // len(chunk) + 3
+
+    async def run():
+        upload = attachment_service.StreamingAttachmentUpload("video.mp4", "video/mp4")
+        for _ in range(chunks):
+            await upload.write(chunk)
+            assert len(upload._buffer) < part
+        return await upload.complete()
+
+    attachment = asyncio.run(run())
+
+    assert s3.calls == ["create_multipart_upload", "complete_multipart_upload"]
+    assert len(s3.objects[attachment["storage_key"]]) == chunks * len(chunk)
+
+
+def test_streaming_upload_rejects_oversized_files(s3):
+    async def run():
+        upload = attachment_service.StreamingAttachmentUpload("big.bin", None, max_bytes=4)
+        await upload.write(b"abc")
+        await upload.write(b"de")
+
+    with pytest.raises(attachment_service.AttachmentTooLargeError):
+        asyncio.run(run())
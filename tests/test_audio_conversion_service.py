@@ -0,0 +1,87 @@
+import asyncio
+import audioop
+import base64
+import io
+import math
+import struct
+import wave
+
+import pytest
+
+from app.services.audio_conversion_service import (
+    AudioConversionService,
+    AudioTranscodingPool,
+    mulaw_batch_to_pcm,
+    pcm_batch_to_l16_b64,
+    pcm_batch_to_mulaw_b64,
+    pcm_to_wav_bytes,
+)
+
+
+def _sine_pcm(sample_rate: int, seconds: float = 0.5, freq: float = 440.0) -> bytes:
+    frames = int(sample_rate * seconds)
+    return b"".join(
+        struct.pack("<h", int(12000 * math.sin(2 * math.pi * freq * i / sample_rate)))
+        for i in range(frames)
+    )
+
+
+def _split(data: bytes, chunk_bytes: int):
+    return [data[i:i + chunk_bytes] for i in range(0, len(data), chunk_bytes)]
+
+
+def test_pcm_batch_to_l16_matches_one_shot_resample():
+    pcm_24k = _sine_pcm(24000)
+    payloads = pcm_batch_to_l16_b64(_split(pcm_24k, 960), from_rate=24000, to_rate=8000)
+
+    batched = b"".join(base64.b64decode(p) for p in payloads)
+    assert batched == AudioConversionService.resample(pcm_24k, 24000, 8000)
+
+
+def test_pcm_batch_to_mulaw_matches_one_shot_conversion():
+    pcm_24k = _sine_pcm(24000)
+    payloads = pcm_batch_to_mulaw_b64(_split(pcm_24k, 1200), from_rate=24000)
+
+    batched = b"".join(base64.b64decode(p) for p in payloads)
+    expected = AudioConversionService.pcm_to_mulaw(AudioConversionService.resample(pcm_24k, 24000, 8000))
+    assert batched == expected
+    assert len(payloads) == len(_split(pcm_24k, 1200))
+
+
+def test_mulaw_batch_to_pcm_matches_one_shot_conversion():
+    mulaw_8k = audioop.lin2ulaw(_sine_pcm(8000), 2)
+    converted = mulaw_batch_to_pcm(_split(mulaw_8k, 160), to_rate=24000)
+
+    expected = AudioConversionService.resample(AudioConversionService.mulaw_to_pcm(mulaw_8k), 8000, 24000)
+    assert b"".join(converted) == expected
+
+
+def test_pcm_to_wav_bytes_round_trips():
+    pcm = _sine_pcm(16000, seconds=0.1)
+    with wave.open(io.BytesIO(pcm_to_wav_bytes(pcm, 16000)), "rb") as wav:
+        assert wav.getframerate() == 16000
+        assert wav.getsampwidth() == 2
+        assert wav.readframes(wav.getnframes()) == pcm
+
+
+@pytest.mark.parametrize("use_processes", [False, True])
+def test_transcoding_pool_offloads_large_payloads(use_processes):
+    pool = AudioTranscodingPool(max_workers=1, use_processes=use_processes, inline_bytes=1024)
+    pcm = _sine_pcm(8000)
+
+    async def run():
+        wav_bytes = await pool.create_wav_bytes(pcm, 8000)
+        chunks = await pool.encode_b64_chunks(pcm, 640)
+        small = await pool.encode_b64_chunks(pcm[:320], 640)
+        return wav_bytes, chunks, small
+
+    try:
+        wav_bytes, chunks, small = asyncio.run(run())
+    finally:
+        pool.shutdown()
+
+    assert isinstance(wav_bytes, bytes)
+    assert b"".join(base64.b64decode(c) for c in chunks) == pcm
+    assert len(small) == 1
+    assert pool.stats()["offloaded_jobs"] == 2
+    assert pool.stats()["inline_jobs"] == 1
@@ -0,0 +1,53 @@
+import datetime
+
+import pytest
+
+from app.core.database import _async_database_url
+from app.services.chat_service import _clean_attachments, decode_session_cursor, encode_session_cursor
+from app.services.contact_service import _channel_contact_lookup
+
+
+def test_session_cursor_round_trip():
+    updated_at = datetime.datetime(2026, 3, 4, 5, 6, 7, 891011)
+
+    cursor = encode_session_cursor(updated_at, 42)
+
+    assert decode_session_cursor(cursor) == (updated_at, 42)
+
+
+def test_malformed_session_cursor_raises_value_error():
+    with pytest.raises(ValueError):
+        decode_session_cursor("not-a-cursor")
+
+
+@pytest.mark.parametrize("url, expected", [
+    ("postgresql://u:p@db:5432/app", "postgresql+asyncpg://u:p@db:5432/app"),
+    ("postgresql+psycopg2://u:p@db/app", "postgresql+asyncpg://u:p@db/app"),
+    ("postgres://u:p@db/app", "postgresql+asyncpg://u:p@db/app"),
+    ("sqlite:///./test.db", "sqlite:///./test.db"),
+])
+def test_async_database_url_uses_asyncpg(url, expected):
+    assert _async_database_url(url) == expected
+
+
+def test_stored_attachments_keep_metadata_only():
+    cleaned = _clean_attachments([
+        {"file_name": "a.png", "file_type": "image/png", "file_size": 3, "file_data": "YWJj", "data": b"abc",
+         "storage_key": "attachments/x_a.png", "file_url": "http://minio/agentconnect/attachments/x_a.png"},
+        {"file_name": "location", "location": {"latitude": 1, "longitude": 2}},
+    ])
+
+    assert cleaned[0] == {"file_name": "a.png", "file_type": "image/png", "file_size": 3,
+                          "file_url": "http://minio/agentconnect/attachments/x_a.png"}
+    assert cleaned[1]["location"] == {"latitude": 1, "longitude": 2}
+    assert _clean_attachments(None) is None
+
+
+def test_channel_contact_lookup_matches_phone_only_for_phone_channels():
+    attribute_key, is_phone, stmt = _channel_contact_lookup(1, "whatsapp", "+100")
+    assert (attribute_key, is_phone) == ("whatsapp_id", True)
+    assert "phone_number" in str(stmt.whereclause)
+
+    attribute_key, is_phone, stmt = _channel_contact_lookup(1, "telegram", "42", email="a@b.c")
+    assert (attribute_key, is_phone) == ("telegram_id", False)
+    assert "phone_number" not in str(stmt.whereclause) and "email" in str(stmt.whereclause)
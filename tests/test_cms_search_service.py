@@ -0,0 +1,223 @@
+from concurrent.futures import ThreadPoolExecutor
+from types import SimpleNamespace
+
+from app.services.cms import search_service
+
+
+CONTENT_TYPE = SimpleNamespace(
+    id=3, slug="recipe", name="Recipe",
+    field_schema=[
+        {"slug": "title", "name": "Title", "type": "text", "searchable": True},
+        {"slug": "notes", "name": "Notes", "type": "text", "searchable": False},
+    ],
+)
+
+
+def _item(**overrides):
+    values = dict(
+        id=11, company_id=5, knowledge_base_id=None, chroma_doc_id=None,
+        status="published", visibility="public", data={"title": "Dal", "notes": "spicy"},
+    )
+    values.update(overrides)
+    return SimpleNamespace(**values)
+
+
+def test_index_document_hash_tracks_everything_indexed():
+    document = search_service._index_document(None, _item(), CONTENT_TYPE)
+
+    assert document["collection_name"] == "cms_content"
+    assert document["doc_id"] == "cms_recipe_11"
+    assert document["text"] == "Title: Dal"
+    assert search_service._index_document(None, _item(), CONTENT_TYPE)["hash"] == document["hash"]
+
+    # Non-searchable fields are still part of the stored metadata
+    changed = [
+        _item(data={"title": "Dal", "notes": "mild"}),
+        _item(visibility="marketplace"),
+        _item(data={"title": "Dal makhani", "notes": "spicy"}),
+    ]
+    assert all(search_service._index_document(None, item, CONTENT_TYPE)["hash"] != document["hash"] for item in changed)
+
+
+def test_index_document_skips_items_without_searchable_text():
+    assert search_service._index_document(None, _item(data={"notes": "only"}), CONTENT_TYPE) is None
+
+
+class FakeEmbeddings:
+    def __init__(self):
+        self.requests = []
+
+    def embed_documents(self, texts):
+        self.requests.append(list(texts))
+        if "bad" in texts:
+            raise RuntimeError("rate limited")
+        return [[float(len(text))] for text in texts]
+
+
+def test_embed_in_batches_keeps_order_and_isolates_failures(monkeypatch):
+    client = FakeEmbeddings()
+    monkeypatch.setattr(search_service, "_embeddings_client", lambda: client)
+    monkeypatch.setattr(search_service.settings, "CMS_EMBED_BATCH_SIZE", 2)
+    texts = ["a", "bb", "bad", "cccc", "ddddd"]
+
+    with ThreadPoolExecutor(max_workers=2) as executor:
+        embeddings = search_service._embed_in_batches(texts, executor)
+
+    assert sorted(map(len, client.requests)) == [1, 2, 2]
+    assert embeddings == [[1.0], [2.0], None, None, [5.0]]
+
+
+def test_search_cache_invalidation_drops_company_results_only():
+    cache = search_service.SearchCache(max_results=10, ttl=60)
+    cache.put_results((1, "q"), [{"id": 1}], cache.generation(1))
+    cache.put_results((2, "q"), [{"id": 2}], cache.generation(2))
+
+    stale_generation = cache.generation(1)
+    cache.invalidate_company(1)
+    # A search that started before the invalidation must not repopulate the cache
+    cache.put_results((1, "q"), [{"id": 1}], stale_generation)
+
+    assert cache.get_results((1, "q")) is None
+    assert cache.get_results((2, "q")) == [{"id": 2}]
+
+
+def test_search_cache_evicts_least_recently_used():
+    cache = search_service.SearchCache(max_results=2, max_embeddings=1, ttl=60)
+    for query in ("a", "b"):
+        cache.put_results((1, query), [], 0)
+    cache.get_results((1, "a"))
+    cache.put_results((1, "c"), [], 0)
+    cache.put_embedding("x", [1.0])
+    cache.put_embedding("y", [2.0])
+
+    assert cache.get_results((1, "b")) is None
+    assert cache.get_results((1, "a")) == []
+    assert cache.get_embedding("x") is None and cache.get_embedding("y") == [2.0]
+
+
+class FakeQuery:
+    def __init__(self, rows):
+        self.rows = rows
+        self.queries = 0
+
+    def query(self, *columns):
+        self.queries += 1
+        return self
+
+    def filter(self, *conditions):
+        return self
+
+    def all(self):
+        return self.rows
+
+
+def test_hydrate_results_loads_items_once_in_rank_order():
+    db = FakeQuery([(7, {"title": "seven"}), (3, {"title": "three"})])
+    results = {
+        "ids": [["cms_a_3", "cms_a_9", "cms_a_7"]],
+        "metadatas": [[
+            {"content_item_id": 3, "content_type_slug": "a"},
+            {"content_item_id": 9, "content_type_slug": "a"},
+            {"content_item_id": 7, "content_type_slug": "a"},
+        ]],
+        "documents": [["three", "gone", "seven"]],
+        "distances": [[0.0, 0.5, 1.0]],
+    }
+
+    hydrated = search_service._hydrate_results(db, 1, results)
+
+    assert db.queries == 1
+    assert [r["id"] for r in hydrated] == [3, 7]
+    assert hydrated[1]["data"] == {"title": "seven"} and hydrated[1]["score"] == 0.5
+
+
+def test_search_cache_invalidates_on_commit_and_not_on_rollback(monkeypatch):
+    from sqlalchemy import create_engine, text
+    from sqlalchemy.orm import Session
+
+    from app.services.cms import publishing_service
+
+    invalidated = []
+    monkeypatch.setattr(search_service.search_cache, "invalidate_company", invalidated.append)
+    db = Session(create_engine("sqlite://"))
+
+    db.execute(text("SELECT 1"))
+    publishing_service._mark_company_dirty(db, 5)
+    db.rollback()
+    assert invalidated == []
+
+    db.execute(text("SELECT 1"))
+    publishing_service._mark_company_dirty(db, 6)
+    db.commit()
+    assert invalidated == [6]
+    db.close()
+
+
+class _ReindexQuery:
+    """Just enough of Query for bulk_index_content's keyset loop."""
+
+    def __init__(self, rows):
+        self.rows = rows
+
+    def filter(self, *criteria):
+        rows = self.rows
+        for criterion in criteria:
+            if getattr(getattr(criterion, "left", None), "key", None) == "id" and criterion.operator.__name__ == "gt":
+                rows = [row for row in rows if row.id > criterion.right.value]
+        return _ReindexQuery(rows)
+
+    def order_by(self, *args):
+        return self
+
+    def limit(self, size):
+        return _ReindexQuery(self.rows[:size])
+
+    def all(self):
+        return self.rows
+
+    def first(self):
+        return self.rows[0] if self.rows else None
+
+
+def test_reindex_checkpoint_stops_at_failed_items_and_skips_empty_ones(monkeypatch):
+    from app.models.content_item import ContentItem
+
+    items = [
+        _item(id=1, chroma_doc_id=None, search_index_hash=None, content_type_id=3, data={"title": "Dal"}),
+        _item(id=2, chroma_doc_id=None, search_index_hash=None, content_type_id=3, data={"notes": "no title"}),
+        _item(id=3, chroma_doc_id=None, search_index_hash=None, content_type_id=3, data={"title": "bad"}),
+        _item(id=4, chroma_doc_id=None, search_index_hash=None, content_type_id=3, data={"title": "Rice"}),
+    ]
+    db = SimpleNamespace(
+        query=lambda model: _ReindexQuery(items if model is ContentItem else [CONTENT_TYPE]),
+        commit=lambda: None, rollback=lambda: None,
+    )
+    job = SimpleNamespace(last_item_id=0, indexed_count=0, skipped_count=0, error_count=0, status="running", completed_at=None)
+    monkeypatch.setattr(search_service, "_start_reindex_job", lambda db, company_id, scope, restart: job)
+    monkeypatch.setattr(search_service, "get_company_chroma_client", lambda company_id: None)
+    upserted = []
+    collection = SimpleNamespace(upsert=lambda ids, **kwargs: upserted.extend(ids))
+    monkeypatch.setattr(search_service, "_get_or_create_collection", lambda client, name: collection)
+    outage = {"Title: bad"}
+
+    def embed_documents(texts):
+        if outage & set(texts):
+            raise RuntimeError("rate limited")
+        return [[1.0] for _ in texts]
+
+    monkeypatch.setattr(search_service, "_embeddings_client", lambda: SimpleNamespace(embed_documents=embed_documents))
+    monkeypatch.setattr(search_service.settings, "CMS_EMBED_BATCH_SIZE", 1)
+    monkeypatch.setattr(search_service.settings, "CMS_REINDEX_BATCH_SIZE", 2)
+    search_service.bulk_index_content(db, company_id=5)
+
+    assert (job.indexed_count, job.skipped_count, job.error_count) == (2, 1, 1)
+    assert upserted == ["cms_recipe_1", "cms_recipe_4"]
+    # Item 3 failed to embed: the checkpoint stays before it and the job can resume
+    assert (job.last_item_id, job.status) == (2, "failed")
+
+    outage.clear()
+    search_service.bulk_index_content(db, company_id=5)
+
+    # Item 4 was indexed by the first run and is unchanged
+    assert upserted[2:] == ["cms_recipe_3"]
+    assert (job.last_item_id, job.status) == (4, "completed")
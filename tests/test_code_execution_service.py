@@ -0,0 +1,79 @@
+import asyncio
+
+import pytest
+
+from app.services.code_execution_service import CodeExecutionPool
+
+
+@pytest.fixture(scope="module")
+def pool():
+    pool = CodeExecutionPool(max_workers=1, timeout=2.0, cpu_seconds=1.0, kill_grace=1.0)
+    yield pool
+    pool.shutdown()
+
+
+def test_function_is_auto_called_and_context_updated(pool):
+    context = {"name": "Asha", "stale": 1}
+    code = "def greet(name):\n    del context['stale']\n    return 'Hi ' + name\n"
+
+    result = asyncio.run(pool.run_code(code, context, {}, {"name": "Asha"}, ["name"], ["greeting"]))
+
+    assert result["output"] == {"greeting": "Hi Asha"}
+    assert context == {"name": "Asha", "greeting": "Hi Asha"}
+    assert result["duration_ms"] >= 0
+
+
+def test_code_has_no_database_session_and_errors_carry_traceback(pool):
+    result = asyncio.run(pool.run_code("output = db.query", {}, {}, {}, [], []))
+
+    assert result["error"] == "Error executing code: name 'db' is not defined"
+    assert "Traceback" in result["traceback"]
+
+
+def test_expression_supports_dot_and_dict_access(pool):
+    context = {"order": {"items": [1, 2, 3]}}
+
+    assert asyncio.run(pool.evaluate("len(ctx['order']['items'])", context, {}))["error"].startswith("Error manipulating data")
+    assert asyncio.run(pool.evaluate("context.order.items[1] + res['n']['output']", context, {"n": {"output": 5}}))["output"] == 7
+    assert asyncio.run(pool.evaluate("context.order", context, {}))["output"] == {"items": [1, 2, 3]}
+
+
+def test_runaway_code_is_stopped_by_cpu_limit(pool):
+    result = asyncio.run(pool.run_code("while True:\n    pass\n", {}, {}, {}, [], []))
+
+    assert result["error"] == "Error executing code: CPU time limit exceeded"
+    assert pool.stats()["code"]["timeouts"] >= 1
+    # The worker is still usable
+    assert asyncio.run(pool.evaluate("1 + 1", {}, {}))["output"] == 2
+
+
+def test_worker_ignoring_its_limits_is_killed(pool):
+    code = "import time\nwhile True:\n    try:\n        time.sleep(10)\n    except BaseException:\n        pass\n"
+
+    result = asyncio.run(pool.run_code(code, {}, {}, {}, [], []))
+
+    assert result["error"] == "Error executing code: Time limit exceeded"
+    assert pool.restarts == 1
+    assert asyncio.run(pool.evaluate("2 * 3", {}, {}))["output"] == 6
+
+
+def test_killing_an_overrunning_worker_leaves_other_runs_alone():
+    pool = CodeExecutionPool(max_workers=2, timeout=1.0, cpu_seconds=1.0, kill_grace=0.5)
+    hang = "import time\nwhile True:\n    try:\n        time.sleep(10)\n    except BaseException:\n        pass\n"
+    slow = "import time\ntime.sleep(0.8)\noutput = 'done'\n"
+
+    async def both():
+        return await asyncio.gather(
+            pool.run_code(hang, {}, {}, {}, [], []),
+            pool.run_code(slow, {}, {}, {}, [], []),
+        )
+
+    try:
+        pool.prewarm()
+        hung, finished = asyncio.run(both())
+    finally:
+        pool.shutdown()
+
+    assert hung["error"] == "Error executing code: Time limit exceeded"
+    assert finished["output"] == "done"
+    assert pool.restarts == 1
@@ -0,0 +1,39 @@
+import datetime
+
+from app.models.conversation_stats import session_contribution
+
+
+def _delta(before: dict, after: dict) -> dict:
+    old, new = session_contribution(before), session_contribution(after)
+    return {key: new[key] - old[key] for key in new if new[key] != old[key]}
+
+
+def test_new_unassigned_session_counts_as_open_and_unattended():
+    contribution = session_contribution({"status": None, "assignee_id": None})
+
+    assert contribution["total_count"] == 1
+    assert contribution["closed_count"] == 0
+    assert contribution["unattended_count"] == 1
+    assert contribution["waiting_for_agent_count"] == 0
+
+
+def test_resolving_a_session_moves_it_out_of_open_counters():
+    before = {"status": "active", "assignee_id": 7, "waiting_for_agent": True}
+    after = {"status": "resolved", "assignee_id": 7, "waiting_for_agent": True}
+
+    assert _delta(before, after) == {"closed_count": 1, "unattended_count": -1, "waiting_for_agent_count": -1}
+
+
+def test_reopen_updates_reopen_totals_and_delay():
+    resolved_at = datetime.datetime(2026, 1, 1, 10, 0)
+    before = {"status": "resolved", "assignee_id": 3, "reopen_count": 1,
+              "resolved_at": resolved_at, "last_reopened_at": resolved_at - datetime.timedelta(hours=5)}
+    after = {"status": "assigned", "assignee_id": 3, "reopen_count": 2,
+             "resolved_at": resolved_at, "last_reopened_at": resolved_at + datetime.timedelta(hours=2)}
+
+    delta = _delta(before, after)
+
+    assert delta["closed_count"] == -1
+    assert delta["reopen_events"] == 1
+    assert "reopened_count" not in delta
+    assert delta["reopen_delay_seconds"] == 7 * 3600
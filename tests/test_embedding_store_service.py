@@ -0,0 +1,86 @@
+import numpy as np
+import pytest
+
+from app.services.embedding_store_service import KnowledgeBaseEmbeddingStore, normalize_rows, top_k
+
+
+@pytest.fixture
+def store(tmp_path):
+    return KnowledgeBaseEmbeddingStore(base_dir=str(tmp_path), mmap=True, cache_size=2)
+
+
+def _cosine(v1, v2):
+    return np.dot(v1, v2) / (np.linalg.norm(v1) * np.linalg.norm(v2))
+
+
+def test_top_k_matches_pairwise_cosine():
+    rng = np.random.default_rng(0)
+    vectors = rng.normal(size=(200, 16))
+    query = rng.normal(size=16)
+
+    results = top_k(normalize_rows(vectors), query, k=5)
+
+    expected = sorted(range(len(vectors)), key=lambda i: _cosine(vectors[i], query), reverse=True)[:5]
+    assert [row for row, _ in results] == expected
+    assert results[0][1] == pytest.approx(_cosine(vectors[expected[0]], query), abs=1e-5)
+
+
+def test_top_k_handles_small_matrices_and_zero_rows():
+    matrix = normalize_rows([[0.0, 0.0], [1.0, 0.0]])
+
+    assert matrix.dtype == np.float32
+    assert [row for row, _ in top_k(matrix, [1.0, 0.0], k=10)] == [1, 0]
+    assert top_k(matrix[:0], [1.0, 0.0], k=3) == []
+
+
+def test_store_roundtrip_is_memory_mapped(store):
+    store.save(3, 11, ["apples", "pears", "plums"], [[1, 0, 0], [0, 1, 0], [0.9, 0.1, 0]])
+
+    matrix, chunks = store.load(3, 11)
+
+    assert isinstance(matrix, np.memmap)
+    assert chunks == ["apples", "pears", "plums"]
+    assert [text for text, _ in store.search(3, 11, [1, 0, 0], k=2)] == ["apples", "plums"]
+
+
+def test_store_replace_and_delete(store):
+    store.save(3, 11, ["old"], [[1, 0]])
+    store.load(3, 11)
+    store.save(3, 11, ["new", "other"], [[0, 1], [1, 0]])
+
+    assert store.search(3, 11, [0, 1], k=1)[0][0] == "new"
+
+    store.delete(3, 11)
+
+    assert not store.exists(3, 11)
+    assert store.search(3, 11, [0, 1], k=1) == []
+
+
+def test_empty_knowledge_base(store):
+    store.save(3, 12, [], [])
+
+    assert store.search(3, 12, [1.0, 0.0], k=3) == []
+
+
+def test_legacy_json_embeddings_are_backfilled_on_first_search(store, monkeypatch):
+    from types import SimpleNamespace
+
+    from sqlalchemy import create_engine, text
+    from sqlalchemy.orm import Session
+
+    from app.services import knowledge_base_service
+
+    monkeypatch.setattr(knowledge_base_service, "kb_embedding_store", store)
+    monkeypatch.setattr(knowledge_base_service, "_legacy_columns", None)
+    db = Session(create_engine("sqlite://"))
+    db.execute(text("CREATE TABLE knowledge_bases (id INTEGER, company_id INTEGER, embeddings JSON, content TEXT)"))
+    db.execute(text("INSERT INTO knowledge_bases VALUES (1, 7, '[[1.0, 0.0], [0.0, 2.0]]', 'only one chunk')"))
+    db.execute(text("INSERT INTO knowledge_bases VALUES (2, 7, NULL, NULL)"))
+
+    assert knowledge_base_service._backfill_legacy_embeddings(db, SimpleNamespace(id=1, company_id=7))
+    assert not knowledge_base_service._backfill_legacy_embeddings(db, SimpleNamespace(id=2, company_id=7))
+
+    # The chunk count doesn't match the stored vectors, so rows are kept by position
+    assert store.search(7, 1, [0.0, 1.0], 1) == [("", pytest.approx(1.0))]
+    assert not store.exists(7, 2)
+    db.close()
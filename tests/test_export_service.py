@@ -0,0 +1,157 @@
+import csv
+import datetime
+import io
+import json
+from types import SimpleNamespace
+
+import pytest
+
+from app.services.cms import export_service
+
+
+class FakeS3:
+    def __init__(self):
+        self.objects = {}
+        self.parts = {}
+        self.calls = []
+
+    def put_object(self, Body, Bucket, Key, ContentType):
+        self.calls.append("put_object")
+        self.objects[Key] = bytes(Body)
+
+    def create_multipart_upload(self, Bucket, Key, ContentType):
+        self.calls.append("create_multipart_upload")
+        self.parts[Key] = []
+        return {"UploadId": "upload-1"}
+
+    def upload_part(self, Bucket, Key, UploadId, PartNumber, Body):
+        self.calls.append("upload_part")
+        self.parts[Key].append(bytes(Body))
+        return {"ETag": f"etag-{PartNumber}"}
+
+    def complete_multipart_upload(self, Bucket, Key, UploadId, MultipartUpload):
+        self.calls.append("complete_multipart_upload")
+        self.objects[Key] = b"".join(self.parts.pop(Key))
+
+    def abort_multipart_upload(self, Bucket, Key, UploadId):
+        self.calls.append("abort_multipart_upload")
+        self.parts.pop(Key, None)
+
+
+@pytest.fixture
+def s3(monkeypatch):
+    fake = FakeS3()
+    monkeypatch.setattr(export_service, "s3_client", fake)
+    return fake
+
+
+def _row(item_id, data, content_type_id=1):
+    created = datetime.datetime(2024, 1, item_id)
+    return SimpleNamespace(
+        id=item_id, content_type_id=content_type_id, data=data, status="published",
+        visibility="public", version=1, created_at=created, updated_at=created, published_at=None,
+    )
+
+
+CONTENT_TYPES = {1: ("shloka", "Shloka")}
+ROWS = [
+    _row(1, {"title": "Ä line\nbreak", "tags": ["a", "b"]}),
+    _row(2, {"title": "Two", "verse": 3}, content_type_id=9),
+]
+
+
+def test_json_writer_matches_whole_document_dump():
+    writer = export_service._new_writer("json", CONTENT_TYPES, len(ROWS))
+    content = "".join(writer.write(ROWS))
+
+    parsed = json.loads(content)
+    expected = json.dumps({
+        "exported_at": parsed["exported_at"],
+        "item_count": 2,
+        "items": [export_service._export_item(row, CONTENT_TYPES) for row in ROWS],
+    }, indent=2, ensure_ascii=False)
+    assert content == expected
+    assert parsed["items"][1]["content_type"] == {"id": None, "slug": None, "name": None}
+
+
+def test_json_writer_without_items():
+    content = "".join(export_service._new_writer("json", {}, 0).write([]))
+
+    assert json.loads(content)["items"] == []
+    assert content.endswith('"items": []\n}')
+
+
+def test_csv_writer_streams_rows_with_data_columns():
+    writer = export_service._new_writer("csv", CONTENT_TYPES, len(ROWS), ["tags", "title", "verse"])
+    rows = list(csv.DictReader(io.StringIO("".join(writer.write(ROWS)))))
+
+    assert rows[0]["content_type_slug"] == "shloka"
+    assert rows[0]["data.tags"] == '["a", "b"]'
+    assert rows[0]["data.title"] == "Ä line\nbreak"
+    assert rows[1]["content_type_slug"] == "" and rows[1]["data.verse"] == "3"
+
+
+def test_ndjson_writer_emits_one_object_per_line():
+    content = "".join(export_service._new_writer("ndjson", CONTENT_TYPES, len(ROWS)).write(ROWS))
+
+    lines = content.splitlines()
+    assert [json.loads(line)["id"] for line in lines] == [1, 2]
+
+
+def test_small_export_uses_single_put(s3):
+    upload = export_service._ExportUpload("exports/1/1/a.json", "application/json")
+    upload.write("{}")
+
+    assert upload.complete() == 2
+    assert s3.calls == ["put_object"]
+
+
+def test_large_export_uses_bounded_multipart_parts(s3):
+    upload = export_service._ExportUpload("exports/1/1/a.csv", "text/csv")
+    chunk = "x" * (1024 * 1024)
+    chunks = upload.part_size // len(chunk) * 2 + 1
+    for _ in range(chunks):
+        upload.write(chunk)
+        assert len(upload._buffer) < upload.part_size
+
+    assert upload.complete() == chunks * len(chunk)
+    assert s3.calls.count("upload_part") == 3
+    assert len(s3.objects["exports/1/1/a.csv"]) == chunks * len(chunk)
+
+
+def test_aborted_export_discards_parts(s3):
+    upload = export_service._ExportUpload("exports/1/1/b.csv", "text/csv")
+    upload.write("x" * upload.part_size)
+    upload.abort()
+
+    assert s3.calls[-1] == "abort_multipart_upload"
+    assert "exports/1/1/b.csv" not in s3.objects
+
+
+def test_writer_base_requires_item():
+    with pytest.raises(TypeError):
+        export_service._ExportWriter({}, 0)
+
+
+def test_failed_export_is_marked_failed(s3):
+    from sqlalchemy import create_engine
+    from sqlalchemy.orm import Session
+
+    from app.models.content_publishing import ContentExport
+
+    engine = create_engine("sqlite://")
+    ContentExport.__table__.create(engine)
+    db = Session(engine)
+    export = ContentExport(company_id=4, format="csv", status="pending", filter_criteria="{not json")
+    db.add(export)
+    db.commit()
+
+    with pytest.raises(ValueError, match="Export failed"):
+        export_service.process_export(db, export.id, 4)
+
+    db.expire_all()
+    stored = db.get(ContentExport, export.id)
+    assert stored.status == "failed"
+    assert stored.error_message.startswith("Expecting property name")
+    assert s3.calls == []
+    db.close()
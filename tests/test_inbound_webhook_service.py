@@ -0,0 +1,112 @@
+from app.services.inbound_webhook_service import (
+    split_meta_messaging_payload,
+    split_telegram_update,
+    split_whatsapp_payload,
+)
+
+
+def _whatsapp_message(message_id, sender, body):
+    return {"id": message_id, "from": sender, "type": "text", "text": {"body": body}}
+
+
+def test_whatsapp_split_covers_every_entry_change_and_message():
+    data = {
+        "object": "whatsapp_business_account",
+        "entry": [
+            {"id": "waba-1", "changes": [{"field": "messages", "value": {
+                "metadata": {"phone_number_id": "pn-1"},
+                "contacts": [{"wa_id": "111", "profile": {"name": "Ann"}}, {"wa_id": "222", "profile": {"name": "Bob"}}],
+                "messages": [_whatsapp_message("wamid.1", "111", "hi"), _whatsapp_message("wamid.2", "222", "yo")],
+            }}]},
+            {"id": "waba-1", "changes": [
+                {"field": "messages", "value": {"metadata": {"phone_number_id": "pn-1"}, "statuses": [{"id": "wamid.0"}]}},
+                {"field": "messages", "value": {
+                    "metadata": {"phone_number_id": "pn-2"},
+                    "messages": [_whatsapp_message("wamid.3", "111", "again")],
+                }},
+            ]},
+        ],
+    }
+
+    events = split_whatsapp_payload(data)
+
+    assert [e["provider_message_id"] for e in events] == ["wamid.1", "wamid.2", "wamid.3"]
+    assert [e["conversation_key"] for e in events] == ["pn-1:111", "pn-1:222", "pn-2:111"]
+
+    second_value = events[1]["payload"]["entry"][0]["changes"][0]["value"]
+    assert second_value["messages"] == [_whatsapp_message("wamid.2", "222", "yo")]
+    assert second_value["contacts"][0]["profile"]["name"] == "Bob"
+    assert second_value["metadata"] == {"phone_number_id": "pn-1"}
+    assert events[0]["payload"]["object"] == "whatsapp_business_account"
+
+
+def test_meta_messaging_split_keeps_one_event_per_item():
+    data = {
+        "object": "page",
+        "entry": [
+            {"id": "page-1", "time": 1, "messaging": [
+                {"sender": {"id": "u1"}, "message": {"mid": "m1", "text": "a"}},
+                {"sender": {"id": "u2"}, "message": {"mid": "m2", "text": "b"}},
+            ]},
+            {"id": "page-2", "time": 2, "messaging": [{"sender": {"id": "u1"}, "message": {"mid": "m3", "text": "c"}}]},
+        ],
+    }
+
+    events = split_meta_messaging_payload(data, "page")
+
+    assert [(e["provider_message_id"], e["conversation_key"]) for e in events] == [
+        ("m1", "page-1:u1"), ("m2", "page-1:u2"), ("m3", "page-2:u1"),
+    ]
+    assert events[2]["payload"] == {"object": "page", "entry": [{"id": "page-2", "time": 2, "messaging": [data["entry"][1]["messaging"][0]]}]}
+    assert split_meta_messaging_payload(data, "instagram") == []
+
+
+def test_events_without_provider_id_are_never_deduplicated():
+    data = {"object": "page", "entry": [{"id": "p", "messaging": [{"sender": {"id": "u"}, "read": {}}] * 2}]}
+
+    first, second = split_meta_messaging_payload(data, "page")
+
+    assert first["provider_message_id"] != second["provider_message_id"]
+
+
+def test_telegram_update_keyed_by_bot_and_chat():
+    (event,) = split_telegram_update({"update_id": 10, "message": {"chat": {"id": 99}, "text": "hi"}}, integration_id=5)
+
+    assert event["provider_message_id"] == "5:10"
+    assert event["conversation_key"] == "5:99"
+
+
+def test_failed_handler_marks_event_failed_off_the_event_loop(monkeypatch):
+    import asyncio
+    import threading
+    from unittest.mock import MagicMock
+
+    from app.services import inbound_webhook_service
+    from app.services.inbound_webhook_service import InboundWebhookWorker
+
+    sessions = []
+    monkeypatch.setattr(inbound_webhook_service, "SessionLocal", lambda: sessions.append(MagicMock()) or sessions[-1])
+    worker = InboundWebhookWorker()
+    claims = [(7, {"text": "hi"}, 3), None]
+    finished, threads = [], []
+
+    def claim_next(db, channel, key):
+        threads.append(threading.current_thread())
+        return claims.pop(0)
+
+    def finish(db, event_id, error=None):
+        threads.append(threading.current_thread())
+        finished.append((event_id, error))
+
+    async def handler(payload, db, integration_id):
+        raise ValueError("bad payload")
+
+    monkeypatch.setattr(worker, "_claim_next", claim_next)
+    monkeypatch.setattr(worker, "_finish", finish)
+    worker.register_handler("whatsapp", handler)
+
+    asyncio.run(worker._drain("whatsapp", "pn-1:111"))
+
+    assert finished == [(7, "bad payload")]
+    assert threading.main_thread() not in threads
+    assert any(session.rollback.called for session in sessions)
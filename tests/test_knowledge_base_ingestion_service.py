@@ -0,0 +1,134 @@
+import threading
+import time
+from types import SimpleNamespace
+
+from app.services import knowledge_base_ingestion_service as ingestion
+from app.services.knowledge_base_ingestion_service import DocumentParsePool
+
+
+class FakeDB:
+    def __init__(self):
+        self.commits = 0
+
+    def commit(self):
+        self.commits += 1
+
+
+class FakeSink:
+    def __init__(self, delay=0.0):
+        self.delay = delay
+        self.writes = []
+        self.in_flight = 0
+        self.max_in_flight = 0
+        self._lock = threading.Lock()
+
+    def embed(self, agent, texts):
+        with self._lock:
+            self.in_flight += 1
+            self.max_in_flight = max(self.max_in_flight, self.in_flight)
+        time.sleep(self.delay)
+        with self._lock:
+            self.in_flight -= 1
+        return [[float(len(text))] for text in texts]
+
+    def add(self, offset, texts, embeddings, metadatas):
+        self.writes.append((offset, list(texts), embeddings, metadatas))
+
+
+def _job():
+    return SimpleNamespace(file_name="manual.pdf", processed_pages=0, chunk_count=0)
+
+
+def test_pages_are_chunked_embedded_and_written_in_order(monkeypatch):
+    monkeypatch.setattr(ingestion.settings, "KB_INGEST_EMBED_BATCH_SIZE", 2)
+    monkeypatch.setattr(ingestion.settings, "KB_INGEST_EMBED_CONCURRENCY", 2)
+    pages = [[(0, "alpha"), (1, "beta")], [(2, "gamma"), (3, "")], [(4, "delta")]]
+    job, db, sink = _job(), FakeDB(), FakeSink(delay=0.01)
+
+    chunks = ingestion._ingest_pages(db, job, iter(pages), SimpleNamespace(embedding_model="nvidia"), sink)
+
+    assert chunks == ["alpha", "beta", "gamma", "delta"]
+    assert [(offset, texts) for offset, texts, _, _ in sink.writes] == [(0, ["alpha", "beta"]), (2, ["gamma", "delta"])]
+    assert sink.writes[1][3] == [{"source": "manual.pdf", "page": 2}, {"source": "manual.pdf", "page": 4}]
+    assert job.processed_pages == 5
+    assert job.chunk_count == 4
+
+
+def test_embedding_concurrency_is_bounded(monkeypatch):
+    monkeypatch.setattr(ingestion.settings, "KB_INGEST_EMBED_BATCH_SIZE", 1)
+    monkeypatch.setattr(ingestion.settings, "KB_INGEST_EMBED_CONCURRENCY", 3)
+    pages = [[(i, f"page {i}") for i in range(12)]]
+    sink = FakeSink(delay=0.02)
+
+    ingestion._ingest_pages(FakeDB(), _job(), iter(pages), None, sink)
+
+    assert len(sink.writes) == 12
+    assert [offset for offset, _, _, _ in sink.writes] == list(range(12))
+    assert 1 < sink.max_in_flight <= 3
+
+
+def test_text_document_is_parsed_in_worker_process(tmp_path):
+    path = tmp_path / "notes.txt"
+    path.write_text("first line\nsecond line")
+    pool = DocumentParsePool(max_workers=1)
+    try:
+        pages = list(pool.iter_pages(str(path), ".txt", pool.page_count(str(path), ".txt")))
+    finally:
+        pool.shutdown()
+
+    assert pages == [[(0, "first line\nsecond line")]]
+    assert pool.stats()["pages_parsed"] == 1
+
+
+def test_pdf_is_parsed_in_ordered_page_ranges(tmp_path):
+    from pypdf import PdfWriter
+
+    writer = PdfWriter()
+    for _ in range(5):
+        writer.add_blank_page(width=200, height=200)
+    path = str(tmp_path / "blank.pdf")
+    with open(path, "wb") as f:
+        writer.write(f)
+
+    pool = DocumentParsePool(max_workers=2, pages_per_task=2)
+    try:
+        ranges = list(pool.iter_pages(path, ".pdf", pool.page_count(path, ".pdf")))
+    finally:
+        pool.shutdown()
+
+    assert [[number for number, _ in pages] for pages in ranges] == [[0, 1], [2, 3], [4]]
+
+
+def test_failed_job_is_marked_failed_and_vector_store_discarded(monkeypatch):
+    from sqlalchemy import create_engine
+    from sqlalchemy.orm import Session
+
+    from app.models.knowledge_base_ingestion_job import KnowledgeBaseIngestionJob
+
+    engine = create_engine("sqlite://")
+    KnowledgeBaseIngestionJob.__table__.create(engine)
+    db = Session(engine)
+    job = KnowledgeBaseIngestionJob(company_id=1, name="Manual", file_name="manual.txt", storage_key="uploads/manual.txt")
+    db.add(job)
+    db.commit()
+
+    discarded = []
+    sink = SimpleNamespace(discard=lambda: discarded.append(True))
+
+    def failing_ingest(db, job, pages, agent, sink):
+        job.processed_pages = 1
+        db.flush()
+        raise RuntimeError("embedding service unavailable")
+
+    monkeypatch.setattr(ingestion, "s3_client", SimpleNamespace(download_file=lambda bucket, key, path: None))
+    monkeypatch.setattr(ingestion, "document_parser", SimpleNamespace(page_count=lambda path, ext: 1, iter_pages=lambda *args: iter([])))
+    monkeypatch.setattr(ingestion, "_new_sink", lambda store_type, company_id: sink)
+    monkeypatch.setattr(ingestion, "_ingest_pages", failing_ingest)
+
+    result = ingestion.process_ingestion_job(db, job.id)
+
+    assert result.status == "failed"
+    assert result.error_message == "embedding service unavailable"
+    assert result.processed_pages == 0  # The partial progress was rolled back
+    assert discarded == [True]
+    db.close()
@@ -0,0 +1,84 @@
+from unittest.mock import MagicMock
+
+import numpy as np
+
+from app.models.lead_score import ScoreType
+from app.services.lead_qualification_service import (
+    combine_scores,
+    engagement_scores,
+    rescore_leads,
+)
+
+
+def _engagement_reference(opens, clicks, replies, calls_completed):
+    score = min(30, opens * 3) + min(30, clicks * 5) + min(25, replies * 8) + min(15, calls_completed * 10)
+    return min(100, score)
+
+
+def test_engagement_scores_match_the_per_lead_formula():
+    rng = np.random.default_rng(7)
+    counts = rng.integers(0, 15, size=(200, 4))
+
+    scores = engagement_scores(counts)
+
+    assert scores.tolist() == [_engagement_reference(*row) for row in counts.tolist()]
+    assert engagement_scores([0, 0, 0, 0]).tolist() == [0]
+    assert engagement_scores([50, 50, 50, 50]).tolist() == [100]
+
+
+def test_combine_scores_skips_missing_types():
+    weights = np.array([0.25, 0.25, 0.15, 0.20, 0.15])
+    values = np.array([
+        [80, 60, np.nan, np.nan, np.nan],
+        [np.nan, 40, np.nan, 90, 10],
+        [np.nan] * 5,
+    ])
+
+    combined = combine_scores(values, weights)
+
+    assert combined.tolist() == [70, int((40 * 0.25 + 90 * 0.20 + 10 * 0.15) / 0.60), 0]
+
+
+def _db(aggregates, latest):
+    db = MagicMock()
+    query = db.query.return_value
+    for method in ("join", "filter", "group_by", "having", "order_by", "distinct"):
+        getattr(query, method).return_value = query
+    query.all.side_effect = [aggregates, latest]
+    return db
+
+
+def test_rescore_writes_scores_in_bulk():
+    aggregates = [(1, 10, 4, 2, 1, 0), (2, 10, 0, 0, 0, 1)]
+    latest = [
+        (1, ScoreType.ENGAGEMENT, 30), (1, ScoreType.AI_INTENT, 90),
+        (2, ScoreType.ENGAGEMENT, 10),
+    ]
+    db = _db(aggregates, latest)
+
+    summary = rescore_leads(db, company_id=10)
+
+    assert summary == {"leads": 2, "engagement_scores": 2, "combined_scores": 2}
+    engagement_rows, combined_rows, lead_rows = [call.args[1] for call in db.execute.call_args_list]
+    assert [row["score_value"] for row in engagement_rows] == [30, 10]
+    assert engagement_rows[0]["score_factors"] == {
+        "opens": 4, "clicks": 2, "replies": 1, "calls_completed": 0, "lookback_days": 30
+    }
+    assert all(row["score_type"] == ScoreType.COMBINED for row in combined_rows)
+    assert [row["score_value"] for row in combined_rows] == [60, 10]
+    assert [(row["id"], row["score"]) for row in lead_rows] == [(1, 60), (2, 10)]
+    db.commit.assert_called_once()
+    # Incremental by default: only leads with activity since they were last scored
+    db.query.return_value.having.assert_called_once()
+
+
+def test_full_rescore_skips_the_activity_filter_and_batches():
+    aggregates = [(lead_id, 10, 1, 0, 0, 0) for lead_id in range(1, 6)]
+    db = _db(aggregates, [])
+    db.query.return_value.all.side_effect = [aggregates, [], [], []]  # One latest-scores query per batch
+
+    summary = rescore_leads(db, full=True, batch_size=2)
+
+    assert summary["leads"] == 5
+    assert db.commit.call_count == 3
+    db.query.return_value.having.assert_not_called()
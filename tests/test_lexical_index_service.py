@@ -0,0 +1,83 @@
+from types import SimpleNamespace
+
+import pytest
+
+from app.services import lexical_index_service
+from app.services.lexical_index_service import BM25Index, reciprocal_rank_fusion, tokenize
+
+CHUNKS = [
+    "The AB-1234 blender has a 1.5 litre jar and three speeds.",
+    "Our blenders come with a two year warranty on the motor.",
+    "The AB-1243 blender ships with a travel lid.",
+    "Return any kitchen appliance within 30 days for a refund.",
+]
+
+
+@pytest.fixture
+def lexical_dir(tmp_path, monkeypatch):
+    monkeypatch.setattr(lexical_index_service.settings, "LEXICAL_INDEX_DIR", str(tmp_path))
+    monkeypatch.setattr(lexical_index_service.settings, "KB_HYBRID_SEARCH_ENABLED", True)
+    lexical_index_service._cache.clear()
+    return tmp_path
+
+
+def _kb(collection="kb_test"):
+    return SimpleNamespace(type="local", company_id=7, chroma_collection_name=collection, faiss_index_id=None)
+
+
+def test_tokenize_keeps_identifiers_whole_and_split():
+    assert tokenize("Order SKU-AB_12/x today") == ["order", "sku-ab_12/x", "sku", "ab", "12", "x", "today"]
+
+
+def test_exact_identifier_ranks_first():
+    index = BM25Index(CHUNKS)
+
+    results = index.search("price of ab-1234", k=2)
+
+    assert [doc_id for doc_id, _ in results] == [0, 2]
+
+
+def test_unknown_terms_return_nothing():
+    assert BM25Index(CHUNKS).search("zebra", k=3) == []
+
+
+def test_reciprocal_rank_fusion_rewards_agreement():
+    fused = reciprocal_rank_fusion([["a", "b", "c"], ["b", "d"]], k=3, rrf_k=60)
+
+    assert fused == ["b", "a", "d"]
+
+
+def test_index_roundtrip(lexical_dir):
+    path = lexical_index_service.chroma_index_path(7, "kb_test")
+    lexical_index_service.build_index(path, CHUNKS)
+
+    loaded = lexical_index_service.load_kb_index(_kb())
+
+    assert loaded.documents == CHUNKS
+    assert loaded.search("warranty", k=1) == BM25Index(CHUNKS).search("warranty", k=1)
+    assert lexical_index_service.load_kb_index(_kb()) is loaded
+
+
+def test_fuse_adds_lexical_only_hits(lexical_dir):
+    lexical_index_service.build_index(lexical_index_service.chroma_index_path(7, "kb_test"), CHUNKS)
+    vector_hits = [CHUNKS[1], CHUNKS[3]]
+
+    fused = lexical_index_service.fuse_with_lexical(_kb(), "AB-1234 jar", vector_hits, k=2)
+
+    assert fused == [CHUNKS[1], CHUNKS[0]]
+
+
+def test_fuse_without_index_keeps_vector_order(lexical_dir):
+    vector_hits = ["x", "y", "z"]
+
+    assert lexical_index_service.fuse_with_lexical(_kb("kb_missing"), "x", vector_hits, k=2) == ["x", "y"]
+
+
+def test_delete_removes_index(lexical_dir):
+    path = lexical_index_service.chroma_index_path(7, "kb_test")
+    lexical_index_service.build_index(path, CHUNKS)
+    lexical_index_service.load_kb_index(_kb())
+
+    lexical_index_service.delete_kb_index(_kb())
+
+    assert lexical_index_service.load_kb_index(_kb()) is None
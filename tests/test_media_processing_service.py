@@ -0,0 +1,112 @@
+import io
+import threading
+from types import SimpleNamespace
+from unittest.mock import MagicMock
+
+import pytest
+from PIL import Image
+from sqlalchemy.dialects import postgresql
+
+from app.services.cms import media_processing_service, media_service
+
+
+@pytest.fixture
+def png_path(tmp_path):
+    path = tmp_path / "photo.png"
+    Image.new("RGBA", (1200, 800), (255, 0, 0, 128)).save(path)
+    return str(path)
+
+
+def test_render_thumbnails_fits_each_bounding_box(png_path):
+    thumbnails = media_processing_service.render_thumbnails(png_path, [150, 600, 300])
+
+    assert sorted(thumbnails) == [150, 300, 600]
+    for size, data in thumbnails.items():
+        with Image.open(io.BytesIO(data)) as thumb:
+            assert thumb.format == "JPEG"
+            assert max(thumb.size) == size
+
+
+def test_image_dimensions_and_unreadable_files(png_path, tmp_path):
+    broken = tmp_path / "broken.png"
+    broken.write_bytes(b"not an image")
+
+    assert media_processing_service.get_image_dimensions(png_path) == (1200, 800)
+    assert media_processing_service.get_image_dimensions(str(broken)) == (None, None)
+    assert media_processing_service.render_thumbnails(str(broken), [150]) == {}
+
+
+def test_pool_shares_in_flight_jobs_by_key():
+    pool = media_processing_service.MediaProcessingPool(max_workers=2)
+    release = threading.Event()
+    calls = []
+
+    def job(value):
+        calls.append(value)
+        release.wait(5)
+        return value
+
+    first = pool.submit(job, 1, key="thumb")
+    second = pool.submit(job, 2, key="thumb")
+    release.set()
+
+    assert first is second
+    assert first.result(5) == 1 and calls == [1]
+    pool.shutdown()
+
+
+class FakeDb:
+    def __init__(self):
+        self.commits = 0
+
+    def commit(self):
+        self.commits += 1
+
+
+def _image_media(**overrides):
+    values = dict(
+        company_id=7, filename="abc.png", s3_key="cms/7/media/abc.png", media_type="image",
+        mime_type="image/png", thumbnails=None, thumbnail_s3_key=None,
+    )
+    values.update(overrides)
+    return SimpleNamespace(**values)
+
+
+def test_ensure_thumbnail_reuses_stored_and_recorded_sizes(monkeypatch):
+    monkeypatch.setattr(media_service, "_object_exists", lambda key: True)
+    monkeypatch.setattr(media_service.media_processor, "submit", pytest.fail)
+    db = FakeDb()
+    media = _image_media()
+
+    key = media_service.ensure_thumbnail(db, media, 600)
+
+    assert key == "cms/7/thumbnails/abc_600.jpg"
+    assert media.thumbnails == {"600": key} and db.commits == 1
+
+    monkeypatch.setattr(media_service, "_object_exists", pytest.fail)
+    assert media_service.ensure_thumbnail(db, media, 600) == key
+    assert db.commits == 1
+
+
+def test_ensure_thumbnail_rejects_unknown_sizes_and_non_images():
+    with pytest.raises(ValueError):
+        media_service.ensure_thumbnail(FakeDb(), _image_media(), 123)
+
+    assert media_service.ensure_thumbnail(FakeDb(), _image_media(mime_type="image/svg+xml"), 300) is None
+    assert media_service.ensure_thumbnail(FakeDb(), _image_media(media_type="audio"), 300) is None
+
+
+def test_stale_media_is_resubmitted_once_per_row(monkeypatch):
+    submitted = []
+    monkeypatch.setattr(media_service.media_processor, "submit",
+                        lambda func, media_id, company_id, key: submitted.append((func, media_id, company_id, key)))
+    db = MagicMock()
+    query = db.query.return_value
+    query.filter.return_value.order_by.return_value.all.return_value = [SimpleNamespace(id=4, company_id=2),
+                                                                        SimpleNamespace(id=9, company_id=3)]
+
+    assert media_service.resubmit_stale_media(db, older_than_minutes=30) == 2
+
+    assert submitted == [(media_service.process_media, 4, 2, "media:4"), (media_service.process_media, 9, 3, "media:9")]
+    criterion = str(query.filter.call_args.args[0].compile(dialect=postgresql.dialect()))
+    assert "processing_status IN" in criterion and "created_at <" in criterion
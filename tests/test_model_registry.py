@@ -0,0 +1,72 @@
+import sys
+import threading
+import time
+
+import pytest
+
+from app.core.import_profiler import ImportProfiler
+from app.core.model_registry import ModelRegistry
+
+
+def test_loader_runs_once_on_first_use_even_when_called_concurrently():
+    registry = ModelRegistry()
+    calls = []
+
+    def load():
+        calls.append(1)
+        time.sleep(0.05)
+        return object()
+
+    registry.register("embedder", load, "test model")
+    assert not registry.is_loaded("embedder") and calls == []
+
+    results = []
+    threads = [threading.Thread(target=lambda: results.append(registry.get("embedder"))) for _ in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert len(calls) == 1 and len(set(map(id, results))) == 1
+    stats = registry.stats()["embedder"]
+    assert stats["loaded"] and stats["load_ms"] >= 50 and stats["description"] == "test model"
+
+
+def test_prewarm_reports_unknown_and_failing_entries_without_raising():
+    registry = ModelRegistry()
+    registry.register("ok", lambda: "model")
+    registry.register("broken", lambda: 1 / 0)
+
+    assert registry.prewarm(["ok", "missing", "broken"]) == {
+        "ok": "loaded", "missing": "unknown", "broken": "division by zero",
+    }
+    assert registry.stats()["broken"]["error"] == "division by zero"
+    with pytest.raises(KeyError):
+        registry.get("missing")
+
+
+def test_registered_module_is_imported_on_first_get():
+    registry = ModelRegistry()
+    registry.register_module("json_sdk", "json")
+
+    assert registry.get("json_sdk") is sys.modules["json"]
+
+
+def test_import_profiler_times_first_imports_and_restores_import(monkeypatch):
+    import builtins
+    original_import = builtins.__import__
+    for name in ("email.mime", "email.mime.text"):
+        monkeypatch.delitem(sys.modules, name, raising=False)
+
+    profiler = ImportProfiler()
+    profiler.start()
+    try:
+        from email.mime import text  # noqa: F401
+    finally:
+        profiler.stop()
+
+    assert builtins.__import__ is original_import
+    modules = {entry["module"]: entry for entry in profiler.slowest(100)}
+    assert "email.mime.text" in modules
+    assert modules["email.mime"]["cumulative_ms"] >= modules["email.mime"]["self_ms"] >= 0
+    assert "slowest" in profiler.report(5)
@@ -0,0 +1,55 @@
+from app.services.placeholder_compiler import PlaceholderTemplate, compile_placeholders, iter_placeholder_strings
+from app.services.workflow_plan_service import WorkflowPlan
+
+CONTEXT = {"name": "Asha", "order": {"id": 42, "items": ["a", "b"]}}
+RESULTS = {
+    "llm-1": {"output": {"content": "Hello there", "tokens": 5}},
+    "code-1": {"output": {"total": 3}},
+    "http-1": {"output": None},
+    "num-1": {"output": 7},
+}
+
+
+def render(text):
+    return PlaceholderTemplate(text).render(CONTEXT, RESULTS)
+
+
+def test_single_placeholder_preserves_type():
+    assert render("{{context.order}}") == {"id": 42, "items": ["a", "b"]}
+    assert render("  {{ context.order.id }} ") == 42
+    assert render("{{code-1.output}}") == {"total": 3}
+    assert render("{{num-1}}") == 7
+
+
+def test_bare_step_reference_unwraps_output_content():
+    assert render("{{llm-1}}") == "Hello there"
+    assert render("{{code-1}}") == ""  # dict output without content
+    assert render("{{http-1}}") == ""
+    assert render("{{missing}}") == ""
+
+
+def test_embedded_placeholders_render_as_text():
+    assert render("Hi {{context.name}}, order {{context.order.id}}: {{llm-1}}!") == "Hi Asha, order 42: Hello there!"
+    assert render("{{context.name}}{{context.nope}}/{{context.name.deeper}}") == "Asha/"
+
+
+def test_templates_are_compiled_with_the_plan():
+    steps = {
+        "nodes": [
+            {"id": "n1", "type": "llm", "data": {"prompt": "Summarize {{context.name}}", "headers": [{"v": "{{x}}"}], "n": 3}},
+            {"id": "n2", "type": "response", "data": {"text": "plain"}},
+        ],
+        "edges": [],
+    }
+
+    plan = WorkflowPlan(1, 1, steps)
+
+    assert set(plan.templates) == {"Summarize {{context.name}}", "{{x}}"}
+    assert plan.template("Summarize {{context.name}}") is plan.templates["Summarize {{context.name}}"]
+    assert plan.template("runtime {{context.name}}") is compile_placeholders("runtime {{context.name}}")
+
+
+def test_iter_placeholder_strings_walks_nested_data():
+    data = {"a": "{{x}}", "b": ["no", {"c": "y {{z}}"}], "d": None}
+
+    assert list(iter_placeholder_strings(data)) == ["{{x}}", "y {{z}}"]
@@ -0,0 +1,64 @@
+from app.services.report_service import ReportCache
+
+
+def test_report_cache_reuses_value_until_invalidated():
+    cache = ReportCache()
+    calls = []
+
+    def compute():
+        calls.append(1)
+        return len(calls)
+
+    assert cache.get_or_compute((1, "conversations", None, None), 60, compute) == 1
+    assert cache.get_or_compute((1, "conversations", None, None), 60, compute) == 1
+    assert cache.get_or_compute((2, "conversations", None, None), 60, compute) == 2
+
+    cache.invalidate_company(1)
+
+    assert cache.get_or_compute((1, "conversations", None, None), 60, compute) == 3
+    assert cache.get_or_compute((2, "conversations", None, None), 60, compute) == 2
+
+
+def test_report_cache_expires_and_bounds_entries():
+    cache = ReportCache(max_entries=2)
+
+    assert cache.get_or_compute((1, "team"), 0, lambda: "first") == "first"
+    assert cache.get_or_compute((1, "team"), 0, lambda: "second") == "second"
+
+    for company_id in range(5):
+        cache.get_or_compute((company_id, "team"), 60, lambda: company_id)
+    assert len(cache._entries) == 2
+
+
+def test_report_cache_drops_value_computed_across_an_invalidation():
+    cache = ReportCache()
+
+    def compute():
+        cache.invalidate_company(1)  # A commit lands while the report is being computed
+        return "stale"
+
+    assert cache.get_or_compute((1, "conversations"), 60, compute) == "stale"
+    assert cache.get_or_compute((1, "conversations"), 60, lambda: "fresh") == "fresh"
+    assert cache.get_or_compute((1, "conversations"), 60, lambda: "later") == "fresh"
+
+
+def test_session_rollback_discards_dirty_companies(monkeypatch):
+    from sqlalchemy import create_engine, text
+    from sqlalchemy.orm import Session
+
+    from app.services import report_service
+
+    invalidated = []
+    monkeypatch.setattr(report_service.report_cache, "invalidate_company", invalidated.append)
+    db = Session(create_engine("sqlite://"))
+
+    db.execute(text("SELECT 1"))
+    db.info["report_dirty_companies"] = {1}
+    db.rollback()
+    assert "report_dirty_companies" not in db.info
+
+    db.execute(text("SELECT 1"))
+    db.info["report_dirty_companies"] = {2}
+    db.commit()
+    assert invalidated == [2]
+    db.close()
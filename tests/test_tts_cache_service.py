@@ -0,0 +1,193 @@
+import asyncio
+import json
+from types import SimpleNamespace
+
+import aiohttp
+import pytest
+
+from app.services import tts_cache_service
+from app.services.tts_cache_service import (
+    FORMAT_BROWSER,
+    LocalTTSCacheBackend,
+    TTSAudioCache,
+    extract_static_prompts,
+    normalize_text,
+)
+
+
+@pytest.fixture
+def cache(tmp_path):
+    return TTSAudioCache(LocalTTSCacheBackend(str(tmp_path), max_bytes=1024 * 1024), memory_max_bytes=1024)
+
+
+class FakeTTSService:
+    """Streams fixed chunks; optionally fails part-way like a dropped connection."""
+
+    def __init__(self, chunks, fail_after=None):
+        self.chunks = chunks
+        self.fail_after = fail_after
+        self.calls = 0
+
+    async def text_to_speech_stream(self, text, voice_id, provider, strict=False):
+        self.calls += 1
+        for i, chunk in enumerate(self.chunks):
+            if self.fail_after is not None and i == self.fail_after:
+                if strict:
+                    raise aiohttp.ClientPayloadError("connection reset")
+                return
+            yield chunk
+
+
+async def _drain(generator):
+    return [chunk async for chunk in generator]
+
+
+def test_make_key_normalizes_whitespace():
+    key = TTSAudioCache.make_key("openai", "alloy", "  Hello,\n  world ", "mulaw_8000")
+    assert key == TTSAudioCache.make_key("openai", "alloy", "Hello, world", "mulaw_8000")
+    assert key.startswith("openai/mulaw_8000/")
+    assert key != TTSAudioCache.make_key("openai", "alloy", "Hello, world", "l16_8000")
+    assert TTSAudioCache.make_key(None, "alloy", "Hi", FORMAT_BROWSER).startswith("default/")
+
+
+def test_non_string_text_is_not_cacheable(cache):
+    assert normalize_text(42) == "42"
+    assert normalize_text(None) == ""
+    assert not cache.is_cacheable({"content": "Hi"})
+    assert cache.is_cacheable("Hi")
+
+
+def test_extract_static_prompts_covers_node_types():
+    visual_steps = {
+        "nodes": [
+            {"type": "response", "data": {"output_value": "Thanks for calling."}},
+            {"type": "response", "data": {"output_value": "Hi {{context.name}}"}},
+            {
+                "type": "prompt",
+                "data": {"params": {
+                    "prompt_text": "Pick a department",
+                    "options": [{"key": "sales", "value": "Sales"}, {"key": "support", "value": "Support"}],
+                }},
+            },
+            {
+                "type": "form",
+                "data": {"params": {
+                    "title": "Contact details",
+                    "fields": [{"name": "email", "label": "Email"}, {"name": "phone"}],
+                }},
+            },
+        ]
+    }
+
+    prompts = extract_static_prompts(json.dumps(visual_steps))
+
+    assert "Thanks for calling." in prompts
+    assert not any("{{" in prompt for prompt in prompts)
+    assert "Pick a department" in prompts
+    assert "Pick a department. Your options are: Sales, Support" in prompts
+    assert "Pick a department Your options are: Sales, Support" in prompts
+    assert "Contact details" in prompts
+    assert "Contact details Please provide: Email, phone" in prompts
+
+
+def test_memory_lru_evicts_least_recently_used(cache):
+    cache._remember("a", b"x" * 400)
+    cache._remember("b", b"x" * 400)
+    asyncio.run(cache.get("a"))  # "a" becomes most recently used
+    cache._remember("c", b"x" * 400)
+
+    assert list(cache._memory) == ["a", "c"]
+    assert cache._memory_bytes == 800
+
+    cache._remember("too-big", b"x" * 2048)
+    assert "too-big" not in cache._memory
+
+
+def test_get_or_synthesize_is_single_flight(cache):
+    calls = 0
+
+    async def synthesize():
+        nonlocal calls
+        calls += 1
+        await asyncio.sleep(0.01)
+        return b"audio"
+
+    async def run():
+        return await asyncio.gather(*[
+            cache.get_or_synthesize("openai", "alloy", "Welcome", "mulaw_8000", synthesize, static=True)
+            for _ in range(5)
+        ])
+
+    results = asyncio.run(run())
+
+    assert results == [b"audio"] * 5
+    assert calls == 1
+    key = cache.make_key("openai", "alloy", "Welcome", "mulaw_8000")
+    assert cache.backend.read(key) == b"audio"
+
+
+def test_static_registration_survives_restart(tmp_path):
+    backend = LocalTTSCacheBackend(str(tmp_path), max_bytes=1024 * 1024)
+    asyncio.run(TTSAudioCache(backend, 1024).register_static_prompts(["Please hold."]))
+
+    restarted = TTSAudioCache(LocalTTSCacheBackend(str(tmp_path), max_bytes=1024 * 1024), 1024)
+    assert asyncio.run(restarted.is_static_prompt("Please  hold."))
+    assert not asyncio.run(restarted.is_static_prompt("Something else"))
+
+
+def test_static_prompt_lookups_are_memoized(cache, monkeypatch):
+    reads = []
+    read = cache.backend.read
+    monkeypatch.setattr(cache.backend, "read", lambda key: reads.append(key) or read(key))
+    other_worker = TTSAudioCache(cache.backend, 1024)
+    clock = iter([0] * 4 + [tts_cache_service.STATIC_PROMPT_MISS_TTL + 1])
+    monkeypatch.setattr(tts_cache_service, "time", SimpleNamespace(monotonic=lambda: next(clock)))
+
+    async def scenario():
+        assert not await cache.is_static_prompt("Thanks, your order ships today.")
+        assert not await cache.is_static_prompt("Thanks,  your order ships today.")
+        assert not await cache.is_static_prompt("Please hold.")
+        await other_worker.register_static_prompts(["Please hold."])
+        assert not await cache.is_static_prompt("Please hold.")  # remembered miss
+        assert await cache.is_static_prompt("Please hold.")  # miss expired
+        assert await cache.is_static_prompt("Please hold.")
+        assert not await cache.is_static_prompt("x" * 1000)  # never cached, never looked up
+
+    asyncio.run(scenario())
+
+    assert len(reads) == 3
+
+
+
+def test_truncated_browser_stream_is_not_cached(cache, monkeypatch):
+    monkeypatch.setattr(tts_cache_service, "tts_audio_cache", cache)
+    failing = FakeTTSService([b"one", b"two", b"three"], fail_after=2)
+
+    chunks = asyncio.run(_drain(
+        tts_cache_service.stream_browser_tts(failing, "Please hold.", "v1", "voice_engine", static=True)
+    ))
+
+    assert chunks == [b"one", b"two"]
+    key = cache.make_key("voice_engine", "v1", "Please hold.", FORMAT_BROWSER)
+    assert asyncio.run(cache.get(key)) is None
+
+    complete = FakeTTSService([b"one", b"two", b"three"])
+    asyncio.run(_drain(
+        tts_cache_service.stream_browser_tts(complete, "Please hold.", "v1", "voice_engine", static=True)
+    ))
+    assert asyncio.run(cache.get(key)) == b"onetwothree"
+
+    replay = asyncio.run(_drain(
+        tts_cache_service.stream_browser_tts(complete, "Please hold.", "v1", "voice_engine")
+    ))
+    assert b"".join(replay) == b"onetwothree"
+    assert complete.calls == 1
+
+
+def test_local_backend_sweep_enforces_size_cap(tmp_path):
+    backend = LocalTTSCacheBackend(str(tmp_path), max_bytes=250, sweep_every=1)
+    for i in range(5):
+        backend.write(f"openai/browser/{i}", b"x" * 100)
+
+    remaining = [i for i in range(5) if backend.read(f"openai/browser/{i}")]
+    assert remaining == [3, 4]
@@ -0,0 +1,113 @@
+import asyncio
+import hashlib
+import hmac
+import json
+from unittest.mock import MagicMock
+
+import httpx
+import pytest
+from sqlalchemy.dialects import postgresql
+
+from app.services import webhook_delivery_service
+from app.services.webhook_delivery_service import WebhookDeliveryWorker, sign_payload
+
+
+def test_signature_covers_the_exact_body_sent():
+    body, signature = sign_payload({"message": "Hi", "when": 1.5}, "s3cret")
+
+    assert json.loads(body) == {"message": "Hi", "when": 1.5}
+    assert signature == hmac.new(b"s3cret", body.encode(), hashlib.sha256).hexdigest()
+
+
+def test_retry_delay_doubles_up_to_the_cap():
+    worker = WebhookDeliveryWorker(backoff=5, backoff_max=60)
+
+    delays = [worker.retry_delay(attempts) for attempts in (1, 2, 3, 10)]
+
+    assert 4 <= delays[0] <= 5 and 8 <= delays[1] <= 10 and 16 <= delays[2] <= 20
+    assert 48 <= delays[3] <= 60
+
+
+@pytest.fixture
+def recorded(monkeypatch):
+    """Outcomes written by _finish, by delivery id."""
+    db = MagicMock()
+    monkeypatch.setattr(webhook_delivery_service, "SessionLocal", lambda: db)
+    return db
+
+
+def _worker(handler, **kwargs):
+    worker = WebhookDeliveryWorker(max_attempts=3, **kwargs)
+    worker._client = httpx.AsyncClient(transport=httpx.MockTransport(handler))
+    return worker
+
+
+def _written_values(db):
+    stmt = db.execute.call_args.args[0]
+    return stmt.compile(dialect=postgresql.dialect()).params
+
+
+def test_success_retry_and_permanent_failure_are_recorded(recorded):
+    statuses = iter([200, 503, 404])
+    seen = []
+
+    def handler(request):
+        seen.append((request.headers["X-Webhook-Signature"], request.headers["X-Webhook-Delivery"], request.content))
+        return httpx.Response(next(statuses))
+
+    worker = _worker(handler)
+
+    assert asyncio.run(worker.deliver(1, "https://hooks.test/a", '{"a":1}', "sig", "message_response", 1)) == "delivered"
+    assert asyncio.run(worker.deliver(2, "https://hooks.test/a", "{}", "sig", "message_response", 1)) == "pending"
+    params = _written_values(recorded)
+    assert params["last_status_code"] == 503 and params["last_error"].startswith("HTTP 503")
+    assert asyncio.run(worker.deliver(3, "https://hooks.test/a", "{}", "sig", "message_response", 1)) == "failed"
+
+    assert seen[0] == ("sig", "1", b'{"a":1}')
+    assert worker.stats() == {"in_flight": 0, "delivered": 1, "retried": 1, "failed": 1}
+
+
+def test_transport_errors_retry_until_attempts_run_out(recorded):
+    def handler(request):
+        raise httpx.ConnectError("refused", request=request)
+
+    worker = _worker(handler)
+
+    assert asyncio.run(worker.deliver(1, "https://down.test/", "{}", "sig", "message_response", 2)) == "pending"
+    assert asyncio.run(worker.deliver(1, "https://down.test/", "{}", "sig", "message_response", 3)) == "failed"
+    assert _written_values(recorded)["last_error"].startswith("ConnectError")
+
+
+def test_deliveries_to_one_host_respect_the_per_endpoint_limit(recorded):
+    active = {"now": 0, "max": 0}
+
+    async def handler(request):
+        active["now"] += 1
+        active["max"] = max(active["max"], active["now"])
+        await asyncio.sleep(0.01)
+        active["now"] -= 1
+        return httpx.Response(204)
+
+    worker = _worker(handler, per_endpoint=2)
+
+    async def scenario():
+        await asyncio.gather(*[
+            worker.deliver(i, "https://busy.test/hook", "{}", "sig", "message_response", 1) for i in range(6)
+        ])
+
+    asyncio.run(scenario())
+
+    assert active["max"] == 2
+    assert worker.delivered == 6
+
+
+def test_claim_leases_due_rows_with_skip_locked():
+    db = MagicMock()
+    db.execute.return_value.all.return_value = []
+
+    WebhookDeliveryWorker()._claim_due(db, 5)
+
+    sql = str(db.execute.call_args.args[0].compile(dialect=postgresql.dialect()))
+    assert "FOR UPDATE SKIP LOCKED" in sql
+    assert "attempts=(webhook_deliveries.attempts + " in sql
+    db.commit.assert_called_once()
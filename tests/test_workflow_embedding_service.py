@@ -0,0 +1,78 @@
+from types import SimpleNamespace
+
+import numpy as np
+
+from app.services.workflow_embedding_service import WorkflowEmbeddingIndex
+
+VECTORS = {
+    "Refunds Handle refund requests": [1.0, 0.0, 0.0],
+    "Booking Book appointments": [0.0, 2.0, 0.0],
+    "Booking Book and reschedule appointments": [0.0, 1.0, 1.0],
+    "Support ": [0.0, 0.0, 3.0],
+}
+
+
+def _workflow(id, name, description):
+    return SimpleNamespace(id=id, name=name, description=description)
+
+
+def _index():
+    calls = []
+
+    def embed(texts):
+        calls.append(list(texts))
+        return np.array([VECTORS[text] for text in texts])
+
+    return WorkflowEmbeddingIndex(embed=embed), calls
+
+
+def test_workflows_are_embedded_once_in_one_batch():
+    index, calls = _index()
+    refunds, booking = _workflow(1, "Refunds", "Handle refund requests"), _workflow(2, "Booking", "Book appointments")
+
+    workflow, score = index.best_match(10, [0.1, 0.9, 0.0], [refunds, booking])
+    again, _ = index.best_match(10, [0.9, 0.1, 0.0], [refunds, booking])
+
+    assert workflow is booking and abs(score - 0.9939) < 1e-3
+    assert again is refunds
+    assert calls == [["Refunds Handle refund requests", "Booking Book appointments"]]
+    assert index.stats() == {"companies": 1, "rows": 2, "embedded": 2, "lookups": 2}
+
+
+def test_changed_text_is_re_embedded_and_candidates_limit_the_match():
+    index, calls = _index()
+    refunds, booking = _workflow(1, "Refunds", "Handle refund requests"), _workflow(2, "Booking", "Book appointments")
+    index.upsert(10, [refunds, booking])
+
+    booking.description = "Book and reschedule appointments"
+    assert index.best_match(10, [0.0, 0.0, 1.0], [refunds, booking])[0] is booking
+    assert calls[-1] == ["Booking Book and reschedule appointments"]
+
+    # Only the candidates passed in are considered
+    assert index.best_match(10, [0.0, 0.0, 1.0], [refunds])[0] is refunds
+
+
+def test_remove_keeps_remaining_rows_aligned():
+    index, _ = _index()
+    workflows = [_workflow(1, "Refunds", "Handle refund requests"), _workflow(2, "Booking", "Book appointments"),
+                 _workflow(3, "Support", None)]
+    index.upsert(10, workflows)
+
+    index.remove(10, 1)
+
+    assert index.best_match(10, [0.0, 0.0, 1.0], workflows[1:])[0] is workflows[2]
+    assert index.best_match(10, [0.0, 1.0, 0.0], workflows[1:])[0] is workflows[1]
+    assert index.stats()["rows"] == 2
+
+
+def test_companies_are_evicted_least_recently_used_first():
+    index, calls = _index()
+    index.max_companies = 1
+    refunds = _workflow(1, "Refunds", "Handle refund requests")
+
+    index.upsert(10, [refunds])
+    index.upsert(20, [refunds])
+    index.upsert(10, [refunds])
+
+    assert len(calls) == 3
+    assert index.stats()["companies"] == 1
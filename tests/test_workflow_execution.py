@@ -75,3 +75,114 @@ def test_execute_simple_llm_workflow(workflow_execution_service, mock_db_session
     assert args[1] == conversation_id
     assert isinstance(args[2], ConversationSessionUpdate)
     assert args[2].status == 'completed'
+
+
+def test_fan_out_runs_branches_concurrently_with_isolated_results(workflow_execution_service, monkeypatch):
+    import asyncio
+    import time
+    from app.services.workflow_plan_service import WorkflowPlan
+    from app.services.graph_execution_engine import GraphExecutionEngine
+
+    steps = {
+        "nodes": [
+            {"id": "start", "type": "start"},
+            {"id": "a", "type": "http_request"},
+            {"id": "b1", "type": "http_request"},
+            {"id": "b2", "type": "llm"},
+            {"id": "join", "type": "response"},
+        ],
+        "edges": [
+            {"source": "start", "target": "a"},
+            {"source": "start", "target": "b1"},
+            {"source": "a", "target": "join"},
+            {"source": "b1", "target": "b2"},
+            {"source": "b2", "target": "join"},
+        ],
+    }
+    plan = WorkflowPlan(1, 1, steps)
+    workflow_execution_service._plan = plan
+    seen = {}
+
+    async def fake_node(node_id, node, context, results, workflow_obj, conversation_id):
+        seen[node_id] = set(results)
+        await asyncio.sleep(0.1)
+        context[f"{node_id}_done"] = True
+        return {"output": node_id}
+
+    monkeypatch.setattr(workflow_execution_service, "_execute_parallel_node", fake_node)
+    context, results = {"x": 1}, {"start": {"output": "ok"}}
+
+    started = time.perf_counter()
+    asyncio.run(workflow_execution_service._execute_fan_out(
+        GraphExecutionEngine.from_plan(plan).get_fan_out("a"), context, results, Mock(), "conv-1"))
+    elapsed = time.perf_counter() - started
+
+    assert elapsed < 0.3  # a runs alongside b1 -> b2 rather than after it
+    assert seen["a"] == {"start"} and seen["b2"] == {"start", "b1"}
+    assert results == {"start": {"output": "ok"}, "a": {"output": "a"}, "b1": {"output": "b1"}, "b2": {"output": "b2"}}
+    assert context == {"x": 1, "a_done": True, "b1_done": True, "b2_done": True}
+
+
+def test_fan_out_isolates_nested_context_and_reports_failed_branch(workflow_execution_service, monkeypatch):
+    import asyncio
+    from app.services import workflow_execution_service as execution_module
+    from app.services.workflow_plan_service import WorkflowPlan
+    from app.services.graph_execution_engine import GraphExecutionEngine
+
+    steps = {
+        "nodes": [
+            {"id": "start", "type": "start"},
+            {"id": "a", "type": "http_request"},
+            {"id": "b", "type": "http_request"},
+            {"id": "join", "type": "response"},
+        ],
+        "edges": [
+            {"source": "start", "target": "a"},
+            {"source": "start", "target": "b"},
+            {"source": "a", "target": "join"},
+            {"source": "b", "target": "join"},
+        ],
+    }
+    plan = WorkflowPlan(1, 1, steps)
+    workflow_execution_service._plan = plan
+    sessions = []
+    monkeypatch.setattr(execution_module, "SessionLocal", lambda: sessions.append(MagicMock()) or sessions[-1])
+    seen = {}
+
+    async def fake_node(node_id, node, context, results, workflow_obj, conversation_id):
+        context["order"]["items"].append(node_id)
+        await asyncio.sleep(0.01)
+        seen[node_id] = list(context["order"]["items"])
+        return {"error": "boom"} if node_id == "b" else {"output": node_id}
+
+    monkeypatch.setattr(workflow_execution_service, "_execute_parallel_node", fake_node)
+    context, results = {"order": {"items": []}}, {}
+
+    failed = asyncio.run(workflow_execution_service._execute_fan_out(
+        GraphExecutionEngine.from_plan(plan).get_fan_out("a"), context, results, Mock(), "conv-1"))
+
+    assert failed == "b"
+    assert seen == {"a": ["a"], "b": ["b"]}
+    assert len(sessions) == 2 and all(session.close.called for session in sessions)
+
+
+def test_http_request_node_coerces_settings_and_sends_no_get_body(workflow_execution_service, monkeypatch):
+    import asyncio
+    import httpx
+    from app.services import workflow_execution_service as execution_module
+
+    sent = {}
+
+    async def request(method, url, **kwargs):
+        sent.update(kwargs, method=method)
+        return httpx.Response(200, json={"ok": True}, request=httpx.Request(method, url))
+
+    monkeypatch.setattr(execution_module.workflow_http, "request", request)
+    node_data = {"url": "https://api.test/x", "method": "GET", "body": '{"q": 1}',
+                 "timeout": "2.5", "retries": "many", "cache_ttl": -5}
+
+    result = asyncio.run(workflow_execution_service._execute_http_request_node(node_data, {}, {}))
+
+    assert result == {"output": {"ok": True}}
+    assert (sent["method"], sent["json_body"]) == ("GET", None)
+    assert (sent["timeout"], sent["retries"], sent["cache_ttl"]) == (2.5, None, None)
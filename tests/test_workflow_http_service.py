@@ -0,0 +1,122 @@
+import asyncio
+
+import httpx
+import pytest
+
+from app.services.workflow_http_service import WorkflowHttpClient, cache_control_ttl
+
+
+def _client(handler, **kwargs):
+    return WorkflowHttpClient(transport=httpx.MockTransport(handler), retry_backoff=0, **kwargs)
+
+
+def test_cache_control_ttl():
+    assert cache_control_ttl(httpx.Headers({"Cache-Control": "public, max-age=60"})) == 60
+    assert cache_control_ttl(httpx.Headers({"Cache-Control": "max-age=60, s-maxage=5"})) == 5
+    assert cache_control_ttl(httpx.Headers({"Cache-Control": "no-store"})) == 0
+    assert cache_control_ttl(httpx.Headers({})) is None
+
+
+def test_cached_gets_are_served_without_a_request():
+    calls = []
+
+    def handler(request):
+        calls.append(request.headers.get("authorization"))
+        return httpx.Response(200, json={"n": len(calls)}, headers={"Cache-Control": "max-age=60"})
+
+    client = _client(handler)
+
+    async def scenario():
+        first = await client.request("GET", "https://api.test/items", headers={"Authorization": "a"}, cache=True)
+        again = await client.request("GET", "https://api.test/items", headers={"Authorization": "a"}, cache=True)
+        other_user = await client.request("GET", "https://api.test/items", headers={"Authorization": "b"}, cache=True)
+        uncached = await client.request("GET", "https://api.test/items", headers={"Authorization": "a"})
+        return first, again, other_user, uncached
+
+    first, again, other_user, uncached = asyncio.run(scenario())
+
+    assert first.json() == again.json() == {"n": 1}
+    again.raise_for_status()
+    assert other_user.json() == {"n": 2} and uncached.json() == {"n": 3}
+    assert client.stats()["cache"] == {"entries": 2, "hits": 1, "misses": 2}
+
+
+def test_node_ttl_overrides_no_cache_headers():
+    calls = []
+
+    def handler(request):
+        calls.append(request)
+        return httpx.Response(200, text="ok", headers={"Cache-Control": "no-store"})
+
+    client = _client(handler)
+
+    async def scenario():
+        await client.request("GET", "https://api.test/a", cache=True)
+        await client.request("GET", "https://api.test/a", cache=True)
+        await client.request("GET", "https://api.test/b", cache=True, cache_ttl=30)
+        await client.request("GET", "https://api.test/b", cache=True, cache_ttl=30)
+
+    asyncio.run(scenario())
+
+    assert [str(request.url) for request in calls] == ["https://api.test/a", "https://api.test/a", "https://api.test/b"]
+
+
+def test_retries_idempotent_requests_only():
+    calls = []
+
+    def handler(request):
+        calls.append(request.method)
+        return httpx.Response(503 if len(calls) < 3 else 200, text="busy")
+
+    client = _client(handler)
+
+    assert asyncio.run(client.request("GET", "https://api.test/x", retries=2)).status_code == 200
+    assert calls == ["GET"] * 3
+
+    calls.clear()
+    assert asyncio.run(client.request("POST", "https://api.test/x", json_body={}, retries=2)).status_code == 503
+    assert calls == ["POST"]
+
+
+def test_transport_errors_raise_after_retries_and_are_counted_per_host():
+    def handler(request):
+        raise httpx.ConnectError("refused", request=request)
+
+    client = _client(handler)
+
+    with pytest.raises(httpx.ConnectError):
+        asyncio.run(client.request("POST", "https://down.test/x", retries=1))
+
+    assert client.stats()["hosts"]["down.test"]["requests"] == 2
+    assert client.stats()["hosts"]["down.test"]["errors"] == 2
+
+
+def test_json_body_is_only_sent_with_body_methods():
+    seen = []
+
+    def handler(request):
+        seen.append((request.method, request.content, request.headers.get("content-type")))
+        return httpx.Response(200)
+
+    client = _client(handler)
+
+    async def scenario():
+        await client.request("GET", "https://api.test/x", json_body={})
+        await client.request("DELETE", "https://api.test/x", json_body={"id": 1})
+        await client.request("POST", "https://api.test/x", json_body={"id": 1})
+
+    asyncio.run(scenario())
+
+    assert seen[:2] == [("GET", b"", None), ("DELETE", b"", None)]
+    assert seen[2][0] == "POST" and seen[2][1] == b'{"id":1}'
+
+
+def test_a_new_event_loop_closes_the_previous_client():
+    client = _client(lambda request: httpx.Response(200))
+
+    asyncio.run(client.request("GET", "https://api.test/x"))
+    first = client._client
+    asyncio.run(client.request("GET", "https://api.test/x"))
+
+    assert first.is_closed and client._client is not first and not client._client.is_closed
+    asyncio.run(client.aclose())
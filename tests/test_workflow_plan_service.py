@@ -0,0 +1,140 @@
+import json
+from types import SimpleNamespace
+
+import pytest
+
+from app.services.graph_execution_engine import GraphExecutionEngine
+from app.services.workflow_plan_service import WorkflowPlan, WorkflowPlanCache, WorkflowPlanError
+
+STEPS = {
+    "nodes": [
+        {"id": "start", "type": "start"},
+        {"id": "check", "type": "condition"},
+        {"id": "classify", "type": "question_classifier"},
+        {"id": "yes", "type": "response"},
+        {"id": "no", "type": "response"},
+        {"id": "billing", "type": "response"},
+        {"id": "fallback", "type": "response"},
+    ],
+    "edges": [
+        {"source": "start", "target": "check"},
+        {"source": "check", "target": "yes", "sourceHandle": "true"},
+        {"source": "check", "target": "no", "sourceHandle": "false"},
+        {"source": "check", "target": "fallback", "sourceHandle": "true"},
+        {"source": "yes", "target": "classify"},
+        {"source": "classify", "target": "billing", "sourceHandle": "billing"},
+        {"source": "classify", "target": "fallback", "sourceHandle": "default"},
+        {"source": "no", "target": "fallback", "sourceHandle": "error"},
+    ],
+}
+
+
+def _workflow(visual_steps, workflow_id=1, version=1):
+    return SimpleNamespace(id=workflow_id, version=version, visual_steps=visual_steps)
+
+
+def test_plan_indexes_graph():
+    plan = WorkflowPlan(1, 1, STEPS)
+
+    assert plan.start_node_id == "start"
+    assert plan.target("check", "true") == "yes"  # first matching edge wins
+    assert plan.adjacency_list["check"] == ("yes", "no", "fallback")
+    with pytest.raises(TypeError):
+        plan.nodes["extra"] = {}
+
+
+def test_engine_routes_through_plan():
+    engine = GraphExecutionEngine.from_plan(WorkflowPlan(1, 1, STEPS))
+
+    assert engine.find_start_node() == "start"
+    assert engine.get_next_node("start", {"output": "ok"}) == "check"
+    assert engine.get_next_node("check", {"output": False}) == "no"
+    assert engine.get_next_node("classify", {"output": "billing"}) == "billing"
+    assert engine.get_next_node("classify", {"output": "sales"}) == "fallback"
+    assert engine.get_next_node("no", {"error": "boom"}) == "fallback"
+    assert engine.get_next_node("billing", {"output": "done"}) is None
+
+
+def test_engine_still_accepts_raw_workflow_data():
+    engine = GraphExecutionEngine(None)
+
+    assert engine.nodes == {} and engine.find_start_node() is None
+
+
+def test_cache_reuses_plan_until_steps_change():
+    cache = WorkflowPlanCache(max_entries=10)
+    stored = json.dumps(STEPS)
+
+    first = cache.get(_workflow(stored))
+    assert cache.get(_workflow(stored)) is first
+
+    edited = dict(STEPS, edges=STEPS["edges"][:1])
+    second = cache.get(_workflow(json.dumps(edited)))
+    assert second is not first and second.target("check", "true") is None
+    assert cache.stats() == {"entries": 2, "hits": 1, "misses": 2}
+
+
+def test_invalidate_drops_dict_backed_plans():
+    cache = WorkflowPlanCache(max_entries=10)
+    workflow = _workflow(STEPS)
+    first = cache.get(workflow)
+
+    cache.invalidate(1)
+
+    assert cache.get(workflow) is not first
+
+
+@pytest.mark.parametrize("visual_steps, message", [
+    (None, "Workflow configuration is incomplete. Please contact support."),
+    ("{not json", "Failed to parse workflow visual steps."),
+    ("[1, 2]", "Workflow configuration is invalid. Please contact support."),
+])
+def test_unusable_steps_raise_user_facing_errors(visual_steps, message):
+    with pytest.raises(WorkflowPlanError, match=message.replace(".", r"\.")):
+        WorkflowPlanCache().get(_workflow(visual_steps))
+
+
+FAN_OUT_STEPS = {
+    "nodes": [
+        {"id": "start", "type": "start"},
+        {"id": "crm", "type": "http_request"},
+        {"id": "billing", "type": "http_request"},
+        {"id": "summarize", "type": "llm"},
+        {"id": "kb", "type": "knowledge"},
+        {"id": "reply", "type": "response"},
+    ],
+    "edges": [
+        {"source": "start", "target": "crm"},
+        {"source": "start", "target": "billing"},
+        {"source": "start", "target": "kb"},
+        {"source": "billing", "target": "summarize"},
+        {"source": "crm", "target": "reply"},
+        {"source": "summarize", "target": "reply"},
+        {"source": "kb", "target": "reply"},
+    ],
+}
+
+
+def test_plan_finds_fan_out_keyed_by_first_branch_head():
+    plan = WorkflowPlan(1, 1, FAN_OUT_STEPS)
+
+    fan_out = GraphExecutionEngine.from_plan(plan).get_fan_out("crm")
+    assert fan_out.source == "start" and fan_out.join == "reply"
+    assert fan_out.branches == (("crm",), ("billing", "summarize"), ("kb",))
+    assert plan.default_target("start") == "crm"
+    assert list(plan.fan_outs) == ["crm"]
+
+
+@pytest.mark.parametrize("edit", [
+    # Branches that don't meet again
+    lambda steps: steps["edges"].__setitem__(4, {"source": "crm", "target": "start"}),
+    # A branch node with an error path
+    lambda steps: steps["edges"].append({"source": "kb", "target": "reply", "sourceHandle": "error"}),
+    # A node that can pause inside a branch
+    lambda steps: steps["nodes"].__setitem__(4, {"id": "kb", "type": "listen"}),
+])
+def test_plan_rejects_non_independent_branches(edit):
+    steps = json.loads(json.dumps(FAN_OUT_STEPS))
+    edit(steps)
+
+    assert WorkflowPlan(1, 1, steps).fan_outs == {}
@@ -0,0 +1,159 @@
+from types import SimpleNamespace
+from unittest.mock import MagicMock
+
+import pytest
+from sqlalchemy.dialects import postgresql
+
+from app.schemas.conversation_session import ConversationSessionUpdate
+from app.services import conversation_session_service, memory_service
+from app.services.workflow_turn_state import WorkflowTurnState
+
+
+@pytest.fixture
+def session_row():
+    return SimpleNamespace(conversation_id="c1", context={}, next_step_id=None, status="active")
+
+
+@pytest.fixture
+def calls(monkeypatch, session_row):
+    calls = {"get_session": 0, "deleted": [], "upserted": []}
+
+    def get_session(db, conversation_id):
+        calls["get_session"] += 1
+        return session_row if conversation_id == "c1" else None
+
+    monkeypatch.setattr(conversation_session_service, "get_session", get_session)
+    monkeypatch.setattr(memory_service, "get_all_memories", lambda db, agent_id, session_id: [
+        SimpleNamespace(key="name", value="stored"), SimpleNamespace(key="city", value="Pune"),
+    ])
+    monkeypatch.setattr(memory_service, "delete_all_memories",
+                        lambda db, agent_id, session_id, commit: calls["deleted"].append((agent_id, session_id, commit)))
+    monkeypatch.setattr(memory_service, "upsert_memories",
+                        lambda db, values, agent_id, session_id, commit: calls["upserted"].append((agent_id, session_id, dict(values), commit)))
+    # flag_modified needs a mapped instance
+    monkeypatch.setattr("app.services.workflow_turn_state.flag_modified", lambda row, key: None)
+    return calls
+
+
+def test_session_changes_are_visible_in_the_turn_and_written_once(calls, session_row):
+    db = MagicMock()
+    turn = WorkflowTurnState(db)
+
+    assert not turn.session("c1").next_step_id and not turn.pending
+    turn.update_session("c1", ConversationSessionUpdate(next_step_id="n2", status="active"))
+    turn.update_context("c1", {"tags": ["vip"]})
+    turn.update_session("c1", ConversationSessionUpdate(next_step_id=None))
+
+    session = turn.session("c1")
+    assert session.next_step_id is None and session.context == {"tags": ["vip"]}
+    assert session.conversation_id == "c1"
+    with pytest.raises(AttributeError):
+        session.status = "completed"
+    assert turn.update_context("missing", {}) is None
+    # The row itself is untouched until the flush
+    assert session_row.context == {} and session_row.status == "active"
+    db.commit.assert_not_called()
+
+    turn.flush()
+    turn.flush()  # nothing left to write
+
+    assert session_row.next_step_id is None and session_row.context == {"tags": ["vip"]}
+    db.commit.assert_called_once()
+    assert calls["get_session"] == 2  # "c1" once for the turn, plus the missing conversation
+    assert not turn.pending
+
+
+def test_memories_are_buffered_and_upserted_per_agent(calls):
+    db = MagicMock()
+    turn = WorkflowTurnState(db)
+
+    turn.set_memory(7, "c1", "name", "first")
+    turn.set_memory(7, "c1", "name", "Asha")
+    turn.set_memory(None, "c1", "ignored", 1)
+
+    assert turn.memories(7, "c1") == {"name": "Asha", "city": "Pune"}
+    assert turn.memories(None, "c1") == {}
+
+    turn.flush()
+
+    assert calls["upserted"] == [(7, "c1", {"name": "Asha"}, False)]
+    db.commit.assert_called_once()
+
+
+def test_clear_drops_earlier_keys_and_runs_before_upserts(calls):
+    turn = WorkflowTurnState(MagicMock())
+
+    turn.set_memory(7, "c1", "old", 1)
+    turn.clear_memories(7, "c1")
+    turn.set_memory(7, "c1", "initial_user_message", "hi")
+
+    assert turn.memories(7, "c1") == {"initial_user_message": "hi"}
+
+    turn.flush()
+
+    assert calls["deleted"] == [(7, "c1", False)]
+    assert calls["upserted"] == [(7, "c1", {"initial_user_message": "hi"}, False)]
+
+
+def test_failed_flush_rolls_back_and_keeps_changes(calls):
+    db = MagicMock()
+    db.commit.side_effect = RuntimeError("connection lost")
+    turn = WorkflowTurnState(db)
+    turn.set_memory(7, "c1", "name", "Asha")
+
+    with pytest.raises(RuntimeError):
+        turn.flush()
+
+    db.rollback.assert_called_once()
+    assert turn.pending
+
+
+def test_upsert_memories_is_one_on_conflict_statement():
+    db = MagicMock()
+
+    assert memory_service.upsert_memories(db, {}, agent_id=1, session_id="c1") == 0
+    assert memory_service.upsert_memories(db, {"a": 1, "b": {"x": 2}}, agent_id=1, session_id="c1", commit=False) == 2
+
+    stmt = db.execute.call_args.args[0]
+    sql = str(stmt.compile(dialect=postgresql.dialect()))
+    assert "ON CONFLICT (agent_id, session_id, key) DO UPDATE SET value = excluded.value" in sql
+    db.execute.assert_called_once()
+    db.commit.assert_not_called()
+
+
+def test_staged_session_leaves_the_row_clean_and_a_failed_flush_rolls_back(monkeypatch):
+    from sqlalchemy import create_engine
+    from sqlalchemy.orm import Session
+
+    from app.models.conversation_session import ConversationSession
+
+    engine = create_engine("sqlite://")
+    ConversationSession.__table__.create(engine)
+    db = Session(engine)
+    # A Core insert skips the conversation stats hooks, whose table isn't created here
+    db.execute(ConversationSession.__table__.insert().values(
+        conversation_id="c1", company_id=1, channel="web", context={"step": 1}, status="active",
+        is_ai_enabled=True, is_client_connected=False, reopen_count=0, priority=0, waiting_for_agent=False,
+    ))
+    db.commit()
+
+    def fail(db, values, agent_id, session_id, commit):
+        raise RuntimeError("deadlock detected")
+
+    monkeypatch.setattr(memory_service, "upsert_memories", fail)
+    turn = WorkflowTurnState(db)
+    turn.update_session("c1", ConversationSessionUpdate(next_step_id="n2", status="waiting_for_input"))
+    turn.update_context("c1", {"step": 2})
+    turn.set_memory(7, "c1", "name", "Asha")
+
+    # No dirty row for the next query to autoflush and lock
+    assert not db.dirty
+    assert turn.session("c1").status == "waiting_for_input"
+
+    with pytest.raises(RuntimeError):
+        turn.flush()
+
+    row = db.query(ConversationSession).filter_by(conversation_id="c1").one()
+    assert (row.status, row.next_step_id, row.context) == ("active", None, {"step": 1})
+    assert turn.pending and turn.session("c1").next_step_id == "n2"
+    db.close()